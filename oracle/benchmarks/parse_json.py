@@ -0,0 +1,130 @@
+"""Micro-benchmark for judgment parsing.
+
+Compares the previous regex-based `parse_llm_json` + dict-to-model path
+against `utils.parse_judgment_json` over a corpus of provider outputs (one
+JSON object per line with "provider", "shape" and "raw").
+
+The bundled `corpus.jsonl` is synthetic: three short judgments (about 150
+characters of reasoning each) in each of the response shapes seen from the
+providers, namely structured output, pretty-printed JSON, fenced JSON and
+JSON wrapped in prose. It shows the relative cost of each shape, but real
+answers with long reasoning spend more of their time in JSON decoding. To
+benchmark real provider outputs, record a run (`main --record`) and pass
+the cassette with `--cassette`; its non-streamed Claude, GPT and Gemini
+answers become the corpus.
+
+Usage (from the oracle/ directory):
+    python -m benchmarks.parse_json
+    python -m benchmarks.parse_json --corpus recorded.jsonl --number 20000
+    python -m benchmarks.parse_json --cassette cassettes/m7.jsonl.gz
+"""
+
+import argparse
+import json
+import re
+import timeit
+from collections import defaultdict
+from pathlib import Path
+
+from src import utils
+from src.cassette import Cassette
+from src.types import JudgmentResult, Outcome
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent / "corpus.jsonl"
+
+
+def legacy_parse(raw: str, provider: str) -> JudgmentResult:
+    """The pre-fast-path parser, kept here as the baseline."""
+    text = raw.strip()
+    text = re.sub(r"^```(?:json)?\s*\n?", "", text)
+    text = re.sub(r"\n?```\s*$", "", text)
+    start = text.find("{")
+    end = text.rfind("}")
+    if start == -1 or end == -1 or end < start:
+        raise ValueError(f"No JSON object found in LLM response: {raw}")
+    data = json.loads(text[start : end + 1])
+    return JudgmentResult(
+        provider=provider,
+        outcome=Outcome(data["outcome"]),
+        confidence=int(data["confidence"]),
+        reasoning=str(data["reasoning"]),
+    )
+
+
+def load_corpus(path: Path) -> list[dict]:
+    with path.open() as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _answer_text(body: dict) -> str | None:
+    """The judgment text of a Claude, GPT or Gemini response body."""
+    if "content" in body:  # Anthropic Messages
+        for block in body["content"]:
+            if block.get("type") == "tool_use":
+                return json.dumps(block["input"])
+        return "".join(block.get("text", "") for block in body["content"]) or None
+    if "choices" in body:  # OpenAI chat completions
+        return body["choices"][0]["message"].get("content")
+    if "candidates" in body:  # Gemini generateContent
+        return "".join(part.get("text", "") for part in body["candidates"][0]["content"]["parts"]) or None
+    return None
+
+
+def corpus_from_cassette(path: Path) -> list[dict]:
+    """Provider answers recorded in a cassette, as corpus entries.
+
+    Streamed responses and answers that are not valid judgments are skipped.
+    """
+    corpus = []
+    for interaction in Cassette.load(path).interactions:
+        if interaction["status"] != 200 or interaction["text"] is None:
+            continue
+        try:
+            body = json.loads(interaction["text"])
+            raw = _answer_text(body) if isinstance(body, dict) else None
+            if raw is None:
+                continue
+            provider = body.get("model") or body.get("modelVersion") or "recorded"
+            legacy_parse(raw, provider)
+        except (ValueError, KeyError, IndexError, TypeError):
+            continue
+        corpus.append({"provider": provider, "shape": "recorded", "raw": raw})
+    return corpus
+
+
+def bench(parse, corpus: list[dict], number: int) -> float:
+    """Mean microseconds per parse over the corpus."""
+    def run() -> None:
+        for entry in corpus:
+            parse(entry["raw"], entry["provider"])
+    return timeit.timeit(run, number=number) / (number * len(corpus)) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark LLM judgment parsing")
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--cassette", type=Path, help="Benchmark the provider answers recorded in a cassette")
+    parser.add_argument("--number", type=int, default=5000, help="Passes over the corpus")
+    args = parser.parse_args()
+
+    corpus = corpus_from_cassette(args.cassette) if args.cassette else load_corpus(args.corpus)
+    if not corpus:
+        parser.exit(1, "No provider answers found in the corpus\n")
+    for entry in corpus:
+        expected = legacy_parse(entry["raw"], entry["provider"])
+        assert utils.parse_judgment_json(entry["raw"], entry["provider"]) == expected, entry["shape"]
+
+    by_shape: defaultdict[str, list[dict]] = defaultdict(list)
+    for entry in corpus:
+        by_shape[entry.get("shape", "-")].append(entry)
+
+    print(f"{len(corpus)} responses, orjson={'yes' if utils.orjson is not None else 'no'}")
+    print(f"{'shape':<20} {'legacy µs':>10} {'fast µs':>10} {'speedup':>8}")
+    for shape, entries in [*sorted(by_shape.items()), ("all", corpus)]:
+        legacy = bench(legacy_parse, entries, args.number)
+        fast = bench(utils.parse_judgment_json, entries, args.number)
+        print(f"{shape:<20} {legacy:>10.2f} {fast:>10.2f} {legacy / fast:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark for Position decoding and risk analytics.
+
+Builds a synthetic set of Position accounts (random owners, markets, sides
+and amounts; a share of them claimed) and times `positions.decode_positions`
+and `positions.analyze` over it.
+
+Usage (from the oracle/ directory):
+    python -m benchmarks.positions
+    python -m benchmarks.positions --positions 1000000 --markets 2000 --owners 200000
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+
+from src.chain import POSITION_ACCOUNT_DISCRIMINATOR
+from src.positions import POSITION_DTYPE, analyze, decode_positions
+from src.types import MarketInfo, MarketStatus, Outcome
+
+
+def synthetic_accounts(n: int, markets: int, owners: int, seed: int = 0) -> tuple[bytes, list[MarketInfo], list[bytes]]:
+    """Concatenated Position account data, plus the markets and market keys they reference."""
+    rng = np.random.default_rng(seed)
+    owner_keys = rng.integers(0, 256, (owners, 32), dtype=np.uint8)
+    market_keys = rng.integers(0, 256, (markets, 32), dtype=np.uint8)
+
+    records = np.zeros(n, dtype=POSITION_DTYPE)
+    records["discriminator"] = np.void(POSITION_ACCOUNT_DISCRIMINATOR)
+    records["owner"] = owner_keys[rng.integers(0, owners, n)].view("V32").reshape(n)
+    market_of = rng.integers(0, markets, n)
+    records["market"] = market_keys[market_of].view("V32").reshape(n)
+    records["side"] = rng.integers(0, 2, n)
+    records["amount"] = rng.integers(1, 10**12, n)
+    records["claimed"] = rng.random(n) < 0.3
+
+    yes = np.bincount(market_of, weights=np.where(records["side"] == 0, records["amount"], 0), minlength=markets)
+    no = np.bincount(market_of, weights=np.where(records["side"] == 1, records["amount"], 0), minlength=markets)
+    infos = [
+        MarketInfo(
+            id=i,
+            title=f"Market {i}",
+            description="",
+            resolution_deadline=0,
+            yes_pool=int(yes[i]),
+            no_pool=int(no[i]),
+            status=MarketStatus.RESOLVED if i % 2 else MarketStatus.OPEN,
+            outcome=Outcome.YES if i % 2 else None,
+        )
+        for i in range(markets)
+    ]
+    return records.tobytes(), infos, [bytes(k) for k in market_keys]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Position decoding and analytics")
+    parser.add_argument("--positions", type=int, default=300_000)
+    parser.add_argument("--markets", type=int, default=200)
+    parser.add_argument("--owners", type=int, default=50_000)
+    parser.add_argument("--number", type=int, default=5, help="Timed runs (best is reported)")
+    args = parser.parse_args()
+
+    data, markets, keys = synthetic_accounts(args.positions, args.markets, args.owners)
+    positions = decode_positions(data, POSITION_ACCOUNT_DISCRIMINATOR)
+    assert len(positions) == args.positions
+
+    decode = min(timeit.repeat(lambda: decode_positions(data, POSITION_ACCOUNT_DISCRIMINATOR), number=1, repeat=args.number))
+    risk = min(timeit.repeat(lambda: analyze(positions, markets, keys, 250), number=1, repeat=args.number))
+    print(f"{args.positions} positions, {args.markets} markets, {args.owners} owners")
+    print(f"decode  {decode * 1000:>8.1f} ms")
+    print(f"analyze {risk * 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
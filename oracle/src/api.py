@@ -0,0 +1,421 @@
+"""HTTP resolution API.
+
+A small asyncio HTTP/1.1 service (stdlib only) in front of the resolution
+pipeline, for the dashboard and operators:
+
+    POST /markets/<id>/resolve   start resolving a market (202), or with
+                                 `?wait=1` block until the report is ready
+    GET  /markets/<id>/report    the latest ResolveReport (202 while running)
+    GET  /markets/<id>/events    progress as server-sent events, then the report
+    GET  /health                 liveness and in-flight resolutions
+    GET  /metrics                the scheduler's tracked markets and resolution
+                                 queue, when served from a scheduler process
+
+Requests for a market that is already being resolved join the in-flight
+run (singleflight) instead of starting another, so duplicate triggers never
+pay twice for research, LLM calls or transactions. Progress events are the
+pipeline's own log records, attributed to the run that emitted them.
+
+When `ORACLE_API_TOKEN` is set, POST requests need `Authorization: Bearer
+<token>`.
+
+Usage:
+    python -m oracle.src.api
+    python -m oracle.src.api --host 0.0.0.0 --port 8080 --dry-run
+"""
+
+import argparse
+import asyncio
+import contextvars
+import hmac
+import json
+import logging
+import os
+import re
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from urllib.parse import parse_qs, urlsplit
+
+from pydantic import BaseModel
+
+from .types import ResolveReport
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+REQUEST_TIMEOUT_SECONDS = 10.0
+MAX_HEADER_LINES = 100
+# Finished runs kept for GET /report and /events.
+MAX_FINISHED_RUNS = 256
+
+Resolver = Callable[[int], Awaitable[ResolveReport]]
+Metrics = Callable[[], BaseModel]
+
+_ROUTE = re.compile(r"^/markets/(\d+)/(resolve|report|events)$")
+_REASONS = {
+    200: "OK", 202: "Accepted", 400: "Bad Request", 401: "Unauthorized",
+    404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error",
+}
+_current_run: contextvars.ContextVar["ResolutionRun | None"] = contextvars.ContextVar("current_run", default=None)
+
+
+class ResolutionRun:
+    """One in-flight or finished resolution of a market, with its progress events."""
+
+    def __init__(self, market_id: int):
+        self.market_id = market_id
+        self.started_at = time.time()
+        self.finished_at: float | None = None
+        self.report: ResolveReport | None = None
+        self.events: list[dict] = []
+        self.task: asyncio.Task | None = None
+        self._loop = asyncio.get_running_loop()
+        self._followers: set[asyncio.Queue] = set()
+
+    @property
+    def status(self) -> str:
+        if self.report is None:
+            return "running"
+        return "failed" if self.report.error else "succeeded"
+
+    def summary(self) -> dict:
+        return {
+            "market_id": self.market_id,
+            "status": self.status,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+    def add_event(self, event: dict) -> None:
+        self.events.append(event)
+        for queue in self._followers:
+            queue.put_nowait(event)
+
+    def add_event_threadsafe(self, event: dict) -> None:
+        self._loop.call_soon_threadsafe(self.add_event, event)
+
+    def finish(self, report: ResolveReport) -> None:
+        self.report = report
+        self.finished_at = time.time()
+        for queue in self._followers:
+            queue.put_nowait(None)
+
+    async def follow(self) -> AsyncIterator[dict]:
+        """Every event so far, then new ones as they arrive, until the run finishes."""
+        queue: asyncio.Queue = asyncio.Queue()
+        backlog = list(self.events)
+        if self.report is None:
+            self._followers.add(queue)
+        else:
+            queue.put_nowait(None)
+        try:
+            for event in backlog:
+                yield event
+            while (event := await queue.get()) is not None:
+                yield event
+        finally:
+            self._followers.discard(queue)
+
+
+class _RunLogHandler(logging.Handler):
+    """Routes log records emitted inside a run to that run's events."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        run = _current_run.get()
+        if run is None:
+            return
+        try:
+            run.add_event_threadsafe({
+                "ts": record.created,
+                "level": record.levelname,
+                "logger": record.name,
+                "message": record.getMessage(),
+            })
+        except Exception:
+            self.handleError(record)
+
+
+class ResolutionService:
+    """Singleflight front for a resolver: one run per market at a time."""
+
+    def __init__(self, resolve: Resolver):
+        self.resolve = resolve
+        self.started = 0
+        self.coalesced = 0
+        self._runs: dict[int, ResolutionRun] = {}
+        self._log_handler = _RunLogHandler(level=logging.INFO)
+
+    def open(self) -> None:
+        logging.getLogger().addHandler(self._log_handler)
+
+    async def close(self) -> None:
+        logging.getLogger().removeHandler(self._log_handler)
+        tasks = [r.task for r in self._runs.values() if r.task is not None and not r.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get(self, market_id: int) -> ResolutionRun | None:
+        return self._runs.get(market_id)
+
+    def inflight(self) -> list[ResolutionRun]:
+        return [r for r in self._runs.values() if r.report is None]
+
+    def start(self, market_id: int) -> tuple[ResolutionRun, bool]:
+        """The market's in-flight run, or a new one. Returns (run, joined_existing)."""
+        run = self._runs.get(market_id)
+        if run is not None and run.report is None:
+            self.coalesced += 1
+            logger.info("Market %d: joining in-flight resolution", market_id)
+            return run, True
+
+        run = ResolutionRun(market_id)
+        self._runs.pop(market_id, None)
+        self._runs[market_id] = run
+        self._evict()
+        self.started += 1
+        # The run's context carries it into every task and thread the
+        # pipeline spawns, so their log records land in its events.
+        context = contextvars.copy_context()
+        context.run(_current_run.set, run)
+        run.task = asyncio.get_running_loop().create_task(self._execute(run), context=context)
+        return run, False
+
+    async def _execute(self, run: ResolutionRun) -> None:
+        try:
+            report = await self.resolve(run.market_id)
+        except Exception as e:
+            logger.exception("Market %d: resolution failed", run.market_id)
+            report = ResolveReport(market_id=run.market_id, market_title="", error=str(e))
+        except asyncio.CancelledError:
+            run.finish(ResolveReport(market_id=run.market_id, market_title="", error="cancelled"))
+            raise
+        run.finish(report)
+
+    def _evict(self) -> None:
+        finished = [m for m, r in self._runs.items() if r.report is not None]
+        for market_id in finished[: max(0, len(finished) - MAX_FINISHED_RUNS)]:
+            del self._runs[market_id]
+
+
+class ResolutionAPI:
+    """The HTTP front end of a ResolutionService.
+
+    `metrics`, if given, is served at GET /metrics (the scheduler passes
+    its `DeadlineScheduler.metrics`).
+    """
+
+    def __init__(self, service: ResolutionService, token: str | None = None, metrics: Metrics | None = None):
+        self.service = service
+        self.token = token
+        self.metrics = metrics
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> int:
+        """Start listening; returns the bound port (useful with port 0)."""
+        self.service.open()
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        await self.service.close()
+
+    async def serve_forever(self) -> None:
+        assert self._server is not None
+        await self._server.serve_forever()
+
+    # -- HTTP ---------------------------------------------------------------
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                method, target, headers = await asyncio.wait_for(_read_request(reader), REQUEST_TIMEOUT_SECONDS)
+            except (ValueError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+                await _send_json(writer, 400, {"error": "malformed request"})
+                return
+            await self._route(method, target, headers, writer)
+        except ConnectionError:
+            pass
+        except Exception:
+            logger.exception("API request failed")
+            await _send_json(writer, 500, {"error": "internal error"})
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _route(self, method: str, target: str, headers: dict[str, str], writer: asyncio.StreamWriter) -> None:
+        url = urlsplit(target)
+        if url.path == "/health":
+            await _send_json(writer, 200, {
+                "ok": True,
+                "inflight": [r.market_id for r in self.service.inflight()],
+                "started": self.service.started,
+                "coalesced": self.service.coalesced,
+            })
+            return
+        if url.path == "/metrics":
+            if self.metrics is None:
+                await _send_json(writer, 404, {"error": "no scheduler in this process"})
+            else:
+                await _send_json(writer, 200, self.metrics().model_dump(mode="json"))
+            return
+        match = _ROUTE.match(url.path)
+        if match is None:
+            await _send_json(writer, 404, {"error": "not found"})
+            return
+        market_id, action = int(match.group(1)), match.group(2)
+        expected = "POST" if action == "resolve" else "GET"
+        if method != expected:
+            await _send_json(writer, 405, {"error": f"use {expected}"})
+            return
+
+        if action == "resolve":
+            if not self._authorized(headers):
+                await _send_json(writer, 401, {"error": "missing or invalid bearer token"})
+                return
+            run, joined = self.service.start(market_id)
+            if parse_qs(url.query).get("wait", ["0"])[0] not in ("", "0", "false"):
+                await asyncio.shield(run.task)
+                await _send_json(writer, 200, _report_body(run))
+            else:
+                await _send_json(writer, 202, {**run.summary(), "joined": joined})
+            return
+
+        run = self.service.get(market_id)
+        if run is None:
+            await _send_json(writer, 404, {"error": f"no resolution of market {market_id} in this process"})
+        elif action == "report":
+            await _send_json(writer, 200 if run.report is not None else 202, _report_body(run))
+        else:
+            await self._stream_events(run, writer)
+
+    def _authorized(self, headers: dict[str, str]) -> bool:
+        if not self.token:
+            return True
+        scheme, _, credentials = headers.get("authorization", "").partition(" ")
+        return scheme.lower() == "bearer" and hmac.compare_digest(credentials.strip(), self.token)
+
+    async def _stream_events(self, run: ResolutionRun, writer: asyncio.StreamWriter) -> None:
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"Connection: close\r\n\r\n"
+        )
+        async for event in run.follow():
+            writer.write(_sse("log", event))
+            await writer.drain()
+        writer.write(_sse("report", _report_body(run)))
+        await writer.drain()
+
+
+def _report_body(run: ResolutionRun) -> dict:
+    return {**run.summary(), "report": run.report.model_dump(mode="json") if run.report else None}
+
+
+async def _read_request(reader: asyncio.StreamReader) -> tuple[str, str, dict[str, str]]:
+    method, target, _version = (await reader.readline()).decode("latin-1").rstrip("\r\n").split(" ", 2)
+    headers: dict[str, str] = {}
+    for _ in range(MAX_HEADER_LINES):
+        line = (await reader.readline()).decode("latin-1").rstrip("\r\n")
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise ValueError("too many headers")
+    if length := int(headers.get("content-length") or 0):
+        await reader.readexactly(length)  # request bodies are not used
+    return method.upper(), target, headers
+
+
+async def _send_json(writer: asyncio.StreamWriter, status: int, body: dict) -> None:
+    payload = json.dumps(body).encode()
+    writer.write(
+        f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        f"Connection: close\r\n\r\n".encode()
+        + payload
+    )
+    await writer.drain()
+
+
+def _sse(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+async def serve(host: str, port: int, dry_run: bool = False) -> None:
+    """Serve the API with the real pipeline until cancelled."""
+    # main pulls in the providers and the Solana stack; only serving needs them.
+    from .archive import open_archive
+    from .chain import check_oracle_signer
+    from .leases import LeaseCoordinator, SqliteLeaseStore
+    from .main import resolve_market
+    from .market_index import MarketIndex
+    from .rpc import close_rpc_pool, get_rpc_pool
+
+    if not dry_run:
+        await check_oracle_signer(get_rpc_pool())
+    index = MarketIndex.open()
+    archive = open_archive()
+    # Leases keep API-triggered runs from racing schedulers resolving the same market.
+    leases = LeaseCoordinator(SqliteLeaseStore.open(), member=False)
+    leases.beat()
+
+    async def resolve(market_id: int) -> ResolveReport:
+        with leases.lease(market_id) as acquired:
+            if not acquired:
+                return leases.leased_report(market_id)
+            report = await resolve_market(market_id, dry_run=dry_run)
+        if not dry_run:
+            index.record_resolution(report)
+        if archive is not None:
+            archive.append(report, dry_run=dry_run)
+            archive.flush()
+        return report
+
+    api = ResolutionAPI(ResolutionService(resolve), token=os.environ.get("ORACLE_API_TOKEN") or None)
+    bound = await api.start(host, port)
+    logger.info("Resolution API listening on http://%s:%d (dry_run=%s)", host, bound, dry_run)
+    health_checks = asyncio.create_task(get_rpc_pool().run_health_checks())
+    heartbeats = asyncio.create_task(leases.run_heartbeats())
+    try:
+        await api.serve_forever()
+    finally:
+        health_checks.cancel()
+        heartbeats.cancel()
+        leases.close()
+        await api.close()
+        await close_rpc_pool()
+        index.close()
+        if archive is not None:
+            archive.close()
+
+
+def main() -> None:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Sibyl Oracle — HTTP resolution API")
+    parser.add_argument("--host", default=os.environ.get("ORACLE_API_HOST", DEFAULT_HOST))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("ORACLE_API_PORT", DEFAULT_PORT)))
+    parser.add_argument("--dry-run", action="store_true", help="Judge without submitting transactions")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, dry_run=args.dry_run))
+    except KeyboardInterrupt:
+        logger.info("Resolution API stopped.")
+
+
+if __name__ == "__main__":
+    main()
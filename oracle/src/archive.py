@@ -0,0 +1,321 @@
+"""Columnar archive of oracle decisions for bulk analysis.
+
+Every resolution report is appended to two Parquet datasets under
+`data/archive/` (or `ORACLE_ARCHIVE_DIR`), hive-partitioned by UTC date:
+
+    decisions/date=2026-10-19/part-<ts>-<pid>.parquet   one row per market resolution
+    judgments/date=2026-10-19/part-<ts>-<pid>.parquet   one row per provider judgment
+
+Provider names and outcomes are dictionary-encoded columns and everything is
+zstd-compressed, so months of decisions stay small. The writer buffers at
+most FLUSH_ROWS rows, writes each flush as a row group and rolls to a new
+file every ROLL_SECONDS and at midnight. Files are written under a
+dot-prefixed name and renamed when closed, so readers never see a partial
+file. `compact` merges a day's small files into one.
+
+`scan` reads a dataset with column projection and predicate pushdown: date
+filters prune whole partitions and row-group statistics skip the rest.
+
+Requires pyarrow (`pip install sibyl-oracle[archive]`). Without it
+`open_archive` returns None and resolutions are simply not archived.
+
+Usage:
+    python -m oracle.src.archive summary --since 2026-09-01
+    python -m oracle.src.archive compact --date 2026-10-18
+"""
+
+import argparse
+import logging
+import os
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # optional: the `archive` extra
+    pa = None
+
+from .types import ResolveReport
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARCHIVE_DIR = Path(__file__).resolve().parent.parent / "data" / "archive"
+FLUSH_ROWS = 1024
+ROLL_SECONDS = 600
+COMPRESSION = "zstd"
+TABLES = ("decisions", "judgments")
+
+if pa is not None:
+    _LABEL = pa.dictionary(pa.int8(), pa.string())
+    _TS = pa.timestamp("ms", tz="UTC")
+    SCHEMAS = {
+        "decisions": pa.schema([
+            ("ts", _TS),
+            ("market_id", pa.int64()),
+            ("market_title", pa.string()),
+            ("outcome", _LABEL),
+            ("confidence", pa.uint8()),
+            ("consensus_reached", pa.bool_()),
+            ("agreeing_providers", pa.list_(_LABEL)),
+            ("summary", pa.string()),
+            ("tier", _LABEL),
+            ("tx_signature", pa.string()),
+            ("verified", pa.bool_()),
+            ("dry_run", pa.bool_()),
+            ("error", pa.string()),
+        ]),
+        "judgments": pa.schema([
+            ("ts", _TS),
+            ("market_id", pa.int64()),
+            ("provider", _LABEL),
+            ("outcome", _LABEL),
+            ("confidence", pa.uint8()),
+            ("agreed", pa.bool_()),
+            ("final_outcome", _LABEL),
+            ("reasoning", pa.string()),
+        ]),
+    }
+    PARTITIONING = ds.partitioning(pa.schema([("date", pa.date32())]), flavor="hive")
+
+
+def report_rows(report: ResolveReport, dry_run: bool, now: datetime) -> tuple[dict, list[dict]]:
+    """The decisions row and judgments rows of a resolution report."""
+    consensus = report.consensus
+    decision = {
+        "ts": now,
+        "market_id": report.market_id,
+        "market_title": report.market_title,
+        "outcome": consensus.final_outcome.value if consensus else None,
+        "confidence": consensus.final_confidence if consensus else None,
+        "consensus_reached": consensus.consensus_reached if consensus else None,
+        "agreeing_providers": consensus.agreeing_providers if consensus else [],
+        "summary": consensus.summary if consensus else None,
+        "tier": consensus.tier if consensus else None,
+        "tx_signature": report.tx_signature,
+        "verified": report.verified,
+        "dry_run": dry_run,
+        "error": report.error,
+    }
+    judgments = [
+        {
+            "ts": now,
+            "market_id": report.market_id,
+            "provider": j.provider,
+            "outcome": j.outcome.value,
+            "confidence": j.confidence,
+            "agreed": j.provider in consensus.agreeing_providers,
+            "final_outcome": consensus.final_outcome.value,
+            "reasoning": j.reasoning,
+        }
+        for j in (consensus.judgments if consensus else [])
+    ]
+    return decision, judgments
+
+
+class ArchiveWriter:
+    """Streams rows of one table into date-partitioned Parquet files."""
+
+    def __init__(
+        self,
+        root: Path,
+        schema: "pa.Schema",
+        flush_rows: int = FLUSH_ROWS,
+        roll_seconds: float = ROLL_SECONDS,
+        clock=time.monotonic,
+    ):
+        self.root = root
+        self.schema = schema
+        self.flush_rows = flush_rows
+        self.roll_seconds = roll_seconds
+        self._clock = clock
+        self._buffer: list[dict] = []
+        self._date: date | None = None
+        self._writer: "pq.ParquetWriter | None" = None
+        self._path: Path | None = None
+        self._opened_at = 0.0
+
+    def write(self, row: dict) -> None:
+        """Buffer a row; it reaches disk at the next flush."""
+        day = row["ts"].astimezone(timezone.utc).date()
+        if day != self._date:
+            self.flush()
+            self._close_file()
+            self._date = day
+        self._buffer.append(row)
+        if len(self._buffer) >= self.flush_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered rows as a row group, rolling the file if it is old."""
+        if self._buffer:
+            if self._writer is None:
+                self._open_file()
+            self._writer.write_table(pa.Table.from_pylist(self._buffer, schema=self.schema))
+            self._buffer.clear()
+        if self._writer is not None and self._clock() - self._opened_at >= self.roll_seconds:
+            self._close_file()
+
+    def close(self) -> None:
+        self.flush()
+        self._close_file()
+
+    def _open_file(self) -> None:
+        partition = self.root / f"date={self._date.isoformat()}"
+        partition.mkdir(parents=True, exist_ok=True)
+        self._path = partition / f"part-{time.time_ns()}-{os.getpid()}.parquet"
+        self._writer = pq.ParquetWriter(_in_progress(self._path), self.schema, compression=COMPRESSION)
+        self._opened_at = self._clock()
+
+    def _close_file(self) -> None:
+        if self._writer is None:
+            return
+        self._writer.close()
+        _in_progress(self._path).rename(self._path)
+        self._writer = None
+
+
+def _in_progress(path: Path) -> Path:
+    # Dataset discovery skips dot-files, so unfinished files stay invisible.
+    return path.with_name("." + path.name)
+
+
+class DecisionArchive:
+    """Appends resolution reports to the decisions and judgments datasets."""
+
+    def __init__(self, root: Path, **writer_options):
+        self.root = root
+        self._writers = {name: ArchiveWriter(root / name, SCHEMAS[name], **writer_options) for name in TABLES}
+
+    def append(self, report: ResolveReport, dry_run: bool = False, now: datetime | None = None) -> None:
+        """Buffer a report's rows. Long-running services `flush` after each one."""
+        decision, judgments = report_rows(report, dry_run, now or datetime.now(timezone.utc))
+        self._writers["decisions"].write(decision)
+        for row in judgments:
+            self._writers["judgments"].write(row)
+
+    def flush(self) -> None:
+        for writer in self._writers.values():
+            writer.flush()
+
+    def close(self) -> None:
+        for writer in self._writers.values():
+            writer.close()
+
+
+def archive_dir() -> Path:
+    env_dir = os.environ.get("ORACLE_ARCHIVE_DIR")
+    return Path(env_dir) if env_dir else DEFAULT_ARCHIVE_DIR
+
+
+def open_archive(root: Path | None = None) -> DecisionArchive | None:
+    """The decision archive, or None when pyarrow is not installed."""
+    if pa is None:
+        logger.debug("pyarrow not installed; resolutions will not be archived")
+        return None
+    return DecisionArchive(root or archive_dir())
+
+
+def scan(
+    table: str,
+    root: Path | None = None,
+    columns: list[str] | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    market_ids: list[int] | None = None,
+    providers: list[str] | None = None,
+) -> "pa.Table":
+    """Read an archived table, pushing the filters down into the scan.
+
+    `since`/`until` bound `ts` (inclusive/exclusive) and prune date
+    partitions outside the range; `providers` only applies to judgments.
+    """
+    path = (root or archive_dir()) / table
+    if not path.exists():
+        return SCHEMAS[table].empty_table()
+    dataset = ds.dataset(path, format="parquet", partitioning=PARTITIONING)
+    predicates = []
+    if since is not None:
+        predicates += [ds.field("date") >= since.astimezone(timezone.utc).date(), ds.field("ts") >= since]
+    if until is not None:
+        predicates += [ds.field("date") <= until.astimezone(timezone.utc).date(), ds.field("ts") < until]
+    if market_ids is not None:
+        predicates.append(ds.field("market_id").isin(market_ids))
+    if providers is not None:
+        predicates.append(ds.field("provider").isin(providers))
+    expression = None
+    for predicate in predicates:
+        expression = predicate if expression is None else expression & predicate
+    return dataset.to_table(columns=columns, filter=expression)
+
+
+def compact(day: date, root: Path | None = None) -> int:
+    """Merge one day's files of each table into a single file. Returns files merged."""
+    merged = 0
+    for name in TABLES:
+        partition = (root or archive_dir()) / name / f"date={day.isoformat()}"
+        files = sorted(partition.glob("part-*.parquet"))
+        if len(files) < 2:
+            continue
+        target = partition / f"part-{time.time_ns()}-{os.getpid()}.parquet"
+        with pq.ParquetWriter(_in_progress(target), SCHEMAS[name], compression=COMPRESSION) as writer:
+            for file in files:
+                writer.write_table(pq.read_table(file, schema=SCHEMAS[name]))
+        _in_progress(target).rename(target)
+        for file in files:
+            file.unlink()
+        merged += len(files)
+    return merged
+
+
+def provider_summary(judgments: "pa.Table") -> "pa.Table":
+    """Per-provider judgment count, mean confidence and agreement with consensus."""
+    # Each row group carries its own dictionary; grouping needs a shared one.
+    return judgments.unify_dictionaries().group_by("provider").aggregate([
+        ("market_id", "count"),
+        ("confidence", "mean"),
+        ("agreed", "mean"),
+    ]).rename_columns(["provider", "judgments", "mean_confidence", "agreement"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sibyl Oracle — decision archive")
+    parser.add_argument("--archive", type=Path, help="Archive directory (default: ORACLE_ARCHIVE_DIR or data/archive)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    summary = sub.add_parser("summary", help="Decision and per-provider summary")
+    summary.add_argument("--since", type=date.fromisoformat, help="First day (YYYY-MM-DD, UTC)")
+    summary.add_argument("--days", type=int, help="Number of days from --since")
+    compact_cmd = sub.add_parser("compact", help="Merge a day's files into one per table")
+    compact_cmd.add_argument("--date", type=date.fromisoformat, required=True)
+    args = parser.parse_args()
+
+    if pa is None:
+        parser.exit(1, "pyarrow is required: pip install sibyl-oracle[archive]\n")
+
+    if args.command == "compact":
+        print(f"Merged {compact(args.date, args.archive)} files.")
+        return
+
+    since = datetime.combine(args.since, datetime.min.time(), timezone.utc) if args.since else None
+    until = since + timedelta(days=args.days) if since and args.days else None
+    decisions = scan("decisions", args.archive, columns=["outcome", "tier", "consensus_reached", "error"], since=since, until=until)
+    judgments = scan("judgments", args.archive, columns=["provider", "market_id", "confidence", "agreed"], since=since, until=until)
+    print(f"{decisions.num_rows} decisions, {judgments.num_rows} judgments")
+    if decisions.num_rows:
+        for row in decisions.unify_dictionaries().group_by("outcome").aggregate([("outcome", "count")]).to_pylist():
+            print(f"  {row['outcome'] or 'not judged'}: {row['outcome_count']}")
+        for row in decisions.unify_dictionaries().group_by("tier").aggregate([("tier", "count")]).to_pylist():
+            print(f"  decided by {row['tier'] or 'no tier'}: {row['tier_count']}")
+        print(f"  errors: {pc.sum(pc.is_valid(decisions['error'])).as_py()}")
+    for row in provider_summary(judgments).to_pylist():
+        print(
+            f"{row['provider']:<10} judgments={row['judgments']:<6} "
+            f"confidence={row['mean_confidence']:.1f} agreement={row['agreement']:.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""Batched multi-market judgment via vendor batch APIs.
+
+For backfills and end-of-day expiry waves, the seats of the configured panel
+judge every market together. Each Claude or GPT seat submits all market
+prompts as one job through the Anthropic Message Batches API or the OpenAI
+Batch API, polled until it finishes. Seats on other modules (Gemini has no
+batch path here) are queried in real time, one market at a time. The
+per-market judgments are fed into the same consensus rules as
+`judge.run_judgment`; the panel's cascade is not used.
+
+Batch jobs are billed at a discount and do not count against real-time rate
+limits, at the cost of minutes-to-hours of latency.
+
+Both SDKs honour a base URL override (`ANTHROPIC_BASE_URL`, `OPENAI_BASE_URL`),
+which is how the test suite points them at a local stub server.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+from pydantic import BaseModel
+
+from .evidence import EvidenceStore
+from .judge import _safe_judge, build_consensus
+from .providers import claude, openai as openai_provider
+from .registry import PanelConfig, ProviderSpec, get_provider_module, load_panel
+from .researcher import gather_research
+from .types import ConsensusResult, JudgmentResult, ResearchContext
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL_SECONDS = 30.0
+BATCH_TIMEOUT_SECONDS = 24 * 60 * 60
+OPENAI_BATCH_ENDPOINT = "/v1/chat/completions"
+OPENAI_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchMarket(BaseModel):
+    """A market queued for batch judgment."""
+    market_id: int
+    title: str
+    description: str
+    sources: list[str] = []
+    search_queries: list[str] = []
+
+
+def _custom_id(market_id: int) -> str:
+    return f"market-{market_id}"
+
+
+def _market_id(custom_id: str) -> int:
+    return int(custom_id.removeprefix("market-"))
+
+
+async def _poll_until(
+    check: Callable[[], Awaitable[bool]],
+    label: str,
+    poll_interval: float,
+    timeout: float,
+) -> None:
+    """Call `check` every `poll_interval` seconds until it returns True."""
+    deadline = time.monotonic() + timeout
+    while not await check():
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"{label} did not finish within {timeout:.0f}s")
+        await asyncio.sleep(poll_interval)
+
+
+async def run_claude_batch(
+    markets: list[BatchMarket],
+    research: dict[int, ResearchContext],
+    poll_interval: float = POLL_INTERVAL_SECONDS,
+    timeout: float = BATCH_TIMEOUT_SECONDS,
+    model: str | None = None,
+) -> dict[int, JudgmentResult]:
+    """Judge all markets through one Anthropic Message Batch (with `model`, if given)."""
+    client = claude.get_client()
+
+    batch = await client.messages.batches.create(
+        requests=[
+            {
+                "custom_id": _custom_id(m.market_id),
+                "params": claude.build_params(m.title, m.description, research[m.market_id], model),
+            }
+            for m in markets
+        ],
+    )
+    logger.info("[%s] Submitted message batch %s (%d markets)", claude.PROVIDER_NAME, batch.id, len(markets))
+
+    async def ended() -> bool:
+        status = await client.messages.batches.retrieve(batch.id)
+        return status.processing_status == "ended"
+
+    await _poll_until(ended, f"Anthropic batch {batch.id}", poll_interval, timeout)
+
+    results: dict[int, JudgmentResult] = {}
+    async for entry in await client.messages.batches.results(batch.id):
+        market_id = _market_id(entry.custom_id)
+        if entry.result.type != "succeeded":
+            logger.error("[%s] Market %d: batch result %s", claude.PROVIDER_NAME, market_id, entry.result.type)
+            continue
+        try:
+            results[market_id] = claude.parse_judgment(claude.response_text(entry.result.message))
+        except Exception:
+            logger.exception("[%s] Market %d: unparseable batch result", claude.PROVIDER_NAME, market_id)
+    return results
+
+
+async def run_openai_batch(
+    markets: list[BatchMarket],
+    research: dict[int, ResearchContext],
+    poll_interval: float = POLL_INTERVAL_SECONDS,
+    timeout: float = BATCH_TIMEOUT_SECONDS,
+    model: str | None = None,
+) -> dict[int, JudgmentResult]:
+    """Judge all markets through one OpenAI Batch job (with `model`, if given)."""
+    client = openai_provider.get_client()
+
+    lines = [
+        json.dumps({
+            "custom_id": _custom_id(m.market_id),
+            "method": "POST",
+            "url": OPENAI_BATCH_ENDPOINT,
+            "body": openai_provider.build_params(m.title, m.description, research[m.market_id], model),
+        })
+        for m in markets
+    ]
+    input_file = await client.files.create(
+        file=("sibyl-judgments.jsonl", "\n".join(lines).encode()),
+        purpose="batch",
+    )
+    batch = await client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=OPENAI_BATCH_ENDPOINT,
+        completion_window="24h",
+    )
+    logger.info("[%s] Submitted batch %s (%d markets)", openai_provider.PROVIDER_NAME, batch.id, len(markets))
+
+    async def finished() -> bool:
+        nonlocal batch
+        batch = await client.batches.retrieve(batch.id)
+        return batch.status in OPENAI_TERMINAL_STATUSES
+
+    await _poll_until(finished, f"OpenAI batch {batch.id}", poll_interval, timeout)
+
+    if batch.status != "completed" or not batch.output_file_id:
+        raise RuntimeError(f"OpenAI batch {batch.id} ended with status {batch.status}")
+
+    content = await client.files.content(batch.output_file_id)
+
+    results: dict[int, JudgmentResult] = {}
+    for line in content.text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        market_id = _market_id(record["custom_id"])
+        response = record.get("response") or {}
+        if response.get("status_code") != 200:
+            logger.error(
+                "[%s] Market %d: batch request failed: %s",
+                openai_provider.PROVIDER_NAME,
+                market_id,
+                record.get("error") or response.get("status_code"),
+            )
+            continue
+        try:
+            raw = response["body"]["choices"][0]["message"]["content"]
+            results[market_id] = openai_provider.parse_judgment(raw)
+        except Exception:
+            logger.exception("[%s] Market %d: unparseable batch result", openai_provider.PROVIDER_NAME, market_id)
+    return results
+
+
+async def _safe_batch(
+    name: str,
+    job: Awaitable[dict[int, JudgmentResult]],
+) -> dict[int, JudgmentResult]:
+    """Await a vendor batch job; a failed job contributes no judgments."""
+    try:
+        results = await job
+        logger.info("[%s] Batch returned %d judgments", name, len(results))
+        return results
+    except Exception:
+        logger.exception("[%s] Batch failed", name)
+        return {}
+
+
+# Panel modules with a vendor batch path; other seats are queried in real time.
+BATCH_RUNNERS = {"claude": run_claude_batch, "openai": run_openai_batch}
+
+
+async def _run_realtime(
+    spec: ProviderSpec,
+    markets: list[BatchMarket],
+    research: dict[int, ResearchContext],
+) -> dict[int, JudgmentResult]:
+    """Query a seat per market in real time.
+
+    Concurrency is bounded by the provider's limiter inside `_safe_judge`.
+    """
+    module = get_provider_module(spec)
+    results = await asyncio.gather(
+        *(
+            _safe_judge(module, m.title, m.description, research[m.market_id], name=spec.name, model=spec.model)
+            for m in markets
+        )
+    )
+    return {m.market_id: r for m, r in zip(markets, results) if r is not None}
+
+
+async def _run_seat(
+    spec: ProviderSpec,
+    markets: list[BatchMarket],
+    research: dict[int, ResearchContext],
+    poll_interval: float,
+    timeout: float,
+) -> dict[int, JudgmentResult]:
+    """Judge every market with one panel seat, labelling the judgments with its name."""
+    runner = BATCH_RUNNERS.get(spec.module)
+    if runner is None:
+        return await _run_realtime(spec, markets, research)
+    results = await _safe_batch(spec.name, runner(markets, research, poll_interval, timeout, model=spec.model))
+    return {market_id: r.model_copy(update={"provider": spec.name}) for market_id, r in results.items()}
+
+
+async def run_batch_judgment(
+    markets: list[BatchMarket],
+    poll_interval: float = POLL_INTERVAL_SECONDS,
+    timeout: float = BATCH_TIMEOUT_SECONDS,
+    weights: dict[str, float] | None = None,
+    evidence: EvidenceStore | None = None,
+    panel: PanelConfig | None = None,
+) -> dict[int, ConsensusResult]:
+    """
+    Judge many markets at once through the vendor batch APIs.
+
+    Research for every market is gathered up front, then every seat of the
+    panel (default `load_panel()`) judges all markets: Claude and GPT seats
+    through one batch job each, other seats in real time. Each market's
+    judgments go through `build_consensus` with the same panel, so the
+    quorum, weights and consensus rules are the same as for `run_judgment`.
+    With an `evidence` store, each market's research is stored and enriched
+    with related earlier passages, as in `run_judgment`.
+
+    Returns a ConsensusResult per market ID.
+    """
+    if not markets:
+        return {}
+
+    logger.info("Gathering research for %d markets...", len(markets))
+    contexts = await asyncio.gather(*(gather_research(m.sources, m.search_queries) for m in markets))
+    if evidence is not None:
+        contexts = [evidence.enrich(ctx, m.title, m.description, m.market_id) for m, ctx in zip(markets, contexts)]
+    research = {m.market_id: ctx for m, ctx in zip(markets, contexts)}
+
+    panel = panel or load_panel()
+    seat_results = await asyncio.gather(
+        *(_run_seat(spec, markets, research, poll_interval, timeout) for spec in panel.providers)
+    )
+
+    consensus: dict[int, ConsensusResult] = {}
+    for m in markets:
+        judgments = [results[m.market_id] for results in seat_results if m.market_id in results]
+        consensus[m.market_id] = build_consensus(judgments, panel, weights)
+    return consensus
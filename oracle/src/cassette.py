@@ -0,0 +1,206 @@
+"""Record/replay of the oracle's outbound HTTP traffic.
+
+Every network dependency of a resolution goes through httpx's async
+transport: the Anthropic, OpenAI and Google GenAI SDKs, the researcher's
+source fetches and Brave searches, and Solana RPC (`AsyncClient` and
+`RpcPool.batch`). `use_cassette` patches that one transport, so:
+
+- in record mode, each request goes out as usual and its response is saved.
+  Responses are read in full before they are handed back, so streamed
+  responses arrive all at once while recording;
+- in replay mode, nothing touches the network. Each request is answered from
+  the cassette immediately.
+
+Requests are matched on method, URL and body. JSON-RPC ids are ignored, and
+URL credentials (`key`, `api-key`, `token` query parameters) are redacted.
+Request headers are never saved. Identical requests are answered in the
+order they were recorded, and the last answer repeats once they run out.
+The oracle sends a few requests that legitimately differ between runs, such
+as prompts that include related evidence gathered since the recording.
+A request that matches no saved body gets the next unused response
+recorded for the same method and URL. A request with no recorded URL
+raises `CassetteMiss`, which is an httpx transport error.
+
+Cassettes are gzip-compressed JSON lines, one interaction per line.
+
+Usage:
+    python -m oracle.src.main --market-id 7 --dry-run --record cassettes/m7.jsonl.gz
+    python -m oracle.src.main --market-id 7 --dry-run --replay cassettes/m7.jsonl.gz
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+RECORD = "record"
+REPLAY = "replay"
+REDACTED_PARAMS = frozenset({"key", "api-key", "api_key", "apikey", "token"})
+# The body was decoded while recording, so transfer framing no longer applies.
+DROPPED_RESPONSE_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+
+
+class CassetteMiss(httpx.TransportError):
+    """A replayed request has no recorded response."""
+
+
+def _redact_url(url: httpx.URL) -> str:
+    parts = urlsplit(str(url))
+    query = [(k, "REDACTED" if k.lower() in REDACTED_PARAMS else v) for k, v in parse_qsl(parts.query, keep_blank_values=True)]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def _without_rpc_ids(payload):
+    if isinstance(payload, list):
+        return [_without_rpc_ids(p) for p in payload]
+    if isinstance(payload, dict) and "jsonrpc" in payload:
+        return {k: v for k, v in payload.items() if k != "id"}
+    return payload
+
+
+def _body_key(body: bytes) -> str:
+    """Hash of a request body, ignoring JSON-RPC request ids."""
+    try:
+        body = json.dumps(_without_rpc_ids(json.loads(body)), sort_keys=True).encode()
+    except ValueError:
+        pass
+    return hashlib.blake2b(body, digest_size=12).hexdigest()
+
+
+def _with_request_ids(content: bytes, request_body: bytes) -> bytes:
+    """Give a replayed JSON-RPC response the id of the request it answers."""
+    try:
+        request, response = json.loads(request_body), json.loads(content)
+    except ValueError:
+        return content
+    if isinstance(request, dict) and isinstance(response, dict) and "id" in request and "id" in response:
+        response["id"] = request["id"]
+        return json.dumps(response).encode()
+    return content
+
+
+class Cassette:
+    """Recorded HTTP interactions, in request order."""
+
+    def __init__(self, path: Path, mode: str = RECORD):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.interactions: list[dict] = []
+        self._by_key: dict[tuple[str, str, str], list[dict]] = defaultdict(list)
+        self._by_route: dict[tuple[str, str], list[dict]] = defaultdict(list)
+        self.replayed = 0
+        self.fuzzy = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path: Path) -> "Cassette":
+        cassette = cls(path, REPLAY)
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    cassette._add(json.loads(line))
+        logger.info("Loaded %d recorded interactions from %s", len(cassette.interactions), path)
+        return cassette
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            for interaction in self.interactions:
+                f.write(json.dumps(interaction, separators=(",", ":")) + "\n")
+        logger.info("Recorded %d interactions to %s", len(self.interactions), self.path)
+
+    def _add(self, interaction: dict) -> None:
+        self.interactions.append(interaction)
+        route = (interaction["method"], interaction["url"])
+        self._by_key[(*route, interaction["body"])].append(interaction)
+        self._by_route[route].append(interaction)
+
+    async def handle(self, send, transport: httpx.AsyncHTTPTransport, request: httpx.Request) -> httpx.Response:
+        """Serve `request` from the cassette, or send it with `send` and record it."""
+        body = await request.aread()
+        method, url, key = request.method, _redact_url(request.url), _body_key(body)
+        if self.mode == REPLAY:
+            return self._replay(request, method, url, key, body)
+
+        start = time.perf_counter()
+        response = await send(transport, request)
+        try:
+            content = await response.aread()
+        finally:
+            await response.aclose()
+        headers = [(k, v) for k, v in response.headers.multi_items() if k.lower() not in DROPPED_RESPONSE_HEADERS]
+        try:
+            text, encoded = content.decode(), None
+        except UnicodeDecodeError:
+            text, encoded = None, content.hex()
+        self._add({
+            "method": method,
+            "url": url,
+            "body": key,
+            "status": response.status_code,
+            "headers": headers,
+            "text": text,
+            "hex": encoded,
+            "ms": round((time.perf_counter() - start) * 1000, 1),
+        })
+        return httpx.Response(response.status_code, headers=headers, content=content, request=request)
+
+    def _replay(self, request: httpx.Request, method: str, url: str, key: str, body: bytes) -> httpx.Response:
+        exact = self._by_key.get((method, url, key), [])
+        interaction = next((i for i in exact if not i.get("used")), exact[-1] if exact else None)
+        if interaction is None:
+            interaction = next((i for i in self._by_route.get((method, url), []) if not i.get("used")), None)
+            if interaction is None:
+                self.misses += 1
+                raise CassetteMiss(f"No recorded response for {method} {url}", request=request)
+            self.fuzzy += 1
+            logger.debug("Cassette: %s %s replayed without an exact body match", method, url)
+        interaction["used"] = True
+        self.replayed += 1
+        content = interaction["text"].encode() if interaction["text"] is not None else bytes.fromhex(interaction["hex"])
+        return httpx.Response(
+            interaction["status"],
+            headers=interaction["headers"],
+            content=_with_request_ids(content, body),
+            request=request,
+        )
+
+    @property
+    def recorded_seconds(self) -> float:
+        """Network time the replayed interactions took when they were recorded."""
+        return sum(i["ms"] for i in self.interactions if self.mode == RECORD or i.get("used")) / 1000
+
+
+@contextmanager
+def use_cassette(path: Path, mode: str) -> Iterator[Cassette]:
+    """Record or replay all async httpx traffic inside the block."""
+    cassette = Cassette.load(path) if mode == REPLAY else Cassette(path, RECORD)
+    send = httpx.AsyncHTTPTransport.handle_async_request
+
+    async def handle_async_request(transport: httpx.AsyncHTTPTransport, request: httpx.Request) -> httpx.Response:
+        return await cassette.handle(send, transport, request)
+
+    httpx.AsyncHTTPTransport.handle_async_request = handle_async_request
+    try:
+        yield cassette
+    finally:
+        httpx.AsyncHTTPTransport.handle_async_request = send
+        if mode == RECORD:
+            cassette.save()
+        else:
+            logger.info(
+                "Replayed %d interactions (%d without an exact match, %d misses), %.1fs of recorded network time",
+                cassette.replayed, cassette.fuzzy, cassette.misses, cassette.recorded_seconds,
+            )
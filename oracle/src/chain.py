@@ -4,32 +4,49 @@ Submits `resolve` transactions to the Sibyl program and reads market data.
 Uses solders for keypair/transaction handling and solana-py for RPC.
 """
 
+import asyncio
+import base64
 import hashlib
 import json
 import logging
 import os
 import struct
+import time
 from pathlib import Path
 
 from solana.rpc.async_api import AsyncClient
 from solana.rpc.commitment import Confirmed
-from solana.rpc.types import TxOpts
-from solders.hash import Hash  # noqa: F401
+from solana.rpc.types import MemcmpOpts, TxOpts
+from solders.hash import Hash
 from solders.instruction import AccountMeta, Instruction
 from solders.keypair import Keypair
 from solders.message import Message
 from solders.pubkey import Pubkey
 from solders.transaction import Transaction
 
-from .types import MarketInfo, MarketStatus, Outcome
+from .rpc import RpcPool, get_rpc_pool, get_rpc_urls
+from .types import (
+    MarketInfo,
+    MarketStatus,
+    Outcome,
+    PositionInfo,
+    ProtocolInfo,
+    ResolveVerification,
+    SimulationResult,
+)
 
 logger = logging.getLogger(__name__)
 
 # Must match declare_id! in lib.rs
 PROGRAM_ID = Pubkey.from_string("wQpV3yz4oTyRf4SE3xoZkBjxDTNSHUUUDgqT7YsKfcF")
 
+TOKEN_PROGRAM_ID = Pubkey.from_string("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA")
+ASSOCIATED_TOKEN_PROGRAM_ID = Pubkey.from_string("ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL")
+
 PROTOCOL_SEED = b"protocol"
 MARKET_SEED = b"market"
+POSITION_SEED = b"position"
+MARKET_VAULT_SEED = b"market_vault"
 
 # Anchor instruction discriminators are the first 8 bytes of
 # sha256('global:snake_case_instruction_name').
@@ -41,23 +58,59 @@ def compute_discriminator(instruction_name: str) -> bytes:
 
 
 RESOLVE_DISCRIMINATOR = compute_discriminator("resolve")
+CLAIM_DISCRIMINATOR = compute_discriminator("claim")
 
 MAX_RETRIES = 3
-DEFAULT_RPC = "https://api.devnet.solana.com"
+CONFIRM_TIMEOUT_SECONDS = 60.0
+CONFIRM_POLL_SECONDS = 0.5
+SIMULATION_CACHE_TTL_SECONDS = 20.0
+PROTOCOL_CACHE_TTL_SECONDS = 300.0
+# getMultipleAccounts accepts at most this many addresses per call.
+MAX_MULTIPLE_ACCOUNTS = 100
+SIMULATE_CONFIG = {
+    "encoding": "base64",
+    "sigVerify": False,
+    "replaceRecentBlockhash": True,
+    "commitment": "confirmed",
+}
+
+# SibylError variants in declaration order (lib.rs); Anchor numbers custom
+# errors from 6000.
+SIBYL_ERROR_BASE = 6000
+SIBYL_ERRORS = [
+    "InvalidFeeBps", "TitleTooLong", "DescriptionTooLong", "DeadlineInPast", "MarketNotOpen",
+    "MarketExpired", "ZeroAmount", "InvalidBetSide", "SideMismatch", "InvalidConfidence",
+    "MarketNotResolvable", "MarketNotResolved", "AlreadyClaimed", "NotWinner", "NoPayout",
+    "NotPositionOwner", "DeadlineNotReached", "SwapCapExceeded", "TreasuryMismatch",
+]
+# Anchor framework errors a resolve can hit (e.g. signing with a key that
+# is not the protocol's oracle fails `has_one = oracle`).
+CONSTRAINT_HAS_ONE = 2001
+ANCHOR_ERRORS = {
+    CONSTRAINT_HAS_ONE: "ConstraintHasOne (signer is not the protocol oracle)",
+    2006: "ConstraintSeeds",
+    3012: "AccountNotInitialized",
+}
+
+
+def read_keypair(path: str | Path) -> Keypair:
+    """Read a keypair from a JSON file (Solana CLI format)."""
+    data = json.loads(Path(path).read_text())
+    return Keypair.from_bytes(bytes(data[:64]))
 
 
 def load_keypair() -> Keypair:
-    """Load the oracle keypair from a JSON file (Solana CLI format)."""
+    """Load the oracle keypair from `ORACLE_KEYPAIR_PATH`."""
     path = os.environ.get("ORACLE_KEYPAIR_PATH")
     if not path:
         raise ValueError("ORACLE_KEYPAIR_PATH environment variable is required")
 
-    data = json.loads(Path(path).read_text())
-    return Keypair.from_bytes(bytes(data[:64]))
+    return read_keypair(path)
 
 
 def get_rpc_url() -> str:
-    return os.environ.get("SOLANA_RPC_URL", DEFAULT_RPC)
+    """The primary RPC endpoint."""
+    return get_rpc_urls()[0]
 
 
 def derive_protocol_pda() -> tuple[Pubkey, int]:
@@ -71,15 +124,42 @@ def derive_market_pda(market_id: int) -> tuple[Pubkey, int]:
     )
 
 
-async def fetch_market(client: AsyncClient, market_id: int) -> MarketInfo:
-    """Fetch and deserialize a Market account from chain."""
-    market_pda, _ = derive_market_pda(market_id)
-    resp = await client.get_account_info(market_pda, commitment=Confirmed)
+def derive_position_pda(market_pda: Pubkey, owner: Pubkey, side: Outcome) -> tuple[Pubkey, int]:
+    return Pubkey.find_program_address(
+        [POSITION_SEED, bytes(market_pda), bytes(owner), bytes([side.to_chain_value()])],
+        PROGRAM_ID,
+    )
 
-    if resp.value is None:
-        raise ValueError(f"Market {market_id} not found on chain")
 
-    data = resp.value.data
+def derive_vault_pda(market_id: int) -> tuple[Pubkey, int]:
+    return Pubkey.find_program_address(
+        [MARKET_VAULT_SEED, market_id.to_bytes(8, "little")],
+        PROGRAM_ID,
+    )
+
+
+def derive_associated_token_address(owner: Pubkey, mint: Pubkey) -> Pubkey:
+    """The owner's associated token account for `mint`."""
+    address, _ = Pubkey.find_program_address(
+        [bytes(owner), bytes(TOKEN_PROGRAM_ID), bytes(mint)],
+        ASSOCIATED_TOKEN_PROGRAM_ID,
+    )
+    return address
+
+
+def compute_account_discriminator(account_name: str) -> bytes:
+    """Compute an Anchor account discriminator from its CamelCase name."""
+    return hashlib.sha256(f"account:{account_name}".encode()).digest()[:8]
+
+
+MARKET_ACCOUNT_DISCRIMINATOR = compute_account_discriminator("Market")
+# 8 + Market::INIT_SPACE: discriminator, id, authority, title (max 200),
+# description (max 1000), deadline, pools, status, outcome, confidence, bump.
+MARKET_ACCOUNT_SIZE = 8 + 8 + 32 + (4 + 200) + (4 + 1000) + 8 + 8 + 8 + 1 + 2 + 1 + 1
+
+
+def decode_market(data: bytes) -> MarketInfo:
+    """Deserialize a Market account's raw data."""
     # Skip 8-byte Anchor discriminator
     offset = 8
 
@@ -144,19 +224,285 @@ async def fetch_market(client: AsyncClient, market_id: int) -> MarketInfo:
     )
 
 
-async def submit_resolve(
+PROTOCOL_ACCOUNT_DISCRIMINATOR = compute_account_discriminator("Protocol")
+# 8 + Protocol::INIT_SPACE: discriminator, authority, oracle, sbyl_mint,
+# treasury, fee_bps, swap_cap, market_count, bump.
+PROTOCOL_ACCOUNT_SIZE = 8 + 32 * 4 + 2 + 8 + 8 + 1
+
+POSITION_ACCOUNT_DISCRIMINATOR = compute_account_discriminator("Position")
+# 8 + Position::INIT_SPACE: discriminator, owner, market, side, amount, claimed, bump.
+POSITION_ACCOUNT_SIZE = 8 + 32 + 32 + 1 + 8 + 1 + 1
+
+
+def decode_protocol(data: bytes) -> ProtocolInfo:
+    """Deserialize the Protocol account's raw data."""
+    offset = 8
+    keys = []
+    for _ in range(4):
+        keys.append(str(Pubkey.from_bytes(bytes(data[offset : offset + 32]))))
+        offset += 32
+    fee_bps, swap_cap, market_count = struct.unpack_from("<HQQ", data, offset)
+    authority, oracle, sbyl_mint, treasury = keys
+    return ProtocolInfo(
+        authority=authority,
+        oracle=oracle,
+        sbyl_mint=sbyl_mint,
+        treasury=treasury,
+        fee_bps=fee_bps,
+        swap_cap=swap_cap,
+        market_count=market_count,
+    )
+
+
+async def fetch_protocol(client: AsyncClient | RpcPool) -> ProtocolInfo:
+    """Fetch and deserialize the Protocol account."""
+    protocol_pda, _ = derive_protocol_pda()
+    resp = await client.get_account_info(protocol_pda, commitment=Confirmed)
+    if resp.value is None:
+        raise ValueError("Protocol account not found on chain")
+    return decode_protocol(resp.value.data)
+
+
+class ProtocolCache:
+    """The decoded Protocol account, re-read once it is older than `ttl`.
+
+    Every resolve checks the oracle signer against it, so it is kept warm
+    rather than fetched per market. A re-read that finds the account changed
+    (e.g. the oracle key was rotated) is logged.
+    """
+
+    def __init__(self, ttl: float = PROTOCOL_CACHE_TTL_SECONDS, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self._protocol: ProtocolInfo | None = None
+        self._fetched_at = 0.0
+
+    async def get(self, client: AsyncClient | RpcPool, refresh: bool = False) -> ProtocolInfo:
+        if not refresh and self._protocol is not None and self.clock() - self._fetched_at <= self.ttl:
+            return self._protocol
+        protocol = await fetch_protocol(client)
+        if self._protocol is not None and protocol != self._protocol:
+            changed = [f for f in ProtocolInfo.model_fields if getattr(protocol, f) != getattr(self._protocol, f)]
+            logger.info("Protocol account changed: %s", ", ".join(changed))
+        self._protocol, self._fetched_at = protocol, self.clock()
+        return protocol
+
+    def invalidate(self) -> None:
+        self._protocol = None
+
+
+_protocol_cache = ProtocolCache()
+
+
+async def get_protocol(client: AsyncClient | RpcPool | None = None, refresh: bool = False) -> ProtocolInfo:
+    """The Protocol account, from cache unless stale or `refresh` is set."""
+    return await _protocol_cache.get(client if client is not None else get_rpc_pool(), refresh=refresh)
+
+
+class OracleSignerMismatch(RuntimeError):
+    """The oracle keypair is not the protocol's oracle, so every resolve would fail."""
+
+
+async def check_oracle_signer(
+    client: AsyncClient | RpcPool | None = None,
+    keypair: Keypair | None = None,
+) -> ProtocolInfo:
+    """Check that the oracle keypair is the one the protocol accepts for `resolve`.
+
+    Raises OracleSignerMismatch otherwise; run it before paying for judgment.
+    """
+    keypair = keypair if keypair is not None else load_keypair()
+    protocol = await get_protocol(client)
+    if str(keypair.pubkey()) != protocol.oracle:
+        raise OracleSignerMismatch(
+            f"Oracle keypair {keypair.pubkey()} is not the protocol oracle {protocol.oracle}; "
+            "check ORACLE_KEYPAIR_PATH"
+        )
+    return protocol
+
+
+def decode_position(data: bytes) -> PositionInfo:
+    """Deserialize a Position account's raw data."""
+    owner = Pubkey.from_bytes(bytes(data[8:40]))
+    market = Pubkey.from_bytes(bytes(data[40:72]))
+    side = [Outcome.YES, Outcome.NO, Outcome.INVALID][data[72]]
+    (amount,) = struct.unpack_from("<Q", data, 73)
+    return PositionInfo(owner=str(owner), market=str(market), side=side, amount=amount, claimed=bool(data[81]))
+
+
+async def fetch_position_accounts(client: AsyncClient | RpcPool, owner: Pubkey | None = None) -> list[bytes]:
+    """Raw data of every Position account, or only `owner`'s, in one RPC call."""
+    filters: list = [POSITION_ACCOUNT_SIZE]
+    if owner is not None:
+        filters.append(MemcmpOpts(offset=8, bytes=str(owner)))
+    resp = await client.get_program_accounts(
+        PROGRAM_ID,
+        commitment=Confirmed,
+        encoding="base64",
+        filters=filters,
+    )
+    return [bytes(keyed.account.data) for keyed in resp.value]
+
+
+async def fetch_market(client: AsyncClient | RpcPool, market_id: int) -> MarketInfo:
+    """Fetch and deserialize a Market account from chain."""
+    market_pda, _ = derive_market_pda(market_id)
+    resp = await client.get_account_info(market_pda, commitment=Confirmed)
+
+    if resp.value is None:
+        raise ValueError(f"Market {market_id} not found on chain")
+
+    return decode_market(resp.value.data)
+
+
+async def fetch_market_snapshot(client: AsyncClient | RpcPool) -> tuple[int, list[MarketInfo]]:
+    """Fetch every Market account owned by the program in one RPC call.
+
+    Returns the slot the accounts were read at along with the markets.
+    Market accounts are allocated at a fixed size, so a dataSize filter
+    selects them server-side; the discriminator is checked here.
+    """
+    resp = await client.get_program_accounts(
+        PROGRAM_ID,
+        commitment=Confirmed,
+        encoding="base64",
+        filters=[MARKET_ACCOUNT_SIZE],
+    )
+    markets: list[MarketInfo] = []
+    for keyed in resp.value:
+        if bytes(keyed.account.data[:8]) != MARKET_ACCOUNT_DISCRIMINATOR:
+            continue
+        try:
+            markets.append(decode_market(keyed.account.data))
+        except Exception:
+            logger.warning("Skipping undecodable market account %s", keyed.pubkey)
+    return resp.context.slot, markets
+
+
+async def fetch_all_markets(client: AsyncClient | RpcPool) -> list[MarketInfo]:
+    """Fetch every Market account owned by the program in one RPC call."""
+    _, markets = await fetch_market_snapshot(client)
+    return markets
+
+
+async def fetch_markets(client: AsyncClient | RpcPool, market_ids: list[int]) -> tuple[int, list[MarketInfo]]:
+    """Fetch Market accounts by id, MAX_MULTIPLE_ACCOUNTS per `getMultipleAccounts` call.
+
+    Returns the oldest slot among the calls with the markets that exist, in
+    `market_ids` order.
+    """
+    chunks = [market_ids[i : i + MAX_MULTIPLE_ACCOUNTS] for i in range(0, len(market_ids), MAX_MULTIPLE_ACCOUNTS)]
+    responses = await asyncio.gather(*(
+        client.get_multiple_accounts(
+            [derive_market_pda(market_id)[0] for market_id in chunk],
+            commitment=Confirmed,
+            encoding="base64",
+        )
+        for chunk in chunks
+    ))
+    markets = [
+        decode_market(account.data)
+        for resp in responses
+        for account in resp.value
+        if account is not None
+    ]
+    return min((resp.context.slot for resp in responses), default=0), markets
+
+
+async def fetch_markets_by_count(client: AsyncClient | RpcPool) -> tuple[int, list[MarketInfo]]:
+    """Fetch every market by id, 0 to the protocol's `market_count`."""
+    protocol = await get_protocol(client, refresh=True)
+    return await fetch_markets(client, list(range(protocol.market_count)))
+
+
+def verify_resolution(
+    signature: str,
+    slot: int,
+    market: MarketInfo | None,
+    outcome: Outcome,
+    confidence: int,
+) -> ResolveVerification:
+    """Compare a Market account's post-state with what was submitted."""
+    mismatches = []
+    if market is None:
+        mismatches.append("market account not found")
+    else:
+        if market.status != MarketStatus.RESOLVED:
+            mismatches.append(f"status is {market.status.value}, expected Resolved")
+        if market.outcome != outcome:
+            actual = market.outcome.value if market.outcome else "none"
+            mismatches.append(f"outcome is {actual}, expected {outcome.value}")
+        if market.oracle_confidence != confidence:
+            mismatches.append(f"confidence is {market.oracle_confidence}, expected {confidence}")
+    return ResolveVerification(
+        signature=signature,
+        slot=slot,
+        status=market.status if market else None,
+        outcome=market.outcome if market else None,
+        confidence=market.oracle_confidence if market else None,
+        mismatches=mismatches,
+    )
+
+
+async def confirm_resolve(
+    client: RpcPool,
+    signature: str,
     market_id: int,
     outcome: Outcome,
     confidence: int,
-) -> str:
+    timeout: float = CONFIRM_TIMEOUT_SECONDS,
+) -> ResolveVerification:
+    """Wait for a resolve tx to confirm and verify the market's post-state.
+
+    Each poll is one JSON-RPC batch of `getSignatureStatuses` and
+    `getAccountInfo` for the market, so the post-state arrives with the
+    confirmation instead of in a separate read. The account read is only
+    trusted once it is from the transaction's slot or later.
     """
-    Submit a `resolve` transaction to the Sibyl program.
+    market_pda, _ = derive_market_pda(market_id)
+    give_up = time.monotonic() + timeout
+    while True:
+        statuses, account = await client.batch([
+            ("getSignatureStatuses", [[signature]]),
+            ("getAccountInfo", [str(market_pda), {"encoding": "base64", "commitment": "confirmed"}]),
+        ])
+        status = statuses["value"][0]
+        if status is not None:
+            if status["err"] is not None:
+                raise RuntimeError(f"Resolve tx {signature} failed: {status['err']}")
+            confirmed = status.get("confirmationStatus") in ("confirmed", "finalized")
+            if confirmed and account["context"]["slot"] >= status["slot"]:
+                value = account["value"]
+                market = decode_market(base64.b64decode(value["data"][0])) if value is not None else None
+                return verify_resolution(signature, status["slot"], market, outcome, confidence)
+        if time.monotonic() >= give_up:
+            raise TimeoutError(f"Resolve tx {signature} not confirmed after {timeout:.0f}s")
+        await asyncio.sleep(CONFIRM_POLL_SECONDS)
+
+
+async def find_landed_resolve(
+    client: RpcPool,
+    signatures: list[str],
+    market_id: int,
+    outcome: Outcome,
+    confidence: int,
+) -> ResolveVerification | None:
+    """Check whether an earlier send of a resolve landed.
 
-    Returns the transaction signature on success.
+    Returns the verification of the first one that executed without error
+    (waiting for it to confirm if it has only been processed), or None if
+    none of them is known to the cluster or all of them failed.
     """
-    keypair = load_keypair()
-    rpc_url = get_rpc_url()
+    (statuses,) = await client.batch([("getSignatureStatuses", [signatures])])
+    for signature, status in zip(signatures, statuses["value"]):
+        if status is not None and status["err"] is None:
+            logger.info("Resolve tx from an earlier attempt landed: %s", signature)
+            return await confirm_resolve(client, signature, market_id, outcome, confidence)
+    return None
+
 
+def build_resolve_ix(oracle: Pubkey, market_id: int, outcome: Outcome, confidence: int) -> Instruction:
+    """Build the `resolve` instruction for a market."""
     protocol_pda, _ = derive_protocol_pda()
     market_pda, _ = derive_market_pda(market_id)
 
@@ -164,42 +510,259 @@ async def submit_resolve(
     outcome_byte = outcome.to_chain_value()
     ix_data = RESOLVE_DISCRIMINATOR + bytes([outcome_byte]) + bytes([confidence])
 
-    ix = Instruction(
+    return Instruction(
         program_id=PROGRAM_ID,
         accounts=[
             AccountMeta(protocol_pda, is_signer=False, is_writable=False),
             AccountMeta(market_pda, is_signer=False, is_writable=True),
-            AccountMeta(keypair.pubkey(), is_signer=True, is_writable=False),
+            AccountMeta(oracle, is_signer=True, is_writable=False),
         ],
         data=ix_data,
     )
 
-    async with AsyncClient(rpc_url) as client:
-        for attempt in range(1, MAX_RETRIES + 1):
-            try:
-                blockhash_resp = await client.get_latest_blockhash(commitment=Confirmed)
-                recent_blockhash = blockhash_resp.value.blockhash
 
-                msg = Message.new_with_blockhash([ix], keypair.pubkey(), recent_blockhash)
-                tx = Transaction.new_unsigned(msg)
-                tx.sign([keypair], recent_blockhash)
+def build_claim_ix(owner: Pubkey, market_id: int, side: Outcome, mint: Pubkey, treasury: Pubkey) -> Instruction:
+    """Build the `claim` instruction for `owner`'s position on `side` of a market.
+
+    `treasury` is the protocol treasury's token account for `mint`.
+    """
+    protocol_pda, _ = derive_protocol_pda()
+    market_pda, _ = derive_market_pda(market_id)
+    position_pda, _ = derive_position_pda(market_pda, owner, side)
+    vault_pda, _ = derive_vault_pda(market_id)
+
+    return Instruction(
+        program_id=PROGRAM_ID,
+        accounts=[
+            AccountMeta(protocol_pda, is_signer=False, is_writable=False),
+            AccountMeta(market_pda, is_signer=False, is_writable=False),
+            AccountMeta(position_pda, is_signer=False, is_writable=True),
+            AccountMeta(vault_pda, is_signer=False, is_writable=True),
+            AccountMeta(derive_associated_token_address(owner, mint), is_signer=False, is_writable=True),
+            AccountMeta(treasury, is_signer=False, is_writable=True),
+            AccountMeta(owner, is_signer=True, is_writable=False),
+            AccountMeta(TOKEN_PROGRAM_ID, is_signer=False, is_writable=False),
+        ],
+        data=CLAIM_DISCRIMINATOR,
+    )
+
+
+def program_error_code(err: object) -> int | None:
+    """The custom program error code in a transaction error, if any."""
+    if isinstance(err, dict) and "InstructionError" in err:
+        _, detail = err["InstructionError"]
+        if isinstance(detail, dict) and "Custom" in detail:
+            return detail["Custom"]
+    return None
 
-                resp = await client.send_transaction(
-                    tx,
-                    opts=TxOpts(skip_preflight=False, preflight_commitment=Confirmed),
-                )
 
-                sig = str(resp.value)
-                logger.info("Resolve tx sent (attempt %d): %s", attempt, sig)
+def describe_program_error(err: object) -> str:
+    """Human-readable name for a transaction error from a simulation or status."""
+    code = program_error_code(err)
+    if code is not None:
+        if 0 <= code - SIBYL_ERROR_BASE < len(SIBYL_ERRORS):
+            return SIBYL_ERRORS[code - SIBYL_ERROR_BASE]
+        return ANCHOR_ERRORS.get(code, f"custom program error {code}")
+    if isinstance(err, dict) and "InstructionError" in err:
+        return str(err["InstructionError"][1])
+    return str(err)
 
-                # Confirm
-                await client.confirm_transaction(resp.value, commitment=Confirmed)
-                logger.info("Resolve tx confirmed: %s", sig)
-                return sig
 
-            except Exception:
-                logger.exception("Resolve tx attempt %d/%d failed", attempt, MAX_RETRIES)
-                if attempt == MAX_RETRIES:
-                    raise
+class SimulationRejected(RuntimeError):
+    """A resolve transaction failed simulation and was not sent."""
+
+    def __init__(self, result: SimulationResult):
+        super().__init__(f"Market {result.market_id}: resolve simulation failed: {result.error}")
+        self.result = result
+
+
+class SimulationCache:
+    """Recent simulation results per (market, outcome, confidence).
+
+    Lets a batch pre-check and the per-market submit share one simulation.
+    A submit invalidates its market's entries once the resolve confirms, or
+    before re-simulating ahead of a resend.
+    """
+
+    def __init__(self, ttl: float = SIMULATION_CACHE_TTL_SECONDS, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self._results: dict[tuple[int, Outcome, int], tuple[float, SimulationResult]] = {}
+
+    def get(self, key: tuple[int, Outcome, int]) -> SimulationResult | None:
+        entry = self._results.get(key)
+        if entry is None or self.clock() - entry[0] > self.ttl:
+            self._results.pop(key, None)
+            return None
+        return entry[1]
+
+    def put(self, key: tuple[int, Outcome, int], result: SimulationResult) -> None:
+        self._results[key] = (self.clock(), result)
+
+    def invalidate(self, market_id: int) -> None:
+        for key in [k for k in self._results if k[0] == market_id]:
+            del self._results[key]
+
+
+_simulations = SimulationCache()
+
+
+async def simulate_resolves(
+    client: RpcPool,
+    oracle: Pubkey,
+    resolutions: list[tuple[int, Outcome, int]],
+    cache: SimulationCache | None = None,
+) -> dict[int, SimulationResult]:
+    """Simulate `resolve` for each (market_id, outcome, confidence) in one batched request.
+
+    Transactions are simulated unsigned (`sigVerify: false`) against the
+    latest blockhash, so doomed ones are caught before signing or sending.
+    Cached results are reused.
+    """
+    cache = cache if cache is not None else _simulations
+    results: dict[int, SimulationResult] = {}
+    pending = []
+    for key in resolutions:
+        if (cached := cache.get(key)) is not None:
+            results[key[0]] = cached
+        else:
+            pending.append(key)
+    if not pending:
+        return results
+
+    calls = []
+    for market_id, outcome, confidence in pending:
+        msg = Message.new_with_blockhash(
+            [build_resolve_ix(oracle, market_id, outcome, confidence)], oracle, Hash.default()
+        )
+        tx = base64.b64encode(bytes(Transaction.new_unsigned(msg))).decode()
+        calls.append(("simulateTransaction", [tx, SIMULATE_CONFIG]))
+
+    for key, sim in zip(pending, await client.batch(calls)):
+        value = sim["value"]
+        result = SimulationResult(
+            market_id=key[0],
+            ok=value["err"] is None,
+            error=describe_program_error(value["err"]) if value["err"] is not None else None,
+            logs=value.get("logs") or [],
+            units_consumed=value.get("unitsConsumed"),
+        )
+        cache.put(key, result)
+        results[key[0]] = result
+        if program_error_code(value["err"]) == CONSTRAINT_HAS_ONE:
+            # The oracle may have been rotated; re-read the protocol next time.
+            _protocol_cache.invalidate()
+        if not result.ok:
+            logger.warning("Market %d: resolve would fail (%s); not sending", key[0], result.error)
+    return results
+
+
+async def submit_resolve(
+    market_id: int,
+    outcome: Outcome,
+    confidence: int,
+    client: RpcPool | None = None,
+    cache: SimulationCache | None = None,
+) -> ResolveVerification:
+    """
+    Submit a `resolve` transaction to the Sibyl program.
+
+    The transaction is simulated first (or its cached simulation reused);
+    one that would fail raises SimulationRejected without being signed or
+    sent, and one that passes is sent with preflight skipped. Before a
+    retry, the earlier attempts' signatures are checked so a send that
+    landed is confirmed instead of resent, and the resolve is simulated
+    again. Uses the shared RPC pool unless a client is given. Returns the
+    confirmed signature with the market's verified post-state.
+    """
+    keypair = load_keypair()
+    client = client if client is not None else get_rpc_pool()
+    cache = cache if cache is not None else _simulations
+
+    key = (market_id, outcome, confidence)
+    simulation = (await simulate_resolves(client, keypair.pubkey(), [key], cache))[market_id]
+    if not simulation.ok:
+        raise SimulationRejected(simulation)
+
+    ix = build_resolve_ix(keypair.pubkey(), market_id, outcome, confidence)
+    sent: list[str] = []
+
+    for attempt in range(1, MAX_RETRIES + 1):
+        try:
+            if sent:
+                # An earlier send may have landed even though its confirmation
+                # was lost; resending it would only fail on-chain and burn a fee.
+                landed = await find_landed_resolve(client, sent, market_id, outcome, confidence)
+                cache.invalidate(market_id)
+                if landed is not None:
+                    return landed
+                simulation = (await simulate_resolves(client, keypair.pubkey(), [key], cache))[market_id]
+                if not simulation.ok:
+                    raise SimulationRejected(simulation)
+
+            blockhash_resp = await client.get_latest_blockhash(commitment=Confirmed)
+            recent_blockhash = blockhash_resp.value.blockhash
+
+            msg = Message.new_with_blockhash([ix], keypair.pubkey(), recent_blockhash)
+            tx = Transaction.new_unsigned(msg)
+            tx.sign([keypair], recent_blockhash)
+            # Known before sending, so a send whose response is lost can still be looked up.
+            sent.append(str(tx.signatures[0]))
+
+            # Already simulated; a second preflight would only cost a round trip.
+            resp = await client.send_transaction(
+                tx,
+                opts=TxOpts(skip_preflight=True, preflight_commitment=Confirmed),
+            )
+
+            sig = str(resp.value)
+            logger.info("Resolve tx sent (attempt %d): %s", attempt, sig)
+
+            verification = await confirm_resolve(client, sig, market_id, outcome, confidence)
+            logger.info("Resolve tx confirmed at slot %d: %s", verification.slot, sig)
+            cache.invalidate(market_id)
+            return verification
+
+        except SimulationRejected:
+            raise
+        except Exception:
+            logger.exception("Resolve tx attempt %d/%d failed", attempt, MAX_RETRIES)
+            if attempt == MAX_RETRIES:
+                raise
 
     raise RuntimeError("Unreachable")
+
+
+async def submit_resolves(
+    resolutions: list[tuple[int, Outcome, int]],
+    client: RpcPool | None = None,
+    cache: SimulationCache | None = None,
+) -> dict[int, ResolveVerification | Exception]:
+    """Resolve several markets: simulate all in one batch, then send the survivors.
+
+    Returns each market's verification, or the exception that stopped it
+    (SimulationRejected for markets that would have failed on-chain).
+    """
+    keypair = load_keypair()
+    client = client if client is not None else get_rpc_pool()
+    cache = cache if cache is not None else _simulations
+
+    simulations = await simulate_resolves(client, keypair.pubkey(), resolutions, cache)
+    results: dict[int, ResolveVerification | Exception] = {}
+    survivors = []
+    for market_id, outcome, confidence in resolutions:
+        if simulations[market_id].ok:
+            survivors.append((market_id, outcome, confidence))
+        else:
+            results[market_id] = SimulationRejected(simulations[market_id])
+    logger.info("Resolve pre-check: %d/%d markets pass simulation", len(survivors), len(resolutions))
+
+    sent = await asyncio.gather(
+        *(submit_resolve(m, o, c, client=client, cache=cache) for m, o, c in survivors),
+        return_exceptions=True,
+    )
+    for (market_id, _, _), result in zip(survivors, sent):
+        if isinstance(result, BaseException) and not isinstance(result, Exception):
+            raise result
+        results[market_id] = result
+    return results
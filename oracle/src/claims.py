@@ -0,0 +1,375 @@
+"""Claim keeper: settles winning and refund positions in resolved markets.
+
+The program's `claim` must be signed by the position's owner, so the keeper
+claims for the owners whose keypairs it holds (`CLAIM_KEYPAIR_PATHS`,
+comma-separated; defaults to the oracle keypair). The first keypair pays
+the transaction fees. Each run:
+
+1. reads the protocol, every market, and each held owner's positions
+   (one `getProgramAccounts` per owner, filtered server-side);
+2. keeps unclaimed positions in Resolved markets that pay out something;
+3. simulates every claim unsigned in batched JSON-RPC requests, and
+   rejects the ones that would fail;
+4. packs the rest into as few transactions as the packet size allows;
+5. sends them through a window of in-flight transactions while a single
+   `getSignatureStatuses` call per poll confirms everything outstanding.
+
+Every position's progress is tracked as a `ClaimResult`. Claiming is
+idempotent on-chain (`claimed` is set), so positions that fail or time out
+are simply picked up again by the next run.
+
+Usage:
+    python -m oracle.src.claims
+    python -m oracle.src.claims --dry-run
+    python -m oracle.src.claims --market-id 3 --market-id 7
+    python -m oracle.src.claims --watch 300
+"""
+
+import argparse
+import asyncio
+import base64
+import logging
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+from solana.rpc.commitment import Confirmed
+from solana.rpc.types import TxOpts
+from solders.hash import Hash
+from solders.instruction import Instruction
+from solders.keypair import Keypair
+from solders.message import Message
+from solders.pubkey import Pubkey
+from solders.transaction import Transaction
+
+from .chain import (
+    CONFIRM_POLL_SECONDS,
+    POSITION_ACCOUNT_DISCRIMINATOR,
+    SIMULATE_CONFIG,
+    build_claim_ix,
+    decode_position,
+    derive_associated_token_address,
+    derive_market_pda,
+    describe_program_error,
+    fetch_market_snapshot,
+    fetch_position_accounts,
+    get_protocol,
+    load_keypair,
+    read_keypair,
+)
+from .rpc import RpcPool, close_rpc_pool, get_rpc_pool
+from .types import ClaimResult, ClaimStatus, MarketInfo, MarketStatus, Outcome, PositionInfo
+
+logger = logging.getLogger(__name__)
+
+FEE_BPS_DENOMINATOR = 10_000
+# Largest serialized transaction a validator accepts (PACKET_DATA_SIZE).
+MAX_TRANSACTION_BYTES = 1232
+MAX_INFLIGHT_TRANSACTIONS = 16
+SIMULATION_BATCH_SIZE = 100
+CLAIM_CONFIRM_TIMEOUT_SECONDS = 60.0
+BLOCKHASH_MAX_AGE_SECONDS = 30.0
+DEFAULT_WATCH_INTERVAL_SECONDS = 300.0
+
+Claim = tuple[ClaimResult, Instruction]
+
+
+def load_claim_keypairs() -> list[Keypair]:
+    """Keypairs from `CLAIM_KEYPAIR_PATHS`, else the oracle keypair."""
+    paths = [p.strip() for p in os.environ.get("CLAIM_KEYPAIR_PATHS", "").split(",") if p.strip()]
+    if not paths:
+        return [load_keypair()]
+    return [read_keypair(p) for p in paths]
+
+
+def treasury_token_account(treasury: Pubkey, mint: Pubkey) -> Pubkey:
+    """The treasury's SBYL token account: `SIBYL_TREASURY_TOKEN_ACCOUNT`, else its ATA."""
+    override = os.environ.get("SIBYL_TREASURY_TOKEN_ACCOUNT")
+    if override:
+        return Pubkey.from_string(override)
+    return derive_associated_token_address(treasury, mint)
+
+
+def claim_payout(position: PositionInfo, market: MarketInfo, fee_bps: int) -> int:
+    """What `claim` would pay a position, net of fees; 0 if it would pay nothing.
+
+    Mirrors the program's integer math: winners get
+    `amount * total_pool / winning_pool` less `fee_bps`, and an Invalid
+    outcome refunds `amount * total_pool / side_pool` with no fee.
+    """
+    if position.claimed or market.status != MarketStatus.RESOLVED or market.outcome is None:
+        return 0
+    side_pool = {Outcome.YES: market.yes_pool, Outcome.NO: market.no_pool}.get(position.side, 0)
+    if side_pool == 0:
+        return 0
+    gross = position.amount * (market.yes_pool + market.no_pool) // side_pool
+    if market.outcome == Outcome.INVALID:
+        return gross
+    if position.side != market.outcome:
+        return 0
+    return gross - gross * fee_bps // FEE_BPS_DENOMINATOR
+
+
+async def find_claims(
+    client: RpcPool,
+    owners: list[Pubkey],
+    market_ids: set[int] | None = None,
+) -> list[Claim]:
+    """Claimable positions of `owners`, each with its `claim` instruction."""
+    protocol, (_, markets), *accounts = await asyncio.gather(
+        get_protocol(client),
+        fetch_market_snapshot(client),
+        *(fetch_position_accounts(client, owner) for owner in owners),
+    )
+    resolved = {
+        str(derive_market_pda(m.id)[0]): m
+        for m in markets
+        if m.status == MarketStatus.RESOLVED and (market_ids is None or m.id in market_ids)
+    }
+    mint = Pubkey.from_string(protocol.sbyl_mint)
+    treasury = treasury_token_account(Pubkey.from_string(protocol.treasury), mint)
+
+    claims: list[Claim] = []
+    for data in (d for owner_accounts in accounts for d in owner_accounts):
+        if data[:8] != POSITION_ACCOUNT_DISCRIMINATOR:
+            continue
+        position = decode_position(data)
+        market = resolved.get(position.market)
+        if market is None:
+            continue
+        payout = claim_payout(position, market, protocol.fee_bps)
+        if payout == 0:
+            continue
+        result = ClaimResult(market_id=market.id, owner=position.owner, side=position.side, payout=payout)
+        ix = build_claim_ix(Pubkey.from_string(position.owner), market.id, position.side, mint, treasury)
+        claims.append((result, ix))
+    return claims
+
+
+async def simulate_claims(client: RpcPool, claims: list[Claim], fee_payer: Pubkey) -> list[Claim]:
+    """Simulate each claim on its own; mark failures rejected and return the rest.
+
+    Claims are simulated individually so one bad position cannot sink a
+    packed transaction later. Simulations go out in JSON-RPC batches of
+    `SIMULATION_BATCH_SIZE`.
+    """
+    calls = []
+    for _, ix in claims:
+        msg = Message.new_with_blockhash([ix], fee_payer, Hash.default())
+        tx = base64.b64encode(bytes(Transaction.new_unsigned(msg))).decode()
+        calls.append(("simulateTransaction", [tx, SIMULATE_CONFIG]))
+    chunks = await asyncio.gather(*(
+        client.batch(calls[i : i + SIMULATION_BATCH_SIZE]) for i in range(0, len(calls), SIMULATION_BATCH_SIZE)
+    ))
+
+    survivors = []
+    for (result, ix), sim in zip(claims, (s for chunk in chunks for s in chunk)):
+        err = sim["value"]["err"]
+        if err is None:
+            survivors.append((result, ix))
+        else:
+            result.status = ClaimStatus.REJECTED
+            result.error = describe_program_error(err)
+            logger.warning(
+                "Market %d: claim for %s would fail (%s); not sending", result.market_id, result.owner, result.error
+            )
+    return survivors
+
+
+def _transaction_size(instructions: list[Instruction], fee_payer: Pubkey) -> int:
+    msg = Message.new_with_blockhash(instructions, fee_payer, Hash.default())
+    return len(bytes(Transaction.new_unsigned(msg)))
+
+
+def pack_claims(claims: list[Claim], fee_payer: Pubkey) -> list[list[Claim]]:
+    """Pack claims greedily into transactions no larger than MAX_TRANSACTION_BYTES.
+
+    Claims are grouped by market and owner first, so the accounts they
+    share are listed once per transaction.
+    """
+    batches: list[list[Claim]] = []
+    current: list[Claim] = []
+    for claim in sorted(claims, key=lambda c: (c[0].market_id, c[0].owner)):
+        if current and _transaction_size([ix for _, ix in [*current, claim]], fee_payer) > MAX_TRANSACTION_BYTES:
+            batches.append(current)
+            current = []
+        current.append(claim)
+    if current:
+        batches.append(current)
+    return batches
+
+
+async def send_claims(
+    client: RpcPool,
+    batches: list[list[Claim]],
+    signers: dict[str, Keypair],
+    fee_payer: Keypair,
+    timeout: float = CLAIM_CONFIRM_TIMEOUT_SECONDS,
+) -> None:
+    """Sign, send and confirm packed claim transactions, updating each claim's status.
+
+    At most MAX_INFLIGHT_TRANSACTIONS are unconfirmed at a time; a sender
+    waits for a slot while the confirmer polls every outstanding signature
+    in one `getSignatureStatuses` call. Sends skip preflight, since every
+    claim was just simulated.
+    """
+    window = asyncio.Semaphore(MAX_INFLIGHT_TRANSACTIONS)
+    inflight: dict[str, tuple[float, list[ClaimResult]]] = {}
+    blockhash: Hash | None = None
+    blockhash_at = 0.0
+
+    async def recent_blockhash() -> Hash:
+        nonlocal blockhash, blockhash_at
+        if blockhash is None or time.monotonic() - blockhash_at > BLOCKHASH_MAX_AGE_SECONDS:
+            blockhash = (await client.get_latest_blockhash(commitment=Confirmed)).value.blockhash
+            blockhash_at = time.monotonic()
+        return blockhash
+
+    def finish(results: list[ClaimResult], status: ClaimStatus, error: str | None = None) -> None:
+        for r in results:
+            r.status = status
+            r.error = error
+
+    async def send(batch: list[Claim]) -> None:
+        results = [r for r, _ in batch]
+        owners = {r.owner: signers[r.owner] for r in results if r.owner != str(fee_payer.pubkey())}
+        await window.acquire()
+        try:
+            recent = await recent_blockhash()
+            tx = Transaction.new_unsigned(Message.new_with_blockhash([ix for _, ix in batch], fee_payer.pubkey(), recent))
+            tx.sign([fee_payer, *owners.values()], recent)
+            resp = await client.send_transaction(tx, opts=TxOpts(skip_preflight=True, preflight_commitment=Confirmed))
+        except Exception as e:
+            window.release()
+            logger.warning("Claim tx for %d positions failed to send: %r", len(results), e)
+            finish(results, ClaimStatus.FAILED, f"send failed: {e!r}")
+            return
+        sig = str(resp.value)
+        for r in results:
+            r.status = ClaimStatus.SENT
+            r.signature = sig
+        inflight[sig] = (time.monotonic(), results)
+        logger.info("Claim tx sent for %d positions: %s", len(results), sig)
+
+    async def confirm(sending: asyncio.Task) -> None:
+        while not (sending.done() and not inflight):
+            if inflight:
+                signatures = list(inflight)
+                try:
+                    (statuses,) = await client.batch([("getSignatureStatuses", [signatures])])
+                except Exception as e:
+                    logger.warning("Claim confirmation poll failed: %r", e)
+                    statuses = {"value": [None] * len(signatures)}
+                now = time.monotonic()
+                for sig, status in zip(signatures, statuses["value"]):
+                    sent_at, results = inflight[sig]
+                    if status is not None and status["err"] is not None:
+                        finish(results, ClaimStatus.FAILED, describe_program_error(status["err"]))
+                    elif status is not None and status.get("confirmationStatus") in ("confirmed", "finalized"):
+                        finish(results, ClaimStatus.CONFIRMED)
+                    elif now - sent_at > timeout:
+                        finish(results, ClaimStatus.FAILED, f"not confirmed after {timeout:.0f}s")
+                    else:
+                        continue
+                    del inflight[sig]
+                    window.release()
+            await asyncio.sleep(CONFIRM_POLL_SECONDS)
+
+    sending = asyncio.ensure_future(asyncio.gather(*(send(b) for b in batches)))
+    await asyncio.gather(sending, confirm(sending))
+
+
+async def run_claims(
+    client: RpcPool | None = None,
+    market_ids: set[int] | None = None,
+    dry_run: bool = False,
+) -> list[ClaimResult]:
+    """Find, simulate, pack and (unless `dry_run`) send every claim the keeper can make."""
+    client = client if client is not None else get_rpc_pool()
+    keypairs = load_claim_keypairs()
+    fee_payer = keypairs[0]
+    signers = {str(k.pubkey()): k for k in keypairs}
+
+    claims = await find_claims(client, [k.pubkey() for k in keypairs], market_ids)
+    if not claims:
+        logger.info("No claimable positions")
+        return []
+    survivors = await simulate_claims(client, claims, fee_payer.pubkey())
+    batches = pack_claims(survivors, fee_payer.pubkey())
+    logger.info(
+        "%d claimable positions: %d pass simulation, packed into %d transactions",
+        len(claims), len(survivors), len(batches),
+    )
+    if not dry_run:
+        await send_claims(client, batches, signers, fee_payer)
+    return [r for r, _ in claims]
+
+
+async def run_keeper(
+    interval: float = DEFAULT_WATCH_INTERVAL_SECONDS,
+    market_ids: set[int] | None = None,
+    dry_run: bool = False,
+) -> None:
+    """Run claim passes every `interval` seconds until interrupted."""
+    try:
+        while True:
+            try:
+                results = await run_claims(market_ids=market_ids, dry_run=dry_run)
+            except Exception:
+                logger.exception("Claim pass failed")
+            else:
+                confirmed = sum(r.status == ClaimStatus.CONFIRMED for r in results)
+                logger.info("Claim pass done: %d/%d positions claimed", confirmed, len(results))
+            await asyncio.sleep(interval)
+    finally:
+        await close_rpc_pool()
+
+
+async def _run_once(market_ids: set[int] | None, dry_run: bool) -> list[ClaimResult]:
+    try:
+        return await run_claims(market_ids=market_ids, dry_run=dry_run)
+    finally:
+        await close_rpc_pool()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sibyl Oracle — claim keeper for resolved markets")
+    parser.add_argument("--market-id", type=int, action="append", help="Only these markets (repeatable)")
+    parser.add_argument("--dry-run", action="store_true", help="Find and simulate claims without sending")
+    parser.add_argument(
+        "--watch",
+        type=float,
+        metavar="SECONDS",
+        help="Keep running, with a claim pass this often",
+    )
+    parser.add_argument("--verbose", "-v", action="store_true", help="Enable debug logging")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    )
+    load_dotenv()
+    market_ids = set(args.market_id) if args.market_id else None
+
+    if args.watch:
+        try:
+            asyncio.run(run_keeper(args.watch, market_ids, args.dry_run))
+        except KeyboardInterrupt:
+            logger.info("Claim keeper stopped.")
+        return
+
+    results = asyncio.run(_run_once(market_ids, args.dry_run))
+    print(f"{'market':>6} {'owner':<44} {'side':<4} {'payout':>14} {'status':<9} detail")
+    for r in sorted(results, key=lambda r: (r.market_id, r.owner)):
+        print(
+            f"{r.market_id:>6} {r.owner:<44} {r.side.value:<4} {r.payout:>14} "
+            f"{r.status.value:<9} {r.error or r.signature or ''}"
+        )
+    if any(r.status == ClaimStatus.FAILED for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
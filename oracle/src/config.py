@@ -0,0 +1,127 @@
+"""Validated, hot-reloadable market configuration (`markets.json`).
+
+`markets.json` maps market IDs to the sources and search queries used for
+research:
+
+```json
+{"0": {"sources": ["https://..."], "search_queries": ["..."]}}
+```
+
+The file is parsed and validated once into typed models indexed by market
+ID, so lookups are dict hits. The file's modification time, size and inode
+are checked at most once per `check_interval` seconds; when they change the
+file is reloaded and swapped in atomically. An edit that fails to parse or
+validate is logged and the last good config stays in use; it is never
+replaced by an empty one. An invalid file at startup raises.
+"""
+
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+from pydantic import BaseModel, ConfigDict, RootModel
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MARKETS_PATH = Path(__file__).resolve().parent.parent / "markets.json"
+CHECK_INTERVAL_SECONDS = 1.0
+
+
+class MarketConfig(BaseModel):
+    """Research configuration for one market."""
+    model_config = ConfigDict(extra="forbid")
+
+    sources: list[str] = []
+    search_queries: list[str] = []
+
+
+class MarketsFile(RootModel[dict[int, MarketConfig]]):
+    """The whole markets.json file, keyed by market ID."""
+
+
+def _fingerprint(path: Path) -> tuple[int, int, int] | None:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+class MarketsConfig:
+    """Indexed markets.json that reloads itself when the file changes."""
+
+    def __init__(self, path: Path, check_interval: float = CHECK_INTERVAL_SECONDS):
+        self.path = path
+        self.check_interval = check_interval
+        self.last_error: str | None = None
+        self._index: dict[int, MarketConfig] = {}
+        self._fingerprint: tuple[int, int, int] | None = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+        fingerprint = _fingerprint(path)
+        if fingerprint is not None:
+            # Fail fast: never start resolving with a broken config.
+            self._index = self._parse()
+            self._fingerprint = fingerprint
+        self._next_check = time.monotonic() + check_interval
+
+    def _parse(self) -> dict[int, MarketConfig]:
+        return MarketsFile.model_validate_json(self.path.read_bytes()).root
+
+    def reload_if_changed(self, force: bool = False) -> bool:
+        """Reload the file if it changed on disk. Returns True if a new config was swapped in."""
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return False
+        with self._lock:
+            self._next_check = now + self.check_interval
+            fingerprint = _fingerprint(self.path)
+            if fingerprint == self._fingerprint:
+                return False
+            if fingerprint is None:
+                if self.last_error is None:
+                    logger.error("%s disappeared; keeping the last good market config", self.path)
+                self.last_error = f"{self.path} not found"
+                return False
+            try:
+                index = self._parse()
+            except (OSError, ValueError) as e:
+                logger.error("Invalid %s; keeping the last good market config: %s", self.path, e)
+                self.last_error = str(e)
+                self._fingerprint = fingerprint  # don't re-parse the same bad file
+                return False
+            self._index = index
+            self._fingerprint = fingerprint
+            self.last_error = None
+        logger.info("Reloaded %s (%d markets)", self.path, len(index))
+        return True
+
+    def get(self, market_id: int) -> MarketConfig | None:
+        """Config for a market, or None if it has none."""
+        self.reload_if_changed()
+        return self._index.get(market_id)
+
+    def market_ids(self) -> list[int]:
+        self.reload_if_changed()
+        return sorted(self._index)
+
+
+_config: MarketsConfig | None = None
+
+
+def get_markets_config() -> MarketsConfig:
+    """The shared markets config (`ORACLE_MARKETS_CONFIG` or `markets.json`)."""
+    global _config
+    if _config is None:
+        env_path = os.environ.get("ORACLE_MARKETS_CONFIG")
+        _config = MarketsConfig(Path(env_path) if env_path else DEFAULT_MARKETS_PATH)
+    return _config
+
+
+def reset_markets_config() -> None:
+    """Forget the shared config so the next call reloads it (used by tests)."""
+    global _config
+    _config = None
@@ -0,0 +1,254 @@
+"""Persistent cross-market evidence store with BM25 full-text search.
+
+Every source and search snippet the researcher fetches is split into
+passages (see `textdiff.split_passages`) and kept in a local SQLite
+database (`data/evidence.db`, or `ORACLE_EVIDENCE_PATH`) with an FTS5
+inverted index over it. Passages are stored once, keyed by content hash,
+with the markets that gathered them.
+
+Before a market is judged, its title and description are run as a BM25
+query against everything gathered so far, so relevant passages found while
+researching other markets are added to the prompt without any network
+calls. FTS5 answers `ORDER BY rank LIMIT k` from the inverted index, so a
+query costs the posting lists of its terms rather than a scan, and stays
+fast at millions of passages. Queries are capped at MAX_QUERY_TERMS terms.
+
+Usage:
+    python -m oracle.src.evidence search "fed rate cut december"
+    python -m oracle.src.evidence stats
+    python -m oracle.src.evidence optimize
+"""
+
+import argparse
+import logging
+import os
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+from .textdiff import passage_key, split_passages
+from .types import EvidencePassage, ResearchContext
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EVIDENCE_PATH = Path(__file__).resolve().parent.parent / "data" / "evidence.db"
+# Shorter lines are navigation, bylines and the like.
+MIN_PASSAGE_LENGTH = 40
+MAX_PASSAGE_LENGTH = 1000
+MAX_QUERY_TERMS = 16
+RELATED_PASSAGES = 8
+# bm25() column weights: passage text, then its source title.
+BM25_WEIGHTS = (1.0, 0.5)
+
+_STOPWORDS = frozenset(
+    "a an and are as at be before by can did do does for from has have how if in into is it its "
+    "not of on or over than that the their then there this to under was were what when where "
+    "which who will with would yes no".split()
+)
+_TOKEN = re.compile(r"\w+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS passages (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    text TEXT NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS passage_markets (
+    passage_id INTEGER NOT NULL,
+    market_id INTEGER NOT NULL,
+    PRIMARY KEY (passage_id, market_id)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE IF NOT EXISTS passages_fts USING fts5(
+    text, title, content='passages', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS passages_ai AFTER INSERT ON passages BEGIN
+    INSERT INTO passages_fts (rowid, text, title) VALUES (new.id, new.text, new.title);
+END;
+"""
+
+
+def build_query(text: str, max_terms: int = MAX_QUERY_TERMS) -> str | None:
+    """An FTS5 OR-query of the distinct content words of `text` (None if there are none).
+
+    Terms are quoted, so punctuation and FTS5 keywords in market titles are
+    taken literally.
+    """
+    terms: list[str] = []
+    for token in _TOKEN.findall(text.lower()):
+        if len(token) > 1 and token not in _STOPWORDS and token not in terms:
+            terms.append(token)
+        if len(terms) == max_terms:
+            break
+    return " OR ".join(f'"{t}"' for t in terms) or None
+
+
+def _passages(research: ResearchContext) -> list[tuple[str, str, str]]:
+    """(text, title, url) passages of a research context."""
+    passages = []
+    for source in research.source_summaries:
+        if source.error:
+            continue
+        for passage in split_passages(source.content):
+            if len(passage) >= MIN_PASSAGE_LENGTH:
+                passages.append((passage[:MAX_PASSAGE_LENGTH], "", source.url))
+    for result in research.search_results:
+        if len(result.snippet) >= MIN_PASSAGE_LENGTH:
+            passages.append((result.snippet[:MAX_PASSAGE_LENGTH], result.title, result.url))
+    return passages
+
+
+class EvidenceStore:
+    """SQLite FTS5 store of research passages."""
+
+    def __init__(self, path: Path | str = ":memory:"):
+        self.path = path
+        if isinstance(path, Path):
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    @classmethod
+    def open(cls, path: Path | None = None) -> "EvidenceStore":
+        """Open the store at `path`, `ORACLE_EVIDENCE_PATH` or data/evidence.db."""
+        if path is None:
+            env_path = os.environ.get("ORACLE_EVIDENCE_PATH")
+            path = Path(env_path) if env_path else DEFAULT_EVIDENCE_PATH
+        return cls(path)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def add(self, research: ResearchContext, market_id: int | None = None, now: float | None = None) -> int:
+        """Store a research context's passages. Returns how many were new."""
+        now = time.time() if now is None else now
+        passages = _passages(research)
+        if not passages:
+            return 0
+        with self._db:
+            self._db.execute("BEGIN")
+            cur = self._db.executemany(
+                "INSERT OR IGNORE INTO passages (key, text, title, url, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                [(passage_key(text), text, title, url, now) for text, title, url in passages],
+            )
+            added = cur.rowcount
+            if market_id is not None:
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO passage_markets (passage_id, market_id) "
+                    "SELECT id, ? FROM passages WHERE key = ?",
+                    [(market_id, passage_key(text)) for text, _, _ in passages],
+                )
+        logger.debug("Evidence store: %d/%d passages new", added, len(passages))
+        return added
+
+    def search(
+        self,
+        query: str,
+        limit: int = RELATED_PASSAGES,
+        exclude_urls: set[str] = frozenset(),
+    ) -> list[EvidencePassage]:
+        """The `limit` passages that best match `query` by BM25, best first."""
+        match = build_query(query)
+        if match is None:
+            return []
+        # Over-fetch a little so excluded URLs do not leave the result short.
+        rows = self._db.execute(
+            f"""
+            SELECT p.text, p.title, p.url, p.fetched_at, bm25(passages_fts, {BM25_WEIGHTS[0]}, {BM25_WEIGHTS[1]}) AS score
+            FROM passages_fts JOIN passages p ON p.id = passages_fts.rowid
+            WHERE passages_fts MATCH ?
+            ORDER BY score
+            LIMIT ?
+            """,
+            (match, limit + 4 * len(exclude_urls) + 4),
+        )
+        results = [
+            EvidencePassage(text=r["text"], title=r["title"], url=r["url"], fetched_at=r["fetched_at"], score=-r["score"])
+            for r in rows
+            if r["url"] not in exclude_urls
+        ]
+        return results[:limit]
+
+    def related(
+        self,
+        title: str,
+        description: str,
+        research: ResearchContext,
+        limit: int = RELATED_PASSAGES,
+    ) -> list[EvidencePassage]:
+        """Stored passages relevant to a market, from sources other than those already in `research`."""
+        urls = {s.url for s in research.source_summaries} | {r.url for r in research.search_results}
+        return self.search(f"{title} {description}", limit=limit, exclude_urls=urls)
+
+    def enrich(
+        self,
+        research: ResearchContext,
+        title: str,
+        description: str,
+        market_id: int | None = None,
+    ) -> ResearchContext:
+        """Store a market's research and return it with related earlier passages attached."""
+        related = self.related(title, description, research)
+        self.add(research, market_id)
+        if related:
+            logger.info("Evidence store: %d related passages from earlier research", len(related))
+        return research.model_copy(update={"related": related})
+
+    def stats(self) -> dict[str, int]:
+        row = self._db.execute(
+            "SELECT (SELECT COUNT(*) FROM passages) AS passages, "
+            "(SELECT COUNT(DISTINCT url) FROM passages) AS sources, "
+            "(SELECT COUNT(DISTINCT market_id) FROM passage_markets) AS markets"
+        ).fetchone()
+        return dict(row)
+
+    def optimize(self) -> None:
+        """Merge the FTS index segments (worth running after large imports)."""
+        self._db.execute("INSERT INTO passages_fts (passages_fts) VALUES ('optimize')")
+
+
+_store: EvidenceStore | None = None
+
+
+def get_evidence_store() -> EvidenceStore:
+    """The shared evidence store for this process."""
+    global _store
+    if _store is None:
+        _store = EvidenceStore.open()
+    return _store
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sibyl Oracle — research evidence store")
+    parser.add_argument("--store", type=Path, help="Store path (default: ORACLE_EVIDENCE_PATH or data/evidence.db)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    search = sub.add_parser("search", help="BM25 search over stored passages")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=10)
+    sub.add_parser("stats", help="Passage, source and market counts")
+    sub.add_parser("optimize", help="Merge FTS index segments")
+    args = parser.parse_args()
+
+    store = EvidenceStore.open(args.store)
+    try:
+        if args.command == "search":
+            for p in store.search(args.query, limit=args.limit):
+                print(f"{p.score:7.2f}  {p.url}\n         {p.text[:160]}")
+        elif args.command == "stats":
+            for name, count in store.stats().items():
+                print(f"{name:<10} {count}")
+        else:
+            store.optimize()
+            print("Optimized.")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
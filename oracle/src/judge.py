@@ -1,17 +1,87 @@
-"""3-model consensus judgment logic for the Sibyl Oracle."""
+"""Weighted N-of-M consensus judgment logic for the Sibyl Oracle."""
 
 import asyncio
 import logging
-from collections import Counter
+import time
+from collections import Counter, defaultdict
+from collections.abc import Callable
 
-from .providers import claude, gemini, openai as openai_provider
+from pydantic import BaseModel
+
+from .evidence import EvidenceStore
+from .ratelimit import all_metrics, capture_headers, get_limiter, is_rate_limited
+from .registry import CascadeConfig, PanelConfig, get_provider_module, load_panel
 from .researcher import gather_research
 from .types import ConsensusResult, JudgmentResult, Outcome, ResearchContext
 
 logger = logging.getLogger(__name__)
 
-PROVIDERS = [gemini, claude, openai_provider]
 TIMEOUT_SECONDS = 120
+RATE_LIMIT_RETRIES = 3
+CASCADE_TIER = "cascade"
+PANEL_TIER = "panel"
+
+
+class TierMetrics(BaseModel):
+    """Snapshot of how often a judgment tier ran and settled the market.
+
+    `escalated` counts the markets the tier passed on, by reason: a seat
+    "failed", answered "invalid", had "low_confidence", or ended in
+    "disagreement".
+    """
+    tier: str
+    markets: int
+    settled: int
+    escalated: dict[str, int]
+    provider_calls: int
+    avg_seconds: float
+
+
+class _TierStats:
+    def __init__(self, tier: str):
+        self.tier = tier
+        self.markets = 0
+        self.settled = 0
+        self.escalated: Counter[str] = Counter()
+        self.provider_calls = 0
+        self.total_seconds = 0.0
+
+    def record(self, seconds: float, calls: int, settled: bool, escalation: str | None = None) -> None:
+        self.markets += 1
+        self.settled += settled
+        self.provider_calls += calls
+        self.total_seconds += seconds
+        if escalation is not None:
+            self.escalated[escalation] += 1
+
+    def metrics(self) -> TierMetrics:
+        return TierMetrics(
+            tier=self.tier,
+            markets=self.markets,
+            settled=self.settled,
+            escalated=dict(self.escalated),
+            provider_calls=self.provider_calls,
+            avg_seconds=self.total_seconds / self.markets if self.markets else 0.0,
+        )
+
+
+_tiers: dict[str, _TierStats] = {}
+
+
+def _tier(tier: str) -> _TierStats:
+    if tier not in _tiers:
+        _tiers[tier] = _TierStats(tier)
+    return _tiers[tier]
+
+
+def reset_tier_stats() -> None:
+    """Drop all tier stats (used by tests)."""
+    _tiers.clear()
+
+
+def tier_metrics() -> list[TierMetrics]:
+    """Metrics for every judgment tier used so far."""
+    return [stats.metrics() for stats in _tiers.values()]
 
 
 async def _safe_judge(
@@ -19,22 +89,216 @@ async def _safe_judge(
     title: str,
     description: str,
     research: ResearchContext,
+    name: str | None = None,
+    model: str | None = None,
+    on_verdict: Callable[[JudgmentResult], None] | None = None,
 ) -> JudgmentResult | None:
-    """Call a provider's judge function with error/timeout handling."""
-    name = getattr(provider_module, "PROVIDER_NAME", provider_module.__name__)
+    """Call a provider's judge function with error/timeout handling.
+
+    `name` overrides the provider label (and rate-limit bucket) and `model`
+    overrides the provider's default model, for panel seats that reuse a
+    provider module with a different model. With `on_verdict`, the provider
+    is streamed and the callback receives its outcome and confidence as
+    soon as they are parsed.
+    """
+    name = name or getattr(provider_module, "PROVIDER_NAME", provider_module.__name__)
+    model_kwargs = {"model": model} if model else {}
+    limiter = get_limiter(name)
+
+    def call():
+        if on_verdict is not None and hasattr(provider_module, "judge_stream"):
+            return provider_module.judge_stream(
+                title,
+                description,
+                research,
+                on_verdict=lambda v: on_verdict(v.model_copy(update={"provider": name})),
+                **model_kwargs,
+            )
+        return provider_module.judge(title, description, research, **model_kwargs)
+
+    for attempt in range(1, RATE_LIMIT_RETRIES + 1):
+        try:
+            with capture_headers() as headers:
+                async with limiter:
+                    result = await asyncio.wait_for(call(), timeout=TIMEOUT_SECONDS)
+            limiter.on_success(headers[-1] if headers else None)
+            if result.provider != name:
+                result = result.model_copy(update={"provider": name})
+            logger.info("[%s] outcome=%s confidence=%d", name, result.outcome.value, result.confidence)
+            return result
+        except asyncio.TimeoutError:
+            logger.error("[%s] Timed out after %ds", name, TIMEOUT_SECONDS)
+            return None
+        except Exception as e:
+            if is_rate_limited(e) and attempt < RATE_LIMIT_RETRIES:
+                # Back off and retry rather than losing this vote to a 429.
+                limiter.on_throttle(e)
+                continue
+            if is_rate_limited(e):
+                limiter.on_throttle(e)
+            logger.exception("[%s] Failed", name)
+            return None
+    return None
+
+
+def _is_decided(
+    judgments: list[JudgmentResult],
+    weights: dict[str, float],
+    pending_weight: float,
+    quorum: int,
+) -> bool:
+    """True if no combination of pending votes can change the winner."""
+    counts: Counter[Outcome] = Counter(j.outcome for j in judgments)
+    totals: defaultdict[Outcome, float] = defaultdict(float)
+    for j in judgments:
+        totals[j.outcome] += weights.get(j.provider, 1.0)
+    if not totals:
+        return False
+
+    leader = max(totals, key=totals.__getitem__)
+    strongest_rival = max(
+        (totals[o] for o in Outcome if o != leader),
+        default=0.0,
+    )
+    return counts[leader] >= quorum and totals[leader] > strongest_rival + pending_weight
+
+
+async def _judge_panel(
+    panel: PanelConfig,
+    market_title: str,
+    market_description: str,
+    research: ResearchContext,
+    weights: dict[str, float],
+    on_consensus: Callable[[ConsensusResult], None] | None = None,
+) -> list[JudgmentResult]:
+    """Query every panel seat concurrently and collect the judgments.
+
+    With `panel.early_exit`, the outcome is decided as soon as the seats
+    still pending can no longer change the winner: those seats are
+    cancelled and `on_consensus` receives the decided ConsensusResult. With
+    `panel.stream`, a seat's verdict counts towards that decision as soon
+    as its outcome and confidence have streamed in; its reasoning is still
+    awaited before returning.
+    """
+    verdicts: dict[str, JudgmentResult] = {}
+    finished: set[str] = set()
+    decided: set[str] | None = None  # seats that made the decision
+
+    def check_decided() -> None:
+        nonlocal decided
+        if decided is not None or not panel.early_exit:
+            return
+        pending = [s for s in panel.providers if s.name not in verdicts and s.name not in finished]
+        if not pending:
+            return
+        pending_weight = sum(weights.get(s.name, 1.0) for s in pending)
+        if not _is_decided(list(verdicts.values()), weights, pending_weight, panel.quorum):
+            return
+
+        decided = set(verdicts)
+        logger.info("Weighted quorum reached; not waiting for %d providers", len(pending))
+        for task, spec in tasks.items():
+            if spec.name not in decided:
+                task.cancel()
+        if on_consensus is not None:
+            on_consensus(build_consensus(list(verdicts.values()), panel, weights))
+
+    def on_verdict(verdict: JudgmentResult) -> None:
+        if decided is None:
+            verdicts.setdefault(verdict.provider, verdict)
+            check_decided()
+
+    tasks = {
+        asyncio.create_task(
+            _safe_judge(
+                get_provider_module(spec),
+                market_title,
+                market_description,
+                research,
+                name=spec.name,
+                model=spec.model,
+                on_verdict=on_verdict if panel.stream else None,
+            )
+        ): spec
+        for spec in panel.providers
+    }
+
+    pending_tasks = set(tasks)
     try:
-        result = await asyncio.wait_for(
-            provider_module.judge(title, description, research),
-            timeout=TIMEOUT_SECONDS,
+        while pending_tasks:
+            done, pending_tasks = await asyncio.wait(pending_tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                spec = tasks[task]
+                finished.add(spec.name)
+                if task.cancelled() or (decided is not None and spec.name not in decided):
+                    continue
+                if (result := task.result()) is not None:
+                    # The full judgment supersedes the streamed verdict; a
+                    # seat that fails after its verdict keeps the verdict.
+                    verdicts[spec.name] = result
+            check_decided()
+    finally:
+        for task in pending_tasks:
+            task.cancel()
+
+    return [verdicts[s.name] for s in panel.providers if s.name in verdicts]
+
+
+async def _judge_cascade(
+    cascade: CascadeConfig,
+    market_title: str,
+    market_description: str,
+    research: ResearchContext,
+) -> tuple[ConsensusResult | None, list[JudgmentResult]]:
+    """Query the cascade seats one after another.
+
+    Returns the cascade's consensus if every seat agreed on Yes or No with
+    at least `cascade.min_confidence` (else None), and the judgments made.
+    """
+    start = time.monotonic()
+    judgments: list[JudgmentResult] = []
+    escalation: str | None = None
+    calls = 0
+    for spec in cascade.providers:
+        calls += 1
+        result = await _safe_judge(
+            get_provider_module(spec), market_title, market_description, research, name=spec.name, model=spec.model
         )
-        logger.info("[%s] outcome=%s confidence=%d", name, result.outcome.value, result.confidence)
-        return result
-    except asyncio.TimeoutError:
-        logger.error("[%s] Timed out after %ds", name, TIMEOUT_SECONDS)
-        return None
-    except Exception:
-        logger.exception("[%s] Failed", name)
-        return None
+        if result is None:
+            escalation = "failed"
+        elif result.outcome == Outcome.INVALID:
+            escalation = "invalid"
+        elif judgments and result.outcome != judgments[0].outcome:
+            escalation = "disagreement"
+        elif result.confidence < cascade.min_confidence:
+            escalation = "low_confidence"
+        if result is not None:
+            judgments.append(result)
+        if escalation is not None:
+            break
+    _tier(CASCADE_TIER).record(time.monotonic() - start, calls, settled=escalation is None, escalation=escalation)
+
+    if escalation is not None:
+        logger.info("Cascade escalates to the full panel: [%s] %s", spec.name, escalation)
+        return None, judgments
+
+    weights = {s.name: s.weight for s in cascade.providers}
+    outcome = judgments[0].outcome
+    confidence = round(
+        sum(weights[j.provider] * j.confidence for j in judgments) / sum(weights[j.provider] for j in judgments)
+    )
+    return ConsensusResult(
+        judgments=judgments,
+        final_outcome=outcome,
+        final_confidence=confidence,
+        consensus_reached=True,
+        agreeing_providers=[j.provider for j in judgments],
+        summary=(
+            f"Cascade consensus: {outcome.value} "
+            f"({len(judgments)}/{len(judgments)} agree at >= {cascade.min_confidence}%, confidence {confidence}%)"
+        ),
+        tier=CASCADE_TIER,
+    ), judgments
 
 
 async def run_judgment(
@@ -42,71 +306,151 @@ async def run_judgment(
     market_description: str,
     sources: list[str] | None = None,
     search_queries: list[str] | None = None,
+    panel: PanelConfig | None = None,
+    weights: dict[str, float] | None = None,
+    on_consensus: Callable[[ConsensusResult], None] | None = None,
+    research: ResearchContext | None = None,
+    evidence: EvidenceStore | None = None,
+    market_id: int | None = None,
 ) -> ConsensusResult:
     """
-    Query all 3 AI providers simultaneously and determine consensus.
+    Query the provider panel simultaneously and determine consensus.
 
     Before querying providers, fetches real-time research context from
-    source URLs and web searches.
+    source URLs and web searches, unless already-gathered `research` is
+    passed in (e.g. pre-warmed by the scheduler). The panel defaults to
+    `load_panel()` (the 2-of-3 Gemini/Claude/GPT trio unless configured
+    otherwise), and `weights` to the panel's configured weights (see
+    `Ledger.panel_weights` for track-record-adjusted weights).
+
+    With an `evidence` store, the research is stored under `market_id` and
+    related passages gathered for earlier markets are added to the prompt.
+
+    With an enabled `panel.cascade`, its cheap seats judge first, one after
+    another, and settle the market if they all agree with enough
+    confidence; otherwise the full panel judges as below and the cascade's
+    judgments are appended to the panel's (they do not count towards its
+    consensus). `tier_metrics()` reports how often each tier ran, settled
+    and escalated.
 
-    Consensus rules:
-    - 2/3 agreement → that outcome wins; confidence = average of agreeing models
-    - All 3 agree → unanimous; confidence = average of all 3
-    - All 3 disagree → Invalid
-    - Fewer than 2 providers respond → Invalid (insufficient quorum)
+    With an early-exit panel, `on_consensus` is called with the decided
+    outcome and confidence as soon as the weighted quorum is certain —
+    before slower providers finish, and with streaming, before the
+    deciding providers' reasoning has finished (a cascade consensus is
+    only returned, never passed to `on_consensus`). The returned
+    ConsensusResult has the same outcome and confidence, with full
+    reasoning.
+
+    Consensus rules (see `build_consensus`):
+    - An outcome wins if at least `quorum` providers chose it and its total
+      weight beats every other outcome; confidence = weighted average of
+      the agreeing models
+    - Otherwise → Invalid
+    - Fewer than `quorum` providers respond → Invalid (insufficient quorum)
     """
     sources = sources or []
     search_queries = search_queries or []
+    panel = panel or load_panel()
+    weights = panel.weights() if weights is None else weights
 
     # Gather research context before sending to providers
-    logger.info("Gathering research context (%d sources, %d queries)...", len(sources), len(search_queries))
-    research = await gather_research(sources, search_queries)
+    if research is None:
+        logger.info("Gathering research context (%d sources, %d queries)...", len(sources), len(search_queries))
+        research = await gather_research(sources, search_queries)
+    if evidence is not None:
+        research = evidence.enrich(research, market_title, market_description, market_id)
     logger.info(
         "Research complete: %d source summaries, %d search results",
         len(research.source_summaries),
         len(research.search_results),
     )
 
-    tasks = [_safe_judge(p, market_title, market_description, research) for p in PROVIDERS]
-    results = await asyncio.gather(*tasks)
+    cascade_judgments: list[JudgmentResult] = []
+    if panel.cascade is not None and panel.cascade.enabled:
+        settled, cascade_judgments = await _judge_cascade(panel.cascade, market_title, market_description, research)
+        if settled is not None:
+            _log_metrics()
+            return settled
+
+    start = time.monotonic()
+    judgments = await _judge_panel(panel, market_title, market_description, research, weights, on_consensus)
+    consensus = build_consensus(judgments, panel, weights)
+    _tier(PANEL_TIER).record(time.monotonic() - start, panel.size, settled=consensus.consensus_reached)
+
+    _log_metrics()
+    if cascade_judgments:
+        consensus = consensus.model_copy(update={"judgments": consensus.judgments + cascade_judgments})
+    return consensus
+
 
-    judgments: list[JudgmentResult] = [r for r in results if r is not None]
+def _log_metrics() -> None:
+    for m in all_metrics():
+        logger.debug(
+            "[%s] limiter: requests=%d throttled=%d avg_wait=%.3fs max_queued=%d rate=%.2f/s",
+            m.provider, m.requests, m.throttled, m.avg_wait_seconds, m.max_queued, m.rate,
+        )
+    for t in tier_metrics():
+        logger.debug(
+            "[%s tier] markets=%d settled=%d escalated=%s calls=%d avg=%.1fs",
+            t.tier, t.markets, t.settled, t.escalated, t.provider_calls, t.avg_seconds,
+        )
+
+
+def build_consensus(
+    judgments: list[JudgmentResult],
+    panel: PanelConfig | None = None,
+    weights: dict[str, float] | None = None,
+) -> ConsensusResult:
+    """Apply the weighted N-of-M consensus rules to the judgments that came back.
+
+    `weights` defaults to the panel's configured weights; providers missing
+    from it count with weight 1.0. Shared by the real-time path
+    (`run_judgment`) and the batch path (`batch.run_batch_judgment`).
+    """
+    panel = panel or load_panel()
+    weights = panel.weights() if weights is None else weights
 
-    if len(judgments) < 2:
+    if len(judgments) < panel.quorum:
         return ConsensusResult(
             judgments=judgments,
             final_outcome=Outcome.INVALID,
             final_confidence=0,
             consensus_reached=False,
             agreeing_providers=[j.provider for j in judgments],
-            summary=f"Insufficient responses ({len(judgments)}/3). Cannot reach consensus.",
+            summary=f"Insufficient responses ({len(judgments)}/{panel.size}). Cannot reach consensus.",
         )
 
-    # Count outcomes
-    outcome_counts: Counter[Outcome] = Counter(j.outcome for j in judgments)
-    most_common_outcome, most_common_count = outcome_counts.most_common(1)[0]
+    # Sum weights per outcome
+    totals: defaultdict[Outcome, float] = defaultdict(float)
+    for j in judgments:
+        totals[j.outcome] += weights.get(j.provider, 1.0)
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+    leader, leader_weight = ranked[0]
+    agreeing = [j for j in judgments if j.outcome == leader]
+    clear_lead = len(ranked) == 1 or leader_weight > ranked[1][1]
 
-    if most_common_count >= 2:
-        agreeing = [j for j in judgments if j.outcome == most_common_outcome]
-        avg_confidence = round(sum(j.confidence for j in agreeing) / len(agreeing))
+    if len(agreeing) >= panel.quorum and clear_lead:
+        weighted_confidence = round(
+            sum(weights.get(j.provider, 1.0) * j.confidence for j in agreeing) / leader_weight
+        )
         return ConsensusResult(
             judgments=judgments,
-            final_outcome=most_common_outcome,
-            final_confidence=avg_confidence,
+            final_outcome=leader,
+            final_confidence=weighted_confidence,
             consensus_reached=True,
             agreeing_providers=[j.provider for j in agreeing],
             summary=(
-                f"Consensus: {most_common_outcome.value} "
-                f"({len(agreeing)}/{len(judgments)} agree, confidence {avg_confidence}%)"
+                f"Consensus: {leader.value} "
+                f"({len(agreeing)}/{len(judgments)} agree, confidence {weighted_confidence}%)"
             ),
         )
 
-    # All disagree
+    # No outcome reached quorum with a clear weighted lead
     return ConsensusResult(
         judgments=judgments,
         final_outcome=Outcome.INVALID,
         final_confidence=0,
         consensus_reached=False,
         agreeing_providers=[],
-        summary="No consensus — all providers returned different outcomes.",
+        summary=f"No consensus — no outcome reached {panel.quorum} votes with a clear weighted lead.",
     )
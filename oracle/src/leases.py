@@ -0,0 +1,298 @@
+"""Lease-based coordination between resolver workers.
+
+Several oracle instances (processes or machines) can run the scheduler side
+by side without two of them researching, judging and submitting the same
+market:
+
+- every worker heartbeats into a shared lease store, and the live workers
+  form a consistent-hash ring (RING_REPLICAS points per worker). Each
+  worker only schedules the markets the ring assigns to it, so assignment
+  is stable and moves only the affected markets when a worker joins or
+  leaves;
+- before resolving, a worker takes an expiring lease on the market and
+  renews it with each heartbeat until it is done. A worker that crashes
+  stops heartbeating, drops out of the ring once its heartbeat expires,
+  and its leases expire, so the survivors pick up its markets;
+- a market still unresolved STEAL_AFTER_SECONDS past its deadline (its
+  owner is alive but stuck) is open to any worker; the lease still lets
+  only one of them take it.
+
+The default store is a SQLite file (`data/leases.db`, or
+`ORACLE_LEASE_PATH`) shared by the workers on one machine. Workers on
+several machines need a store they can all reach: anything implementing
+`LeaseStore`. Lease times are wall-clock, so worker clocks must agree to
+well within LEASE_TTL_SECONDS. The program itself rejects a second
+`resolve` for a market, so a lease lost mid-resolution cannot produce a
+conflicting outcome.
+
+Usage:
+    python -m oracle.src.leases status
+"""
+
+import argparse
+import asyncio
+import bisect
+import hashlib
+import logging
+import os
+import socket
+import sqlite3
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Protocol
+
+from .types import MarketInfo, ResolveReport
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEASE_PATH = Path(__file__).resolve().parent.parent / "data" / "leases.db"
+LEASE_TTL_SECONDS = 120.0
+HEARTBEAT_SECONDS = LEASE_TTL_SECONDS / 4
+STEAL_AFTER_SECONDS = 600.0
+RING_REPLICAS = 64
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    market_id INTEGER PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS workers (
+    worker_id TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class LeaseStore(Protocol):
+    """Shared state behind a `LeaseCoordinator`. Every operation must be atomic."""
+
+    def acquire(self, market_id: int, owner: str, ttl: float, now: float) -> bool:
+        """Take or extend a lease unless another owner holds an unexpired one."""
+
+    def renew(self, market_ids: list[int], owner: str, ttl: float, now: float) -> set[int]:
+        """Extend the given unexpired leases held by `owner`. Returns those still held."""
+
+    def release(self, market_id: int, owner: str) -> None: ...
+
+    def holder(self, market_id: int, now: float) -> str | None: ...
+
+    def heartbeat(self, worker_id: str, ttl: float, now: float) -> None: ...
+
+    def live_workers(self, now: float) -> list[str]: ...
+
+    def leave(self, worker_id: str) -> None: ...
+
+
+class SqliteLeaseStore:
+    """`LeaseStore` in a SQLite file shared by local workers."""
+
+    def __init__(self, path: Path | str = ":memory:"):
+        self.path = path
+        if isinstance(path, Path):
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.executescript(_SCHEMA)
+
+    @classmethod
+    def open(cls, path: Path | None = None) -> "SqliteLeaseStore":
+        """Open the store at `path`, `ORACLE_LEASE_PATH` or data/leases.db."""
+        if path is None:
+            env_path = os.environ.get("ORACLE_LEASE_PATH")
+            path = Path(env_path) if env_path else DEFAULT_LEASE_PATH
+        return cls(path)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def acquire(self, market_id: int, owner: str, ttl: float, now: float) -> bool:
+        row = self._db.execute(
+            "INSERT INTO leases (market_id, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (market_id) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE leases.owner = excluded.owner OR leases.expires_at <= ? "
+            "RETURNING owner",
+            (market_id, owner, now + ttl, now),
+        ).fetchone()
+        return row is not None
+
+    def renew(self, market_ids: list[int], owner: str, ttl: float, now: float) -> set[int]:
+        if not market_ids:
+            return set()
+        marks = ",".join("?" * len(market_ids))
+        rows = self._db.execute(
+            f"UPDATE leases SET expires_at = ? WHERE owner = ? AND expires_at > ? AND market_id IN ({marks}) "
+            "RETURNING market_id",
+            (now + ttl, owner, now, *market_ids),
+        ).fetchall()
+        return {r[0] for r in rows}
+
+    def release(self, market_id: int, owner: str) -> None:
+        self._db.execute("DELETE FROM leases WHERE market_id = ? AND owner = ?", (market_id, owner))
+
+    def holder(self, market_id: int, now: float) -> str | None:
+        row = self._db.execute(
+            "SELECT owner FROM leases WHERE market_id = ? AND expires_at > ?", (market_id, now)
+        ).fetchone()
+        return row[0] if row else None
+
+    def heartbeat(self, worker_id: str, ttl: float, now: float) -> None:
+        self._db.execute(
+            "INSERT INTO workers (worker_id, expires_at) VALUES (?, ?) "
+            "ON CONFLICT (worker_id) DO UPDATE SET expires_at = excluded.expires_at",
+            (worker_id, now + ttl),
+        )
+
+    def live_workers(self, now: float) -> list[str]:
+        rows = self._db.execute("SELECT worker_id FROM workers WHERE expires_at > ? ORDER BY worker_id", (now,))
+        return [r[0] for r in rows]
+
+    def leave(self, worker_id: str) -> None:
+        with self._db:
+            self._db.execute("BEGIN")
+            self._db.execute("DELETE FROM workers WHERE worker_id = ?", (worker_id,))
+            self._db.execute("DELETE FROM leases WHERE owner = ?", (worker_id,))
+
+    def leases(self, now: float) -> list[tuple[int, str, float]]:
+        """(market_id, owner, seconds left) of every unexpired lease."""
+        rows = self._db.execute(
+            "SELECT market_id, owner, expires_at - ? FROM leases WHERE expires_at > ? ORDER BY market_id", (now, now)
+        )
+        return [tuple(r) for r in rows]
+
+
+def _point(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent-hash ring mapping market ids to workers."""
+
+    def __init__(self, workers: list[str], replicas: int = RING_REPLICAS):
+        self.workers = sorted(set(workers))
+        points = sorted((_point(f"{w}#{i}"), w) for w in self.workers for i in range(replicas))
+        self._points = [p for p, _ in points]
+        self._owners = [w for _, w in points]
+
+    def owner(self, market_id: int) -> str | None:
+        if not self._points:
+            return None
+        i = bisect.bisect(self._points, _point(f"market:{market_id}")) % len(self._points)
+        return self._owners[i]
+
+
+def default_worker_id() -> str:
+    """`ORACLE_WORKER_ID`, or host-pid. A fixed id keeps assignments across restarts."""
+    return os.environ.get("ORACLE_WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+
+
+class LeaseCoordinator:
+    """One worker's view of the ring and the leases it holds.
+
+    A non-`member` (the HTTP API) takes leases but never joins the ring, so
+    no markets are assigned to it.
+    """
+
+    def __init__(
+        self,
+        store: LeaseStore,
+        worker_id: str | None = None,
+        ttl: float = LEASE_TTL_SECONDS,
+        steal_after: float = STEAL_AFTER_SECONDS,
+        member: bool = True,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.store = store
+        self.worker_id = worker_id or default_worker_id()
+        self.member = member
+        self.ttl = ttl
+        self.steal_after = steal_after
+        self.clock = clock
+        self.held: set[int] = set()
+        self.ring = HashRing([self.worker_id])
+
+    def beat(self) -> None:
+        """Heartbeat, renew held leases and refresh the ring from the live workers."""
+        now = self.clock()
+        if self.member:
+            self.store.heartbeat(self.worker_id, self.ttl, now)
+        kept = self.store.renew(sorted(self.held), self.worker_id, self.ttl, now)
+        for market_id in self.held - kept:
+            logger.error("Market %d: lease lost to another worker", market_id)
+        self.held = kept
+        workers = self.store.live_workers(now)
+        if workers != self.ring.workers:
+            logger.info("Resolver workers: %s", ", ".join(workers))
+            self.ring = HashRing(workers)
+
+    async def run_heartbeats(self, interval: float = HEARTBEAT_SECONDS) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.beat()
+            except Exception:
+                logger.exception("Lease heartbeat failed")
+
+    def assigned(self, market: MarketInfo) -> bool:
+        """Whether this worker should schedule `market`."""
+        if self.ring.owner(market.id) == self.worker_id:
+            return True
+        return self.clock() >= market.resolution_deadline + self.steal_after
+
+    def acquire(self, market_id: int) -> bool:
+        """Take the market's lease. False if another worker holds it."""
+        if not self.store.acquire(market_id, self.worker_id, self.ttl, self.clock()):
+            return False
+        self.held.add(market_id)
+        return True
+
+    def release(self, market_id: int) -> None:
+        self.held.discard(market_id)
+        self.store.release(market_id, self.worker_id)
+
+    def holder(self, market_id: int) -> str | None:
+        return self.store.holder(market_id, self.clock())
+
+    @contextmanager
+    def lease(self, market_id: int) -> Iterator[bool]:
+        """Hold the market's lease for the block; yields False if another worker has it."""
+        acquired = self.acquire(market_id)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self.release(market_id)
+
+    def leased_report(self, market_id: int) -> ResolveReport:
+        """The report for a market skipped because another worker holds its lease."""
+        holder = self.holder(market_id) or "another worker"
+        return ResolveReport(market_id=market_id, market_title="", error=f"Market {market_id} is leased by {holder}")
+
+    def close(self) -> None:
+        """Leave the ring and give up all leases, so other workers take over at once."""
+        self.held.clear()
+        self.store.leave(self.worker_id)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sibyl Oracle — resolver worker leases")
+    parser.add_argument("--store", type=Path, help="Lease store (default: ORACLE_LEASE_PATH or data/leases.db)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="Live workers and held leases")
+    args = parser.parse_args()
+
+    store = SqliteLeaseStore.open(args.store)
+    try:
+        now = time.time()
+        print("Workers:", ", ".join(store.live_workers(now)) or "none")
+        for market_id, owner, left in store.leases(now):
+            print(f"  market {market_id:<6} {owner:<30} expires in {left:.0f}s")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
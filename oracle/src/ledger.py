@@ -0,0 +1,313 @@
+"""Provider accuracy ledger with decay-weighted scoring.
+
+Every JudgmentResult and every final market outcome is appended to a local
+JSONL ledger. Per-provider statistics are maintained incrementally as
+records arrive, so looking up a provider's accuracy, calibration or
+consensus weight is O(1) and never rescans history:
+
+- accuracy: decayed share of settled judgments whose outcome was correct,
+  shrunk towards a prior so a provider with little history is not trusted
+  or distrusted too quickly;
+- calibration: decayed Brier score of the stated confidence, plus the
+  overconfidence gap (mean confidence minus mean accuracy);
+- weight: accuracy in log-odds relative to the prior, so a provider with no
+  history gets 1.0.
+
+Observations decay with a configurable half-life (default 30 days), so
+recent performance dominates. The ledger is replayed once on load, and a
+long-running process keeps one shared ledger (`get_ledger`) that only reads
+the records other processes appended since. A market settled again (e.g.
+after a dispute) has its old contributions reversed before the new outcome
+is applied.
+
+Usage:
+    python -m oracle.src.ledger stats
+    python -m oracle.src.ledger settle --market-id 7 --outcome No
+"""
+
+import argparse
+import fcntl
+import json
+import logging
+import math
+import os
+import time
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from .registry import PanelConfig
+from .types import JudgmentResult, Outcome
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEDGER_PATH = Path(__file__).resolve().parent.parent / "data" / "ledger.jsonl"
+HALF_LIFE_SECONDS = 30 * 24 * 60 * 60
+PRIOR_ACCURACY = 0.75
+PRIOR_STRENGTH = 4.0   # pseudo-observations backing the prior
+MIN_WEIGHT = 0.1
+MAX_WEIGHT = 3.0
+
+
+class ProviderScore(BaseModel):
+    """Point-in-time scoring for one provider."""
+    provider: str
+    observations: int
+    effective_observations: float
+    accuracy: float
+    brier: float | None
+    overconfidence: float | None
+    weight: float
+
+
+class _ProviderStats:
+    """Decayed running sums for one provider.
+
+    All sums are stored as of `ref_ts`; older contributions are scaled down
+    by 0.5 ** (age / half_life) when the reference time moves forward.
+    """
+
+    __slots__ = ("ref_ts", "n", "weight_sum", "correct_sum", "brier_sum", "confidence_sum")
+
+    def __init__(self) -> None:
+        self.ref_ts = 0.0
+        self.n = 0
+        self.weight_sum = 0.0
+        self.correct_sum = 0.0
+        self.brier_sum = 0.0
+        self.confidence_sum = 0.0
+
+    def _factor(self, age: float, half_life: float) -> float:
+        return 0.5 ** (age / half_life)
+
+    def add(self, ts: float, correct: bool, confidence: int, half_life: float, sign: int = 1) -> None:
+        """Add (sign=1) or reverse (sign=-1) one settled judgment."""
+        if ts >= self.ref_ts:
+            factor = self._factor(ts - self.ref_ts, half_life)
+            self.weight_sum *= factor
+            self.correct_sum *= factor
+            self.brier_sum *= factor
+            self.confidence_sum *= factor
+            self.ref_ts = ts
+            w = 1.0
+        else:
+            w = self._factor(self.ref_ts - ts, half_life)
+
+        p = confidence / 100
+        y = 1.0 if correct else 0.0
+        self.n += sign
+        self.weight_sum += sign * w
+        self.correct_sum += sign * w * y
+        self.brier_sum += sign * w * (p - y) ** 2
+        self.confidence_sum += sign * w * p
+
+    def score(self, provider: str, now: float, half_life: float) -> ProviderScore:
+        decay = self._factor(max(0.0, now - self.ref_ts), half_life) if self.n else 0.0
+        eff = max(0.0, self.weight_sum * decay)
+        accuracy = (self.correct_sum * decay + PRIOR_ACCURACY * PRIOR_STRENGTH) / (eff + PRIOR_STRENGTH)
+        has_data = self.weight_sum > 1e-12
+        return ProviderScore(
+            provider=provider,
+            observations=self.n,
+            effective_observations=round(eff, 3),
+            accuracy=round(accuracy, 4),
+            brier=round(self.brier_sum / self.weight_sum, 4) if has_data else None,
+            overconfidence=(
+                round((self.confidence_sum - self.correct_sum) / self.weight_sum, 4) if has_data else None
+            ),
+            weight=round(_weight_from_accuracy(accuracy), 4),
+        )
+
+
+def _logit(p: float) -> float:
+    p = min(max(p, 1e-6), 1 - 1e-6)
+    return math.log(p / (1 - p))
+
+
+def _weight_from_accuracy(accuracy: float) -> float:
+    return min(MAX_WEIGHT, max(MIN_WEIGHT, _logit(accuracy) / _logit(PRIOR_ACCURACY)))
+
+
+class Ledger:
+    """Append-only judgment/outcome ledger with O(1) per-provider scores."""
+
+    def __init__(self, path: Path | None = None, half_life: float = HALF_LIFE_SECONDS):
+        self.path = path
+        self.half_life = half_life
+        self._stats: dict[str, _ProviderStats] = {}
+        # market_id -> unsettled judgments (ts, provider, outcome, confidence)
+        self._pending: dict[int, list[tuple[float, str, Outcome, int]]] = {}
+        # market_id -> (judgments, outcome) last applied, so re-settling can reverse it
+        self._settled: dict[int, tuple[list[tuple[float, str, Outcome, int]], Outcome]] = {}
+        # bytes and lines of the file already applied
+        self._offset = 0
+        self._line_no = 0
+
+    # -- persistence --------------------------------------------------------
+
+    @classmethod
+    def load(cls, path: Path | None = None, half_life: float = HALF_LIFE_SECONDS) -> "Ledger":
+        """Open a ledger file, replaying its history once."""
+        if path is None:
+            env_path = os.environ.get("ORACLE_LEDGER_PATH")
+            path = Path(env_path) if env_path else DEFAULT_LEDGER_PATH
+        ledger = cls(path, half_life)
+        ledger.sync()
+        return ledger
+
+    def sync(self) -> int:
+        """Apply records appended to the file since it was last read (e.g. by
+        `settle` in another process). Returns the number of records applied."""
+        if self.path is None or not self.path.exists() or self.path.stat().st_size <= self._offset:
+            return 0
+        applied = 0
+        with self.path.open("rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # a record still being written
+                self._offset += len(line)
+                self._line_no += 1
+                if not line.strip():
+                    continue
+                try:
+                    self._apply(json.loads(line))
+                    applied += 1
+                except (ValueError, KeyError):
+                    logger.warning("Skipping corrupt ledger line %d in %s", self._line_no, self.path)
+        return applied
+
+    def _append(self, records: list[dict]) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = "".join(json.dumps(record) + "\n" for record in records).encode()
+        with self.path.open("ab") as f:
+            # Workers append concurrently: hold the file from the sync to the
+            # write so no other record lands in between and the offset stays
+            # on a line boundary. The lock is released when the file closes.
+            fcntl.flock(f, fcntl.LOCK_EX)
+            self.sync()
+            f.write(data)
+            f.flush()
+            self._offset = f.tell()
+        self._line_no += len(records)
+
+    # -- recording ----------------------------------------------------------
+
+    def record_judgments(self, market_id: int, judgments: list[JudgmentResult], ts: float | None = None) -> None:
+        """Record the judgments given for a market, pending its final outcome."""
+        ts = time.time() if ts is None else ts
+        records = [
+            {
+                "type": "judgment",
+                "ts": ts,
+                "market_id": market_id,
+                "provider": j.provider,
+                "outcome": j.outcome.value,
+                "confidence": j.confidence,
+            }
+            for j in judgments
+        ]
+        self._append(records)
+        for record in records:
+            self._apply(record)
+
+    def record_outcome(self, market_id: int, outcome: Outcome, ts: float | None = None) -> None:
+        """Record a market's final (settled or disputed) outcome and score providers."""
+        ts = time.time() if ts is None else ts
+        record = {"type": "outcome", "ts": ts, "market_id": market_id, "outcome": outcome.value}
+        self._append([record])
+        self._apply(record)
+
+    def _apply(self, record: dict) -> None:
+        market_id = int(record["market_id"])
+        outcome = Outcome(record["outcome"])
+        ts = float(record["ts"])
+
+        if record["type"] == "judgment":
+            # A re-run replaces the provider's earlier unsettled judgment.
+            pending = [j for j in self._pending.get(market_id, []) if j[1] != record["provider"]]
+            pending.append((ts, record["provider"], outcome, int(record["confidence"])))
+            self._pending[market_id] = pending
+            return
+
+        if record["type"] != "outcome":
+            raise ValueError(f"Unknown ledger record type {record['type']}")
+
+        judgments = self._pending.pop(market_id, [])
+        if market_id in self._settled:
+            # Re-settlement: reverse the previous outcome's contributions.
+            previous, previous_outcome = self._settled[market_id]
+            for j_ts, provider, j_outcome, confidence in previous:
+                self._stats[provider].add(j_ts, j_outcome == previous_outcome, confidence, self.half_life, sign=-1)
+            judgments = previous + judgments
+
+        for j_ts, provider, j_outcome, confidence in judgments:
+            stats = self._stats.setdefault(provider, _ProviderStats())
+            stats.add(j_ts, j_outcome == outcome, confidence, self.half_life)
+        self._settled[market_id] = (judgments, outcome)
+
+    # -- queries ------------------------------------------------------------
+
+    def score(self, provider: str, now: float | None = None) -> ProviderScore:
+        """Current decayed score for a provider (O(1))."""
+        now = time.time() if now is None else now
+        stats = self._stats.get(provider) or _ProviderStats()
+        return stats.score(provider, now, self.half_life)
+
+    def weight(self, provider: str, now: float | None = None) -> float:
+        """Consensus weight multiplier for a provider; 1.0 with no history."""
+        return self.score(provider, now).weight
+
+    def panel_weights(self, panel: PanelConfig, now: float | None = None) -> dict[str, float]:
+        """Configured panel weights scaled by each provider's track record."""
+        return {spec.name: spec.weight * self.weight(spec.name, now) for spec in panel.providers}
+
+    def providers(self) -> list[str]:
+        return sorted(self._stats)
+
+
+_ledger: Ledger | None = None
+
+
+def get_ledger() -> Ledger:
+    """The shared ledger for this process, caught up with records appended by others."""
+    global _ledger
+    if _ledger is None:
+        _ledger = Ledger.load()
+    else:
+        _ledger.sync()
+    return _ledger
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sibyl Oracle — provider accuracy ledger")
+    parser.add_argument("--ledger", type=Path, help="Ledger path (default: ORACLE_LEDGER_PATH or data/ledger.jsonl)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="Show decayed accuracy, calibration and weight per provider")
+    settle = sub.add_parser("settle", help="Record a market's final outcome (e.g. after a dispute)")
+    settle.add_argument("--market-id", type=int, required=True)
+    settle.add_argument("--outcome", choices=[o.value for o in Outcome], required=True)
+    args = parser.parse_args()
+
+    ledger = Ledger.load(args.ledger)
+
+    if args.command == "settle":
+        ledger.record_outcome(args.market_id, Outcome(args.outcome))
+        print(f"Market #{args.market_id} settled as {args.outcome}")
+        return
+
+    print(f"{'provider':<24} {'n':>5} {'eff_n':>8} {'acc':>6} {'brier':>6} {'overconf':>9} {'weight':>7}")
+    for provider in ledger.providers():
+        s = ledger.score(provider)
+        brier = f"{s.brier:.3f}" if s.brier is not None else "-"
+        over = f"{s.overconfidence:+.3f}" if s.overconfidence is not None else "-"
+        print(
+            f"{s.provider:<24} {s.observations:>5} {s.effective_observations:>8.2f} "
+            f"{s.accuracy:>6.3f} {brier:>6} {over:>9} {s.weight:>7.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,22 +4,51 @@ Sibyl Oracle — CLI entry point.
 Usage:
     python -m oracle.src.main --market-id 0
     python -m oracle.src.main --market-id 0 --dry-run
+    python -m oracle.src.main --batch 3 4 5
+    python -m oracle.src.main --schedule --prewarm-lead 21600
+    python -m oracle.src.main --schedule --api-port 8080
+    python -m oracle.src.main --market-id 0 --dry-run --record cassettes/m0.jsonl.gz
+    python -m oracle.src.main --market-id 0 --dry-run --replay cassettes/m0.jsonl.gz
 """
 
 import argparse
 import asyncio
-import json
 import logging
+import os
 import sys
+from collections.abc import Awaitable
+from contextlib import nullcontext
 from pathlib import Path
+from typing import TypeVar
 
 from dotenv import load_dotenv
-from solana.rpc.async_api import AsyncClient
-from solana.rpc.commitment import Confirmed
 
-from .chain import fetch_market, get_rpc_url, submit_resolve
+from .api import DEFAULT_HOST, ResolutionAPI, ResolutionService
+from .archive import open_archive
+from .batch import BatchMarket, run_batch_judgment
+from .cassette import RECORD, REPLAY, use_cassette
+from .chain import (
+    OracleSignerMismatch,
+    SimulationRejected,
+    check_oracle_signer,
+    fetch_market,
+    fetch_markets,
+    get_protocol,
+    submit_resolve,
+    submit_resolves,
+)
+from .config import get_markets_config
+from .evidence import get_evidence_store
 from .judge import run_judgment
-from .types import MarketStatus, ResolveReport
+from .leases import LeaseCoordinator, SqliteLeaseStore
+from .ledger import get_ledger
+from .market_index import MarketIndex
+from .registry import load_panel
+from .research_cache import ResearchWarmer
+from .resolve_queue import RESOLVE_CONCURRENCY
+from .rpc import close_rpc_pool, get_rpc_pool
+from .scheduler import DEFAULT_PREWARM_LEAD_SECONDS, PREWARM_INTERVAL_SECONDS, DeadlineScheduler
+from .types import ConsensusResult, MarketInfo, MarketStatus, ResearchContext, ResolveReport, ResolveVerification
 
 logging.basicConfig(
     level=logging.INFO,
@@ -27,55 +56,39 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
 
-async def resolve_market(market_id: int, dry_run: bool = False) -> ResolveReport:
-    """Full resolution pipeline: fetch → judge → submit."""
-
-    # 1. Fetch market from chain
-    logger.info("Fetching market %d from chain...", market_id)
-    rpc_url = get_rpc_url()
-    async with AsyncClient(rpc_url) as client:
-        market = await fetch_market(client, market_id)
 
-    logger.info("Market: %s", market.title)
-    logger.info("Status: %s | Deadline: %d", market.status.value, market.resolution_deadline)
-    logger.info("Pools: YES=%d / NO=%d", market.yes_pool, market.no_pool)
-
-    if market.status not in (MarketStatus.OPEN, MarketStatus.LOCKED):
-        return ResolveReport(
-            market_id=market_id,
-            market_title=market.title,
-            consensus=None,  # type: ignore[arg-type]
-            error=f"Market is already {market.status.value}, cannot resolve.",
-        )
-
-    # 2. Load market-specific sources from config
-    markets_config_path = Path(__file__).resolve().parent.parent / "markets.json"
-    sources: list[str] = []
-    search_queries: list[str] = []
-
-    if markets_config_path.exists():
-        try:
-            markets_config = json.loads(markets_config_path.read_text())
-            market_cfg = markets_config.get(str(market_id), {})
-            sources = market_cfg.get("sources", [])
-            search_queries = market_cfg.get("search_queries", [])
-        except Exception:
-            logger.warning("Failed to load markets.json, using defaults")
+def load_market_config(market: MarketInfo) -> tuple[list[str], list[str]]:
+    """Return (sources, search_queries) for a market from markets.json."""
+    market_cfg = get_markets_config().get(market.id)
+    sources = list(market_cfg.sources) if market_cfg else []
+    search_queries = list(market_cfg.search_queries) if market_cfg else []
 
     # Fall back to using market title as search query if no config
     if not search_queries:
         search_queries = [market.title]
 
-    # 3. Run AI judgment
-    logger.info("Running AI judgment with 3 providers...")
-    consensus = await run_judgment(market.title, market.description, sources, search_queries)
+    return sources, search_queries
 
-    # Print detailed report
+
+def _unresolvable_report(market: MarketInfo) -> ResolveReport | None:
+    """Return an error report if the market cannot be resolved, else None."""
+    if market.status in (MarketStatus.OPEN, MarketStatus.LOCKED):
+        return None
+    return ResolveReport(
+        market_id=market.id,
+        market_title=market.title,
+        error=f"Market is already {market.status.value}, cannot resolve.",
+    )
+
+
+def print_report(market: MarketInfo, consensus: ConsensusResult) -> None:
+    """Print the detailed judgment report for a market."""
     print("\n" + "=" * 60)
     print("SIBYL ORACLE — JUDGMENT REPORT")
     print("=" * 60)
-    print(f"Market #{market_id}: {market.title}\n")
+    print(f"Market #{market.id}: {market.title}\n")
 
     for j in consensus.judgments:
         print(f"  [{j.provider}]")
@@ -88,42 +101,387 @@ async def resolve_market(market_id: int, dry_run: bool = False) -> ResolveReport
     print(f"  Final:     {consensus.final_outcome.value} ({consensus.final_confidence}%)")
     print("=" * 60 + "\n")
 
-    # 4. Submit on-chain
+
+def _submission_report(
+    market: MarketInfo,
+    consensus: ConsensusResult,
+    submission: ResolveVerification | Exception | None,
+) -> ResolveReport:
+    """Build the report for a submission (None for a dry run)."""
     tx_sig = None
+    verified = None
     error = None
 
-    if dry_run:
-        logger.info("Dry run — skipping on-chain submission.")
-    else:
-        try:
-            logger.info(
-                "Submitting resolve tx: outcome=%s, confidence=%d",
-                consensus.final_outcome.value,
-                consensus.final_confidence,
-            )
-            tx_sig = await submit_resolve(
-                market_id,
-                consensus.final_outcome,
-                consensus.final_confidence,
+    if isinstance(submission, Exception):
+        error = str(submission)
+    elif submission is not None:
+        tx_sig = submission.signature
+        verified = submission.verified
+        if verified:
+            logger.info("✅ Market %d: transaction confirmed and verified: %s", market.id, tx_sig)
+        else:
+            error = f"Resolve tx {tx_sig} confirmed but market state differs: " + "; ".join(
+                submission.mismatches
             )
-            logger.info("✅ Transaction confirmed: %s", tx_sig)
-        except Exception as e:
-            logger.exception("Failed to submit resolve transaction")
-            error = str(e)
+            logger.error(error)
 
     return ResolveReport(
-        market_id=market_id,
+        market_id=market.id,
         market_title=market.title,
         consensus=consensus,
         tx_signature=tx_sig,
+        verified=verified,
         error=error,
     )
 
 
+async def submit_consensus(
+    market: MarketInfo,
+    consensus: ConsensusResult,
+    dry_run: bool = False,
+) -> ResolveReport:
+    """Submit a consensus on-chain (unless dry-run) and build the report.
+
+    The transaction is simulated before it is signed and sent. The
+    confirmation reads back the Market account; a post-state that does
+    not match the consensus is reported as an error. The consensus is not
+    recorded in the ledger as the market's outcome: providers are scored
+    only against outcomes settled independently of their own votes
+    (`python -m oracle.src.ledger settle`).
+    """
+    if dry_run:
+        logger.info("Dry run — skipping on-chain submission.")
+        return _submission_report(market, consensus, None)
+
+    submission: ResolveVerification | Exception
+    try:
+        logger.info(
+            "Submitting resolve tx: outcome=%s, confidence=%d",
+            consensus.final_outcome.value,
+            consensus.final_confidence,
+        )
+        submission = await submit_resolve(
+            market.id,
+            consensus.final_outcome,
+            consensus.final_confidence,
+        )
+    except SimulationRejected as e:
+        logger.error("%s", e)
+        submission = e
+    except Exception as e:
+        logger.exception("Failed to submit resolve transaction")
+        submission = e
+    return _submission_report(market, consensus, submission)
+
+
+async def resolve_market(
+    market_id: int,
+    dry_run: bool = False,
+    research: ResearchContext | None = None,
+) -> ResolveReport:
+    """Full resolution pipeline: fetch → judge → submit.
+
+    `research` skips the research step with context gathered earlier (the
+    scheduler pre-warms it ahead of the deadline).
+    """
+
+    # 1. Fetch market from chain
+    logger.info("Fetching market %d from chain...", market_id)
+    market = await fetch_market(get_rpc_pool(), market_id)
+
+    logger.info("Market: %s", market.title)
+    logger.info("Status: %s | Deadline: %d", market.status.value, market.resolution_deadline)
+    logger.info("Pools: YES=%d / NO=%d", market.yes_pool, market.no_pool)
+
+    if (report := _unresolvable_report(market)) is not None:
+        return report
+    if not dry_run:
+        # A signer the program will reject would waste the whole judgment.
+        try:
+            await check_oracle_signer(get_rpc_pool())
+        except OracleSignerMismatch as e:
+            return ResolveReport(market_id=market.id, market_title=market.title, error=str(e))
+
+    # 2. Load market-specific sources from config
+    sources, search_queries = load_market_config(market)
+
+    # 3. Run AI judgment, weighting providers by their track record
+    ledger = get_ledger()
+    panel = load_panel()
+    early_submit: asyncio.Task[ResolveReport] | None = None
+
+    def submit_on_decision(decided: ConsensusResult) -> None:
+        # Early-exit panels decide before slow providers (or streamed
+        # reasoning) finish; start the on-chain submission right away.
+        nonlocal early_submit
+        if not dry_run:
+            logger.info("Consensus decided early: %s", decided.summary)
+            early_submit = asyncio.create_task(submit_consensus(market, decided))
+
+    logger.info("Running AI judgment with %d providers...", panel.size)
+    try:
+        consensus = await run_judgment(
+            market.title,
+            market.description,
+            sources,
+            search_queries,
+            panel=panel,
+            weights=ledger.panel_weights(panel),
+            on_consensus=submit_on_decision,
+            research=research,
+            evidence=get_evidence_store(),
+            market_id=market.id,
+        )
+        ledger.record_judgments(market.id, consensus.judgments)
+
+        print_report(market, consensus)
+    except Exception:
+        if early_submit is None:
+            raise
+        # The resolve may already be on-chain; report it rather than a
+        # failure the scheduler would retry.
+        report = await early_submit
+        if report.error is not None:
+            raise
+        logger.exception("Market %d: judgment failed after the early submission landed", market.id)
+        return report
+
+    # 4. Submit on-chain
+    if early_submit is not None:
+        report = await early_submit
+        return report.model_copy(update={"consensus": consensus})
+    return await submit_consensus(market, consensus, dry_run=dry_run)
+
+
+async def resolve_markets_batch(market_ids: list[int], dry_run: bool = False) -> list[ResolveReport]:
+    """Batch resolution pipeline: fetch all → batch judge → simulate all → submit survivors.
+
+    Intended for backfills and expiry waves where latency matters less than
+    cost and real-time rate limits.
+    """
+    logger.info("Fetching %d markets from chain...", len(market_ids))
+    pool = get_rpc_pool()
+    if not dry_run:
+        await check_oracle_signer(pool)
+    _, markets = await fetch_markets(pool, market_ids)
+    missing = set(market_ids) - {m.id for m in markets}
+    if missing:
+        raise ValueError(f"Markets not found on chain: {sorted(missing)}")
+
+    reports: list[ResolveReport] = []
+    pending: list[MarketInfo] = []
+    for market in markets:
+        if (report := _unresolvable_report(market)) is not None:
+            reports.append(report)
+        else:
+            pending.append(market)
+
+    batch_markets = []
+    for market in pending:
+        sources, search_queries = load_market_config(market)
+        batch_markets.append(BatchMarket(
+            market_id=market.id,
+            title=market.title,
+            description=market.description,
+            sources=sources,
+            search_queries=search_queries,
+        ))
+
+    ledger = get_ledger()
+    logger.info("Running batch AI judgment for %d markets...", len(batch_markets))
+    panel = load_panel()
+    consensus_by_market = await run_batch_judgment(
+        batch_markets, weights=ledger.panel_weights(panel), evidence=get_evidence_store(), panel=panel
+    )
+
+    for market in pending:
+        consensus = consensus_by_market[market.id]
+        ledger.record_judgments(market.id, consensus.judgments)
+        print_report(market, consensus)
+
+    if dry_run:
+        logger.info("Dry run — skipping on-chain submission.")
+        submissions: dict[int, ResolveVerification | Exception] = {}
+    else:
+        # One batched simulation weeds out markets that would fail on-chain
+        # before anything is signed or sent.
+        try:
+            submissions = await submit_resolves([
+                (m.id, consensus_by_market[m.id].final_outcome, consensus_by_market[m.id].final_confidence)
+                for m in pending
+            ])
+        except Exception as e:
+            logger.exception("Failed to submit resolve transactions")
+            submissions = {m.id: e for m in pending}
+
+    for market in pending:
+        reports.append(_submission_report(market, consensus_by_market[market.id], submissions.get(market.id)))
+
+    return reports
+
+
+async def discover_markets(index: MarketIndex) -> list[MarketInfo]:
+    """Sync the market index from chain and return the unresolved markets.
+
+    The Protocol account's `market_count` says which market ids exist, so
+    only new ids and markets still unresolved are read, by address, instead
+    of scanning every program account.
+    """
+    pool = get_rpc_pool()
+    protocol = await get_protocol(pool, refresh=True)
+    stale = {m.id for m in index.unresolved()} | (set(range(protocol.market_count)) - index.ids())
+    slot, markets = await fetch_markets(pool, sorted(stale))
+    index.apply(slot, markets)
+    return index.unresolved()
+
+
+async def run_scheduler(
+    dry_run: bool = False,
+    prewarm_lead: float = DEFAULT_PREWARM_LEAD_SECONDS,
+    prewarm_interval: float = PREWARM_INTERVAL_SECONDS,
+    concurrency: int = RESOLVE_CONCURRENCY,
+    api_port: int | None = None,
+) -> None:
+    """Resolve every market as its deadline passes, until interrupted.
+
+    Research is warmed into a per-market cache during the last
+    `prewarm_lead` seconds before each deadline, so resolution only needs
+    a delta refresh. Several schedulers can run at once: each schedules its
+    share of the hash ring and resolves under a lease (see `leases`).
+    With `api_port`, the resolution API is served from this process too,
+    including the scheduler's GET /metrics.
+    """
+    warmer = ResearchWarmer()
+    index = MarketIndex.open()
+    archive = open_archive()
+    leases = LeaseCoordinator(SqliteLeaseStore.open())
+    leases.beat()
+
+    async def discover() -> list[MarketInfo]:
+        # Other workers schedule the rest of the ring.
+        return [m for m in await discover_markets(index) if leases.assigned(m)]
+
+    async def prewarm(market: MarketInfo, final: bool = False) -> ResearchContext:
+        sources, search_queries = load_market_config(market)
+        return await warmer.warm(market.id, sources, search_queries, final=final)
+
+    async def resolve(market_id: int, research: ResearchContext | None) -> ResolveReport:
+        with leases.lease(market_id) as acquired:
+            if not acquired:
+                return leases.leased_report(market_id)
+            report = await resolve_market(market_id, dry_run=dry_run, research=research)
+        if not dry_run:
+            index.record_resolution(report)
+        if archive is not None:
+            archive.append(report, dry_run=dry_run)
+            archive.flush()
+        if report.error is None:
+            warmer.forget(market_id)
+        return report
+
+    scheduler = DeadlineScheduler(
+        discover,
+        prewarm,
+        resolve,
+        prewarm_lead=prewarm_lead,
+        prewarm_interval=prewarm_interval,
+        concurrency=concurrency,
+    )
+    logger.info(
+        "Scheduler started as worker %s (research warmed every %.0fs from %.0fs before deadlines)",
+        leases.worker_id,
+        prewarm_interval,
+        prewarm_lead,
+    )
+    api = None
+    if api_port is not None:
+        api = ResolutionAPI(
+            ResolutionService(lambda market_id: resolve(market_id, None)),
+            token=os.environ.get("ORACLE_API_TOKEN") or None,
+            metrics=scheduler.metrics,
+        )
+        host = os.environ.get("ORACLE_API_HOST", DEFAULT_HOST)
+        logger.info("Resolution API listening on http://%s:%d", host, await api.start(host, api_port))
+    health_checks = asyncio.create_task(get_rpc_pool().run_health_checks())
+    heartbeats = asyncio.create_task(leases.run_heartbeats())
+    try:
+        await scheduler.run()
+    finally:
+        health_checks.cancel()
+        heartbeats.cancel()
+        if api is not None:
+            await api.close()
+        leases.close()
+        await close_rpc_pool()
+        if archive is not None:
+            archive.close()
+
+
+async def _closing_rpc_pool(coro: Awaitable[T]) -> T:
+    """Run a pipeline, then close the shared RPC pool's connections."""
+    try:
+        return await coro
+    finally:
+        await close_rpc_pool()
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Sibyl Oracle — AI Prediction Market Resolver")
-    parser.add_argument("--market-id", type=int, required=True, help="On-chain market ID to resolve")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--market-id", type=int, help="On-chain market ID to resolve")
+    target.add_argument(
+        "--batch",
+        type=int,
+        nargs="+",
+        metavar="MARKET_ID",
+        help="Resolve several markets through the vendor batch APIs (slower, cheaper)",
+    )
+    target.add_argument(
+        "--schedule",
+        action="store_true",
+        help="Run continuously, resolving each market as its deadline passes",
+    )
+    parser.add_argument(
+        "--prewarm-lead",
+        type=float,
+        default=DEFAULT_PREWARM_LEAD_SECONDS,
+        metavar="SECONDS",
+        help="With --schedule, start warming research this long before each deadline",
+    )
+    parser.add_argument(
+        "--prewarm-interval",
+        type=float,
+        default=PREWARM_INTERVAL_SECONDS,
+        metavar="SECONDS",
+        help="With --schedule, refresh warmed research this often",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=RESOLVE_CONCURRENCY,
+        metavar="N",
+        help="With --schedule, resolve at most N markets at once, highest locked value and most overdue first",
+    )
+    parser.add_argument(
+        "--api-port",
+        type=int,
+        metavar="PORT",
+        help="With --schedule, also serve the resolution API and its GET /metrics on this port",
+    )
     parser.add_argument("--dry-run", action="store_true", help="Run judgment without submitting tx")
+    traffic = parser.add_mutually_exclusive_group()
+    traffic.add_argument(
+        "--record",
+        type=Path,
+        metavar="CASSETTE",
+        help="Record all provider, research and RPC traffic to a cassette file",
+    )
+    traffic.add_argument(
+        "--replay",
+        type=Path,
+        metavar="CASSETTE",
+        help="Serve all provider, research and RPC traffic from a recorded cassette (no network)",
+    )
     parser.add_argument("--verbose", "-v", action="store_true", help="Enable debug logging")
     args = parser.parse_args()
 
@@ -131,15 +489,62 @@ def main() -> None:
         logging.getLogger().setLevel(logging.DEBUG)
 
     load_dotenv()
+    if args.record or args.replay:
+        traffic = use_cassette(args.record or args.replay, RECORD if args.record else REPLAY)
+    else:
+        traffic = nullcontext()
+    with traffic:
+        failed = _run(args)
+    if failed:
+        sys.exit(1)
 
-    report = asyncio.run(resolve_market(args.market_id, dry_run=args.dry_run))
 
-    if report.error:
-        logger.error("Resolution failed: %s", report.error)
-        sys.exit(1)
+def _run(args: argparse.Namespace) -> bool:
+    """Run the pipeline selected on the command line. Returns True if anything failed."""
+    get_markets_config()  # an invalid markets.json fails here, before any resolution
+    if not args.dry_run:
+        try:
+            protocol = asyncio.run(_closing_rpc_pool(check_oracle_signer()))
+        except OracleSignerMismatch as e:
+            logger.error("%s", e)
+            return True
+        logger.info("Oracle signer matches the protocol (%d markets, fee %d bps)", protocol.market_count, protocol.fee_bps)
+
+    if args.schedule:
+        try:
+            asyncio.run(run_scheduler(
+                dry_run=args.dry_run,
+                prewarm_lead=args.prewarm_lead,
+                prewarm_interval=args.prewarm_interval,
+                concurrency=args.concurrency,
+                api_port=args.api_port,
+            ))
+        except KeyboardInterrupt:
+            logger.info("Scheduler stopped.")
+        return False
+
+    if args.batch:
+        reports = asyncio.run(_closing_rpc_pool(resolve_markets_batch(args.batch, dry_run=args.dry_run)))
+    else:
+        reports = [asyncio.run(_closing_rpc_pool(resolve_market(args.market_id, dry_run=args.dry_run)))]
+
+    if not args.dry_run:
+        index = MarketIndex.open()
+        for report in reports:
+            index.record_resolution(report)
+    if (archive := open_archive()) is not None:
+        for report in reports:
+            archive.append(report, dry_run=args.dry_run)
+        archive.close()
 
-    if report.tx_signature:
-        print(f"\n🔗 Transaction: {report.tx_signature}")
+    failed = False
+    for report in reports:
+        if report.error:
+            logger.error("Market %d: resolution failed: %s", report.market_id, report.error)
+            failed = True
+        elif report.tx_signature:
+            print(f"\n🔗 Market #{report.market_id} transaction (verified on-chain): {report.tx_signature}")
+    return failed
 
 
 if __name__ == "__main__":
@@ -0,0 +1,338 @@
+"""Local SQLite index of on-chain markets and their resolution history.
+
+Every decoded `MarketInfo` is kept in a local SQLite database (WAL mode, so
+the CLI can read while the scheduler writes), indexed on status and
+deadline. Questions like "which markets are due" become an index range
+scan instead of an RPC scan of every program account.
+
+The index is synced from `getProgramAccounts` snapshots, each tagged with
+the slot it was read at. A snapshot older than the last one applied (a
+lagging RPC node) is ignored, and a row is only rewritten when the market
+actually changed at a newer slot. Resolution attempts are appended to a
+history table.
+
+Usage:
+    python -m oracle.src.market_index sync
+    python -m oracle.src.market_index due
+    python -m oracle.src.market_index upcoming --within 86400
+    python -m oracle.src.market_index list --status Open
+    python -m oracle.src.market_index history --market-id 7
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from .types import MarketInfo, MarketStatus, Outcome, ResolveReport
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = Path(__file__).resolve().parent.parent / "data" / "markets.db"
+UNRESOLVED = (MarketStatus.OPEN.value, MarketStatus.LOCKED.value)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS markets (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    resolution_deadline INTEGER NOT NULL,
+    yes_pool INTEGER NOT NULL,
+    no_pool INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    outcome TEXT,
+    oracle_confidence INTEGER NOT NULL,
+    slot INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_markets_status_deadline ON markets (status, resolution_deadline);
+CREATE INDEX IF NOT EXISTS idx_markets_deadline ON markets (resolution_deadline);
+CREATE TABLE IF NOT EXISTS resolutions (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    market_id INTEGER NOT NULL,
+    ts REAL NOT NULL,
+    outcome TEXT,
+    confidence INTEGER,
+    consensus_reached INTEGER,
+    tx_signature TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_resolutions_market ON resolutions (market_id, ts);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+_COLUMNS = (
+    "id", "title", "description", "resolution_deadline", "yes_pool", "no_pool",
+    "status", "outcome", "oracle_confidence",
+)
+
+# Rewrite a row only if the snapshot is newer and something changed.
+_UPSERT = f"""
+INSERT INTO markets ({", ".join(_COLUMNS)}, slot, updated_at)
+VALUES ({", ".join("?" for _ in _COLUMNS)}, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    {", ".join(f"{c} = excluded.{c}" for c in _COLUMNS[1:])},
+    slot = excluded.slot,
+    updated_at = excluded.updated_at
+WHERE excluded.slot > markets.slot
+  AND ({" OR ".join(f"{c} IS NOT excluded.{c}" for c in _COLUMNS[1:])})
+"""
+
+
+class ResolutionRecord(BaseModel):
+    """One resolution attempt for a market."""
+    market_id: int
+    ts: float
+    outcome: Outcome | None = None
+    confidence: int | None = None
+    consensus_reached: bool | None = None
+    tx_signature: str | None = None
+    error: str | None = None
+
+
+def _row_to_market(row: sqlite3.Row) -> MarketInfo:
+    return MarketInfo(
+        id=row["id"],
+        title=row["title"],
+        description=row["description"],
+        resolution_deadline=row["resolution_deadline"],
+        yes_pool=row["yes_pool"],
+        no_pool=row["no_pool"],
+        status=MarketStatus(row["status"]),
+        outcome=Outcome(row["outcome"]) if row["outcome"] else None,
+        oracle_confidence=row["oracle_confidence"],
+    )
+
+
+class MarketIndex:
+    """SQLite-backed market index."""
+
+    def __init__(self, path: Path | str = ":memory:"):
+        self.path = path
+        if isinstance(path, Path):
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    @classmethod
+    def open(cls, path: Path | None = None) -> "MarketIndex":
+        """Open the index at `path`, `ORACLE_INDEX_PATH` or data/markets.db."""
+        if path is None:
+            env_path = os.environ.get("ORACLE_INDEX_PATH")
+            path = Path(env_path) if env_path else DEFAULT_INDEX_PATH
+        return cls(path)
+
+    def close(self) -> None:
+        self._db.close()
+
+    # -- sync ---------------------------------------------------------------
+
+    @property
+    def last_slot(self) -> int | None:
+        """Slot of the last snapshot applied, if any."""
+        row = self._db.execute("SELECT value FROM sync_state WHERE key = 'slot'").fetchone()
+        return row["value"] if row else None
+
+    def apply(self, slot: int, markets: list[MarketInfo], now: float | None = None) -> int:
+        """Apply a snapshot of markets read at `slot`. Returns the number of rows changed."""
+        last = self.last_slot
+        if last is not None and slot < last:
+            logger.warning("Ignoring market snapshot from slot %d; index is at slot %d", slot, last)
+            return 0
+
+        now = time.time() if now is None else now
+        rows = [
+            (
+                m.id, m.title, m.description, m.resolution_deadline, m.yes_pool, m.no_pool,
+                m.status.value, m.outcome.value if m.outcome else None, m.oracle_confidence,
+                slot, now,
+            )
+            for m in markets
+        ]
+        with self._db:
+            self._db.execute("BEGIN")
+            before = self._db.total_changes
+            self._db.executemany(_UPSERT, rows)
+            changed = self._db.total_changes - before
+            self._db.execute(
+                "INSERT INTO sync_state (key, value) VALUES ('slot', ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (slot,),
+            )
+        logger.debug("Market index synced to slot %d: %d/%d markets changed", slot, changed, len(markets))
+        return changed
+
+    def record_resolution(self, report: ResolveReport, ts: float | None = None) -> None:
+        """Append a resolution attempt; a confirmed one also marks the market resolved."""
+        ts = time.time() if ts is None else ts
+        consensus = report.consensus
+        with self._db:
+            self._db.execute("BEGIN")
+            self._db.execute(
+                "INSERT INTO resolutions "
+                "(market_id, ts, outcome, confidence, consensus_reached, tx_signature, error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    report.market_id,
+                    ts,
+                    consensus.final_outcome.value if consensus else None,
+                    consensus.final_confidence if consensus else None,
+                    consensus.consensus_reached if consensus else None,
+                    report.tx_signature,
+                    report.error,
+                ),
+            )
+            if report.tx_signature and report.error is None and consensus is not None:
+                # The next sync overwrites this with the on-chain state.
+                self._db.execute(
+                    "UPDATE markets SET status = ?, outcome = ?, oracle_confidence = ?, updated_at = ? "
+                    "WHERE id = ?",
+                    (
+                        MarketStatus.RESOLVED.value,
+                        consensus.final_outcome.value,
+                        consensus.final_confidence,
+                        ts,
+                        report.market_id,
+                    ),
+                )
+
+    # -- queries ------------------------------------------------------------
+
+    def get(self, market_id: int) -> MarketInfo | None:
+        row = self._db.execute("SELECT * FROM markets WHERE id = ?", (market_id,)).fetchone()
+        return _row_to_market(row) if row else None
+
+    def ids(self) -> set[int]:
+        """Ids of every indexed market."""
+        return {r["id"] for r in self._db.execute("SELECT id FROM markets")}
+
+    def unresolved(self) -> list[MarketInfo]:
+        """Open and Locked markets, earliest deadline first."""
+        return self.upcoming(None)
+
+    def due(self, now: float | None = None) -> list[MarketInfo]:
+        """Unresolved markets whose deadline has passed, earliest first."""
+        now = time.time() if now is None else now
+        return self._unresolved_before(now)
+
+    def upcoming(self, within: float | None, now: float | None = None) -> list[MarketInfo]:
+        """Unresolved markets with a deadline in the next `within` seconds (all if None)."""
+        if within is None:
+            return self._unresolved_before(None)
+        now = time.time() if now is None else now
+        return self._unresolved_before(now + within)
+
+    def _unresolved_before(self, until: float | None) -> list[MarketInfo]:
+        query = "SELECT * FROM markets WHERE status IN (?, ?)"
+        params: tuple = UNRESOLVED
+        if until is not None:
+            query += " AND resolution_deadline <= ?"
+            params += (int(until),)
+        query += " ORDER BY resolution_deadline, id"
+        return [_row_to_market(r) for r in self._db.execute(query, params)]
+
+    def by_status(self, status: MarketStatus) -> list[MarketInfo]:
+        rows = self._db.execute(
+            "SELECT * FROM markets WHERE status = ? ORDER BY resolution_deadline, id", (status.value,)
+        )
+        return [_row_to_market(r) for r in rows]
+
+    def counts(self) -> dict[MarketStatus, int]:
+        rows = self._db.execute("SELECT status, COUNT(*) AS n FROM markets GROUP BY status")
+        return {MarketStatus(r["status"]): r["n"] for r in rows}
+
+    def history(self, market_id: int) -> list[ResolutionRecord]:
+        """Resolution attempts for a market, oldest first."""
+        rows = self._db.execute(
+            "SELECT * FROM resolutions WHERE market_id = ? ORDER BY ts, seq", (market_id,)
+        )
+        return [
+            ResolutionRecord(
+                market_id=r["market_id"],
+                ts=r["ts"],
+                outcome=Outcome(r["outcome"]) if r["outcome"] else None,
+                confidence=r["confidence"],
+                consensus_reached=bool(r["consensus_reached"]) if r["consensus_reached"] is not None else None,
+                tx_signature=r["tx_signature"],
+                error=r["error"],
+            )
+            for r in rows
+        ]
+
+
+async def sync_from_chain(index: MarketIndex) -> int:
+    """Read every market from chain and apply the snapshot. Returns rows changed."""
+    # chain pulls in the full Solana client stack; only syncing needs it.
+    from .chain import fetch_market_snapshot
+    from .rpc import close_rpc_pool, get_rpc_pool
+
+    try:
+        slot, markets = await fetch_market_snapshot(get_rpc_pool())
+    finally:
+        await close_rpc_pool()
+    return index.apply(slot, markets)
+
+
+def _print_markets(markets: list[MarketInfo], now: float) -> None:
+    print(f"{'id':>5} {'status':<9} {'deadline':>12} {'in':>10} {'yes':>14} {'no':>14}  title")
+    for m in markets:
+        print(
+            f"{m.id:>5} {m.status.value:<9} {m.resolution_deadline:>12} "
+            f"{m.resolution_deadline - now:>10.0f} {m.yes_pool:>14} {m.no_pool:>14}  {m.title}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sibyl Oracle — local market index")
+    parser.add_argument("--index", type=Path, help="Index path (default: ORACLE_INDEX_PATH or data/markets.db)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("sync", help="Pull all markets from chain into the index")
+    sub.add_parser("due", help="Unresolved markets past their deadline")
+    upcoming = sub.add_parser("upcoming", help="Unresolved markets with a deadline coming up")
+    upcoming.add_argument("--within", type=float, default=24 * 60 * 60, metavar="SECONDS")
+    listing = sub.add_parser("list", help="Markets by status")
+    listing.add_argument("--status", choices=[s.value for s in MarketStatus], default=MarketStatus.OPEN.value)
+    history = sub.add_parser("history", help="Resolution attempts for a market")
+    history.add_argument("--market-id", type=int, required=True)
+    sub.add_parser("stats", help="Market counts by status and the last synced slot")
+    args = parser.parse_args()
+
+    index = MarketIndex.open(args.index)
+    now = time.time()
+
+    if args.command == "sync":
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        changed = asyncio.run(sync_from_chain(index))
+        print(f"Synced to slot {index.last_slot}: {changed} markets changed")
+    elif args.command == "due":
+        _print_markets(index.due(now), now)
+    elif args.command == "upcoming":
+        _print_markets(index.upcoming(args.within, now), now)
+    elif args.command == "list":
+        _print_markets(index.by_status(MarketStatus(args.status)), now)
+    elif args.command == "history":
+        for r in index.history(args.market_id):
+            outcome = f"{r.outcome.value} ({r.confidence}%)" if r.outcome else "-"
+            print(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(r.ts))}  {outcome:<14} "
+                  f"{r.tx_signature or '-':<90} {r.error or ''}")
+    else:
+        for status, n in sorted(index.counts().items(), key=lambda kv: kv[0].value):
+            print(f"{status.value:<9} {n:>6}")
+        print(f"slot      {index.last_slot}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""Vectorized analytics over Position accounts.
+
+Position accounts are decoded in bulk into a NumPy structured array (one
+83-byte record per position, read straight from the account data without a
+per-account Python loop) and analysed per market in a handful of array
+passes:
+
+- exposure: YES/NO stake and position counts;
+- payouts under each outcome, mirroring the program's `claim` math: winners
+  get `amount * total_pool / winning_pool` less `fee_bps`, and an Invalid
+  outcome refunds `amount * total_pool / side_pool` with no fee;
+- unclaimed liability: what resolved markets still owe unclaimed positions;
+- whale concentration: largest holder's share, top-10 share and the
+  Herfindahl index of stake by owner.
+
+Stakes are summed exactly in uint64; payouts are computed in float64, so
+they can differ from the program's integer division by a base unit or so,
+which is fine for risk checks.
+
+Requires numpy (`pip install sibyl-oracle[analytics]`).
+
+Usage:
+    python -m oracle.src.positions
+    python -m oracle.src.positions --market-id 3 --market-id 7
+"""
+
+import argparse
+import asyncio
+
+import numpy as np
+from pydantic import BaseModel
+
+from .types import MarketInfo, MarketStatus, Outcome
+
+FEE_BPS_DENOMINATOR = 10_000
+TOP_HOLDERS = 10
+
+# Borsh layout of a Position account (packed, no alignment padding).
+POSITION_DTYPE = np.dtype([
+    ("discriminator", "V8"),
+    ("owner", "V32"),
+    ("market", "V32"),
+    ("side", "u1"),
+    ("amount", "<u8"),
+    ("claimed", "?"),
+    ("bump", "u1"),
+])
+
+_MIX = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9], dtype=np.uint64)
+_SIDE_YES = Outcome.YES.to_chain_value()
+_SIDE_NO = Outcome.NO.to_chain_value()
+
+
+class MarketRisk(BaseModel):
+    """Exposure and liabilities of one market's positions."""
+    market_id: int
+    status: MarketStatus
+    positions: int
+    holders: int
+    yes_stake: int
+    no_stake: int
+    payout_if_yes: float
+    payout_if_no: float
+    payout_if_invalid: float
+    fees_if_yes: float
+    fees_if_no: float
+    unclaimed_positions: int
+    unclaimed_liability: float
+    top_holder_share: float
+    top10_share: float
+    hhi: float
+
+
+def decode_positions(accounts: list[bytes] | bytes, discriminator: bytes | None = None) -> np.ndarray:
+    """Decode Position account data into a POSITION_DTYPE array.
+
+    `accounts` is a list of raw account data or their concatenation. When
+    `discriminator` is given, records with any other discriminator are
+    dropped.
+    """
+    buf = accounts if isinstance(accounts, (bytes, bytearray, memoryview)) else b"".join(accounts)
+    if len(buf) % POSITION_DTYPE.itemsize:
+        raise ValueError(f"Position data is not a multiple of {POSITION_DTYPE.itemsize} bytes")
+    positions = np.frombuffer(buf, dtype=POSITION_DTYPE)
+    if discriminator is not None:
+        positions = positions[positions["discriminator"] == np.void(discriminator)]
+    return positions
+
+
+def _key64(keys: np.ndarray) -> np.ndarray:
+    """Hash 32-byte pubkeys (a V32 column) to uint64 for fast sorting and lookup."""
+    words = np.ascontiguousarray(keys).view("<u8").reshape(-1, 4)
+    # Wrapping multiply-add over the four words; collisions are ~2**-64.
+    return words[:, 0] * _MIX[0] + words[:, 1] * _MIX[1] + words[:, 2] * _MIX[2] + words[:, 3]
+
+
+def market_codes(positions: np.ndarray, market_keys: list[bytes]) -> np.ndarray:
+    """Index into `market_keys` (market PDAs) of each position's market, or -1."""
+    if not market_keys or len(positions) == 0:
+        return np.full(len(positions), -1, dtype=np.int64)
+    wanted = _key64(np.frombuffer(b"".join(market_keys), dtype="V32"))
+    order = np.argsort(wanted)
+    sorted_keys = wanted[order]
+    found = _key64(positions["market"])
+    slot = np.minimum(np.searchsorted(sorted_keys, found), len(sorted_keys) - 1)
+    return np.where(sorted_keys[slot] == found, order[slot], -1)
+
+
+def _group_sum(keys: np.ndarray, values: np.ndarray, n: int) -> np.ndarray:
+    """Exact uint64 sum of `values` for each key in range(n).
+
+    bincount sums in float64, so the values are summed as 32-bit halves,
+    which stays exact for groups of up to 2**21 positions.
+    """
+    values = values.astype(np.uint64)
+    low = np.bincount(keys, weights=values & np.uint64(0xFFFFFFFF), minlength=n).astype(np.uint64)
+    high = np.bincount(keys, weights=values >> np.uint64(32), minlength=n).astype(np.uint64)
+    return (high << np.uint64(32)) + low
+
+
+def _pro_rata(amount: np.ndarray, side: np.ndarray, yes_pool: np.ndarray, no_pool: np.ndarray) -> np.ndarray:
+    """floor(amount * total_pool / side_pool) per position, 0 for an empty side."""
+    total = yes_pool + no_pool
+    side_pool = np.where(side == _SIDE_YES, yes_pool, np.where(side == _SIDE_NO, no_pool, 0.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.floor(np.where(side_pool > 0, amount * total / side_pool, 0.0))
+
+
+def _settle(share: np.ndarray, side: np.ndarray, outcome: Outcome, fee_bps: int) -> tuple[np.ndarray, np.ndarray]:
+    if outcome == Outcome.INVALID:
+        return share, np.zeros_like(share)
+    gross = np.where(side == outcome.to_chain_value(), share, 0.0)
+    fee = np.floor(gross * fee_bps / FEE_BPS_DENOMINATOR)
+    return gross - fee, fee
+
+
+def payouts(
+    positions: np.ndarray,
+    yes_pool: np.ndarray,
+    no_pool: np.ndarray,
+    outcome: Outcome,
+    fee_bps: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Net payout and fee per position if its market resolves to `outcome`.
+
+    `yes_pool` / `no_pool` are each position's market pools (on-chain
+    totals), aligned with `positions`.
+    """
+    side = np.ascontiguousarray(positions["side"])
+    share = _pro_rata(
+        positions["amount"].astype(np.float64),
+        side,
+        yes_pool.astype(np.float64),
+        no_pool.astype(np.float64),
+    )
+    return _settle(share, side, outcome, fee_bps)
+
+
+def _concentration(
+    owner: np.ndarray, amount: np.ndarray, codes: np.ndarray, n: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Per market: holder count, top holder share, top-10 share and HHI of stake by owner."""
+    holders = np.zeros(n, dtype=np.int64)
+    top1 = np.zeros(n)
+    top10 = np.zeros(n)
+    hhi = np.zeros(n)
+    if len(codes) == 0:
+        return holders, top1, top10, hhi
+
+    # One sort key per (market, owner): market code in the top 16 bits,
+    # owner hash below.
+    pair = (codes.astype(np.uint64) << np.uint64(48)) | (owner >> np.uint64(16))
+    pairs, pair_index = np.unique(pair, return_inverse=True)
+    stake = np.bincount(pair_index.reshape(-1), weights=amount)
+    pair_market = (pairs >> np.uint64(48)).astype(np.int64)
+
+    market_total = np.bincount(pair_market, weights=stake, minlength=n)
+    share = stake / market_total[pair_market]
+
+    # Rank holders within each market, largest first. Shares are in (0, 1],
+    # so one float key orders by market and then by descending share (and
+    # sorts far faster than a two-key lexsort).
+    order = np.argsort(2.0 * pair_market + (1.0 - share))
+    ranked_market = pair_market[order]
+    ranked_share = share[order]
+    starts = np.flatnonzero(np.r_[True, ranked_market[1:] != ranked_market[:-1]])
+    rank = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+
+    holders[:] = np.bincount(pair_market, minlength=n)
+    top1[ranked_market[starts]] = ranked_share[starts]
+    top10[:] = np.bincount(ranked_market, weights=np.where(rank < TOP_HOLDERS, ranked_share, 0.0), minlength=n)
+    hhi[:] = np.bincount(pair_market, weights=share**2, minlength=n)
+    return holders, top1, top10, hhi
+
+
+def analyze(
+    positions: np.ndarray,
+    markets: list[MarketInfo],
+    market_keys: list[bytes],
+    fee_bps: int,
+) -> list[MarketRisk]:
+    """Risk summary for each market in `markets` (`market_keys` are their PDAs, aligned).
+
+    Markets are limited to 2**16 per call; positions of other markets are ignored.
+    """
+    n = len(markets)
+    if n > 1 << 16:
+        raise ValueError("analyze() handles at most 65536 markets per call")
+    codes = market_codes(positions, market_keys)
+    known = codes >= 0
+    if not known.all():
+        positions, codes = positions[known], codes[known]
+
+    # Account fields are unaligned in the 83-byte records; copy the columns
+    # once so the arithmetic below runs on contiguous arrays.
+    side = np.ascontiguousarray(positions["side"])
+    amount = np.ascontiguousarray(positions["amount"])
+    claimed = np.ascontiguousarray(positions["claimed"])
+    owner = _key64(positions["owner"])
+    amount_f = amount.astype(np.float64)
+
+    yes_pools = np.array([m.yes_pool for m in markets], dtype=np.float64)
+    no_pools = np.array([m.no_pool for m in markets], dtype=np.float64)
+    share = _pro_rata(amount_f, side, yes_pools[codes], no_pools[codes])
+
+    yes_stake = _group_sum(codes, np.where(side == _SIDE_YES, amount, 0), n)
+    no_stake = _group_sum(codes, np.where(side == _SIDE_NO, amount, 0), n)
+    counts = np.bincount(codes, minlength=n)
+
+    # What resolved markets still owe: unclaimed positions under the actual outcome.
+    outcome_of = np.array(
+        [m.outcome.to_chain_value() if m.status == MarketStatus.RESOLVED and m.outcome else -1 for m in markets],
+        dtype=np.int64,
+    )
+    position_outcome = outcome_of[codes] if n else np.empty(0, dtype=np.int64)
+    open_claims = ~claimed & (position_outcome >= 0)
+    owed = np.zeros(len(codes))
+
+    by_outcome = {}
+    for outcome in Outcome:
+        net, fee = _settle(share, side, outcome, fee_bps)
+        by_outcome[outcome] = (
+            np.bincount(codes, weights=net, minlength=n),
+            np.bincount(codes, weights=fee, minlength=n),
+        )
+        mask = open_claims & (position_outcome == outcome.to_chain_value())
+        owed[mask] = net[mask]
+
+    liability = np.bincount(codes, weights=owed, minlength=n)
+    unclaimed_count = np.bincount(codes, weights=owed > 0, minlength=n)
+    holders, top1, top10, hhi = _concentration(owner, amount_f, codes, n)
+
+    return [
+        MarketRisk(
+            market_id=m.id,
+            status=m.status,
+            positions=int(counts[i]),
+            holders=int(holders[i]),
+            yes_stake=int(yes_stake[i]),
+            no_stake=int(no_stake[i]),
+            payout_if_yes=float(by_outcome[Outcome.YES][0][i]),
+            payout_if_no=float(by_outcome[Outcome.NO][0][i]),
+            payout_if_invalid=float(by_outcome[Outcome.INVALID][0][i]),
+            fees_if_yes=float(by_outcome[Outcome.YES][1][i]),
+            fees_if_no=float(by_outcome[Outcome.NO][1][i]),
+            unclaimed_positions=int(unclaimed_count[i]),
+            unclaimed_liability=float(liability[i]),
+            top_holder_share=float(top1[i]),
+            top10_share=float(top10[i]),
+            hhi=float(hhi[i]),
+        )
+        for i, m in enumerate(markets)
+    ]
+
+
+async def load_from_chain() -> tuple[np.ndarray, list[MarketInfo], list[bytes], int]:
+    """Positions, markets, market PDAs and fee_bps, read from chain."""
+    # chain pulls in the full Solana client stack; only loading needs it.
+    from .chain import (
+        POSITION_ACCOUNT_DISCRIMINATOR,
+        derive_market_pda,
+        fetch_market_snapshot,
+        fetch_position_accounts,
+        fetch_protocol,
+    )
+    from .rpc import close_rpc_pool, get_rpc_pool
+
+    pool = get_rpc_pool()
+    try:
+        protocol, (_, markets), accounts = await asyncio.gather(
+            fetch_protocol(pool), fetch_market_snapshot(pool), fetch_position_accounts(pool)
+        )
+    finally:
+        await close_rpc_pool()
+    keys = [bytes(derive_market_pda(m.id)[0]) for m in markets]
+    return decode_positions(accounts, POSITION_ACCOUNT_DISCRIMINATOR), markets, keys, protocol.fee_bps
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sibyl Oracle — position exposure and payout analytics")
+    parser.add_argument("--market-id", type=int, action="append", help="Only these markets (repeatable)")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    positions, markets, keys, fee_bps = asyncio.run(load_from_chain())
+    if args.market_id:
+        wanted = set(args.market_id)
+        selected = [(m, k) for m, k in zip(markets, keys) if m.id in wanted]
+        markets, keys = [m for m, _ in selected], [k for _, k in selected]
+
+    risks = analyze(positions, markets, keys, fee_bps)
+    print(f"{len(positions)} positions, fee {fee_bps} bps")
+    print(
+        f"{'id':>5} {'status':<9} {'pos':>7} {'holders':>7} {'yes':>14} {'no':>14} "
+        f"{'pay_yes':>14} {'pay_no':>14} {'unclaimed':>14} {'top1':>6} {'top10':>6} {'hhi':>6}"
+    )
+    for r in sorted(risks, key=lambda r: max(r.payout_if_yes, r.payout_if_no), reverse=True):
+        print(
+            f"{r.market_id:>5} {r.status.value:<9} {r.positions:>7} {r.holders:>7} {r.yes_stake:>14} "
+            f"{r.no_stake:>14} {r.payout_if_yes:>14.0f} {r.payout_if_no:>14.0f} {r.unclaimed_liability:>14.0f} "
+            f"{r.top_holder_share:>6.2f} {r.top10_share:>6.2f} {r.hhi:>6.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
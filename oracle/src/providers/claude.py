@@ -1,16 +1,21 @@
 """Anthropic Claude Opus 4.5 provider for market judgment."""
 
+import json
 import logging
 import os
+from collections.abc import Callable
 
 import anthropic
 
-from ..types import JudgmentResult, Outcome, ResearchContext
-from ..utils import parse_llm_json
+from ..ratelimit import report_headers
+from ..types import JudgmentResult, ResearchContext
+from ..utils import REPAIR_MAX_TOKENS, judgment_schema, parse_judgment_json, parse_or_repair, stream_judgment
 
 logger = logging.getLogger(__name__)
 
 PROVIDER_NAME = "claude-opus-4-5"
+MODEL = "claude-opus-4-5-20250514"
+TOOL_NAME = "submit_judgment"
 
 JUDGMENT_PROMPT = """\
 You are a prediction market oracle. Your job is to determine whether a prediction market should resolve as Yes, No, or Invalid.
@@ -36,41 +41,136 @@ Respond with ONLY valid JSON, no markdown fences or extra text.
 """
 
 
-async def judge(
-    market_title: str,
-    market_description: str,
-    research: ResearchContext,
-) -> JudgmentResult:
-    """Query Claude Opus 4.5 for a market judgment."""
+def judgment_tool() -> dict:
+    """Tool definition whose input schema is the judgment itself.
+
+    Forcing this tool makes the API return the judgment as schema-checked
+    tool input instead of free text.
+    """
+    return {
+        "name": TOOL_NAME,
+        "description": "Submit the resolution judgment for the market.",
+        "input_schema": judgment_schema(),
+    }
+
+
+def get_client() -> anthropic.AsyncAnthropic:
+    """Create an Anthropic client from the environment."""
     api_key = os.environ.get("ANTHROPIC_API_KEY")
     if not api_key:
         raise ValueError("ANTHROPIC_API_KEY environment variable is required")
+    return anthropic.AsyncAnthropic(api_key=api_key)
+
 
-    client = anthropic.AsyncAnthropic(api_key=api_key)
+def build_params(
+    market_title: str,
+    market_description: str,
+    research: ResearchContext,
+    model: str | None = None,
+) -> dict:
+    """Build the Messages API parameters for a judgment request.
 
+    Shared by the real-time path and the Message Batches path so both send
+    identical prompts.
+    """
     prompt = JUDGMENT_PROMPT.format(
         title=market_title,
         description=market_description,
         evidence=research.to_prompt_section(),
     )
+    return _structured_params(prompt, model or MODEL, max_tokens=1024)
 
-    logger.info("Querying %s...", PROVIDER_NAME)
 
-    message = await client.messages.create(
-        model="claude-opus-4-5-20250514",
-        max_tokens=1024,
-        temperature=0.1,
-        messages=[{"role": "user", "content": prompt}],
-    )
+def _structured_params(prompt: str, model: str, max_tokens: int) -> dict:
+    return {
+        "model": model,
+        "max_tokens": max_tokens,
+        "temperature": 0.1,
+        "messages": [{"role": "user", "content": prompt}],
+        "tools": [judgment_tool()],
+        "tool_choice": {"type": "tool", "name": TOOL_NAME},
+    }
+
 
-    raw = message.content[0].text.strip()
+def response_text(message) -> str:
+    """Return a message's judgment as JSON text.
+
+    Reads the forced tool call's input, falling back to any text blocks so
+    responses from a model without tool support still parse.
+    """
+    for block in message.content:
+        if block.type == "tool_use" and block.name == TOOL_NAME:
+            return json.dumps(block.input)
+    return "".join(block.text for block in message.content if block.type == "text")
+
+
+def parse_judgment(raw: str) -> JudgmentResult:
+    """Convert a raw model response into a JudgmentResult."""
     logger.debug("Raw response from %s: %s", PROVIDER_NAME, raw)
 
-    data = parse_llm_json(raw)
+    return parse_judgment_json(raw, PROVIDER_NAME)
+
 
-    return JudgmentResult(
-        provider=PROVIDER_NAME,
-        outcome=Outcome(data["outcome"]),
-        confidence=int(data["confidence"]),
-        reasoning=str(data["reasoning"]),
+async def judge(
+    market_title: str,
+    market_description: str,
+    research: ResearchContext,
+    model: str | None = None,
+) -> JudgmentResult:
+    """Query Claude Opus 4.5 (or `model`) for a market judgment."""
+    client = get_client()
+    params = build_params(market_title, market_description, research, model)
+
+    logger.info("Querying %s...", params["model"])
+
+    message = await _create(client, params)
+
+    return await parse_or_repair(response_text(message), parse_judgment, _repairer(client, params["model"]), PROVIDER_NAME)
+
+
+async def _create(client: anthropic.AsyncAnthropic, params: dict):
+    """Create a message, reporting the response's rate-limit headers."""
+    raw = await client.messages.with_raw_response.create(**params)
+    report_headers(raw.headers)
+    return raw.parse()
+
+
+def _repairer(client: anthropic.AsyncAnthropic, model: str) -> Callable:
+    async def complete(prompt: str) -> str:
+        message = await _create(client, _structured_params(prompt, model, REPAIR_MAX_TOKENS))
+        return response_text(message)
+    return complete
+
+
+async def judge_stream(
+    market_title: str,
+    market_description: str,
+    research: ResearchContext,
+    on_verdict: Callable[[JudgmentResult], None] | None = None,
+    model: str | None = None,
+) -> JudgmentResult:
+    """Stream a Claude Opus 4.5 (or `model`) judgment.
+
+    `on_verdict` fires as soon as outcome and confidence have been parsed,
+    while the reasoning is still streaming.
+    """
+    client = get_client()
+    params = build_params(market_title, market_description, research, model)
+
+    logger.info("Streaming %s...", params["model"])
+
+    async def chunks():
+        # The judgment arrives as partial tool input JSON.
+        async with client.messages.stream(**params) as stream:
+            report_headers(stream.response.headers)
+            async for event in stream:
+                if event.type != "content_block_delta":
+                    continue
+                if event.delta.type == "input_json_delta":
+                    yield event.delta.partial_json
+                elif event.delta.type == "text_delta":
+                    yield event.delta.text
+
+    return await stream_judgment(
+        chunks(), PROVIDER_NAME, parse_judgment, on_verdict, _repairer(client, params["model"])
     )
@@ -2,16 +2,18 @@
 
 import logging
 import os
+from collections.abc import Callable
 
 from google import genai
 from google.genai import types
 
-from ..types import JudgmentResult, Outcome, ResearchContext
-from ..utils import parse_llm_json
+from ..types import JudgmentResult, ResearchContext
+from ..utils import REPAIR_MAX_TOKENS, judgment_schema, parse_judgment_json, parse_or_repair, stream_judgment
 
 logger = logging.getLogger(__name__)
 
 PROVIDER_NAME = "gemini-3-pro"
+MODEL = "gemini-3-pro"
 
 JUDGMENT_PROMPT = """\
 You are a prediction market oracle. Your job is to determine whether a prediction market should resolve as Yes, No, or Invalid.
@@ -37,43 +39,102 @@ Respond with ONLY valid JSON, no markdown fences or extra text.
 """
 
 
-async def judge(
-    market_title: str,
-    market_description: str,
-    research: ResearchContext,
-) -> JudgmentResult:
-    """Query Gemini 3 Pro for a market judgment."""
+def get_client() -> genai.Client:
+    """Create a Gemini client from the environment."""
     api_key = os.environ.get("GEMINI_API_KEY")
     if not api_key:
         raise ValueError("GEMINI_API_KEY environment variable is required")
+    return genai.Client(api_key=api_key)
 
-    client = genai.Client(api_key=api_key)
 
+def build_params(
+    market_title: str,
+    market_description: str,
+    research: ResearchContext,
+    model: str | None = None,
+) -> dict:
+    """Build the generate_content parameters for a judgment request."""
     prompt = JUDGMENT_PROMPT.format(
         title=market_title,
         description=market_description,
         evidence=research.to_prompt_section(),
     )
+    return _structured_params(prompt, model or MODEL, max_tokens=1024)
+
 
-    logger.info("Querying %s...", PROVIDER_NAME)
+def response_schema() -> dict:
+    """JudgmentResult schema in the subset Gemini accepts (no additionalProperties)."""
+    schema = judgment_schema()
+    schema.pop("additionalProperties")
+    return schema
 
-    response = await client.aio.models.generate_content(
-        model="gemini-3-pro",
-        contents=prompt,
-        config=types.GenerateContentConfig(
+
+def _structured_params(prompt: str, model: str, max_tokens: int) -> dict:
+    return {
+        "model": model,
+        "contents": prompt,
+        "config": types.GenerateContentConfig(
             temperature=0.1,
-            max_output_tokens=1024,
+            max_output_tokens=max_tokens,
+            response_mime_type="application/json",
+            response_schema=response_schema(),
         ),
-    )
+    }
 
-    raw = response.text.strip()
+
+def parse_judgment(raw: str) -> JudgmentResult:
+    """Convert a raw model response into a JudgmentResult."""
     logger.debug("Raw response from %s: %s", PROVIDER_NAME, raw)
 
-    data = parse_llm_json(raw)
+    return parse_judgment_json(raw, PROVIDER_NAME)
+
+
+async def judge(
+    market_title: str,
+    market_description: str,
+    research: ResearchContext,
+    model: str | None = None,
+) -> JudgmentResult:
+    """Query Gemini 3 Pro (or `model`) for a market judgment."""
+    client = get_client()
+    params = build_params(market_title, market_description, research, model)
+
+    logger.info("Querying %s...", params["model"])
+
+    response = await client.aio.models.generate_content(**params)
+
+    return await parse_or_repair(response.text or "", parse_judgment, _repairer(client, params["model"]), PROVIDER_NAME)
+
+
+def _repairer(client: genai.Client, model: str) -> Callable:
+    async def complete(prompt: str) -> str:
+        response = await client.aio.models.generate_content(**_structured_params(prompt, model, REPAIR_MAX_TOKENS))
+        return response.text or ""
+    return complete
+
+
+async def judge_stream(
+    market_title: str,
+    market_description: str,
+    research: ResearchContext,
+    on_verdict: Callable[[JudgmentResult], None] | None = None,
+    model: str | None = None,
+) -> JudgmentResult:
+    """Stream a Gemini 3 Pro (or `model`) judgment.
+
+    `on_verdict` fires as soon as outcome and confidence have been parsed,
+    while the reasoning is still streaming.
+    """
+    client = get_client()
+    params = build_params(market_title, market_description, research, model)
+
+    logger.info("Streaming %s...", params["model"])
+
+    async def chunks():
+        async for chunk in await client.aio.models.generate_content_stream(**params):
+            if chunk.text:
+                yield chunk.text
 
-    return JudgmentResult(
-        provider=PROVIDER_NAME,
-        outcome=Outcome(data["outcome"]),
-        confidence=int(data["confidence"]),
-        reasoning=str(data["reasoning"]),
+    return await stream_judgment(
+        chunks(), PROVIDER_NAME, parse_judgment, on_verdict, _repairer(client, params["model"])
     )
@@ -2,15 +2,19 @@
 
 import logging
 import os
+from collections.abc import Callable
 
 import openai
 
-from ..types import JudgmentResult, Outcome, ResearchContext
-from ..utils import parse_llm_json
+from ..ratelimit import report_headers
+from ..types import JudgmentResult, ResearchContext
+from ..utils import REPAIR_MAX_TOKENS, judgment_schema, parse_judgment_json, parse_or_repair, stream_judgment
 
 logger = logging.getLogger(__name__)
 
 PROVIDER_NAME = "gpt-5.2"
+DEFAULT_MODEL = "gpt-5.2"
+SYSTEM_PROMPT = "You are a prediction market oracle. Respond only with valid JSON."
 
 JUDGMENT_PROMPT = """\
 You are a prediction market oracle. Your job is to determine whether a prediction market should resolve as Yes, No, or Invalid.
@@ -36,45 +40,120 @@ Respond with ONLY valid JSON, no markdown fences or extra text.
 """
 
 
-async def judge(
-    market_title: str,
-    market_description: str,
-    research: ResearchContext,
-) -> JudgmentResult:
-    """Query GPT-5.2 for a market judgment."""
+def get_client() -> openai.AsyncOpenAI:
+    """Create an OpenAI (or OpenAI-compatible) client from the environment."""
     api_key = os.environ.get("OPENAI_API_KEY")
     if not api_key:
         raise ValueError("OPENAI_API_KEY environment variable is required")
 
     base_url = os.environ.get("OPENAI_BASE_URL")
-    client = openai.AsyncOpenAI(api_key=api_key, **({"base_url": base_url} if base_url else {}))
+    return openai.AsyncOpenAI(api_key=api_key, **({"base_url": base_url} if base_url else {}))
+
+
+def build_params(
+    market_title: str,
+    market_description: str,
+    research: ResearchContext,
+    model: str | None = None,
+) -> dict:
+    """Build the Chat Completions parameters for a judgment request.
 
+    Shared by the real-time path and the Batch API path so both send
+    identical prompts.
+    """
     prompt = JUDGMENT_PROMPT.format(
         title=market_title,
         description=market_description,
         evidence=research.to_prompt_section(),
     )
+    return _structured_params(prompt, model or os.environ.get("OPENAI_MODEL", DEFAULT_MODEL), max_tokens=1024)
 
-    logger.info("Querying %s...", PROVIDER_NAME)
 
-    response = await client.chat.completions.create(
-        model=os.environ.get("OPENAI_MODEL", "gpt-5.2"),
-        temperature=0.1,
-        max_tokens=1024,
-        messages=[
-            {"role": "system", "content": "You are a prediction market oracle. Respond only with valid JSON."},
+def response_format() -> dict:
+    """Strict JSON-schema response format generated from JudgmentResult."""
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": "judgment", "schema": judgment_schema(), "strict": True},
+    }
+
+
+def _structured_params(prompt: str, model: str, max_tokens: int) -> dict:
+    return {
+        "model": model,
+        "temperature": 0.1,
+        "max_tokens": max_tokens,
+        "response_format": response_format(),
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": prompt},
         ],
-    )
+    }
 
-    raw = response.choices[0].message.content.strip()
+
+def parse_judgment(raw: str) -> JudgmentResult:
+    """Convert a raw model response into a JudgmentResult."""
     logger.debug("Raw response from %s: %s", PROVIDER_NAME, raw)
 
-    data = parse_llm_json(raw)
+    return parse_judgment_json(raw, PROVIDER_NAME)
+
+
+async def judge(
+    market_title: str,
+    market_description: str,
+    research: ResearchContext,
+    model: str | None = None,
+) -> JudgmentResult:
+    """Query GPT-5.2 (or `model`) for a market judgment."""
+    client = get_client()
+    params = build_params(market_title, market_description, research, model)
+
+    logger.info("Querying %s...", params["model"])
+
+    response = await _create(client, params)
+
+    return await parse_or_repair(
+        response.choices[0].message.content or "", parse_judgment, _repairer(client, params["model"]), PROVIDER_NAME
+    )
+
+
+async def _create(client: openai.AsyncOpenAI, params: dict):
+    """Create a chat completion, reporting the response's rate-limit headers."""
+    raw = await client.chat.completions.with_raw_response.create(**params)
+    report_headers(raw.headers)
+    return raw.parse()
+
+
+def _repairer(client: openai.AsyncOpenAI, model: str) -> Callable:
+    async def complete(prompt: str) -> str:
+        response = await _create(client, _structured_params(prompt, model, REPAIR_MAX_TOKENS))
+        return response.choices[0].message.content or ""
+    return complete
+
+
+async def judge_stream(
+    market_title: str,
+    market_description: str,
+    research: ResearchContext,
+    on_verdict: Callable[[JudgmentResult], None] | None = None,
+    model: str | None = None,
+) -> JudgmentResult:
+    """Stream a GPT-5.2 (or `model`) judgment.
+
+    `on_verdict` fires as soon as outcome and confidence have been parsed,
+    while the reasoning is still streaming.
+    """
+    client = get_client()
+    params = build_params(market_title, market_description, research, model)
+
+    logger.info("Streaming %s...", params["model"])
+
+    async def chunks():
+        stream = await client.chat.completions.create(**params, stream=True)
+        report_headers(stream.response.headers)
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
 
-    return JudgmentResult(
-        provider=PROVIDER_NAME,
-        outcome=Outcome(data["outcome"]),
-        confidence=int(data["confidence"]),
-        reasoning=str(data["reasoning"]),
+    return await stream_judgment(
+        chunks(), PROVIDER_NAME, parse_judgment, on_verdict, _repairer(client, params["model"])
     )
@@ -0,0 +1,330 @@
+"""Per-provider concurrency limiting and adaptive rate limiting.
+
+Each provider gets a `ProviderLimiter` that combines:
+
+- an async semaphore capping in-flight requests, and
+- a token bucket whose refill rate adapts to the vendor: it is halved (and
+  the bucket paused for `retry-after`) on every 429, and creeps back up
+  additively on success (AIMD).
+
+Rate-limit response headers from Anthropic (`anthropic-ratelimit-*`), OpenAI
+(`x-ratelimit-*`) and the standard `retry-after`/`retry-after-ms` are read
+off throttling errors so the bucket pauses for exactly as long as the vendor
+asks. Providers also hand the headers of successful responses to
+`report_headers`: when fewer than LOW_REMAINING requests are left in the
+vendor's window, the bucket spreads them over the time until the window
+resets, and when none are left it pauses until then, so it slows down before
+a 429 rather than after. Queueing metrics are kept per provider so
+throughput can be tuned.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RATE = 2.0          # requests/second
+DEFAULT_BURST = 4.0
+MIN_RATE = 0.05
+MAX_RATE = 20.0
+RATE_INCREASE_STEP = 0.1    # additive increase per success
+RATE_DECREASE_FACTOR = 0.5  # multiplicative decrease per throttle
+DEFAULT_RETRY_AFTER = 5.0
+LOW_REMAINING = 5           # requests left in the window before the bucket paces them
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class LimiterMetrics(BaseModel):
+    """Snapshot of a provider limiter's queueing state."""
+    provider: str
+    in_flight: int
+    queued: int
+    max_queued: int
+    requests: int
+    throttled: int
+    total_wait_seconds: float
+    avg_wait_seconds: float
+    rate: float
+
+
+def _parse_duration(value: str) -> float | None:
+    """Parse OpenAI-style reset durations such as "1s", "6m0s" or "20ms"."""
+    parts = _DURATION_PART.findall(value)
+    if not parts or "".join(n + u for n, u in parts) != value.strip():
+        return None
+    return sum(float(n) * _DURATION_UNITS[u] for n, u in parts)
+
+
+def _parse_reset(value: str, now: float) -> float | None:
+    """Parse a reset header into seconds from now.
+
+    Accepts plain seconds, OpenAI durations and RFC 3339 timestamps
+    (Anthropic).
+    """
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    if (duration := _parse_duration(value)) is not None:
+        return duration
+    try:
+        return max(0.0, datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() - now)
+    except ValueError:
+        return None
+
+
+def parse_retry_after(headers: Mapping[str, str], now: float | None = None) -> float | None:
+    """Return how long the vendor asked us to wait, in seconds, if it said."""
+    now = time.time() if now is None else now
+    headers = {k.lower(): v for k, v in headers.items()}
+
+    if "retry-after-ms" in headers:
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    if "retry-after" in headers:
+        value = headers["retry-after"]
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - now)
+            except (TypeError, ValueError):
+                pass
+
+    for remaining_key, reset_key in (
+        ("anthropic-ratelimit-requests-remaining", "anthropic-ratelimit-requests-reset"),
+        ("x-ratelimit-remaining-requests", "x-ratelimit-reset-requests"),
+    ):
+        if headers.get(remaining_key) == "0" and reset_key in headers:
+            return _parse_reset(headers[reset_key], now)
+    return None
+
+
+# (remaining, reset) header pairs; for token budgets only exhaustion matters.
+_REQUEST_BUDGETS = (
+    ("anthropic-ratelimit-requests-remaining", "anthropic-ratelimit-requests-reset"),
+    ("x-ratelimit-remaining-requests", "x-ratelimit-reset-requests"),
+)
+_TOKEN_BUDGETS = (
+    ("anthropic-ratelimit-tokens-remaining", "anthropic-ratelimit-tokens-reset"),
+    ("anthropic-ratelimit-input-tokens-remaining", "anthropic-ratelimit-input-tokens-reset"),
+    ("anthropic-ratelimit-output-tokens-remaining", "anthropic-ratelimit-output-tokens-reset"),
+    ("x-ratelimit-remaining-tokens", "x-ratelimit-reset-tokens"),
+)
+
+
+def parse_budget(headers: Mapping[str, str], now: float | None = None) -> tuple[int, float] | None:
+    """Return (requests remaining, seconds until reset) from response headers.
+
+    An exhausted token budget counts as no requests remaining. The tightest
+    budget wins; None if the headers carry none.
+    """
+    now = time.time() if now is None else now
+    headers = {k.lower(): v for k, v in headers.items()}
+    budgets = []
+    for pairs, tokens in ((_REQUEST_BUDGETS, False), (_TOKEN_BUDGETS, True)):
+        for remaining_key, reset_key in pairs:
+            if remaining_key not in headers or reset_key not in headers:
+                continue
+            try:
+                remaining = int(headers[remaining_key])
+            except ValueError:
+                continue
+            reset = _parse_reset(headers[reset_key], now)
+            if reset is None or (tokens and remaining > 0):
+                continue
+            budgets.append((0 if tokens else remaining, reset))
+    return min(budgets, key=lambda b: (b[0], -b[1])) if budgets else None
+
+
+_response_headers: ContextVar[list[Mapping[str, str]] | None] = ContextVar("response_headers", default=None)
+
+
+@contextmanager
+def capture_headers() -> Iterator[list[Mapping[str, str]]]:
+    """Collect the headers that providers report within the block."""
+    seen: list[Mapping[str, str]] = []
+    token = _response_headers.set(seen)
+    try:
+        yield seen
+    finally:
+        _response_headers.reset(token)
+
+
+def report_headers(headers: Mapping[str, str] | None) -> None:
+    """Hand a successful response's headers to the enclosing `capture_headers`."""
+    if headers is not None and (seen := _response_headers.get()) is not None:
+        seen.append(headers)
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    """True if an SDK exception is a vendor 429."""
+    # anthropic/openai expose `status_code`; google-genai exposes `code`.
+    return getattr(exc, "status_code", None) == 429 or getattr(exc, "code", None) == 429
+
+
+def _error_headers(exc: BaseException) -> Mapping[str, str]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    return headers if headers is not None else {}
+
+
+class ProviderLimiter:
+    """Semaphore + adaptive token bucket for one provider.
+
+    Use as an async context manager around each provider call, then report
+    the result with `on_success()` or `on_throttle()`.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        rate: float = DEFAULT_RATE,
+        burst: float = DEFAULT_BURST,
+    ):
+        self.provider = provider
+        self.concurrency = concurrency
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._semaphore: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+        self._in_flight = 0
+        self._queued = 0
+        self._max_queued = 0
+        self._requests = 0
+        self._throttled = 0
+        self._total_wait = 0.0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Semaphores bind to the loop they are first awaited on; recreate
+        # the semaphore if the limiter is reused from a new event loop.
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    async def _take_token(self) -> None:
+        while True:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                await asyncio.sleep(self._blocked_until - now)
+                continue
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    async def __aenter__(self) -> "ProviderLimiter":
+        start = time.monotonic()
+        self._queued += 1
+        self._max_queued = max(self._max_queued, self._queued)
+        semaphore = self._get_semaphore()
+        try:
+            await semaphore.acquire()
+            try:
+                await self._take_token()
+            except BaseException:
+                semaphore.release()
+                raise
+        finally:
+            self._queued -= 1
+        self._in_flight += 1
+        self._requests += 1
+        self._total_wait += time.monotonic() - start
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._in_flight -= 1
+        if self._semaphore is not None:
+            self._semaphore.release()
+
+    def on_success(self, headers: Mapping[str, str] | None = None) -> None:
+        """Additively raise the rate after a successful call, within the vendor's remaining budget."""
+        self.rate = min(MAX_RATE, self.rate + RATE_INCREASE_STEP)
+        budget = parse_budget(headers) if headers else None
+        if budget is None:
+            return
+        remaining, reset = budget
+        if remaining <= 0:
+            self._tokens = 0.0
+            self._blocked_until = max(self._blocked_until, time.monotonic() + reset)
+            logger.info("[%s] Rate limit budget exhausted — pausing %.1fs", self.provider, reset)
+        elif remaining < LOW_REMAINING and reset > 0:
+            self.rate = max(MIN_RATE, min(self.rate, remaining / reset))
+
+    def on_throttle(self, exc: BaseException | None = None) -> float:
+        """Back off after a 429. Returns the pause applied, in seconds."""
+        retry_after = parse_retry_after(_error_headers(exc)) if exc is not None else None
+        pause = DEFAULT_RETRY_AFTER if retry_after is None else retry_after
+
+        self._throttled += 1
+        self.rate = max(MIN_RATE, self.rate * RATE_DECREASE_FACTOR)
+        self._tokens = 0.0
+        self._blocked_until = max(self._blocked_until, time.monotonic() + pause)
+        logger.warning(
+            "[%s] Rate limited — pausing %.1fs, rate now %.2f req/s",
+            self.provider,
+            pause,
+            self.rate,
+        )
+        return pause
+
+    def metrics(self) -> LimiterMetrics:
+        return LimiterMetrics(
+            provider=self.provider,
+            in_flight=self._in_flight,
+            queued=self._queued,
+            max_queued=self._max_queued,
+            requests=self._requests,
+            throttled=self._throttled,
+            total_wait_seconds=round(self._total_wait, 3),
+            avg_wait_seconds=round(self._total_wait / self._requests, 3) if self._requests else 0.0,
+            rate=round(self.rate, 3),
+        )
+
+
+_limiters: dict[str, ProviderLimiter] = {}
+
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    """Return the shared limiter for a provider, creating it on first use."""
+    if provider not in _limiters:
+        _limiters[provider] = ProviderLimiter(provider)
+    return _limiters[provider]
+
+
+def reset_limiters() -> None:
+    """Drop all limiters and their metrics (used by tests)."""
+    _limiters.clear()
+
+
+def all_metrics() -> list[LimiterMetrics]:
+    """Metrics for every provider limiter created so far."""
+    return [limiter.metrics() for limiter in _limiters.values()]
@@ -0,0 +1,146 @@
+"""Config-driven provider panel for the Sibyl Oracle.
+
+The judging panel — which providers are queried, with which models and
+weights, and how many must agree — is loaded from `panel.json` (or the file
+named by `ORACLE_PANEL_CONFIG`) instead of being hard-coded:
+
+```json
+{
+  "quorum": 2,
+  "early_exit": false,
+  "stream": false,
+  "providers": [
+    {"name": "gemini-3-pro", "module": "gemini", "weight": 1.0},
+    {"name": "gemini-flash", "module": "gemini", "model": "gemini-3-flash", "weight": 0.5}
+  ],
+  "cascade": {
+    "min_confidence": 90,
+    "providers": [
+      {"name": "gemini-3-flash", "module": "gemini", "model": "gemini-3-flash"},
+      {"name": "claude-haiku-4-5", "module": "claude", "model": "claude-haiku-4-5"}
+    ]
+  }
+}
+```
+
+`module` names a module in `src.providers`; several entries may share a
+module with different `model` overrides. `name` is the label recorded on
+each JudgmentResult and used for rate limiting. The optional `cascade` puts
+cheap seats in front of the panel (see `CascadeConfig`).
+"""
+
+import importlib
+import json
+import logging
+import os
+from pathlib import Path
+from types import ModuleType
+
+from pydantic import BaseModel, Field, model_validator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PANEL_PATH = Path(__file__).resolve().parent.parent / "panel.json"
+
+
+class ProviderSpec(BaseModel):
+    """One seat on the judging panel."""
+    name: str
+    module: str
+    model: str | None = None
+    weight: float = Field(default=1.0, gt=0)
+
+
+class CascadeConfig(BaseModel):
+    """Cheap seats that try to settle a market before the full panel.
+
+    The seats judge one after another. The cascade settles the market only
+    if every seat returns the same Yes or No outcome with at least
+    `min_confidence`; the first seat that does not sends the market to the
+    full panel, and the seats after it are never called.
+    """
+    providers: list[ProviderSpec] = Field(min_length=2)
+    min_confidence: int = Field(default=90, ge=0, le=100)
+    enabled: bool = True
+
+    @model_validator(mode="after")
+    def _check_cascade(self) -> "CascadeConfig":
+        names = [p.name for p in self.providers]
+        if len(names) != len(set(names)):
+            raise ValueError(f"Duplicate provider names in cascade: {names}")
+        return self
+
+
+class PanelConfig(BaseModel):
+    """The judging panel and its consensus rule.
+
+    An outcome wins when at least `quorum` providers chose it and its summed
+    weight is strictly greater than that of every other outcome. With
+    `early_exit`, judgment stops as soon as the pending providers can no
+    longer change the winner. With `stream`, providers stream their
+    responses and count towards that decision as soon as their outcome and
+    confidence are parsed, before their reasoning has finished. With an
+    enabled `cascade`, the panel is only consulted for markets the cascade
+    does not settle.
+    """
+    providers: list[ProviderSpec]
+    quorum: int = Field(default=2, ge=1)
+    early_exit: bool = False
+    stream: bool = False
+    cascade: CascadeConfig | None = None
+
+    @model_validator(mode="after")
+    def _check_panel(self) -> "PanelConfig":
+        names = [p.name for p in self.providers]
+        if len(names) != len(set(names)):
+            raise ValueError(f"Duplicate provider names in panel: {names}")
+        if self.quorum > len(self.providers):
+            raise ValueError(f"Quorum {self.quorum} exceeds panel size {len(self.providers)}")
+        if self.cascade is not None and (shared := set(names) & {p.name for p in self.cascade.providers}):
+            # Names label each judgment; the ledger must tell the tiers apart.
+            raise ValueError(f"Cascade seats reuse panel names: {sorted(shared)}")
+        return self
+
+    @property
+    def size(self) -> int:
+        return len(self.providers)
+
+    def weights(self) -> dict[str, float]:
+        return {p.name: p.weight for p in self.providers}
+
+
+DEFAULT_PANEL = PanelConfig(
+    providers=[
+        ProviderSpec(name="gemini-3-pro", module="gemini"),
+        ProviderSpec(name="claude-opus-4-5", module="claude"),
+        ProviderSpec(name="gpt-5.2", module="openai"),
+    ],
+    quorum=2,
+)
+
+
+def load_panel(path: Path | None = None) -> PanelConfig:
+    """Load the panel config, or the default 2-of-3 panel if none exists.
+
+    A config file that exists but is invalid raises rather than silently
+    falling back to a different panel.
+    """
+    if path is None:
+        env_path = os.environ.get("ORACLE_PANEL_CONFIG")
+        path = Path(env_path) if env_path else DEFAULT_PANEL_PATH
+        if not env_path and not path.exists():
+            return DEFAULT_PANEL
+
+    panel = PanelConfig.model_validate(json.loads(Path(path).read_text()))
+    for spec in panel.providers + (panel.cascade.providers if panel.cascade else []):
+        get_provider_module(spec)  # fail fast on unknown modules
+    logger.debug("Loaded panel of %d providers (quorum %d) from %s", panel.size, panel.quorum, path)
+    return panel
+
+
+def get_provider_module(spec: ProviderSpec) -> ModuleType:
+    """Import the provider module named by a spec."""
+    try:
+        return importlib.import_module(f"{__package__}.providers.{spec.module}")
+    except ModuleNotFoundError as e:
+        raise ValueError(f"Unknown provider module '{spec.module}' for '{spec.name}'") from e
@@ -0,0 +1,290 @@
+"""Speculative research warming with incremental snapshots.
+
+In the last hours before a market's deadline the scheduler calls
+`ResearchWarmer.warm` periodically. Each pass refreshes the market's
+research cache:
+
+- sources are re-fetched with conditional GETs (`If-None-Match` /
+  `If-Modified-Since`), so unchanged pages cost a 304 and no parsing;
+- searches are re-run only once their results are older than a TTL;
+- fetches run concurrently rather than one after another.
+
+Each pass appends a snapshot holding only what changed to
+`data/research/market-<id>.jsonl` (or `ORACLE_RESEARCH_DIR`), so a restarted
+oracle resumes with a warm cache. Changed sources are stored as passage
+deltas (see `textdiff`): the page's passage hashes in order plus the text
+of passages not stored before. Passages that are genuinely new since the
+previous snapshot are highlighted in the prompt.
+
+At resolution time a final pass of the same kind is a small delta refresh
+instead of a full gather, which takes research off the critical path.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from pathlib import Path
+
+import httpx
+from pydantic import BaseModel
+
+from .researcher import MAX_SEARCH_RESULTS, brave_search, fetch_url_if_modified
+from .textdiff import new_passages, passage_key, split_passages
+from .types import ResearchContext, SearchResult, SourceSummary
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESEARCH_DIR = Path(__file__).resolve().parent.parent / "data" / "research"
+SEARCH_TTL_SECONDS = 15 * 60
+FINAL_SEARCH_MAX_AGE_SECONDS = 2 * 60
+
+
+class SourceDelta(BaseModel):
+    """How a source changed in one snapshot.
+
+    `order` is the page's passage keys in order; `added` holds the text of
+    only those passages not present in the previous version.
+    """
+    url: str
+    order: list[str] = []
+    added: dict[str, str] = {}
+    error: str | None = None
+    etag: str | None = None
+    last_modified: str | None = None
+    fetched_at: float
+
+
+class CachedSource(BaseModel):
+    """Latest good version of a source URL, as passages."""
+    url: str
+    passages: dict[str, str] = {}
+    order: list[str] = []
+    new: list[str] = []   # keys of passages new since the previous snapshot
+    error: str | None = None
+    etag: str | None = None
+    last_modified: str | None = None
+    fetched_at: float
+
+    def summary(self) -> SourceSummary:
+        return SourceSummary(
+            url=self.url,
+            content="\n".join(self.passages[k] for k in self.order),
+            error=self.error,
+            new_passages=[self.passages[k] for k in self.new],
+        )
+
+
+class CachedSearch(BaseModel):
+    """Latest results for a search query."""
+    query: str
+    results: list[SearchResult]
+    fetched_at: float
+
+
+class ResearchSnapshot(BaseModel):
+    """What changed in one refresh pass."""
+    ts: float
+    sources: list[SourceDelta] = []
+    searches: list[CachedSearch] = []
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.sources or self.searches)
+
+
+class ResearchCache:
+    """Cached research for one market, persisted as incremental snapshots."""
+
+    def __init__(self, market_id: int, path: Path | None = None):
+        self.market_id = market_id
+        self.path = path
+        self.sources: dict[str, CachedSource] = {}
+        self.searches: dict[str, CachedSearch] = {}
+
+    @classmethod
+    def load(cls, market_id: int, directory: Path | None = None) -> "ResearchCache":
+        """Open a market's cache, replaying its snapshots."""
+        if directory is None:
+            env_dir = os.environ.get("ORACLE_RESEARCH_DIR")
+            directory = Path(env_dir) if env_dir else DEFAULT_RESEARCH_DIR
+        cache = cls(market_id, directory / f"market-{market_id}.jsonl")
+        if cache.path.exists():
+            with cache.path.open() as f:
+                for line_no, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        cache._apply(ResearchSnapshot.model_validate_json(line))
+                    except (ValueError, KeyError):
+                        logger.warning("Skipping corrupt research snapshot line %d in %s", line_no, cache.path)
+        return cache
+
+    def _apply(self, snapshot: ResearchSnapshot) -> None:
+        for delta in snapshot.sources:
+            self.sources[delta.url] = self._apply_delta(delta)
+        for search in snapshot.searches:
+            self.searches[search.query] = search
+
+    def _append(self, snapshot: ResearchSnapshot) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a") as f:
+            f.write(snapshot.model_dump_json() + "\n")
+
+    def _apply_delta(self, delta: SourceDelta) -> CachedSource:
+        previous = self.sources.get(delta.url)
+        if delta.error:
+            return CachedSource(url=delta.url, error=delta.error, fetched_at=delta.fetched_at)
+
+        known = previous.passages if previous is not None else {}
+        passages = {k: delta.added[k] if k in delta.added else known[k] for k in delta.order}
+        new: list[str] = []
+        if previous is not None and previous.order == delta.order:
+            new = previous.new  # only the validators changed
+        elif previous is not None and not previous.error and delta.added:
+            fresh = new_passages(
+                [known[k] for k in previous.order],
+                [delta.added[k] for k in dict.fromkeys(delta.order) if k in delta.added],
+            )
+            new = [passage_key(p) for p in fresh]
+        return CachedSource(
+            url=delta.url,
+            passages=passages,
+            order=delta.order,
+            new=new,
+            etag=delta.etag,
+            last_modified=delta.last_modified,
+            fetched_at=delta.fetched_at,
+        )
+
+    async def _refresh_source(self, client: httpx.AsyncClient, url: str, now: float) -> SourceDelta | None:
+        cached = self.sources.get(url)
+        summary, etag, last_modified = await fetch_url_if_modified(
+            client,
+            url,
+            etag=cached.etag if cached else None,
+            last_modified=cached.last_modified if cached else None,
+        )
+        if summary is None:
+            return None  # 304 Not Modified
+        if summary.error:
+            if cached is not None:
+                logger.info("Keeping cached copy of %s after fetch error", url)
+                return None
+            # Nothing better to show; cache the error so the prompt mentions it.
+            return SourceDelta(url=url, error=summary.error, fetched_at=now)
+
+        passages = split_passages(summary.content)
+        order = [passage_key(p) for p in passages]
+        if (
+            cached is not None
+            and cached.order == order
+            and (cached.etag, cached.last_modified) == (etag, last_modified)
+        ):
+            return None
+        known = cached.passages if cached is not None and not cached.error else {}
+        return SourceDelta(
+            url=url,
+            order=order,
+            added={k: p for k, p in zip(order, passages) if k not in known},
+            etag=etag,
+            last_modified=last_modified,
+            fetched_at=now,
+        )
+
+    async def _refresh_search(self, client: httpx.AsyncClient, query: str, now: float) -> CachedSearch | None:
+        results = await brave_search(client, query)
+        cached = self.searches.get(query)
+        if not results and cached is not None:
+            return None  # keep the last results through a failed search
+        if cached is not None and cached.results == results:
+            # Unchanged; only the freshness moves forward.
+            self.searches[query] = cached.model_copy(update={"fetched_at": now})
+            return None
+        return CachedSearch(query=query, results=results, fetched_at=now)
+
+    async def refresh(
+        self,
+        sources: list[str],
+        search_queries: list[str],
+        search_max_age: float = SEARCH_TTL_SECONDS,
+        now: float | None = None,
+    ) -> ResearchSnapshot:
+        """Bring the cache up to date and record what changed.
+
+        Every source is revalidated; searches are re-run only if their
+        results are older than `search_max_age` seconds.
+        """
+        now = time.time() if now is None else now
+        stale_queries = [
+            q for q in search_queries
+            if q not in self.searches or now - self.searches[q].fetched_at >= search_max_age
+        ]
+
+        async with httpx.AsyncClient() as client:
+            results = await asyncio.gather(
+                *(self._refresh_source(client, url, now) for url in sources),
+                *(self._refresh_search(client, q, now) for q in stale_queries),
+            )
+
+        snapshot = ResearchSnapshot(
+            ts=now,
+            sources=[r for r in results[: len(sources)] if r is not None],
+            searches=[r for r in results[len(sources) :] if r is not None],
+        )
+        self._apply(snapshot)
+        if snapshot.changed:
+            self._append(snapshot)
+        logger.debug(
+            "Market %d research refresh: %d/%d sources changed, %d/%d searches re-run, %d changed",
+            self.market_id, len(snapshot.sources), len(sources),
+            len(stale_queries), len(search_queries), len(snapshot.searches),
+        )
+        return snapshot
+
+    def context(self, sources: list[str], search_queries: list[str]) -> ResearchContext:
+        """Assemble the cached research in config order, as gather_research would."""
+        search_results: list[SearchResult] = []
+        for query in search_queries:
+            if query in self.searches:
+                search_results.extend(self.searches[query].results)
+        return ResearchContext(
+            source_summaries=[self.sources[url].summary() for url in sources if url in self.sources],
+            search_results=search_results[:MAX_SEARCH_RESULTS],
+        )
+
+
+class ResearchWarmer:
+    """Keeps one ResearchCache per market being warmed."""
+
+    def __init__(self, directory: Path | None = None):
+        self.directory = directory
+        self._caches: dict[int, ResearchCache] = {}
+
+    def cache(self, market_id: int) -> ResearchCache:
+        if market_id not in self._caches:
+            self._caches[market_id] = ResearchCache.load(market_id, self.directory)
+        return self._caches[market_id]
+
+    async def warm(
+        self,
+        market_id: int,
+        sources: list[str],
+        search_queries: list[str],
+        final: bool = False,
+    ) -> ResearchContext:
+        """Refresh a market's cache and return its research context.
+
+        `final` marks the refresh at resolution time, which also re-runs any
+        search older than a couple of minutes.
+        """
+        cache = self.cache(market_id)
+        max_age = FINAL_SEARCH_MAX_AGE_SECONDS if final else SEARCH_TTL_SECONDS
+        await cache.refresh(sources, search_queries, search_max_age=max_age)
+        return cache.context(sources, search_queries)
+
+    def forget(self, market_id: int) -> None:
+        """Drop a resolved market's cache from memory (snapshots stay on disk)."""
+        self._caches.pop(market_id, None)
@@ -19,26 +19,59 @@ MAX_SEARCH_RESULTS = 5
 FETCH_TIMEOUT = 15.0
 
 
+def extract_text(html: str) -> str:
+    """Extract readable, truncated text from an HTML page."""
+    soup = BeautifulSoup(html, "html.parser")
+
+    # Remove script/style elements
+    for tag in soup(["script", "style", "nav", "footer", "header"]):
+        tag.decompose()
+
+    text = soup.get_text(separator="\n", strip=True)
+    # Truncate
+    if len(text) > MAX_CONTENT_LENGTH:
+        text = text[:MAX_CONTENT_LENGTH] + "..."
+    return text
+
+
 async def fetch_url(client: httpx.AsyncClient, url: str) -> SourceSummary:
     """Fetch a URL and extract readable text content."""
     try:
         resp = await client.get(url, follow_redirects=True, timeout=FETCH_TIMEOUT)
         resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-
-        # Remove script/style elements
-        for tag in soup(["script", "style", "nav", "footer", "header"]):
-            tag.decompose()
+        return SourceSummary(url=url, content=extract_text(resp.text))
+    except Exception as e:
+        logger.warning("Failed to fetch %s: %s", url, e)
+        return SourceSummary(url=url, content="", error=str(e))
 
-        text = soup.get_text(separator="\n", strip=True)
-        # Truncate
-        if len(text) > MAX_CONTENT_LENGTH:
-            text = text[:MAX_CONTENT_LENGTH] + "..."
 
-        return SourceSummary(url=url, content=text)
+async def fetch_url_if_modified(
+    client: httpx.AsyncClient,
+    url: str,
+    etag: str | None = None,
+    last_modified: str | None = None,
+) -> tuple[SourceSummary | None, str | None, str | None]:
+    """Conditionally re-fetch a URL using its previous validators.
+
+    Returns (summary, etag, last_modified). `summary` is None when the
+    server answered 304 Not Modified, in which case the validators passed
+    in are returned unchanged.
+    """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    try:
+        resp = await client.get(url, headers=headers, follow_redirects=True, timeout=FETCH_TIMEOUT)
+        if resp.status_code == 304:
+            return None, etag, last_modified
+        resp.raise_for_status()
+        summary = SourceSummary(url=url, content=extract_text(resp.text))
+        return summary, resp.headers.get("etag"), resp.headers.get("last-modified")
     except Exception as e:
         logger.warning("Failed to fetch %s: %s", url, e)
-        return SourceSummary(url=url, content="", error=str(e))
+        return SourceSummary(url=url, content="", error=str(e)), etag, last_modified
 
 
 async def brave_search(client: httpx.AsyncClient, query: str) -> list[SearchResult]:
@@ -0,0 +1,122 @@
+"""Value-weighted priority queue for market resolutions.
+
+When many markets pass their deadline together, provider capacity is the
+bottleneck, and the order they are judged in decides who waits. The
+scheduler puts each due market in this queue and runs at most
+`concurrency` resolutions at a time, taking markets in order of a
+virtual deadline:
+
+    key = ready_at - value_credit + RETRY_PENALTY_SECONDS * attempts
+
+- `ready_at` is when the market became resolvable (its deadline, or its
+  retry time), so markets further past their deadline go first;
+- `value_credit` grows with the locked value `yes_pool + no_pool`:
+  VALUE_CREDIT_SECONDS per tenfold, capped at MAX_VALUE_CREDIT_SECONDS;
+- each failed attempt costs RETRY_PENALTY_SECONDS, so a market that keeps
+  failing does not hold a slot ahead of fresh ones.
+
+Keys are fixed at enqueue time, and later arrivals get later `ready_at`s,
+so this is aging: no market waits behind markets that became ready more
+than MAX_VALUE_CREDIT_SECONDS (plus its retry penalty) after it.
+
+`metrics()` reports queue depth and the wait (ready to dequeued) of
+recent resolutions, including a value-weighted mean.
+"""
+
+import heapq
+import math
+import time
+from collections import deque
+from collections.abc import Callable
+
+from pydantic import BaseModel
+
+from .types import MarketInfo
+
+RESOLVE_CONCURRENCY = 4
+VALUE_CREDIT_SECONDS = 60.0
+MAX_VALUE_CREDIT_SECONDS = 15 * 60.0
+RETRY_PENALTY_SECONDS = 120.0
+WAIT_SAMPLES = 1024
+
+
+class QueueMetrics(BaseModel):
+    """Depth of the resolution queue and waits of recent resolutions."""
+    depth: int
+    queued_value: int
+    dequeued: int
+    mean_wait_seconds: float
+    p95_wait_seconds: float
+    max_wait_seconds: float
+    value_weighted_wait_seconds: float
+
+
+def locked_value(market: MarketInfo) -> int:
+    return market.yes_pool + market.no_pool
+
+
+def priority_key(market: MarketInfo, ready_at: float, attempts: int = 0) -> float:
+    """Virtual deadline of a market: lower resolves first."""
+    credit = min(MAX_VALUE_CREDIT_SECONDS, VALUE_CREDIT_SECONDS * math.log10(1 + locked_value(market)))
+    return ready_at - credit + RETRY_PENALTY_SECONDS * attempts
+
+
+class ResolutionQueue:
+    """Min-heap of due markets keyed on `priority_key`."""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        # (key, seq, market_id); entries whose seq is not the market's in `_queued` are stale
+        self._heap: list[tuple[float, int, int]] = []
+        self._queued: dict[int, tuple[int, float, int]] = {}  # market_id -> (seq, ready_at, value)
+        self._seq = 0
+        self.dequeued = 0
+        self._waits: deque[tuple[float, int]] = deque(maxlen=WAIT_SAMPLES)
+
+    def __len__(self) -> int:
+        return len(self._queued)
+
+    def __contains__(self, market_id: int) -> bool:
+        return market_id in self._queued
+
+    def push(self, market: MarketInfo, ready_at: float | None = None, attempts: int = 0) -> bool:
+        """Queue a due market. Returns False if it is already queued."""
+        if market.id in self._queued:
+            return False
+        ready_at = self.clock() if ready_at is None else ready_at
+        self._seq += 1
+        heapq.heappush(self._heap, (priority_key(market, ready_at, attempts), self._seq, market.id))
+        self._queued[market.id] = (self._seq, ready_at, locked_value(market))
+        return True
+
+    def pop(self) -> int | None:
+        """The id of the most urgent queued market, or None if the queue is empty."""
+        while self._heap:
+            _, seq, market_id = heapq.heappop(self._heap)
+            entry = self._queued.get(market_id)
+            if entry is not None and entry[0] == seq:
+                del self._queued[market_id]
+                _, ready_at, value = entry
+                self.dequeued += 1
+                self._waits.append((max(0.0, self.clock() - ready_at), value))
+                return market_id
+        return None
+
+    def discard(self, market_id: int) -> None:
+        """Drop a market from the queue; its heap entry becomes stale."""
+        self._queued.pop(market_id, None)
+
+    def metrics(self) -> QueueMetrics:
+        waits = sorted(w for w, _ in self._waits)
+        total_value = sum(v for _, v in self._waits)
+        return QueueMetrics(
+            depth=len(self._queued),
+            queued_value=sum(v for _, _, v in self._queued.values()),
+            dequeued=self.dequeued,
+            mean_wait_seconds=sum(waits) / len(waits) if waits else 0.0,
+            p95_wait_seconds=waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0,
+            max_wait_seconds=waits[-1] if waits else 0.0,
+            value_weighted_wait_seconds=(
+                sum(w * v for w, v in self._waits) / total_value if total_value else 0.0
+            ),
+        )
@@ -0,0 +1,329 @@
+"""Pooled Solana RPC access across several endpoints.
+
+`RpcPool` stands in for a solana-py `AsyncClient`: any client method can be
+called on it (`pool.get_account_info(...)`), and the call is routed to the
+best endpoint available:
+
+- endpoints are ranked by health, slot lag and ping latency (an EWMA of
+  `getSlot` round trips measured by health checks);
+- a transport error or rate limit (HTTP 429) moves the call on to the next
+  endpoint and cools the failing one down, honouring `retry-after`;
+  JSON-RPC errors returned by a node (e.g. a failed preflight) are raised
+  as-is, since another node would answer the same;
+- identical concurrent reads (`get_*` methods with the same arguments) are
+  coalesced into one request.
+
+`batch` sends several raw JSON-RPC calls in one HTTP request, with the same
+failover.
+
+Endpoints come from `SOLANA_RPC_URLS` (comma-separated), falling back to
+`SOLANA_RPC_URL` and then public devnet.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import httpx
+from pydantic import BaseModel
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.core import RPCException
+
+from .ratelimit import parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RPC = "https://api.devnet.solana.com"
+HEALTH_CHECK_INTERVAL_SECONDS = 30.0
+HEALTH_CHECK_TIMEOUT_SECONDS = 5.0
+BATCH_TIMEOUT_SECONDS = 10.0
+LATENCY_EWMA_ALPHA = 0.3
+# Endpoints this many slots behind the best one are only used as a fallback.
+MAX_SLOT_LAG = 150
+FAILURE_COOLDOWN_SECONDS = 2.0
+MAX_COOLDOWN_SECONDS = 60.0
+THROTTLE_COOLDOWN_SECONDS = 10.0
+
+
+class EndpointStats(BaseModel):
+    """Point-in-time state of one RPC endpoint."""
+    url: str
+    available: bool
+    latency_ms: float | None
+    slot: int | None
+    lagging: bool
+    requests: int
+    errors: int
+    throttled: int
+
+
+class AllEndpointsFailed(RuntimeError):
+    """Every endpoint failed for a request."""
+
+
+def _http_status_error(exc: BaseException) -> httpx.HTTPStatusError | None:
+    """The HTTP status error behind a (possibly wrapped) RPC exception."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        if isinstance(exc, httpx.HTTPStatusError):
+            return exc
+        seen.add(id(exc))
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+
+class _Endpoint:
+    def __init__(self, url: str, client_factory: Callable[[str], Any]):
+        self.url = url
+        self._client_factory = client_factory
+        self._client: Any = None
+        self.latency: float | None = None
+        self.slot: int | None = None
+        self.lagging = False
+        self.failures = 0
+        self.cooldown_until = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            self._client = self._client_factory(self.url)
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    def observe_latency(self, seconds: float) -> None:
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency += LATENCY_EWMA_ALPHA * (seconds - self.latency)
+
+    def on_success(self) -> None:
+        self.failures = 0
+        self.cooldown_until = 0.0
+
+    def on_failure(self, exc: BaseException, now: float) -> None:
+        self.errors += 1
+        self.failures += 1
+        status = _http_status_error(exc)
+        if status is not None and status.response.status_code == 429:
+            self.throttled += 1
+            retry_after = parse_retry_after(status.response.headers)
+            pause = THROTTLE_COOLDOWN_SECONDS if retry_after is None else retry_after
+        else:
+            pause = min(MAX_COOLDOWN_SECONDS, FAILURE_COOLDOWN_SECONDS * 2 ** (self.failures - 1))
+        self.cooldown_until = max(self.cooldown_until, now + pause)
+
+    def stats(self, now: float) -> EndpointStats:
+        return EndpointStats(
+            url=self.url,
+            available=now >= self.cooldown_until,
+            latency_ms=round(self.latency * 1000, 1) if self.latency is not None else None,
+            slot=self.slot,
+            lagging=self.lagging,
+            requests=self.requests,
+            errors=self.errors,
+            throttled=self.throttled,
+        )
+
+
+class RpcPool:
+    """Failover, latency-ranked pool of RPC endpoints with read coalescing."""
+
+    def __init__(
+        self,
+        urls: list[str],
+        client_factory: Callable[[str], Any] = AsyncClient,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not urls:
+            raise ValueError("RpcPool needs at least one endpoint")
+        self.endpoints = [_Endpoint(url, client_factory) for url in dict.fromkeys(urls)]
+        self.clock = clock
+        self.coalesced = 0
+        self._inflight: dict[tuple, asyncio.Task] = {}
+        self._checked = False
+        self._http: httpx.AsyncClient | None = None
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        # Only AsyncClient's RPC methods are proxied; anything else is a bug.
+        if name.startswith("_") or not callable(getattr(AsyncClient, name, None)):
+            raise AttributeError(name)
+        if name.startswith("get_"):
+            return lambda *args, **kwargs: self.read(name, *args, **kwargs)
+        return lambda *args, **kwargs: self.call(name, *args, **kwargs)
+
+    async def __aenter__(self) -> "RpcPool":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        await asyncio.gather(*(e.close() for e in self.endpoints), return_exceptions=True)
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    # -- routing ------------------------------------------------------------
+
+    def ranked(self) -> list[_Endpoint]:
+        """Endpoints in the order a request should try them."""
+        now = self.clock()
+        return sorted(
+            self.endpoints,
+            key=lambda e: (
+                now < e.cooldown_until,
+                e.lagging,
+                e.latency if e.latency is not None else float("inf"),
+            ),
+        )
+
+    async def _failover(self, label: str, request: Callable[[_Endpoint], Awaitable[Any]]) -> Any:
+        if not self._checked and len(self.endpoints) > 1:
+            await self.check_health()
+
+        errors: list[str] = []
+        for endpoint in self.ranked():
+            endpoint.requests += 1
+            try:
+                result = await request(endpoint)
+            except RPCException:
+                # The node answered; the request itself was rejected.
+                endpoint.on_success()
+                raise
+            except Exception as e:
+                endpoint.on_failure(e, self.clock())
+                errors.append(f"{endpoint.url}: {e!r}")
+                logger.warning("RPC %s failed on %s (%r); trying next endpoint", label, endpoint.url, e)
+                continue
+            endpoint.on_success()
+            return result
+        raise AllEndpointsFailed(f"RPC {label} failed on every endpoint: " + "; ".join(errors))
+
+    async def call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """Call an AsyncClient method, failing over across endpoints."""
+        return await self._failover(method, lambda e: getattr(e.client, method)(*args, **kwargs))
+
+    async def batch(self, calls: list[tuple[str, list]]) -> list[Any]:
+        """Send `(method, params)` JSON-RPC calls in one HTTP request.
+
+        Returns each call's raw `result`, in order. A JSON-RPC error in any
+        call raises RPCException.
+        """
+        body = [{"jsonrpc": "2.0", "id": i, "method": m, "params": p} for i, (m, p) in enumerate(calls)]
+
+        async def post(endpoint: _Endpoint) -> list[dict]:
+            if self._http is None:
+                self._http = httpx.AsyncClient(timeout=BATCH_TIMEOUT_SECONDS)
+            resp = await self._http.post(endpoint.url, json=body)
+            resp.raise_for_status()
+            return resp.json()
+
+        label = "batch(" + ",".join(m for m, _ in calls) + ")"
+        responses = sorted(await self._failover(label, post), key=lambda r: r["id"])
+        for r in responses:
+            if "error" in r:
+                raise RPCException(r["error"])
+        return [r["result"] for r in responses]
+
+    async def read(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """Like `call`, but identical concurrent reads share one request."""
+        key = (method, repr(args), repr(sorted(kwargs.items())))
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(self.call(method, *args, **kwargs))
+            self._inflight[key] = task
+
+            def _done(t: asyncio.Task) -> None:
+                if self._inflight.get(key) is t:
+                    del self._inflight[key]
+
+            task.add_done_callback(_done)
+        # Shielded so one caller giving up does not cancel the others' request.
+        return await asyncio.shield(task)
+
+    # -- health -------------------------------------------------------------
+
+    async def _ping(self, endpoint: _Endpoint) -> None:
+        start = self.clock()
+        try:
+            resp = await asyncio.wait_for(endpoint.client.get_slot(), HEALTH_CHECK_TIMEOUT_SECONDS)
+        except Exception as e:
+            endpoint.on_failure(e, self.clock())
+            endpoint.slot = None
+            logger.warning("RPC endpoint %s failed its health check: %r", endpoint.url, e)
+            return
+        endpoint.observe_latency(self.clock() - start)
+        endpoint.slot = resp.value
+        endpoint.on_success()
+
+    async def check_health(self) -> list[EndpointStats]:
+        """Ping every endpoint, update latency and slot lag, and return their stats."""
+        self._checked = True
+        await asyncio.gather(*(self._ping(e) for e in self.endpoints))
+        best = max((e.slot for e in self.endpoints if e.slot is not None), default=None)
+        for e in self.endpoints:
+            e.lagging = best is not None and (e.slot is None or best - e.slot > MAX_SLOT_LAG)
+        stats = self.stats()
+        for s in stats:
+            logger.debug(
+                "RPC %s: available=%s latency=%sms slot=%s lagging=%s errors=%d throttled=%d",
+                s.url, s.available, s.latency_ms, s.slot, s.lagging, s.errors, s.throttled,
+            )
+        return stats
+
+    async def run_health_checks(
+        self,
+        interval: float = HEALTH_CHECK_INTERVAL_SECONDS,
+        stop: asyncio.Event | None = None,
+    ) -> None:
+        """Re-check endpoint health every `interval` seconds until `stop` is set."""
+        stop = stop or asyncio.Event()
+        while not stop.is_set():
+            await self.check_health()
+            try:
+                await asyncio.wait_for(stop.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> list[EndpointStats]:
+        now = self.clock()
+        return [e.stats(now) for e in self.endpoints]
+
+
+def get_rpc_urls() -> list[str]:
+    """RPC endpoints from `SOLANA_RPC_URLS`, else `SOLANA_RPC_URL`, else devnet."""
+    urls = [u.strip() for u in os.environ.get("SOLANA_RPC_URLS", "").split(",") if u.strip()]
+    if urls:
+        return urls
+    return [os.environ.get("SOLANA_RPC_URL", DEFAULT_RPC)]
+
+
+_pool: RpcPool | None = None
+
+
+def get_rpc_pool() -> RpcPool:
+    """The shared RPC pool for this process."""
+    global _pool
+    if _pool is None:
+        _pool = RpcPool(get_rpc_urls())
+    return _pool
+
+
+async def close_rpc_pool() -> None:
+    """Close and forget the shared pool's connections."""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
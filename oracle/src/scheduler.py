@@ -0,0 +1,297 @@
+"""Deadline-driven market scheduler for the Sibyl Oracle.
+
+Keeps every unresolved market in a min-heap keyed on its on-chain
+`resolution_deadline` and sleeps until the next event instead of polling:
+
+- from `prewarm_lead` seconds before a deadline, research for the market is
+  refreshed in the background every `prewarm_interval` seconds, with a last
+  pass shortly before the deadline;
+- at the deadline (plus a small grace for cluster clock drift), the market
+  joins a value-weighted resolution queue (see `resolve_queue`). Up to
+  `concurrency` markets resolve at once, each with a final delta refresh
+  of its warmed research, so the judgment starts almost immediately.
+
+The market set is re-read from chain every `refresh_interval` seconds to
+pick up new markets and drop ones resolved elsewhere. Adding a market with
+an earlier deadline wakes the scheduler early.
+"""
+
+import asyncio
+import heapq
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+from pydantic import BaseModel
+
+from .resolve_queue import RESOLVE_CONCURRENCY, QueueMetrics, ResolutionQueue
+from .types import MarketInfo, MarketStatus, ResearchContext, ResolveReport
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PREWARM_LEAD_SECONDS = 6 * 60 * 60.0
+PREWARM_INTERVAL_SECONDS = 30 * 60.0
+LAST_PREWARM_LEAD_SECONDS = 60.0
+REFRESH_INTERVAL_SECONDS = 60.0
+# The program rejects `resolve` until the cluster clock reaches the deadline,
+# which can trail wall-clock time by a second or two.
+DEADLINE_GRACE_SECONDS = 2.0
+RETRY_DELAY_SECONDS = 30.0
+MAX_RESOLVE_ATTEMPTS = 3
+
+_PREWARM = 0
+_RESOLVE = 1
+
+Discover = Callable[[], Awaitable[list[MarketInfo]]]
+Prewarm = Callable[..., Awaitable[ResearchContext]]
+Resolve = Callable[[int, ResearchContext | None], Awaitable[ResolveReport]]
+
+
+class SchedulerMetrics(BaseModel):
+    """Markets tracked and resolving, plus the resolution queue's metrics."""
+    tracked: int
+    resolving: int
+    given_up: int
+    queue: QueueMetrics
+
+
+class DeadlineScheduler:
+    """Wake at each market's deadline and resolve it.
+
+    `discover` returns the current on-chain markets, `prewarm(market,
+    final=False)` refreshes research for one market and returns it, and
+    `resolve(market_id, research)` runs the resolution pipeline. `clock`
+    returns unix seconds, comparable with `resolution_deadline`.
+    """
+
+    def __init__(
+        self,
+        discover: Discover,
+        prewarm: Prewarm,
+        resolve: Resolve,
+        prewarm_lead: float = DEFAULT_PREWARM_LEAD_SECONDS,
+        prewarm_interval: float = PREWARM_INTERVAL_SECONDS,
+        refresh_interval: float = REFRESH_INTERVAL_SECONDS,
+        grace: float = DEADLINE_GRACE_SECONDS,
+        concurrency: int = RESOLVE_CONCURRENCY,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.discover = discover
+        self.prewarm = prewarm
+        self.resolve = resolve
+        self.prewarm_lead = prewarm_lead
+        self.prewarm_interval = prewarm_interval
+        self.refresh_interval = refresh_interval
+        self.grace = grace
+        self.concurrency = concurrency
+        self.clock = clock
+        self.queue = ResolutionQueue(clock)
+
+        # (when, kind, market_id, deadline); stale entries are skipped on pop
+        self._heap: list[tuple[float, int, int, int]] = []
+        self._markets: dict[int, MarketInfo] = {}
+        self._research: dict[int, asyncio.Task[ResearchContext]] = {}
+        self._attempts: dict[int, int] = {}
+        # market_id -> deadline of markets that failed MAX_RESOLVE_ATTEMPTS times
+        self._given_up: dict[int, int] = {}
+        self._running: set[asyncio.Task] = set()
+        self._resolving = 0
+        self._stopped = False
+        self._wakeup = asyncio.Event()
+
+    # -- scheduling ---------------------------------------------------------
+
+    def schedule(self, market: MarketInfo) -> bool:
+        """Track a market until its deadline. Returns False if it needs no resolution.
+
+        A market given up on after MAX_RESOLVE_ATTEMPTS stays unscheduled
+        until its deadline changes or the scheduler restarts.
+        """
+        if market.status not in (MarketStatus.OPEN, MarketStatus.LOCKED):
+            self.unschedule(market.id)
+            return False
+        if self._given_up.get(market.id) == market.resolution_deadline:
+            return False
+
+        current = self._markets.get(market.id)
+        self._markets[market.id] = market
+        if current is not None and current.resolution_deadline == market.resolution_deadline:
+            return True
+
+        deadline = market.resolution_deadline
+        heapq.heappush(self._heap, (deadline - self.prewarm_lead, _PREWARM, market.id, deadline))
+        heapq.heappush(self._heap, (deadline + self.grace, _RESOLVE, market.id, deadline))
+        if self._heap[0][2] == market.id:
+            self._wakeup.set()
+        return True
+
+    def unschedule(self, market_id: int) -> None:
+        """Stop tracking a market; its heap entries become stale."""
+        self._markets.pop(market_id, None)
+        self._attempts.pop(market_id, None)
+        self.queue.discard(market_id)
+        if (task := self._research.pop(market_id, None)) is not None:
+            task.cancel()
+
+    def metrics(self) -> SchedulerMetrics:
+        return SchedulerMetrics(
+            tracked=len(self._markets),
+            resolving=self._resolving,
+            given_up=len(self._given_up),
+            queue=self.queue.metrics(),
+        )
+
+    def next_event(self) -> float | None:
+        """Time of the next live prewarm/resolve event, if any."""
+        while self._heap and self._is_stale(self._heap[0]):
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def _is_stale(self, entry: tuple[float, int, int, int]) -> bool:
+        market = self._markets.get(entry[2])
+        return market is None or market.resolution_deadline != entry[3]
+
+    async def refresh(self) -> int:
+        """Re-read markets from chain. Returns the number being tracked."""
+        try:
+            markets = await self.discover()
+        except Exception:
+            logger.exception("Failed to refresh markets; keeping current schedule")
+            return len(self._markets)
+
+        seen = set()
+        for market in markets:
+            seen.add(market.id)
+            # Markets already being resolved keep their in-flight state.
+            if market.id not in self._attempts:
+                self.schedule(market)
+        for market_id in list(self._markets):
+            if market_id not in seen and market_id not in self._attempts:
+                self.unschedule(market_id)
+        for market_id in list(self._given_up):
+            if market_id not in seen:
+                del self._given_up[market_id]
+        return len(self._markets)
+
+    # -- event handling -----------------------------------------------------
+
+    def _fire_due(self, now: float) -> None:
+        while (when := self.next_event()) is not None and when <= now:
+            _, kind, market_id, deadline = heapq.heappop(self._heap)
+            market = self._markets[market_id]
+            if kind == _RESOLVE:
+                self.queue.push(market, ready_at=when, attempts=self._attempts.get(market_id, 0))
+                continue
+
+            running = self._research.get(market_id)
+            if running is None or running.done():
+                logger.info("Market %d: pre-warming research (deadline in %.0fs)", market_id, deadline - now)
+                self._research[market_id] = asyncio.create_task(self.prewarm(market))
+            last_pass = deadline - LAST_PREWARM_LEAD_SECONDS
+            if now < last_pass:
+                next_pass = min(max(now, when) + self.prewarm_interval, last_pass)
+                heapq.heappush(self._heap, (next_pass, _PREWARM, market_id, deadline))
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Start queued resolutions while there are free slots."""
+        while not self._stopped and self._resolving < self.concurrency and (market_id := self.queue.pop()) is not None:
+            if (market := self._markets.get(market_id)) is None:
+                continue
+            self._resolving += 1
+            self._spawn(self._resolve_in_slot(market))
+
+    async def _resolve_in_slot(self, market: MarketInfo) -> None:
+        try:
+            await self._resolve(market)
+        finally:
+            self._resolving -= 1
+            self._dispatch()
+
+    def _spawn(self, coro: Awaitable) -> None:
+        task = asyncio.ensure_future(coro)
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _final_research(self, market: MarketInfo) -> ResearchContext | None:
+        """Delta-refresh the warmed research once the deadline has passed."""
+        if (task := self._research.pop(market.id, None)) is not None:
+            await asyncio.gather(task, return_exceptions=True)
+        try:
+            return await self.prewarm(market, final=True)
+        except Exception:
+            logger.exception("Market %d: final research refresh failed; the pipeline will gather it", market.id)
+            return None
+
+    async def _resolve(self, market: MarketInfo) -> None:
+        attempt = self._attempts[market.id] = self._attempts.get(market.id, 0) + 1
+        research = await self._final_research(market)
+        late = self.clock() - market.resolution_deadline
+        logger.info("Market %d: resolving %.1fs after deadline (attempt %d)", market.id, late, attempt)
+
+        try:
+            report = await self.resolve(market.id, research)
+            error = report.error
+        except Exception as e:
+            logger.exception("Market %d: resolution raised", market.id)
+            error = str(e)
+
+        if error is None:
+            self.unschedule(market.id)
+            return
+        if attempt >= MAX_RESOLVE_ATTEMPTS:
+            logger.error("Market %d: giving up after %d attempts: %s", market.id, attempt, error)
+            self._given_up[market.id] = market.resolution_deadline
+            self.unschedule(market.id)
+            return
+
+        logger.warning("Market %d: resolution failed (%s); retrying in %.0fs", market.id, error, RETRY_DELAY_SECONDS)
+        heapq.heappush(
+            self._heap,
+            (self.clock() + RETRY_DELAY_SECONDS, _RESOLVE, market.id, market.resolution_deadline),
+        )
+        self._wakeup.set()
+
+    # -- main loop ----------------------------------------------------------
+
+    async def run(self, stop: asyncio.Event | None = None) -> None:
+        """Run until `stop` is set (or forever)."""
+        stop = stop or asyncio.Event()
+        next_refresh = self.clock()
+        try:
+            while not stop.is_set():
+                now = self.clock()
+                if now >= next_refresh:
+                    tracked = await self.refresh()
+                    next_refresh = now + self.refresh_interval
+                    logger.debug("Tracking %d markets; next event at %s", tracked, self.next_event())
+                    if self.queue.dequeued or len(self.queue):
+                        metrics = self.metrics()
+                        m = metrics.queue
+                        logger.info(
+                            "Resolution queue: depth=%d (value %d), %d resolving; wait mean=%.1fs "
+                            "p95=%.1fs max=%.1fs value-weighted=%.1fs",
+                            m.depth, m.queued_value, metrics.resolving, m.mean_wait_seconds,
+                            m.p95_wait_seconds, m.max_wait_seconds, m.value_weighted_wait_seconds,
+                        )
+                self._fire_due(now)
+
+                wake_at = min(next_refresh, self.next_event() or next_refresh)
+                self._wakeup.clear()
+                stop_wait = asyncio.ensure_future(stop.wait())
+                wake_wait = asyncio.ensure_future(self._wakeup.wait())
+                try:
+                    await asyncio.wait(
+                        {stop_wait, wake_wait},
+                        timeout=max(0.0, wake_at - self.clock()),
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                finally:
+                    stop_wait.cancel()
+                    wake_wait.cancel()
+        finally:
+            self._stopped = True
+            for task in self._research.values():
+                task.cancel()
+            if self._running:
+                await asyncio.gather(*self._running, return_exceptions=True)
@@ -0,0 +1,76 @@
+"""Passage-level diffing of fetched source text.
+
+Source text is split into passages (the lines `researcher.extract_text`
+produces). Each passage is keyed by a content hash of its normalised text,
+so an unchanged passage is recognised in O(1) however the page around it
+moved. Passages whose hash is new are then compared by word-shingle Jaccard
+similarity against the previous passages, so a passage that only changed
+trivially (a timestamp, a view counter) is not reported as new content.
+"""
+
+import hashlib
+from collections.abc import Iterable
+
+SHINGLE_SIZE = 3
+NEAR_DUPLICATE_THRESHOLD = 0.8
+
+
+def _normalise(passage: str) -> str:
+    return " ".join(passage.lower().split())
+
+
+def split_passages(text: str) -> list[str]:
+    """Split extracted text into non-empty passages, in page order."""
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+def passage_key(passage: str) -> str:
+    """Stable content hash of a passage, insensitive to case and spacing."""
+    return hashlib.blake2b(_normalise(passage).encode(), digest_size=8).hexdigest()
+
+
+def shingles(passage: str, k: int = SHINGLE_SIZE) -> frozenset[int]:
+    """Hashed word k-grams of a passage (the whole passage if shorter than k)."""
+    words = _normalise(passage).split()
+    if len(words) <= k:
+        return frozenset([hash(tuple(words))])
+    return frozenset(hash(tuple(words[i : i + k])) for i in range(len(words) - k + 1))
+
+
+def jaccard(a: frozenset[int], b: frozenset[int]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def new_passages(
+    previous: Iterable[str],
+    current: list[str],
+    threshold: float = NEAR_DUPLICATE_THRESHOLD,
+) -> list[str]:
+    """Passages of `current` that are genuinely new relative to `previous`.
+
+    A passage is new if its hash is unseen and no previous passage shares at
+    least `threshold` of its shingles.
+    """
+    previous = list(previous)
+    seen = {passage_key(p) for p in previous}
+    candidates = [p for p in current if passage_key(p) not in seen]
+    if not candidates:
+        return []
+
+    previous_shingles = [shingles(p) for p in previous]
+    # Only previous passages sharing a shingle with the candidate can be
+    # near-duplicates; index them so each check touches only those.
+    index: dict[int, list[int]] = {}
+    for i, sh in enumerate(previous_shingles):
+        for s in sh:
+            index.setdefault(s, []).append(i)
+
+    fresh = []
+    for passage in candidates:
+        sh = shingles(passage)
+        neighbours = {i for s in sh for i in index.get(s, ())}
+        if not any(jaccard(sh, previous_shingles[i]) >= threshold for i in neighbours):
+            fresh.append(passage)
+    return fresh
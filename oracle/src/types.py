@@ -1,7 +1,9 @@
 """Shared types and data models for the Sibyl Oracle service."""
 
 from enum import Enum
-from pydantic import BaseModel, Field
+from typing import ClassVar
+
+from pydantic import BaseModel, Field, ValidationInfo, model_validator
 
 
 class Outcome(str, Enum):
@@ -35,29 +37,70 @@ class MarketInfo(BaseModel):
     oracle_confidence: int = 0
 
 
+class ProtocolInfo(BaseModel):
+    """On-chain protocol configuration."""
+    authority: str
+    oracle: str
+    sbyl_mint: str
+    treasury: str
+    fee_bps: int
+    swap_cap: int
+    market_count: int
+
+
+class PositionInfo(BaseModel):
+    """On-chain position data."""
+    owner: str
+    market: str
+    side: Outcome
+    amount: int
+    claimed: bool
+
+
 class JudgmentResult(BaseModel):
-    """Result from a single AI provider's judgment."""
+    """Result from a single AI provider's judgment.
+
+    A model's answer carries no `provider`; validating it with
+    `context={"provider": name}` labels it with the provider that gave it.
+    """
     provider: str
     outcome: Outcome
     confidence: int = Field(ge=0, le=100)
     reasoning: str
 
+    @model_validator(mode="before")
+    @classmethod
+    def _provider_from_context(cls, data, info: ValidationInfo):
+        if info.context and "provider" in info.context and isinstance(data, dict):
+            return {**data, "provider": info.context["provider"]}
+        return data
+
 
 class ConsensusResult(BaseModel):
-    """Aggregated consensus from multiple AI judgments."""
+    """Aggregated consensus from multiple AI judgments.
+
+    `tier` is the judgment tier that produced it: "cascade" when the cheap
+    seats settled the market, otherwise "panel".
+    """
     judgments: list[JudgmentResult]
     final_outcome: Outcome
     final_confidence: int = Field(ge=0, le=100)
     consensus_reached: bool
     agreeing_providers: list[str]
     summary: str
+    tier: str = "panel"
 
 
 class SourceSummary(BaseModel):
-    """Summary of a fetched source URL."""
+    """Summary of a fetched source URL.
+
+    `new_passages` lists the passages of `content` that appeared since the
+    previous research snapshot, when the source has been fetched before.
+    """
     url: str
     content: str
     error: str | None = None
+    new_passages: list[str] = []
 
 
 class SearchResult(BaseModel):
@@ -67,10 +110,23 @@ class SearchResult(BaseModel):
     snippet: str
 
 
+class EvidencePassage(BaseModel):
+    """A stored passage from earlier research, with its BM25 relevance."""
+    text: str
+    title: str
+    url: str
+    fetched_at: float
+    score: float
+
+
 class ResearchContext(BaseModel):
     """Aggregated research context from URLs and web searches."""
+    # Unchanged text shown alongside a source's new passages, in characters.
+    UNCHANGED_CONTEXT_LENGTH: ClassVar[int] = 800
+
     source_summaries: list[SourceSummary] = []
     search_results: list[SearchResult] = []
+    related: list[EvidencePassage] = []
 
     def to_prompt_section(self) -> str:
         """Format research context as a prompt section."""
@@ -80,19 +136,84 @@ class ResearchContext(BaseModel):
             for s in self.source_summaries:
                 if s.error:
                     parts.append(f"- {s.url}: [Error: {s.error}]")
+                elif s.new_passages:
+                    new = "\n".join(f"+ {p}" for p in s.new_passages)
+                    added = set(s.new_passages)
+                    rest = "\n".join(line for line in s.content.splitlines() if line.strip() not in added)
+                    if len(rest) > self.UNCHANGED_CONTEXT_LENGTH:
+                        rest = rest[:self.UNCHANGED_CONTEXT_LENGTH] + "..."
+                    parts.append(
+                        f"**{s.url}**\nNew since previous snapshot:\n{new}\n"
+                        + (f"Unchanged:\n{rest}\n" if rest else "")
+                    )
                 else:
                     parts.append(f"**{s.url}**\n{s.content}\n")
         if self.search_results:
             parts.append("### Web Search Results")
             for r in self.search_results:
                 parts.append(f"- **{r.title}** ({r.url})\n  {r.snippet}")
+        if self.related:
+            parts.append("### Related Evidence (earlier research)")
+            for p in self.related:
+                parts.append(f"- ({p.url}) {p.text}")
         return "\n".join(parts) if parts else "No research context available."
 
 
+class SimulationResult(BaseModel):
+    """Outcome of simulating a resolve transaction."""
+    market_id: int
+    ok: bool
+    error: str | None = None
+    logs: list[str] = []
+    units_consumed: int | None = None
+
+
+class ResolveVerification(BaseModel):
+    """A confirmed resolve transaction checked against the Market account's post-state."""
+    signature: str
+    slot: int
+    status: MarketStatus | None = None
+    outcome: Outcome | None = None
+    confidence: int | None = None
+    mismatches: list[str] = []
+
+    @property
+    def verified(self) -> bool:
+        return not self.mismatches
+
+
 class ResolveReport(BaseModel):
-    """Full report of a market resolution."""
+    """Full report of a market resolution.
+
+    `verified` is True once the on-chain Market account was read back with
+    the submitted outcome and confidence, False if it did not match.
+    """
     market_id: int
     market_title: str
-    consensus: ConsensusResult
+    consensus: ConsensusResult | None = None
     tx_signature: str | None = None
+    verified: bool | None = None
+    error: str | None = None
+
+
+class ClaimStatus(str, Enum):
+    PENDING = "pending"
+    REJECTED = "rejected"
+    SENT = "sent"
+    CONFIRMED = "confirmed"
+    FAILED = "failed"
+
+
+class ClaimResult(BaseModel):
+    """Progress of claiming one position.
+
+    `rejected` claims failed simulation and were never sent; `failed` ones
+    were sent but errored or did not confirm in time.
+    """
+    market_id: int
+    owner: str
+    side: Outcome
+    payout: int
+    status: ClaimStatus = ClaimStatus.PENDING
+    signature: str | None = None
     error: str | None = None
@@ -1,32 +1,305 @@
 """Shared utilities for the Sibyl Oracle service."""
 
+import copy
 import json
-import re
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable
+from functools import cache
+
+from .types import JudgmentResult, Outcome
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+_json_loads: Callable[[str], object] = orjson.loads if orjson is not None else json.loads
+
+MAX_REPAIR_ATTEMPTS = 1
+REPAIR_MAX_TOKENS = 512
+
+REPAIR_PROMPT = """\
+Your previous answer could not be used: {error}
+
+Previous answer:
+{raw}
+
+Return the same judgment as JSON with exactly these fields:
+- "outcome": one of "Yes", "No", or "Invalid"
+- "confidence": integer 0-100
+- "reasoning": brief explanation
+
+Do not change the judgment itself; only fix the format.
+"""
+
+
+class JSONNotFound(ValueError):
+    """An LLM response contains no JSON object."""
+
+
+def _json_object_span(text: str) -> tuple[int, int]:
+    """Locate the JSON object in an LLM response without copying it.
+
+    If the response contains a markdown fence (```json ... ``` or ``` ... ```),
+    only the fenced block is searched, so braces in surrounding prose are
+    ignored. Returns (start, end) with `end` exclusive, or (-1, -1).
+    """
+    lo, hi = 0, len(text)
+    fence = text.find("```")
+    if fence != -1:
+        body = text.find("\n", fence)
+        if body != -1:
+            close = text.find("```", body)
+            lo, hi = body + 1, close if close != -1 else hi
+
+    start = text.find("{", lo, hi)
+    end = text.rfind("}", lo, hi)
+    if (start == -1 or end < start) and (lo, hi) != (0, len(text)):
+        # Nothing in the fence (e.g. a fenced example); search everything.
+        start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        return -1, -1
+    return start, end + 1
+
+
+def _extract_json_object(raw: str) -> str:
+    text = raw.strip()
+    if text.startswith("{") and text.endswith("}"):
+        return text
+    start, end = _json_object_span(text)
+    if start == -1:
+        raise JSONNotFound(f"No JSON object found in LLM response: {raw}")
+    return text[start:end]
 
 
 def parse_llm_json(raw: str) -> dict:
     """Parse JSON from LLM responses, handling markdown fences and extra text.
 
-    Strips markdown code fences (```json...``` or ```...```), extracts the
-    JSON object between the first '{' and last '}', then parses it.
+    Tries the text as-is first (the common case with structured output),
+    then the JSON object inside a markdown fence or between the first '{'
+    and last '}'. Uses orjson when it is installed.
 
     Raises ValueError with the raw text if parsing fails.
     """
-    text = raw.strip()
+    try:
+        data = _json_loads(raw)
+        if isinstance(data, dict):
+            return data
+    except ValueError:
+        pass
+
+    try:
+        return _json_loads(_extract_json_object(raw))
+    except JSONNotFound:
+        raise
+    except ValueError as e:
+        raise ValueError(f"Failed to parse JSON from LLM response: {raw}") from e
+
+
+def parse_judgment_json(raw: str, provider: str) -> JudgmentResult:
+    """Parse and validate an LLM response straight into a JudgmentResult.
+
+    A bare JSON object (the structured-output case) goes directly to
+    `model_validate_json`, which parses and checks it in one pass without
+    an intermediate dict; otherwise the object is first sliced out of its
+    fence or surrounding text. The validation context supplies `provider`,
+    which the model's answer does not contain.
+
+    Raises ValueError (pydantic's ValidationError is a subclass) if the
+    response holds no valid judgment.
+    """
+    return JudgmentResult.model_validate_json(_extract_json_object(raw), context={"provider": provider})
+
 
-    # Strip markdown code fences
-    text = re.sub(r"^```(?:json)?\s*\n?", "", text)
-    text = re.sub(r"\n?```\s*$", "", text)
+@cache
+def _judgment_schema() -> dict:
+    schema = JudgmentResult.model_json_schema()
+    defs = schema.pop("$defs", {})
+    properties = {k: v for k, v in schema["properties"].items() if k != "provider"}
+    for name, prop in properties.items():
+        if "$ref" in prop:
+            properties[name] = dict(defs[prop["$ref"].rsplit("/", 1)[-1]])
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
 
-    # Extract from first { to last }
-    start = text.find("{")
-    end = text.rfind("}")
-    if start == -1 or end == -1 or end < start:
-        raise ValueError(f"No JSON object found in LLM response: {raw}")
 
-    text = text[start : end + 1]
+def judgment_schema() -> dict:
+    """JSON schema for a model's judgment, generated from JudgmentResult.
 
+    Drops `provider` (filled in by the oracle) and inlines the Outcome enum,
+    which structured-output APIs require.
+    """
+    return copy.deepcopy(_judgment_schema())
+
+
+async def parse_or_repair(
+    raw: str,
+    parse: Callable[[str], JudgmentResult],
+    complete: Callable[[str], Awaitable[str]],
+    provider: str,
+) -> JudgmentResult:
+    """Parse a judgment, asking the model to fix unusable output if needed.
+
+    A repair sends only the bad answer and the error, not the market prompt
+    and evidence, so it is far cheaper than re-running the judgment.
+    `complete` takes a repair prompt and returns the model's raw answer.
+    """
     try:
-        return json.loads(text)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Failed to parse JSON from LLM response: {raw}") from e
+        return parse(raw)
+    except (ValueError, KeyError) as e:
+        error: Exception = e
+
+    for attempt in range(1, MAX_REPAIR_ATTEMPTS + 1):
+        logger.warning("[%s] Unusable response (%s); repair attempt %d", provider, error, attempt)
+        raw = await complete(REPAIR_PROMPT.format(error=error, raw=raw))
+        try:
+            return parse(raw)
+        except (ValueError, KeyError) as e:
+            error = e
+    raise error
+
+
+class IncrementalJSONParser:
+    """Parse the top-level fields of a JSON object as it streams in.
+
+    Feed text chunks as they arrive; each top-level field becomes available
+    in `fields` as soon as its value is complete, without waiting for the
+    rest of the object. Text before the first '{' (e.g. a markdown fence)
+    is ignored.
+    """
+
+    def __init__(self) -> None:
+        self.fields: dict = {}
+        self.done = False
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect_key = False
+        self._key_start = -1
+        self._key: str | None = None
+        self._value_start = -1
+
+    def feed(self, chunk: str) -> None:
+        self._text += chunk
+        text = self._text
+        while self._pos < len(text) and not self.done:
+            i = self._pos
+            ch = text[i]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect_key:
+                        self._key = json.loads(text[self._key_start : i + 1])
+                        self._expect_key = False
+                continue
+
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._expect_key = True
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    if self._expect_key:
+                        self._key_start = i
+                    elif self._value_start == -1:
+                        self._value_start = i
+            elif ch in "{[":
+                if self._depth == 1 and self._value_start == -1:
+                    self._value_start = i
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._finish_value(i)
+                    self.done = True
+            elif self._depth == 1:
+                if ch == ",":
+                    self._finish_value(i)
+                    self._expect_key = True
+                elif not ch.isspace() and ch != ":" and self._key is not None and self._value_start == -1:
+                    self._value_start = i
+
+    def _finish_value(self, end: int) -> None:
+        if self._key is not None and self._value_start != -1:
+            raw = self._text[self._value_start : end].strip()
+            try:
+                self.fields[self._key] = json.loads(raw)
+            except ValueError:
+                pass
+        self._key = None
+        self._value_start = -1
+
+
+def verdict_from_fields(fields: dict, provider: str) -> JudgmentResult | None:
+    """Build a JudgmentResult from parsed fields once outcome and confidence are known.
+
+    `reasoning` may still be missing while the response is streaming.
+    """
+    if "outcome" not in fields or "confidence" not in fields:
+        return None
+    try:
+        return JudgmentResult(
+            provider=provider,
+            outcome=Outcome(fields["outcome"]),
+            confidence=int(fields["confidence"]),
+            reasoning=str(fields.get("reasoning", "")),
+        )
+    except (TypeError, ValueError):
+        return None
+
+
+async def stream_judgment(
+    chunks: AsyncIterator[str],
+    provider: str,
+    parse: Callable[[str], JudgmentResult],
+    on_verdict: Callable[[JudgmentResult], None] | None = None,
+    complete: Callable[[str], Awaitable[str]] | None = None,
+) -> JudgmentResult:
+    """Consume a streamed provider response.
+
+    Calls `on_verdict` once, as soon as outcome and confidence have been
+    parsed, then keeps reading until the stream ends and returns the full
+    judgment via `parse`. If the full text cannot be parsed but the
+    verdict could, the verdict is returned with whatever reasoning arrived;
+    otherwise a repair is attempted through `complete` when given.
+    """
+    parser = IncrementalJSONParser()
+    parts: list[str] = []
+    notified = False
+
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        parts.append(chunk)
+        parser.feed(chunk)
+        if not notified and on_verdict is not None:
+            if (verdict := verdict_from_fields(parser.fields, provider)) is not None:
+                notified = True
+                on_verdict(verdict)
+
+    raw = "".join(parts)
+    try:
+        return parse(raw)
+    except (ValueError, KeyError):
+        if (verdict := verdict_from_fields(parser.fields, provider)) is not None:
+            return verdict
+        if complete is None:
+            raise
+    return await parse_or_repair(raw, parse, complete, provider)
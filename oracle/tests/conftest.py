@@ -1,6 +1,8 @@
 """Shared fixtures for Sibyl Oracle tests."""
 
 import pytest
+from src.judge import reset_tier_stats
+from src.ratelimit import reset_limiters
 from src.types import (
     JudgmentResult,
     MarketInfo,
@@ -12,6 +14,22 @@ from src.types import (
 )
 
 
+@pytest.fixture(autouse=True)
+def _fresh_limiters():
+    """Give every test its own provider limiters and metrics."""
+    reset_limiters()
+    yield
+    reset_limiters()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_tier_stats():
+    """Give every test its own judgment tier stats."""
+    reset_tier_stats()
+    yield
+    reset_tier_stats()
+
+
 @pytest.fixture
 def research_context():
     """Empty research context for provider tests."""
@@ -0,0 +1,149 @@
+"""Tests for src.api — HTTP resolution API with singleflight runs."""
+
+import asyncio
+import json
+import logging
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from src.api import ResolutionAPI, ResolutionService
+from src.resolve_queue import ResolutionQueue
+from src.scheduler import SchedulerMetrics
+from src.types import MarketInfo, MarketStatus, ResolveReport
+
+logger = logging.getLogger("tests.fake_pipeline")
+
+
+class _FakePipeline:
+    """A resolver that logs progress and waits to be released."""
+
+    def __init__(self):
+        self.calls: list[int] = []
+        self.release = asyncio.Event()
+
+    async def __call__(self, market_id: int) -> ResolveReport:
+        self.calls.append(market_id)
+        logger.warning("researching market %d", market_id)
+        # Log from a worker thread too, as blocking research code does.
+        await asyncio.to_thread(logger.warning, "judging market %d", market_id)
+        await self.release.wait()
+        if market_id == 13:
+            raise RuntimeError("rpc unavailable")
+        return ResolveReport(market_id=market_id, market_title=f"Market {market_id}", tx_signature="sig")
+
+
+@pytest_asyncio.fixture
+async def api():
+    pipeline = _FakePipeline()
+    server = ResolutionAPI(ResolutionService(pipeline), token="secret")
+    port = await server.start("127.0.0.1", 0)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=5) as client:
+        client.headers["Authorization"] = "Bearer secret"
+        yield client, pipeline
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_triggers_share_one_run(api):
+    client, pipeline = api
+
+    first, second = await asyncio.gather(client.post("/markets/7/resolve"), client.post("/markets/7/resolve"))
+
+    assert first.status_code == second.status_code == 202
+    assert sorted([first.json()["joined"], second.json()["joined"]]) == [False, True]
+    assert (await client.get("/markets/7/report")).status_code == 202
+
+    waiter = asyncio.create_task(client.post("/markets/7/resolve?wait=1"))
+    await asyncio.sleep(0.05)
+    pipeline.release.set()
+    waited = await waiter
+
+    assert pipeline.calls == [7]
+    assert waited.status_code == 200
+    assert waited.json()["report"]["tx_signature"] == "sig"
+    health = (await client.get("/health")).json()
+    assert (health["started"], health["coalesced"], health["inflight"]) == (1, 2, [])
+
+
+@pytest.mark.asyncio
+async def test_a_finished_market_can_be_resolved_again(api):
+    client, pipeline = api
+    pipeline.release.set()
+
+    first = (await client.post("/markets/3/resolve?wait=1")).json()
+    second = (await client.post("/markets/3/resolve?wait=1")).json()
+
+    assert pipeline.calls == [3, 3]
+    assert second["started_at"] >= first["finished_at"]
+
+
+@pytest.mark.asyncio
+async def test_events_stream_progress_then_report(api):
+    client, pipeline = api
+    await client.post("/markets/5/resolve")
+    await asyncio.sleep(0.05)
+
+    events = []
+    async with client.stream("GET", "/markets/5/events") as resp:
+        assert resp.headers["content-type"] == "text/event-stream"
+        pipeline.release.set()
+        kind = None
+        async for line in resp.aiter_lines():
+            if line.startswith("event: "):
+                kind = line.removeprefix("event: ")
+            elif line.startswith("data: "):
+                events.append((kind, json.loads(line.removeprefix("data: "))))
+
+    messages = [data["message"] for kind, data in events if kind == "log"]
+    assert messages[:2] == ["researching market 5", "judging market 5"]
+    assert events[-1][0] == "report"
+    assert events[-1][1]["status"] == "succeeded"
+
+
+@pytest.mark.asyncio
+async def test_pipeline_errors_become_failed_reports(api):
+    client, pipeline = api
+    pipeline.release.set()
+
+    resp = await client.post("/markets/13/resolve?wait=1")
+
+    body = resp.json()
+    assert body["status"] == "failed"
+    assert body["report"]["error"] == "rpc unavailable"
+
+
+@pytest.mark.asyncio
+async def test_auth_and_routing(api):
+    client, pipeline = api
+
+    assert (await client.post("/markets/1/resolve", headers={"Authorization": "Bearer wrong"})).status_code == 401
+    assert (await client.get("/markets/1/resolve")).status_code == 405
+    assert (await client.get("/markets/1/report")).status_code == 404
+    assert (await client.get("/nope")).status_code == 404
+    assert (await client.get("/metrics")).status_code == 404
+    assert pipeline.calls == []
+
+
+@pytest.mark.asyncio
+async def test_metrics_are_served_from_the_scheduler():
+    queue = ResolutionQueue()
+    queue.push(MarketInfo(
+        id=1, title="t", description="d", resolution_deadline=0,
+        yes_pool=40, no_pool=60, status=MarketStatus.LOCKED,
+    ))
+
+    def metrics() -> SchedulerMetrics:
+        return SchedulerMetrics(tracked=3, resolving=2, given_up=1, queue=queue.metrics())
+
+    server = ResolutionAPI(ResolutionService(_FakePipeline()), metrics=metrics)
+    port = await server.start("127.0.0.1", 0)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=5) as client:
+            body = (await client.get("/metrics")).json()
+    finally:
+        await server.close()
+
+    assert (body["tracked"], body["resolving"], body["given_up"]) == (3, 2, 1)
+    assert (body["queue"]["depth"], body["queue"]["queued_value"]) == (1, 100)
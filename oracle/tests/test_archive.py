@@ -0,0 +1,113 @@
+"""Tests for src.archive — Parquet archive of oracle decisions."""
+
+from datetime import datetime, timedelta, timezone
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.archive import DecisionArchive, compact, provider_summary, scan
+from src.types import ConsensusResult, JudgmentResult, Outcome, ResolveReport
+
+DAY = datetime(2026, 10, 18, 12, tzinfo=timezone.utc)
+
+
+def _report(market_id: int, outcome: Outcome = Outcome.YES) -> ResolveReport:
+    judgments = [
+        JudgmentResult(provider="gemini", outcome=outcome, confidence=90, reasoning="r1"),
+        JudgmentResult(provider="claude", outcome=outcome, confidence=80, reasoning="r2"),
+        JudgmentResult(provider="openai", outcome=Outcome.NO, confidence=60, reasoning="r3"),
+    ]
+    consensus = ConsensusResult(
+        judgments=judgments,
+        final_outcome=outcome,
+        final_confidence=85,
+        consensus_reached=True,
+        agreeing_providers=["gemini", "claude"],
+        summary="2/3 agree",
+    )
+    return ResolveReport(market_id=market_id, market_title=f"Market {market_id}", consensus=consensus, tx_signature="sig")
+
+
+def _files(root, table):
+    return sorted(p.name for p in (root / table).rglob("*.parquet"))
+
+
+def test_reports_round_trip_with_dictionary_encoding(tmp_path):
+    archive = DecisionArchive(tmp_path)
+    archive.append(_report(1), now=DAY)
+    archive.append(ResolveReport(market_id=2, market_title="Market 2", error="rpc down"), now=DAY)
+    archive.close()
+
+    decisions = scan("decisions", tmp_path)
+    judgments = scan("judgments", tmp_path)
+
+    assert decisions.num_rows == 2 and judgments.num_rows == 3
+    assert decisions.column("error").to_pylist() == [None, "rpc down"]
+    assert decisions.column("tier").to_pylist() == ["panel", None]
+    assert pa.types.is_dictionary(judgments.schema.field("provider").type)
+    assert judgments.column("agreed").to_pylist() == [True, True, False]
+    assert str(judgments.column("date")[0]) == "2026-10-18"
+    file = next((tmp_path / "judgments").rglob("*.parquet"))
+    column = pq.ParquetFile(file).metadata.row_group(0).column(2)
+    assert "RLE_DICTIONARY" in column.encodings
+    assert column.compression == "ZSTD"
+
+
+def test_writer_streams_row_groups_and_hides_open_files(tmp_path):
+    now = [0.0]
+    archive = DecisionArchive(tmp_path, flush_rows=2, roll_seconds=60, clock=lambda: now[0])
+    for market_id in range(5):
+        archive.append(_report(market_id), now=DAY)
+
+    # Two full row groups are on disk, but only in an unfinished dot-file.
+    assert scan("decisions", tmp_path).num_rows == 0
+    assert len(list((tmp_path / "decisions").rglob(".part-*.parquet"))) == 1
+
+    now[0] = 61
+    archive.flush()
+    assert scan("decisions", tmp_path).num_rows == 5
+    (file,) = (tmp_path / "decisions").rglob("part-*.parquet")
+    assert pq.ParquetFile(file).metadata.num_row_groups == 3
+
+    # Rows for a new day go to a new partition.
+    archive.append(_report(9), now=DAY + timedelta(days=1))
+    archive.close()
+    assert len(_files(tmp_path, "decisions")) == 2
+
+
+def test_scan_pushes_down_filters(tmp_path):
+    archive = DecisionArchive(tmp_path)
+    for offset in range(5):
+        archive.append(_report(offset, Outcome.YES if offset % 2 else Outcome.NO), now=DAY + timedelta(days=offset))
+    archive.close()
+
+    window = scan("decisions", tmp_path, columns=["market_id"], since=DAY + timedelta(days=1), until=DAY + timedelta(days=3))
+    assert window.column_names == ["market_id"]
+    assert window.column("market_id").to_pylist() == [1, 2]
+
+    claude = scan("judgments", tmp_path, market_ids=[3, 4], providers=["claude"])
+    assert sorted(claude.column("market_id").to_pylist()) == [3, 4]
+    assert set(claude.column("provider").to_pylist()) == {"claude"}
+
+    summary = {row["provider"]: row for row in provider_summary(scan("judgments", tmp_path)).to_pylist()}
+    assert summary["openai"]["judgments"] == 5
+    assert summary["openai"]["agreement"] == 0.0
+    assert summary["gemini"]["mean_confidence"] == 90
+
+
+def test_compact_merges_a_days_files(tmp_path):
+    for market_id in range(3):
+        archive = DecisionArchive(tmp_path)
+        archive.append(_report(market_id), now=DAY)
+        archive.close()
+    assert len(_files(tmp_path, "judgments")) == 3
+
+    assert compact(DAY.date(), tmp_path) == 6
+
+    assert len(_files(tmp_path, "decisions")) == len(_files(tmp_path, "judgments")) == 1
+    assert sorted(scan("decisions", tmp_path).column("market_id").to_pylist()) == [0, 1, 2]
+    assert scan("judgments", tmp_path).num_rows == 9
+
+
+def test_scan_of_an_empty_archive(tmp_path):
+    assert scan("decisions", tmp_path).num_rows == 0
@@ -0,0 +1,243 @@
+"""Tests for src.batch — batched judgment against a local vendor stub server."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.batch import BatchMarket, run_batch_judgment
+from src.registry import PanelConfig, ProviderSpec
+from src.types import JudgmentResult, Outcome, ResearchContext
+
+
+def _answer(outcome: str, confidence: int) -> str:
+    return json.dumps({"outcome": outcome, "confidence": confidence, "reasoning": f"batch says {outcome}"})
+
+
+class BatchStub:
+    """Minimal stand-in for the Anthropic Message Batches and OpenAI Batch APIs.
+
+    Each batch reports "in progress" on the first poll and finished on the
+    second. `answers` maps (vendor, custom_id) to the raw model text; requests
+    without an answer come back as errored.
+    """
+
+    def __init__(self):
+        self.answers: dict[tuple[str, str], str] = {}
+        self.anthropic_requests: list[dict] = []
+        self.openai_requests: list[dict] = []
+        self.polls = {"anthropic": 0, "openai": 0}
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: str, content_type: str = "application/json"):
+                data = body.encode()
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.path == "/v1/messages/batches":
+                    stub.anthropic_requests = json.loads(body)["requests"]
+                    self._send(200, json.dumps(stub._anthropic_batch(ended=False)))
+                elif self.path == "/v1/files":
+                    stub.openai_requests = [
+                        json.loads(line)
+                        for line in body.decode(errors="replace").splitlines()
+                        if line.startswith('{"custom_id"')
+                    ]
+                    self._send(200, json.dumps({
+                        "id": "file-in", "object": "file", "bytes": len(body), "created_at": 0,
+                        "filename": "sibyl-judgments.jsonl", "purpose": "batch", "status": "processed",
+                    }))
+                elif self.path == "/v1/batches":
+                    self._send(200, json.dumps(stub._openai_batch(completed=False)))
+                else:
+                    self._send(404, "{}")
+
+            def do_GET(self):
+                if self.path == "/v1/messages/batches/msgbatch_1":
+                    stub.polls["anthropic"] += 1
+                    self._send(200, json.dumps(stub._anthropic_batch(ended=stub.polls["anthropic"] > 1)))
+                elif self.path == "/v1/messages/batches/msgbatch_1/results":
+                    self._send(200, stub._anthropic_results(), "application/binary")
+                elif self.path == "/v1/batches/batch_1":
+                    stub.polls["openai"] += 1
+                    self._send(200, json.dumps(stub._openai_batch(completed=stub.polls["openai"] > 1)))
+                elif self.path == "/v1/files/file-out/content":
+                    self._send(200, stub._openai_results(), "application/octet-stream")
+                else:
+                    self._send(404, "{}")
+
+        return Handler
+
+    def _anthropic_batch(self, ended: bool) -> dict:
+        return {
+            "id": "msgbatch_1",
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {"processing": 0, "succeeded": 0, "errored": 0, "canceled": 0, "expired": 0},
+            "created_at": "2026-01-01T00:00:00Z",
+            "expires_at": "2026-01-02T00:00:00Z",
+            "ended_at": "2026-01-01T00:01:00Z" if ended else None,
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "results_url": f"{self.url}/v1/messages/batches/msgbatch_1/results" if ended else None,
+        }
+
+    def _anthropic_results(self) -> str:
+        lines = []
+        for req in self.anthropic_requests:
+            text = self.answers.get(("anthropic", req["custom_id"]))
+            if text is None:
+                result = {"type": "errored", "error": {"type": "error", "error": {"type": "api_error", "message": "boom"}}}
+            else:
+                result = {"type": "succeeded", "message": {
+                    "id": "msg_1", "type": "message", "role": "assistant", "model": req["params"]["model"],
+                    "content": [{"type": "tool_use", "id": "toolu_1", "name": "submit_judgment", "input": json.loads(text)}],
+                    "stop_reason": "tool_use", "stop_sequence": None,
+                    "usage": {"input_tokens": 1, "output_tokens": 1},
+                }}
+            lines.append(json.dumps({"custom_id": req["custom_id"], "result": result}))
+        return "\n".join(lines)
+
+    def _openai_batch(self, completed: bool) -> dict:
+        return {
+            "id": "batch_1",
+            "object": "batch",
+            "endpoint": "/v1/chat/completions",
+            "input_file_id": "file-in",
+            "completion_window": "24h",
+            "status": "completed" if completed else "in_progress",
+            "output_file_id": "file-out" if completed else None,
+            "created_at": 0,
+        }
+
+    def _openai_results(self) -> str:
+        lines = []
+        for req in self.openai_requests:
+            text = self.answers.get(("openai", req["custom_id"]))
+            if text is None:
+                record = {"custom_id": req["custom_id"], "response": {"status_code": 500, "body": {}}, "error": "boom"}
+            else:
+                record = {"custom_id": req["custom_id"], "error": None, "response": {
+                    "status_code": 200,
+                    "body": {"choices": [{"index": 0, "message": {"role": "assistant", "content": text}}]},
+                }}
+            lines.append(json.dumps(record))
+        return "\n".join(lines)
+
+
+@pytest.fixture
+def batch_stub(monkeypatch):
+    stub = BatchStub()
+    thread = threading.Thread(target=stub.server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setenv("ANTHROPIC_BASE_URL", stub.url)
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_BASE_URL", f"{stub.url}/v1")
+    yield stub
+    stub.server.shutdown()
+    stub.server.server_close()
+
+
+def _gemini(outcome: Outcome, confidence: int) -> JudgmentResult:
+    return JudgmentResult(provider="gemini-3-pro", outcome=outcome, confidence=confidence, reasoning="realtime")
+
+
+MARKETS = [
+    BatchMarket(market_id=1, title="Market one", description="Desc one"),
+    BatchMarket(market_id=2, title="Market two", description="Desc two"),
+]
+
+
+@pytest.mark.asyncio
+async def test_batch_judgment_reaches_consensus_per_market(batch_stub):
+    batch_stub.answers = {
+        ("anthropic", "market-1"): _answer("Yes", 90),
+        ("anthropic", "market-2"): _answer("No", 80),
+        ("openai", "market-1"): _answer("Yes", 70),
+        ("openai", "market-2"): _answer("No", 60),
+    }
+    gemini_judge = AsyncMock(side_effect=[_gemini(Outcome.YES, 80), _gemini(Outcome.YES, 50)])
+
+    with patch("src.providers.gemini.judge", gemini_judge), \
+         patch("src.batch.gather_research", AsyncMock(return_value=ResearchContext())):
+        results = await run_batch_judgment(MARKETS, poll_interval=0)
+
+    assert results[1].final_outcome == Outcome.YES
+    assert results[1].final_confidence == 80  # avg(80, 90, 70)
+    assert len(results[1].agreeing_providers) == 3
+    assert results[2].final_outcome == Outcome.NO
+    assert results[2].final_confidence == 70  # avg(80, 60)
+    assert batch_stub.polls["anthropic"] >= 2 and batch_stub.polls["openai"] >= 2
+
+
+@pytest.mark.asyncio
+async def test_batch_requests_carry_market_prompts(batch_stub):
+    batch_stub.answers = {("anthropic", "market-1"): _answer("Yes", 90), ("openai", "market-1"): _answer("Yes", 90)}
+
+    with patch("src.providers.gemini.judge", AsyncMock(return_value=_gemini(Outcome.YES, 90))), \
+         patch("src.batch.gather_research", AsyncMock(return_value=ResearchContext())):
+        await run_batch_judgment(MARKETS[:1], poll_interval=0)
+
+    assert [r["custom_id"] for r in batch_stub.anthropic_requests] == ["market-1"]
+    assert "Market one" in batch_stub.anthropic_requests[0]["params"]["messages"][0]["content"]
+    assert batch_stub.openai_requests[0]["url"] == "/v1/chat/completions"
+    assert "Desc one" in batch_stub.openai_requests[0]["body"]["messages"][1]["content"]
+
+
+@pytest.mark.asyncio
+async def test_errored_batch_entries_drop_out_of_quorum(batch_stub):
+    """Per-request failures behave like a failed real-time provider call."""
+    batch_stub.answers = {("anthropic", "market-1"): _answer("Yes", 90)}  # openai errors
+
+    with patch("src.providers.gemini.judge", AsyncMock(side_effect=Exception("down"))), \
+         patch("src.batch.gather_research", AsyncMock(return_value=ResearchContext())):
+        results = await run_batch_judgment(MARKETS[:1], poll_interval=0)
+
+    assert results[1].final_outcome == Outcome.INVALID
+    assert results[1].consensus_reached is False
+    assert len(results[1].judgments) == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_follows_the_configured_panel(batch_stub):
+    """Seats, models, labels and quorum come from the panel, not a fixed trio."""
+    batch_stub.answers = {("anthropic", "market-1"): _answer("No", 90)}
+    panel = PanelConfig(
+        providers=[
+            ProviderSpec(name="haiku", module="claude", model="claude-haiku-4-5"),
+            ProviderSpec(name="flash", module="gemini", model="gemini-3-flash"),
+        ],
+        quorum=2,
+    )
+    gemini_judge = AsyncMock(return_value=_gemini(Outcome.NO, 70))
+
+    with patch("src.providers.gemini.judge", gemini_judge), \
+         patch("src.batch.gather_research", AsyncMock(return_value=ResearchContext())):
+        results = await run_batch_judgment(MARKETS[:1], poll_interval=0, panel=panel)
+
+    assert results[1].final_outcome == Outcome.NO
+    assert sorted(results[1].agreeing_providers) == ["flash", "haiku"]
+    assert batch_stub.anthropic_requests[0]["params"]["model"] == "claude-haiku-4-5"
+    assert batch_stub.openai_requests == []
+    assert gemini_judge.call_args.kwargs == {"model": "gemini-3-flash"}
+
+
+@pytest.mark.asyncio
+async def test_empty_batch_is_a_no_op():
+    assert await run_batch_judgment([]) == {}
@@ -0,0 +1,102 @@
+"""Tests for src.cassette — record/replay of outbound HTTP traffic."""
+
+import asyncio
+import gzip
+import json
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from src.cassette import RECORD, REPLAY, CassetteMiss, use_cassette
+
+
+@pytest_asyncio.fixture
+async def server():
+    """A tiny HTTP server: JSON-RPC echo with a call counter, plus a gzipped page."""
+    calls = {"n": 0}
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        head = (await reader.readuntil(b"\r\n\r\n")).decode()
+        request_line, *header_lines = head.split("\r\n")
+        headers = {k.lower(): v for k, v in (line.split(": ", 1) for line in header_lines if line)}
+        body = await reader.readexactly(int(headers.get("content-length", 0)))
+        calls["n"] += 1
+        extra = ""
+        if request_line.startswith("POST"):
+            payload = json.loads(body)
+            content = json.dumps({"jsonrpc": "2.0", "id": payload["id"], "result": calls["n"]}).encode()
+        else:
+            content = gzip.compress(b"<p>Fed cuts rates</p>")
+            extra = "Content-Encoding: gzip\r\n"
+        writer.write(
+            f"HTTP/1.1 200 OK\r\nContent-Length: {len(content)}\r\n{extra}Connection: close\r\n\r\n".encode() + content
+        )
+        await writer.drain()
+        writer.close()
+
+    srv = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = srv.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}", calls
+    srv.close()
+    await srv.wait_closed()
+
+
+def _rpc(request_id: int, method: str = "getSlot") -> dict:
+    return {"jsonrpc": "2.0", "id": request_id, "method": method, "params": []}
+
+
+@pytest.mark.asyncio
+async def test_replay_serves_recorded_responses_without_network(server, tmp_path):
+    url, calls = server
+    path = tmp_path / "run.jsonl.gz"
+
+    with use_cassette(path, RECORD) as recording:
+        async with httpx.AsyncClient() as client:
+            page = await client.get(f"{url}/page?api-key=secret")
+            first = await client.post(f"{url}/rpc", json=_rpc(1))
+            second = await client.post(f"{url}/rpc", json=_rpc(2))
+            other = await client.post(f"{url}/rpc", json=_rpc(3, "getHealth"))
+    assert page.text == "<p>Fed cuts rates</p>"
+    assert [first.json()["result"], second.json()["result"], other.json()["result"]] == [2, 3, 4]
+    assert len(recording.interactions) == 4
+
+    with use_cassette(path, REPLAY) as replay:
+        async with httpx.AsyncClient() as client:
+            assert (await client.get(f"{url}/page?api-key=other")).text == "<p>Fed cuts rates</p>"
+            # Identical requests replay in recorded order, whatever their JSON-RPC id.
+            replayed = [(await client.post(f"{url}/rpc", json=_rpc(i))).json() for i in (40, 41, 42)]
+            # A body that was never recorded gets the next unused response for its URL.
+            fuzzy = await client.post(f"{url}/rpc", json=_rpc(43, "getVersion"))
+            with pytest.raises(CassetteMiss):
+                await client.get(f"{url}/never-recorded")
+
+    assert calls["n"] == 4
+    assert [(r["id"], r["result"]) for r in replayed] == [(40, 2), (41, 3), (42, 3)]
+    assert fuzzy.json()["result"] == 4
+    assert (replay.replayed, replay.fuzzy, replay.misses) == (5, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_cassettes_hold_no_credentials(server, tmp_path):
+    url, _ = server
+    path = tmp_path / "run.jsonl.gz"
+
+    with use_cassette(path, RECORD):
+        async with httpx.AsyncClient(headers={"X-Subscription-Token": "brave-secret"}) as client:
+            await client.get(f"{url}/search?q=fed&key=gemini-secret")
+
+    saved = gzip.decompress(path.read_bytes()).decode()
+    assert "secret" not in saved
+    assert "q=fed&key=REDACTED" in saved
+
+
+@pytest.mark.asyncio
+async def test_transport_is_restored(tmp_path):
+    original = httpx.AsyncHTTPTransport.handle_async_request
+    with use_cassette(tmp_path / "empty.jsonl.gz", RECORD):
+        assert httpx.AsyncHTTPTransport.handle_async_request is not original
+    assert httpx.AsyncHTTPTransport.handle_async_request is original
+
+    with use_cassette(tmp_path / "empty.jsonl.gz", REPLAY) as replay:
+        assert replay.interactions == []
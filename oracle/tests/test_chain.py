@@ -1,11 +1,31 @@
 """Tests for src.chain — Solana on-chain integration (mocked RPC)."""
 
+import base64
 import hashlib
+import struct
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
+from solders.hash import Hash
+from solders.keypair import Keypair
+
 from src.chain import (
+    MARKET_ACCOUNT_DISCRIMINATOR,
+    PROTOCOL_ACCOUNT_DISCRIMINATOR,
+    PROTOCOL_ACCOUNT_SIZE,
+    OracleSignerMismatch,
+    ProtocolCache,
+    SimulationCache,
+    SimulationRejected,
     compute_discriminator,
+    check_oracle_signer,
+    confirm_resolve,
+    decode_protocol,
+    fetch_markets,
+    describe_program_error,
+    submit_resolves,
+    verify_resolution,
     derive_protocol_pda,
     derive_market_pda,
     submit_resolve,
@@ -13,7 +33,7 @@ from src.chain import (
     PROTOCOL_SEED,
     MARKET_SEED,
 )
-from src.types import Outcome
+from src.types import MarketStatus, Outcome, ProtocolInfo, SimulationResult
 
 
 class TestComputeDiscriminator:
@@ -60,41 +80,86 @@ class TestDerivePda:
 
 
 @pytest.mark.asyncio
-async def test_submit_resolve_retries_on_failure(monkeypatch):
+async def test_submit_resolve_retries_on_failure():
     """submit_resolve retries up to MAX_RETRIES and eventually raises."""
     from solders.keypair import Keypair
     from solders.hash import Hash
     mock_keypair = Keypair()
 
-    monkeypatch.setenv("SOLANA_RPC_URL", "https://fake-rpc.test")
-
     mock_blockhash = MagicMock()
     mock_blockhash.value.blockhash = Hash.default()
 
     mock_client = AsyncMock()
     mock_client.get_latest_blockhash = AsyncMock(return_value=mock_blockhash)
     mock_client.send_transaction = AsyncMock(side_effect=Exception("RPC error"))
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=False)
+    mock_client.batch = AsyncMock(side_effect=[
+        [_simulated()],
+        [_unknown_statuses(1)], [_simulated()],
+        [_unknown_statuses(2)], [_simulated()],
+    ])
 
-    with patch("src.chain.load_keypair", return_value=mock_keypair), \
-         patch("src.chain.AsyncClient", return_value=mock_client):
+    with patch("src.chain.load_keypair", return_value=mock_keypair):
         with pytest.raises(Exception, match="RPC error"):
-            await submit_resolve(1, Outcome.YES, 85)
+            await submit_resolve(1, Outcome.YES, 85, client=mock_client, cache=SimulationCache())
 
-    # Should have been called MAX_RETRIES (3) times
+    # Should have been called MAX_RETRIES (3) times; each resend first checks
+    # the earlier signatures and re-simulates.
     assert mock_client.send_transaction.call_count == 3
+    methods = [[m for m, _ in c.args[0]] for c in mock_client.batch.call_args_list]
+    assert methods == [
+        ["simulateTransaction"],
+        ["getSignatureStatuses"], ["simulateTransaction"],
+        ["getSignatureStatuses"], ["simulateTransaction"],
+    ]
 
 
 @pytest.mark.asyncio
-async def test_submit_resolve_success(monkeypatch):
+async def test_submit_resolve_confirms_earlier_send_instead_of_resending():
+    """A send whose confirmation was lost is found by signature, not resent."""
+    client = AsyncMock()
+    client.get_latest_blockhash = AsyncMock(return_value=MagicMock(value=MagicMock(blockhash=Hash.default())))
+    client.send_transaction = AsyncMock(return_value=MagicMock(value="sig-1"))
+    landed = {"slot": 100, "err": None, "confirmationStatus": "confirmed"}
+    client.batch = AsyncMock(side_effect=[
+        [_simulated()],
+        Exception("connection dropped"),
+        [{"context": {"slot": 100}, "value": [landed]}],
+        _confirmed(_market_account(2, Outcome.YES, 85)),
+    ])
+
+    with patch("src.chain.load_keypair", return_value=Keypair()):
+        verification = await submit_resolve(1, Outcome.YES, 85, client=client, cache=SimulationCache())
+
+    assert verification.verified
+    assert client.send_transaction.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_submit_resolve_resimulates_before_resending():
+    """A retry whose earlier send is unknown re-simulates and stops if the resolve would now fail."""
+    client = AsyncMock()
+    client.get_latest_blockhash = AsyncMock(return_value=MagicMock(value=MagicMock(blockhash=Hash.default())))
+    client.send_transaction = AsyncMock(side_effect=Exception("RPC error"))
+    client.batch = AsyncMock(side_effect=[
+        [_simulated()],
+        [_unknown_statuses(1)],
+        [_simulated({"InstructionError": [0, {"Custom": 6010}]})],
+    ])
+
+    with patch("src.chain.load_keypair", return_value=Keypair()):
+        with pytest.raises(SimulationRejected, match="MarketNotResolvable"):
+            await submit_resolve(1, Outcome.YES, 85, client=client, cache=SimulationCache())
+
+    assert client.send_transaction.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_submit_resolve_success():
     """submit_resolve returns tx signature on success."""
     from solders.keypair import Keypair
     from solders.hash import Hash
     mock_keypair = Keypair()
 
-    monkeypatch.setenv("SOLANA_RPC_URL", "https://fake-rpc.test")
-
     mock_blockhash = MagicMock()
     mock_blockhash.value.blockhash = Hash.default()
 
@@ -104,13 +169,199 @@ async def test_submit_resolve_success(monkeypatch):
     mock_client = AsyncMock()
     mock_client.get_latest_blockhash = AsyncMock(return_value=mock_blockhash)
     mock_client.send_transaction = AsyncMock(return_value=mock_send_resp)
-    mock_client.confirm_transaction = AsyncMock()
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=False)
+    mock_client.batch = AsyncMock(side_effect=[[_simulated()], _confirmed(_market_account(2, Outcome.YES, 85))])
 
-    with patch("src.chain.load_keypair", return_value=mock_keypair), \
-         patch("src.chain.AsyncClient", return_value=mock_client):
-        sig = await submit_resolve(1, Outcome.YES, 85)
+    with patch("src.chain.load_keypair", return_value=mock_keypair):
+        verification = await submit_resolve(1, Outcome.YES, 85, client=mock_client, cache=SimulationCache())
 
-    assert sig == "fake-sig-123"
+    assert verification.signature == "fake-sig-123"
+    assert verification.verified
     assert mock_client.send_transaction.call_count == 1
+    assert mock_client.send_transaction.call_args.kwargs["opts"].skip_preflight
+    # Status and post-state come back in a single batched request.
+    assert mock_client.batch.call_count == 2
+    methods = [m for m, _ in mock_client.batch.call_args.args[0]]
+    assert methods == ["getSignatureStatuses", "getAccountInfo"]
+
+
+def _simulated(err=None) -> dict:
+    return {"context": {"slot": 1}, "value": {"err": err, "logs": ["Program log: x"], "unitsConsumed": 5000}}
+
+
+def _unknown_statuses(count: int) -> dict:
+    return {"context": {"slot": 1}, "value": [None] * count}
+
+
+@pytest.mark.asyncio
+async def test_submit_resolve_rejected_by_simulation_is_not_sent():
+    client = AsyncMock()
+    client.batch = AsyncMock(return_value=[_simulated({"InstructionError": [0, {"Custom": 6016}]})])
+
+    with patch("src.chain.load_keypair", return_value=Keypair()):
+        with pytest.raises(SimulationRejected, match="DeadlineNotReached"):
+            await submit_resolve(1, Outcome.YES, 85, client=client, cache=SimulationCache())
+
+    client.send_transaction.assert_not_called()
+    client.get_latest_blockhash.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_submit_resolves_simulates_in_one_batch_and_sends_survivors():
+    cache = SimulationCache()
+    client = AsyncMock()
+    client.get_latest_blockhash = AsyncMock(return_value=MagicMock(value=MagicMock(blockhash=Hash.default())))
+    client.send_transaction = AsyncMock(return_value=MagicMock(value="sig-1"))
+    client.batch = AsyncMock(side_effect=[
+        [_simulated(), _simulated({"InstructionError": [0, {"Custom": 2001}]})],
+        _confirmed(_market_account(2, Outcome.YES, 80)),
+    ])
+
+    with patch("src.chain.load_keypair", return_value=Keypair()):
+        results = await submit_resolves([(1, Outcome.YES, 80), (2, Outcome.NO, 60)], client=client, cache=cache)
+
+    assert results[1].verified
+    assert isinstance(results[2], SimulationRejected)
+    assert "signer is not the protocol oracle" in str(results[2])
+    simulate_calls = client.batch.call_args_list[0].args[0]
+    assert [m for m, _ in simulate_calls] == ["simulateTransaction", "simulateTransaction"]
+    assert simulate_calls[0][1][1]["sigVerify"] is False
+    assert client.send_transaction.call_count == 1
+    # The successful submit cleared its cached simulation; the failure stays cached.
+    assert cache.get((1, Outcome.YES, 80)) is None
+    assert cache.get((2, Outcome.NO, 60)).error.startswith("ConstraintHasOne")
+
+
+def test_simulation_cache_expires():
+    now = [0.0]
+    cache = SimulationCache(ttl=10, clock=lambda: now[0])
+    result = SimulationResult(market_id=1, ok=True)
+    cache.put((1, Outcome.YES, 90), result)
+    assert cache.get((1, Outcome.YES, 90)) is result
+    now[0] = 11
+    assert cache.get((1, Outcome.YES, 90)) is None
+
+
+def test_describe_program_error():
+    assert describe_program_error({"InstructionError": [0, {"Custom": 6010}]}) == "MarketNotResolvable"
+    assert describe_program_error({"InstructionError": [0, {"Custom": 9999}]}) == "custom program error 9999"
+    assert describe_program_error("AccountNotFound") == "AccountNotFound"
+
+
+def _market_account(status: int, outcome: Outcome | None, confidence: int, market_id: int = 1) -> bytes:
+    title, desc = b"Will it?", b"desc"
+    data = MARKET_ACCOUNT_DISCRIMINATOR + struct.pack("<Q", market_id) + bytes(32)
+    data += struct.pack("<I", len(title)) + title + struct.pack("<I", len(desc)) + desc
+    data += struct.pack("<qQQ", 1_700_000_000, 10, 20) + bytes([status])
+    data += bytes([1, outcome.to_chain_value()]) if outcome else bytes([0])
+    return data + bytes([confidence])
+
+
+def _confirmed(account: bytes | None, tx_slot: int = 100, account_slot: int = 100) -> list:
+    return [
+        {"context": {"slot": tx_slot}, "value": [{"slot": tx_slot, "err": None, "confirmationStatus": "confirmed"}]},
+        {
+            "context": {"slot": account_slot},
+            "value": None if account is None else {"data": [base64.b64encode(account).decode(), "base64"]},
+        },
+    ]
+
+
+@pytest.mark.asyncio
+async def test_confirm_resolve_waits_for_post_state_at_tx_slot(monkeypatch):
+    monkeypatch.setattr("src.chain.CONFIRM_POLL_SECONDS", 0)
+    client = AsyncMock()
+    client.batch = AsyncMock(side_effect=[
+        _confirmed(_market_account(0, None, 0), tx_slot=100, account_slot=99),
+        _confirmed(_market_account(2, Outcome.NO, 70), tx_slot=100, account_slot=101),
+    ])
+
+    verification = await confirm_resolve(client, "sig", 1, Outcome.NO, 70)
+
+    assert client.batch.call_count == 2
+    assert verification.verified
+    assert verification.status == MarketStatus.RESOLVED
+
+
+@pytest.mark.asyncio
+async def test_confirm_resolve_reports_mismatched_post_state():
+    client = AsyncMock()
+    client.batch = AsyncMock(return_value=_confirmed(_market_account(2, Outcome.YES, 60)))
+
+    verification = await confirm_resolve(client, "sig", 1, Outcome.NO, 70)
+
+    assert not verification.verified
+    assert verification.mismatches == ["outcome is Yes, expected No", "confidence is 60, expected 70"]
+
+
+def test_verify_resolution_missing_account():
+    verification = verify_resolution("sig", 5, None, Outcome.YES, 90)
+    assert verification.mismatches == ["market account not found"]
+
+
+def test_decode_protocol():
+    keys = [Keypair().pubkey() for _ in range(4)]
+    data = PROTOCOL_ACCOUNT_DISCRIMINATOR + b"".join(bytes(k) for k in keys)
+    data += struct.pack("<HQQ", 250, 10**12, 42) + bytes([254])
+    assert len(data) == PROTOCOL_ACCOUNT_SIZE
+
+    protocol = decode_protocol(data)
+
+    assert [protocol.authority, protocol.oracle, protocol.sbyl_mint, protocol.treasury] == [str(k) for k in keys]
+    assert (protocol.fee_bps, protocol.swap_cap, protocol.market_count) == (250, 10**12, 42)
+
+
+def _protocol_account(oracle, market_count: int = 3) -> MagicMock:
+    keys = [Keypair().pubkey(), oracle, Keypair().pubkey(), Keypair().pubkey()]
+    data = PROTOCOL_ACCOUNT_DISCRIMINATOR + b"".join(bytes(k) for k in keys)
+    data += struct.pack("<HQQ", 250, 0, market_count) + bytes([254])
+    return MagicMock(value=MagicMock(data=data))
+
+
+@pytest.mark.asyncio
+async def test_protocol_cache_rereads_after_ttl():
+    now = [0.0]
+    oracle = Keypair().pubkey()
+    client = AsyncMock()
+    client.get_account_info = AsyncMock(side_effect=[_protocol_account(oracle, 3), _protocol_account(oracle, 4)])
+    cache = ProtocolCache(ttl=60, clock=lambda: now[0])
+
+    assert (await cache.get(client)).market_count == 3
+    now[0] = 30
+    assert (await cache.get(client)).market_count == 3
+    now[0] = 61
+    assert (await cache.get(client)).market_count == 4
+    assert client.get_account_info.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_check_oracle_signer_rejects_wrong_keypair():
+    oracle = Keypair()
+    protocol = ProtocolInfo(
+        authority="a", oracle=str(oracle.pubkey()), sbyl_mint="m", treasury="t",
+        fee_bps=250, swap_cap=0, market_count=3,
+    )
+    with patch("src.chain.get_protocol", AsyncMock(return_value=protocol)):
+        assert await check_oracle_signer(AsyncMock(), oracle) == protocol
+        with pytest.raises(OracleSignerMismatch, match="ORACLE_KEYPAIR_PATH"):
+            await check_oracle_signer(AsyncMock(), Keypair())
+
+
+@pytest.mark.asyncio
+async def test_fetch_markets_reads_by_address_in_chunks():
+    def accounts(pubkeys, **kwargs):
+        by_pda = {derive_market_pda(i)[0]: i for i in range(250)}
+        # Market 5 does not exist.
+        value = [
+            None if by_pda[k] == 5 else MagicMock(data=_market_account(0, None, 0, market_id=by_pda[k]))
+            for k in pubkeys
+        ]
+        return MagicMock(value=value, context=MagicMock(slot=100 + len(pubkeys)))
+
+    client = AsyncMock()
+    client.get_multiple_accounts = AsyncMock(side_effect=accounts)
+
+    slot, markets = await fetch_markets(client, list(range(250)))
+
+    assert [len(c.args[0]) for c in client.get_multiple_accounts.await_args_list] == [100, 100, 50]
+    assert [m.id for m in markets] == [i for i in range(250) if i != 5]
+    assert slot == 150
@@ -0,0 +1,189 @@
+"""Tests for src.claims — the claim keeper (mocked RPC)."""
+
+import struct
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from solders.hash import Hash
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+
+from src import claims
+from src.chain import (
+    CLAIM_DISCRIMINATOR,
+    POSITION_ACCOUNT_DISCRIMINATOR,
+    PROGRAM_ID,
+    TOKEN_PROGRAM_ID,
+    build_claim_ix,
+    derive_market_pda,
+    derive_vault_pda,
+)
+from src.claims import (
+    MAX_TRANSACTION_BYTES,
+    _transaction_size,
+    claim_payout,
+    find_claims,
+    pack_claims,
+    send_claims,
+    simulate_claims,
+)
+from src.types import ClaimResult, ClaimStatus, MarketInfo, MarketStatus, Outcome, PositionInfo, ProtocolInfo
+
+MINT = Pubkey.new_unique()
+TREASURY = Pubkey.new_unique()
+
+
+def _market(market_id: int, yes_pool: int = 200, no_pool: int = 300, outcome: Outcome | None = Outcome.YES) -> MarketInfo:
+    return MarketInfo(
+        id=market_id,
+        title=f"Market {market_id}",
+        description="",
+        resolution_deadline=0,
+        yes_pool=yes_pool,
+        no_pool=no_pool,
+        status=MarketStatus.RESOLVED if outcome else MarketStatus.LOCKED,
+        outcome=outcome,
+    )
+
+
+def _position_info(side: Outcome, amount: int, claimed: bool = False) -> PositionInfo:
+    return PositionInfo(owner="o", market="m", side=side, amount=amount, claimed=claimed)
+
+
+def _position_account(owner: Pubkey, market_id: int, side: Outcome, amount: int, claimed: bool = False) -> bytes:
+    market_pda, _ = derive_market_pda(market_id)
+    return (
+        POSITION_ACCOUNT_DISCRIMINATOR + bytes(owner) + bytes(market_pda)
+        + bytes([side.to_chain_value()]) + struct.pack("<Q", amount) + bytes([claimed, 255])
+    )
+
+
+def _claims(owners: list[Keypair], markets: int) -> list[claims.Claim]:
+    return [
+        (
+            ClaimResult(market_id=m, owner=str(k.pubkey()), side=Outcome.YES, payout=1),
+            build_claim_ix(k.pubkey(), m, Outcome.YES, MINT, TREASURY),
+        )
+        for m in range(markets)
+        for k in owners
+    ]
+
+
+def test_claim_payout_mirrors_program_math():
+    market = _market(1, yes_pool=200, no_pool=300, outcome=Outcome.YES)
+    # 100 * 500 / 200 = 250 gross, 1% fee.
+    assert claim_payout(_position_info(Outcome.YES, 100), market, fee_bps=100) == 248
+    assert claim_payout(_position_info(Outcome.NO, 300), market, fee_bps=100) == 0
+    assert claim_payout(_position_info(Outcome.YES, 100, claimed=True), market, fee_bps=100) == 0
+
+    invalid = _market(2, yes_pool=200, no_pool=300, outcome=Outcome.INVALID)
+    assert claim_payout(_position_info(Outcome.NO, 300), invalid, fee_bps=100) == 500
+
+    unresolved = _market(3, outcome=None)
+    assert claim_payout(_position_info(Outcome.YES, 100), unresolved, fee_bps=100) == 0
+
+
+def test_build_claim_ix_derives_accounts():
+    owner = Pubkey.new_unique()
+    ix = build_claim_ix(owner, 7, Outcome.NO, MINT, TREASURY)
+
+    market_pda, _ = derive_market_pda(7)
+    position_pda, _ = Pubkey.find_program_address([b"position", bytes(market_pda), bytes(owner), bytes([1])], PROGRAM_ID)
+    accounts = [a.pubkey for a in ix.accounts]
+    assert ix.data == CLAIM_DISCRIMINATOR
+    assert accounts[1:4] == [market_pda, position_pda, derive_vault_pda(7)[0]]
+    assert accounts[5:] == [TREASURY, owner, TOKEN_PROGRAM_ID]
+    assert [a.is_signer for a in ix.accounts] == [False] * 6 + [True, False]
+
+
+def test_pack_claims_fills_transactions_up_to_the_size_limit():
+    owners = [Keypair() for _ in range(3)]
+    fee_payer = owners[0].pubkey()
+    all_claims = _claims(owners, markets=10)
+
+    batches = pack_claims(all_claims, fee_payer)
+
+    assert sum(len(b) for b in batches) == len(all_claims)
+    assert 1 < len(batches) < len(all_claims) // 2
+    for batch in batches:
+        assert _transaction_size([ix for _, ix in batch], fee_payer) <= MAX_TRANSACTION_BYTES
+    # Greedy: adding the next claim would not have fit.
+    for batch, following in zip(batches, batches[1:]):
+        ixs = [ix for _, ix in [*batch, following[0]]]
+        assert _transaction_size(ixs, fee_payer) > MAX_TRANSACTION_BYTES
+
+
+@pytest.mark.asyncio
+async def test_find_claims_keeps_payable_unclaimed_positions():
+    alice = Pubkey.new_unique()
+    protocol = ProtocolInfo(
+        authority=str(Pubkey.new_unique()), oracle=str(Pubkey.new_unique()), sbyl_mint=str(MINT),
+        treasury=str(Pubkey.new_unique()), fee_bps=100, swap_cap=0, market_count=3,
+    )
+    markets = [_market(0), _market(1, outcome=None), _market(2, outcome=Outcome.INVALID)]
+    accounts = [
+        _position_account(alice, 0, Outcome.YES, 100),
+        _position_account(alice, 0, Outcome.NO, 50),
+        _position_account(alice, 1, Outcome.YES, 100),
+        _position_account(alice, 2, Outcome.NO, 30, claimed=True),
+        _position_account(alice, 2, Outcome.YES, 40),
+    ]
+    with (
+        patch("src.claims.get_protocol", AsyncMock(return_value=protocol)),
+        patch("src.claims.fetch_market_snapshot", AsyncMock(return_value=(10, markets))),
+        patch("src.claims.fetch_position_accounts", AsyncMock(return_value=accounts)),
+    ):
+        found = await find_claims(AsyncMock(), [alice])
+
+    assert [(r.market_id, r.side, r.payout) for r, _ in found] == [(0, Outcome.YES, 248), (2, Outcome.YES, 100)]
+    assert all(r.status == ClaimStatus.PENDING for r, _ in found)
+
+
+@pytest.mark.asyncio
+async def test_simulate_claims_rejects_failing_claims():
+    owner = Keypair()
+    pending = _claims([owner], markets=2)
+    client = AsyncMock()
+    client.batch = AsyncMock(return_value=[
+        {"value": {"err": None, "logs": []}},
+        {"value": {"err": {"InstructionError": [0, {"Custom": 6013}]}, "logs": []}},
+    ])
+
+    survivors = await simulate_claims(client, pending, owner.pubkey())
+
+    assert [r.market_id for r, _ in survivors] == [0]
+    assert pending[1][0].status == ClaimStatus.REJECTED
+    assert pending[1][0].error == "NotWinner"
+    client.batch.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_send_claims_pipelines_sends_and_tracks_status(monkeypatch):
+    monkeypatch.setattr(claims, "CONFIRM_POLL_SECONDS", 0)
+    payer, other = Keypair(), Keypair()
+    batches = [_claims([payer, other], markets=1), _claims([other], markets=1)]
+    client = AsyncMock()
+    client.get_latest_blockhash = AsyncMock(
+        return_value=SimpleNamespace(value=SimpleNamespace(blockhash=Hash.default()))
+    )
+    client.send_transaction = AsyncMock(side_effect=[SimpleNamespace(value="sig-a"), SimpleNamespace(value="sig-b")])
+    polls = iter([
+        [{"value": [None, None]}],
+        [{"value": [{"slot": 5, "err": None, "confirmationStatus": "confirmed"}, None]}],
+        [{"value": [{"slot": 6, "err": {"InstructionError": [0, {"Custom": 6012}]}, "confirmationStatus": "confirmed"}]}],
+    ])
+    client.batch = AsyncMock(side_effect=lambda calls: next(polls))
+
+    await send_claims(client, batches, {str(k.pubkey()): k for k in (payer, other)}, payer)
+
+    first, second = [r for r, _ in batches[0]], [r for r, _ in batches[1]]
+    assert {(r.status, r.signature) for r in first} == {(ClaimStatus.CONFIRMED, "sig-a")}
+    assert second[0].status == ClaimStatus.FAILED
+    assert second[0].error == "AlreadyClaimed"
+    # Both transactions were sent before either confirmed, and each one was
+    # signed by the fee payer plus its owners only.
+    assert client.send_transaction.await_count == 2
+    signed = client.send_transaction.await_args_list[0].args[0]
+    assert len(signed.signatures) == 2
+    assert client.get_latest_blockhash.await_count == 1
@@ -0,0 +1,81 @@
+"""Tests for src.config — validated, hot-reloadable markets.json."""
+
+import json
+import os
+
+import pytest
+
+from src.config import MarketsConfig
+
+
+def _write(path, data, mtime_ns=None):
+    path.write_text(data if isinstance(data, str) else json.dumps(data))
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_loads_and_indexes_by_market_id(tmp_path):
+    path = tmp_path / "markets.json"
+    _write(path, {"0": {"sources": ["https://a"], "search_queries": ["q"]}, "7": {}})
+    config = MarketsConfig(path)
+
+    assert config.get(0).sources == ["https://a"]
+    assert config.get(7).search_queries == []
+    assert config.get(3) is None
+    assert config.market_ids() == [0, 7]
+
+
+def test_missing_file_means_no_config(tmp_path):
+    config = MarketsConfig(tmp_path / "markets.json")
+    assert config.get(0) is None
+
+
+@pytest.mark.parametrize("content", [
+    "{not json",
+    json.dumps({"zero": {}}),
+    json.dumps({"0": {"sourcse": ["typo"]}}),
+    json.dumps({"0": {"sources": "https://not-a-list"}}),
+])
+def test_invalid_file_fails_at_startup(tmp_path, content):
+    path = tmp_path / "markets.json"
+    _write(path, content)
+    with pytest.raises(ValueError):
+        MarketsConfig(path)
+
+
+def test_hot_reload_on_change(tmp_path):
+    path = tmp_path / "markets.json"
+    _write(path, {"0": {"sources": ["https://old"]}}, mtime_ns=1_000_000_000)
+    config = MarketsConfig(path, check_interval=0)
+
+    _write(path, {"0": {"sources": ["https://new"]}, "1": {}}, mtime_ns=2_000_000_000)
+
+    assert config.get(0).sources == ["https://new"]
+    assert config.get(1) is not None
+
+
+def test_bad_edit_keeps_last_good_config(tmp_path):
+    path = tmp_path / "markets.json"
+    _write(path, {"0": {"sources": ["https://good"]}}, mtime_ns=1_000_000_000)
+    config = MarketsConfig(path, check_interval=0)
+
+    _write(path, '{"0": {"sources": ["https://half-writ', mtime_ns=2_000_000_000)
+    assert config.get(0).sources == ["https://good"]
+    assert config.last_error is not None
+
+    _write(path, {"0": {"sources": ["https://fixed"]}}, mtime_ns=3_000_000_000)
+    assert config.get(0).sources == ["https://fixed"]
+    assert config.last_error is None
+
+
+def test_unchanged_file_is_not_reparsed(tmp_path, monkeypatch):
+    path = tmp_path / "markets.json"
+    _write(path, {"0": {}})
+    config = MarketsConfig(path, check_interval=0)
+
+    def fail():
+        raise AssertionError("re-parsed an unchanged file")
+
+    monkeypatch.setattr(config, "_parse", fail)
+    assert config.get(0) is not None
+    assert not config.reload_if_changed(force=True)
@@ -0,0 +1,104 @@
+"""Tests for src.evidence — cross-market evidence store with BM25 search."""
+
+import random
+import time
+
+from src.evidence import MAX_QUERY_TERMS, EvidenceStore, build_query
+from src.types import ResearchContext, SearchResult, SourceSummary
+
+FED_PAGE = """\
+Federal Reserve
+The Federal Open Market Committee voted to lower the federal funds rate by 25 basis points.
+Markets had priced in a rate cut after weaker payroll data in November.
+Subscribe
+"""
+ELECTION_PAGE = """\
+The electoral commission certified the results of the parliamentary election on Sunday.
+Turnout reached 71 percent according to the official count.
+"""
+
+
+def _research(url: str, page: str, snippets: list[tuple[str, str, str]] = ()) -> ResearchContext:
+    return ResearchContext(
+        source_summaries=[SourceSummary(url=url, content=page)],
+        search_results=[SearchResult(title=t, url=u, snippet=s) for t, u, s in snippets],
+    )
+
+
+def test_build_query_quotes_content_words():
+    assert build_query('Will the Fed cut rates by "December"?') == '"fed" OR "cut" OR "rates" OR "december"'
+    assert build_query("Will it be?") is None
+    assert build_query(" ".join(f"term{i}" for i in range(40))).count(" OR ") == MAX_QUERY_TERMS - 1
+
+
+def test_add_splits_and_deduplicates_passages():
+    store = EvidenceStore()
+    research = _research(
+        "https://fed.gov/a",
+        FED_PAGE,
+        [("Fed cuts", "https://news.example/fed", "The Fed lowered its benchmark rate by a quarter point on Wednesday.")],
+    )
+
+    # Two content lines from the page, the snippet; short lines are dropped.
+    assert store.add(research, market_id=1) == 3
+    assert store.add(research, market_id=2) == 0
+    assert store.stats() == {"passages": 3, "sources": 2, "markets": 2}
+
+
+def test_failed_sources_are_not_stored():
+    store = EvidenceStore()
+    research = ResearchContext(source_summaries=[SourceSummary(url="https://x", content=FED_PAGE, error="HTTP 500")])
+
+    assert store.add(research) == 0
+
+
+def test_search_ranks_by_bm25():
+    store = EvidenceStore()
+    store.add(_research("https://fed.gov/a", FED_PAGE), market_id=1)
+    store.add(_research("https://elections.example", ELECTION_PAGE), market_id=2)
+
+    results = store.search("Will the Federal Reserve cut the funds rate?")
+
+    assert results[0].url == "https://fed.gov/a"
+    assert "federal funds rate" in results[0].text
+    assert all(r.url == "https://fed.gov/a" for r in results)
+    assert results[0].score >= results[-1].score > 0
+    # Porter stemming matches inflected forms; FTS syntax in queries is literal.
+    assert store.search("certifying elections")[0].url == "https://elections.example"
+    assert store.search('turnout AND "NEAR(')[0].text.startswith("Turnout")
+    assert store.search("volcano eruption") == []
+
+
+def test_enrich_attaches_related_passages_from_other_sources():
+    store = EvidenceStore()
+    store.add(_research("https://fed.gov/a", FED_PAGE), market_id=1)
+    research = _research("https://fed.gov/b", "The committee statement noted easing inflation pressure overall.")
+
+    enriched = store.enrich(research, "Will the Fed cut rates in December?", "Resolves YES if the FOMC lowers the funds rate.", 2)
+
+    assert enriched.related and {p.url for p in enriched.related} == {"https://fed.gov/a"}
+    assert "### Related Evidence (earlier research)" in enriched.to_prompt_section()
+    assert research.related == []
+    # The new market's own research is stored for later markets.
+    assert store.stats()["markets"] == 2
+    again = store.enrich(research, "Fed committee statement inflation", "", 3)
+    assert "https://fed.gov/b" not in {p.url for p in again.related}
+
+
+def test_search_stays_fast_on_a_large_corpus():
+    store = EvidenceStore()
+    rng = random.Random(0)
+    words = [f"word{i}" for i in range(5000)]
+    pages = ["\n".join(" ".join(rng.choices(words, k=12)) for _ in range(20)) for _ in range(1000)]
+    for p, page in enumerate(pages):
+        store.add(_research(f"https://example/{p}", page), market_id=p)
+    store.optimize()
+    assert store.stats()["passages"] == 20_000
+
+    start = time.perf_counter()
+    for _ in range(20):
+        results = store.search("word17 word1234 word4000 word99", limit=8)
+    elapsed = (time.perf_counter() - start) / 20
+
+    assert len(results) == 8
+    assert elapsed < 0.05
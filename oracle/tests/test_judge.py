@@ -3,7 +3,8 @@
 import pytest
 from unittest.mock import AsyncMock, patch
 
-from src.judge import run_judgment
+from src.judge import build_consensus, run_judgment, tier_metrics
+from src.registry import CascadeConfig, PanelConfig, ProviderSpec
 from src.types import JudgmentResult, Outcome, ResearchContext
 
 
@@ -27,9 +28,9 @@ def _patch_providers(*judgments_or_none):
             m.return_value = j
         mocks.append(m)
     return (
-        patch("src.judge.gemini.judge", mocks[0]),
-        patch("src.judge.claude.judge", mocks[1]),
-        patch("src.judge.openai_provider.judge", mocks[2]),
+        patch("src.providers.gemini.judge", mocks[0]),
+        patch("src.providers.claude.judge", mocks[1]),
+        patch("src.providers.openai.judge", mocks[2]),
         patch("src.judge.gather_research", AsyncMock(return_value=ResearchContext())),
     )
 
@@ -138,3 +139,264 @@ async def test_confidence_averaging():
     assert result.final_outcome == Outcome.YES
     # avg of agreeing (100 + 60) / 2 = 80, NOT including the No provider
     assert result.final_confidence == 80
+
+
+# --- Weighted N-of-M panels ---
+
+
+def _panel(weights: dict[str, float], quorum: int = 2, early_exit: bool = False) -> PanelConfig:
+    return PanelConfig(
+        providers=[ProviderSpec(name=n, module="claude", weight=w) for n, w in weights.items()],
+        quorum=quorum,
+        early_exit=early_exit,
+    )
+
+
+def test_weighted_confidence():
+    panel = _panel({"a": 3.0, "b": 1.0, "c": 1.0})
+    result = build_consensus(
+        [
+            _make_judgment("a", Outcome.YES, 90),
+            _make_judgment("b", Outcome.YES, 50),
+            _make_judgment("c", Outcome.NO, 80),
+        ],
+        panel,
+    )
+    assert result.final_outcome == Outcome.YES
+    assert result.final_confidence == 80  # (3*90 + 1*50) / 4
+
+
+def test_heavier_minority_blocks_consensus():
+    """Two light votes do not beat one heavier dissent."""
+    panel = _panel({"a": 0.5, "b": 0.5, "c": 2.0})
+    result = build_consensus(
+        [
+            _make_judgment("a", Outcome.YES, 90),
+            _make_judgment("b", Outcome.YES, 90),
+            _make_judgment("c", Outcome.NO, 90),
+        ],
+        panel,
+    )
+    assert result.final_outcome == Outcome.INVALID
+    assert result.consensus_reached is False
+
+
+def test_tied_weights_are_invalid():
+    panel = _panel({"a": 1, "b": 1, "c": 1, "d": 1})
+    result = build_consensus(
+        [
+            _make_judgment("a", Outcome.YES, 90),
+            _make_judgment("b", Outcome.YES, 90),
+            _make_judgment("c", Outcome.NO, 90),
+            _make_judgment("d", Outcome.NO, 90),
+        ],
+        panel,
+    )
+    assert result.final_outcome == Outcome.INVALID
+
+
+def test_quorum_and_panel_size_in_summary():
+    panel = _panel({"a": 1, "b": 1, "c": 1, "d": 1, "e": 1}, quorum=3)
+    result = build_consensus([_make_judgment("a", Outcome.YES, 90), _make_judgment("b", Outcome.YES, 90)], panel)
+    assert result.final_outcome == Outcome.INVALID
+    assert "(2/5)" in result.summary
+
+
+@pytest.mark.asyncio
+async def test_run_judgment_uses_panel_models_and_labels():
+    judge_mock = AsyncMock(return_value=_make_judgment("claude-opus-4-5", Outcome.YES, 80))
+    panel = PanelConfig(
+        providers=[
+            ProviderSpec(name="claude-full", module="claude"),
+            ProviderSpec(name="claude-fast", module="claude", model="claude-haiku"),
+        ],
+        quorum=2,
+    )
+    with patch("src.providers.claude.judge", judge_mock), \
+         patch("src.judge.gather_research", AsyncMock(return_value=ResearchContext())):
+        result = await run_judgment("Test", "Desc", panel=panel)
+
+    assert result.consensus_reached is True
+    assert sorted(result.agreeing_providers) == ["claude-fast", "claude-full"]
+    models = [call.kwargs.get("model") for call in judge_mock.call_args_list]
+    assert set(models) == {None, "claude-haiku"}
+
+
+@pytest.mark.asyncio
+async def test_early_exit_skips_slow_provider():
+    """Once the pending weight cannot flip the result, slow seats are cancelled."""
+    import asyncio
+
+    async def slow(*args, **kwargs):
+        await asyncio.sleep(10)
+        return _make_judgment("openai", Outcome.NO, 99)
+
+    panel = PanelConfig(
+        providers=[
+            ProviderSpec(name="gemini-3-pro", module="gemini"),
+            ProviderSpec(name="claude-opus-4-5", module="claude"),
+            ProviderSpec(name="gpt-5.2", module="openai"),
+        ],
+        quorum=2,
+        early_exit=True,
+    )
+    with patch("src.providers.gemini.judge", AsyncMock(return_value=_make_judgment("g", Outcome.YES, 90))), \
+         patch("src.providers.claude.judge", AsyncMock(return_value=_make_judgment("c", Outcome.YES, 70))), \
+         patch("src.providers.openai.judge", slow), \
+         patch("src.judge.gather_research", AsyncMock(return_value=ResearchContext())):
+        result = await asyncio.wait_for(run_judgment("Test", "Desc", panel=panel), timeout=2)
+
+    assert result.final_outcome == Outcome.YES
+    assert result.final_confidence == 80
+    assert len(result.judgments) == 2
+
+
+@pytest.mark.asyncio
+async def test_streamed_verdicts_decide_before_reasoning_finishes():
+    """With streaming + early exit, consensus fires on parsed verdicts."""
+    import asyncio
+
+    reasoning_gate = asyncio.Event()
+    decided_before_reasoning = []
+
+    def streaming(provider: str, outcome: Outcome, confidence: int, block: bool):
+        async def judge_stream(title, description, research, on_verdict=None, **kwargs):
+            verdict = JudgmentResult(provider=provider, outcome=outcome, confidence=confidence, reasoning="")
+            on_verdict(verdict)
+            if block:
+                await reasoning_gate.wait()
+            return verdict.model_copy(update={"reasoning": f"{provider} full reasoning"})
+        return judge_stream
+
+    async def never(*args, **kwargs):
+        await asyncio.sleep(10)
+
+    def on_consensus(result):
+        decided_before_reasoning.append((result, reasoning_gate.is_set()))
+        reasoning_gate.set()
+
+    panel = PanelConfig(
+        providers=[
+            ProviderSpec(name="gemini-3-pro", module="gemini"),
+            ProviderSpec(name="claude-opus-4-5", module="claude"),
+            ProviderSpec(name="gpt-5.2", module="openai"),
+        ],
+        quorum=2,
+        early_exit=True,
+        stream=True,
+    )
+    with patch("src.providers.gemini.judge_stream", streaming("g", Outcome.NO, 80, block=True)), \
+         patch("src.providers.claude.judge_stream", streaming("c", Outcome.NO, 60, block=True)), \
+         patch("src.providers.openai.judge_stream", never), \
+         patch("src.judge.gather_research", AsyncMock(return_value=ResearchContext())):
+        result = await asyncio.wait_for(
+            run_judgment("Test", "Desc", panel=panel, on_consensus=on_consensus), timeout=2
+        )
+
+    assert len(decided_before_reasoning) == 1
+    early, reasoning_done = decided_before_reasoning[0]
+    assert reasoning_done is False
+    assert (early.final_outcome, early.final_confidence) == (Outcome.NO, 70)
+    assert (result.final_outcome, result.final_confidence) == (Outcome.NO, 70)
+    assert [j.reasoning for j in result.judgments] == ["g full reasoning", "c full reasoning"]
+    assert [j.provider for j in result.judgments] == ["gemini-3-pro", "claude-opus-4-5"]
+
+
+# --- Cascade ---
+
+
+def _cascade_panel(min_confidence: int = 85) -> PanelConfig:
+    """Cheap seats on the gemini module, the full panel on claude."""
+    return PanelConfig(
+        providers=[ProviderSpec(name=n, module="claude") for n in ("p1", "p2", "p3")],
+        quorum=2,
+        cascade=CascadeConfig(
+            providers=[
+                ProviderSpec(name="fast", module="gemini", model="flash"),
+                ProviderSpec(name="check", module="gemini", model="lite"),
+            ],
+            min_confidence=min_confidence,
+        ),
+    )
+
+
+async def _run_cascade(fast, check, panel_outcome=Outcome.YES):
+    """Run a cascade judgment; `fast`/`check` are (outcome, confidence) or None to fail."""
+    def cheap(title, desc, research, model):
+        verdict = {"flash": fast, "lite": check}[model]
+        if verdict is None:
+            raise Exception("Provider failed")
+        return _make_judgment("gemini", *verdict)
+
+    gemini = AsyncMock(side_effect=cheap)
+    full = AsyncMock(return_value=_make_judgment("claude", panel_outcome, 70))
+    with patch("src.providers.gemini.judge", gemini), patch("src.providers.claude.judge", full), \
+         patch("src.judge.gather_research", AsyncMock(return_value=ResearchContext())):
+        result = await run_judgment("Test", "Desc", panel=_cascade_panel())
+    return result, gemini, full
+
+
+@pytest.mark.asyncio
+async def test_cascade_settles_confident_agreement_without_the_panel():
+    result, gemini, full = await _run_cascade((Outcome.NO, 95), (Outcome.NO, 85))
+
+    assert (result.final_outcome, result.final_confidence, result.tier) == (Outcome.NO, 90, "cascade")
+    assert result.agreeing_providers == ["fast", "check"]
+    assert gemini.await_count == 2
+    full.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_unsure_fast_seat_escalates_without_the_second_seat():
+    result, gemini, full = await _run_cascade((Outcome.YES, 60), (Outcome.YES, 99))
+
+    assert gemini.await_count == 1
+    assert full.await_count == 3
+    assert (result.final_outcome, result.final_confidence, result.tier) == (Outcome.YES, 70, "panel")
+    # The cascade's judgment is kept for the ledger but did not vote.
+    assert [j.provider for j in result.judgments] == ["p1", "p2", "p3", "fast"]
+    assert result.agreeing_providers == ["p1", "p2", "p3"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fast, check, reason", [
+    ((Outcome.YES, 90), (Outcome.NO, 90), "disagreement"),
+    ((Outcome.YES, 90), (Outcome.YES, 80), "low_confidence"),
+    ((Outcome.INVALID, 99), (Outcome.INVALID, 99), "invalid"),
+    ((Outcome.YES, 90), None, "failed"),
+])
+async def test_cascade_escalation_reasons(fast, check, reason):
+    result, _, full = await _run_cascade(fast, check, panel_outcome=Outcome.NO)
+
+    assert result.tier == "panel" and result.final_outcome == Outcome.NO
+    assert full.await_count == 3
+    tiers = {t.tier: t for t in tier_metrics()}
+    assert (tiers["cascade"].markets, tiers["cascade"].settled, tiers["cascade"].escalated) == (1, 0, {reason: 1})
+    assert (tiers["panel"].markets, tiers["panel"].settled, tiers["panel"].provider_calls) == (1, 1, 3)
+
+
+@pytest.mark.asyncio
+async def test_tier_metrics_count_calls_saved():
+    await _run_cascade((Outcome.YES, 95), (Outcome.YES, 95))
+    await _run_cascade((Outcome.YES, 95), (Outcome.YES, 95))
+    await _run_cascade((Outcome.YES, 50), (Outcome.YES, 95))
+
+    cascade, panel = tier_metrics()
+    assert (cascade.markets, cascade.settled, cascade.provider_calls) == (3, 2, 5)
+    assert cascade.escalated == {"low_confidence": 1}
+    assert (panel.markets, panel.provider_calls) == (1, 3)
+
+
+@pytest.mark.asyncio
+async def test_disabled_cascade_goes_straight_to_the_panel():
+    panel = _cascade_panel()
+    panel.cascade.enabled = False
+    gemini = AsyncMock()
+    with patch("src.providers.gemini.judge", gemini), \
+         patch("src.providers.claude.judge", AsyncMock(return_value=_make_judgment("claude", Outcome.YES, 80))), \
+         patch("src.judge.gather_research", AsyncMock(return_value=ResearchContext())):
+        result = await run_judgment("Test", "Desc", panel=panel)
+
+    gemini.assert_not_awaited()
+    assert result.tier == "panel" and result.consensus_reached
+    assert [t.tier for t in tier_metrics()] == ["panel"]
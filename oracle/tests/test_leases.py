@@ -0,0 +1,135 @@
+"""Tests for src.leases — lease-based coordination of resolver workers."""
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from src.leases import HashRing, LeaseCoordinator, SqliteLeaseStore
+from src.types import MarketInfo, MarketStatus
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _market(market_id: int, deadline: int = 1000) -> MarketInfo:
+    return MarketInfo(
+        id=market_id, title="t", description="d", resolution_deadline=deadline,
+        yes_pool=0, no_pool=0, status=MarketStatus.LOCKED,
+    )
+
+
+def test_leases_are_exclusive_until_they_expire():
+    store = SqliteLeaseStore()
+
+    assert store.acquire(7, "a", ttl=60, now=0)
+    assert store.acquire(7, "a", ttl=60, now=10)  # re-acquire extends
+    assert not store.acquire(7, "b", ttl=60, now=69)
+    assert store.holder(7, now=69) == "a"
+    # a crashed: its lease runs out and b steals it.
+    assert store.acquire(7, "b", ttl=60, now=70)
+    assert store.renew([7], "a", ttl=60, now=71) == set()
+    store.release(7, "a")  # not a's to release any more
+    assert store.holder(7, now=71) == "b"
+    store.release(7, "b")
+    assert store.holder(7, now=71) is None
+
+
+def test_concurrent_workers_never_share_a_lease(tmp_path):
+    path = tmp_path / "leases.db"
+    SqliteLeaseStore(path).close()
+
+    def worker(name: str) -> list[int]:
+        store = SqliteLeaseStore(path)
+        try:
+            return [m for m in range(200) if store.acquire(m, name, ttl=60, now=0)]
+        finally:
+            store.close()
+
+    with ThreadPoolExecutor(4) as pool:
+        won = list(pool.map(worker, ["w0", "w1", "w2", "w3"]))
+
+    assert sorted(m for markets in won for m in markets) == list(range(200))
+
+
+def test_hash_ring_is_balanced_and_stable():
+    markets = range(10_000)
+    three = HashRing(["w0", "w1", "w2"])
+    four = HashRing(["w0", "w1", "w2", "w3"])
+
+    shares = Counter(three.owner(m) for m in markets)
+    assert min(shares.values()) > 2500
+    moved = [m for m in markets if three.owner(m) != four.owner(m)]
+    # Only about a quarter of the markets move, all of them to the new worker.
+    assert 1500 < len(moved) < 3500
+    assert {four.owner(m) for m in moved} == {"w3"}
+    assert HashRing([]).owner(1) is None
+
+
+def test_coordinators_split_markets_and_take_over_from_a_crashed_worker():
+    store, clock = SqliteLeaseStore(), Clock()
+    a = LeaseCoordinator(store, "a", ttl=60, steal_after=600, clock=clock)
+    b = LeaseCoordinator(store, "b", ttl=60, steal_after=600, clock=clock)
+    api = LeaseCoordinator(store, "api", ttl=60, member=False, clock=clock)
+    for worker in (a, b, api):
+        worker.beat()
+    a.beat()
+
+    markets = [_market(m) for m in range(100)]
+    mine_a = {m.id for m in markets if a.assigned(m)}
+    mine_b = {m.id for m in markets if b.assigned(m)}
+    assert a.ring.workers == ["a", "b"]
+    assert mine_a and mine_b and not mine_a & mine_b and len(mine_a | mine_b) == 100
+
+    market_id = min(mine_a)
+    with a.lease(market_id) as acquired:
+        assert acquired
+        assert not b.acquire(market_id)
+        assert b.leased_report(market_id).error == f"Market {market_id} is leased by a"
+    assert b.holder(market_id) is None
+
+    # a crashes holding a lease: b keeps heartbeating and inherits a's share.
+    assert a.acquire(market_id)
+    clock.now += 61
+    b.beat()
+    assert b.ring.workers == ["b"]
+    assert all(b.assigned(m) for m in markets)
+    assert b.acquire(market_id)
+    clock.now += 1
+    a.beat()  # a comes back to find the lease gone
+    assert market_id not in a.held
+
+
+def test_stuck_owner_markets_open_up_after_the_steal_window():
+    store, clock = SqliteLeaseStore(), Clock(now=1000)
+    a = LeaseCoordinator(store, "a", steal_after=600, clock=clock)
+    b = LeaseCoordinator(store, "b", steal_after=600, clock=clock)
+    a.beat()
+    b.beat()
+    a.beat()
+    theirs = next(m for m in (_market(i, deadline=1000) for i in range(100)) if not b.assigned(m))
+
+    # a keeps heartbeating but never resolves the market.
+    clock.now = 1599
+    a.beat()
+    b.beat()
+    assert not b.assigned(theirs)
+    clock.now = 1600
+    assert b.assigned(theirs)
+
+
+def test_close_releases_leases_and_leaves_the_ring():
+    store, clock = SqliteLeaseStore(), Clock()
+    a = LeaseCoordinator(store, "a", clock=clock)
+    b = LeaseCoordinator(store, "b", clock=clock)
+    a.beat()
+    assert a.acquire(3)
+
+    a.close()
+    b.beat()
+
+    assert b.ring.workers == ["b"]
+    assert b.acquire(3)
@@ -0,0 +1,165 @@
+"""Tests for src.ledger — provider accuracy ledger with decayed scoring."""
+
+import json
+import threading
+
+import pytest
+
+from src.ledger import HALF_LIFE_SECONDS, Ledger
+from src.registry import DEFAULT_PANEL
+from src.types import JudgmentResult, Outcome
+
+DAY = 24 * 60 * 60
+
+
+def _j(provider: str, outcome: Outcome, confidence: int = 80) -> JudgmentResult:
+    return JudgmentResult(provider=provider, outcome=outcome, confidence=confidence, reasoning="r")
+
+
+def test_unknown_provider_has_neutral_weight():
+    ledger = Ledger()
+    score = ledger.score("never-seen")
+    assert score.observations == 0
+    assert score.weight == 1.0
+    assert score.brier is None
+
+
+def test_correct_and_wrong_providers_diverge():
+    ledger = Ledger()
+    for market_id in range(10):
+        ledger.record_judgments(market_id, [_j("good", Outcome.YES), _j("bad", Outcome.NO)], ts=1000.0 + market_id)
+        ledger.record_outcome(market_id, Outcome.YES, ts=2000.0 + market_id)
+
+    good, bad = ledger.score("good", now=3000.0), ledger.score("bad", now=3000.0)
+    assert good.observations == bad.observations == 10
+    assert good.accuracy > 0.9 > 0.3 > bad.accuracy
+    assert good.weight > 1.0 > bad.weight
+    assert good.brier == pytest.approx(0.04)  # (0.8 - 1)^2
+    assert bad.overconfidence == pytest.approx(0.8)
+
+
+def test_unsettled_judgments_do_not_score():
+    ledger = Ledger()
+    ledger.record_judgments(1, [_j("p", Outcome.NO)], ts=0.0)
+    assert ledger.score("p").observations == 0
+
+
+def test_old_mistakes_decay():
+    ledger = Ledger()
+    for market_id in range(5):
+        ledger.record_judgments(market_id, [_j("p", Outcome.NO)], ts=0.0)
+        ledger.record_outcome(market_id, Outcome.YES, ts=0.0)
+    fresh = ledger.score("p", now=0.0)
+    stale = ledger.score("p", now=10 * HALF_LIFE_SECONDS)
+    assert fresh.accuracy < stale.accuracy
+    assert stale.effective_observations < 0.01
+
+
+def test_recent_observations_dominate():
+    ledger = Ledger()
+    for market_id in range(5):
+        ledger.record_judgments(market_id, [_j("p", Outcome.NO)], ts=0.0)
+        ledger.record_outcome(market_id, Outcome.YES, ts=0.0)
+    for market_id in range(5, 10):
+        ledger.record_judgments(market_id, [_j("p", Outcome.YES)], ts=90 * DAY)
+        ledger.record_outcome(market_id, Outcome.YES, ts=90 * DAY)
+    assert ledger.score("p", now=90 * DAY).accuracy > 0.75
+
+
+def test_dispute_resettlement_reverses_previous_outcome():
+    ledger = Ledger()
+    ledger.record_judgments(1, [_j("a", Outcome.YES), _j("b", Outcome.NO)], ts=0.0)
+    ledger.record_outcome(1, Outcome.YES, ts=1.0)
+    ledger.record_outcome(1, Outcome.NO, ts=2.0)
+
+    a, b = ledger.score("a", now=2.0), ledger.score("b", now=2.0)
+    assert a.observations == b.observations == 1
+    assert a.accuracy < 0.75 < b.accuracy
+
+
+def test_rerun_replaces_pending_judgment():
+    ledger = Ledger()
+    ledger.record_judgments(1, [_j("p", Outcome.NO)], ts=0.0)
+    ledger.record_judgments(1, [_j("p", Outcome.YES)], ts=1.0)
+    ledger.record_outcome(1, Outcome.YES, ts=2.0)
+    score = ledger.score("p", now=2.0)
+    assert score.observations == 1
+    assert score.accuracy > 0.75
+
+
+def test_ledger_round_trips_through_file(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    ledger = Ledger.load(path)
+    ledger.record_judgments(1, [_j("a", Outcome.YES), _j("b", Outcome.NO)], ts=0.0)
+    ledger.record_outcome(1, Outcome.YES, ts=1.0)
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["type"] for r in lines] == ["judgment", "judgment", "outcome"]
+
+    reloaded = Ledger.load(path)
+    assert reloaded.score("a", now=1.0) == ledger.score("a", now=1.0)
+    assert reloaded.score("b", now=1.0) == ledger.score("b", now=1.0)
+
+
+def test_sync_reads_only_what_other_processes_appended(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    resolver = Ledger.load(path)
+    resolver.record_judgments(1, [_j("a", Outcome.YES)], ts=0.0)
+
+    # `ledger settle` runs in another process.
+    Ledger.load(path).record_outcome(1, Outcome.YES, ts=1.0)
+    assert resolver.score("a").observations == 0
+    assert resolver.sync() == 1
+    assert resolver.score("a").observations == 1
+
+    # Own appends are not applied twice, and a half-written line waits.
+    resolver.record_judgments(2, [_j("a", Outcome.NO)], ts=2.0)
+    with path.open("a") as f:
+        f.write('{"type": "outcome", "ts": 3, "market_id": 2,')
+    assert resolver.sync() == 0
+    with path.open("a") as f:
+        f.write(' "outcome": "Yes"}\n')
+    assert resolver.sync() == 1
+    assert resolver.score("a").observations == 2
+    assert resolver.score("a", now=3.0) == Ledger.load(path).score("a", now=3.0)
+
+
+def test_append_waits_for_a_concurrent_writer(tmp_path, caplog):
+    path = tmp_path / "ledger.jsonl"
+    first, second = Ledger.load(path), Ledger.load(path)
+    second.record_judgments(1, [_j("a", Outcome.YES)], ts=0.0)
+    racers = []
+
+    def sync_then_race() -> int:
+        # Another worker appends after our sync, before our write.
+        applied = Ledger.sync(first)
+        if not racers:
+            racers.append(threading.Thread(target=second.record_judgments, args=(2, [_j("b", Outcome.NO)], 1.0)))
+            racers[0].start()
+            racers[0].join(timeout=0.2)
+        return applied
+
+    first.sync = sync_then_race
+    first.record_judgments(3, [_j("c", Outcome.YES)], ts=2.0)
+    racers[0].join()
+    del first.sync
+
+    assert first.sync() == 1
+    assert first._offset == path.stat().st_size
+    assert sorted(first._pending) == [1, 2, 3]
+    assert "corrupt" not in caplog.text
+    # The racer's own append applied ours once it got the file.
+    assert second.sync() == 0
+    assert sorted(second._pending) == [1, 2, 3]
+
+
+def test_corrupt_lines_are_skipped(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    path.write_text('not json\n{"type": "outcome", "ts": 0, "market_id": 1, "outcome": "Yes"}\n')
+    assert Ledger.load(path).providers() == []
+
+
+def test_panel_weights_scale_configured_weights():
+    ledger = Ledger()
+    weights = ledger.panel_weights(DEFAULT_PANEL)
+    assert weights == {"gemini-3-pro": 1.0, "claude-opus-4-5": 1.0, "gpt-5.2": 1.0}
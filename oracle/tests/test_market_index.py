@@ -0,0 +1,100 @@
+"""Tests for src.market_index — SQLite market index and resolution history."""
+
+import sqlite3
+
+from src.market_index import MarketIndex
+from src.types import ConsensusResult, MarketInfo, MarketStatus, Outcome, ResolveReport
+
+
+def _market(market_id: int, deadline: int, status: MarketStatus = MarketStatus.OPEN, yes: int = 0) -> MarketInfo:
+    return MarketInfo(
+        id=market_id,
+        title=f"Market {market_id}",
+        description="d",
+        resolution_deadline=deadline,
+        yes_pool=yes,
+        no_pool=0,
+        status=status,
+    )
+
+
+def _consensus(outcome: Outcome = Outcome.YES) -> ConsensusResult:
+    return ConsensusResult(
+        judgments=[],
+        final_outcome=outcome,
+        final_confidence=90,
+        consensus_reached=True,
+        agreeing_providers=["a", "b"],
+        summary="2/2 agree",
+    )
+
+
+def test_due_and_upcoming_use_deadline_order():
+    index = MarketIndex()
+    index.apply(100, [
+        _market(1, 3000),
+        _market(2, 1000),
+        _market(3, 500, MarketStatus.RESOLVED),
+        _market(4, 2000, MarketStatus.LOCKED),
+    ])
+
+    assert [m.id for m in index.due(now=2500)] == [2, 4]
+    assert [m.id for m in index.upcoming(1000, now=2500)] == [2, 4, 1]
+    assert [m.id for m in index.unresolved()] == [2, 4, 1]
+    assert index.counts() == {MarketStatus.OPEN: 2, MarketStatus.LOCKED: 1, MarketStatus.RESOLVED: 1}
+
+
+def test_sync_only_rewrites_changed_markets():
+    index = MarketIndex()
+    assert index.apply(100, [_market(1, 1000), _market(2, 2000)]) == 2
+    assert index.apply(110, [_market(1, 1000), _market(2, 2000, yes=5)]) == 1
+    assert index.get(2).yes_pool == 5
+    assert index.last_slot == 110
+
+
+def test_stale_snapshot_is_ignored():
+    index = MarketIndex()
+    index.apply(200, [_market(1, 1000, MarketStatus.RESOLVED)])
+    assert index.apply(150, [_market(1, 1000, MarketStatus.OPEN)]) == 0
+    assert index.get(1).status == MarketStatus.RESOLVED
+    assert index.last_slot == 200
+
+
+def test_confirmed_resolution_is_recorded_and_marks_market():
+    index = MarketIndex()
+    index.apply(100, [_market(1, 1000)])
+    index.record_resolution(ResolveReport(market_id=1, market_title="m", consensus=_consensus(), error="rpc down"), ts=1.0)
+    assert index.get(1).status == MarketStatus.OPEN
+
+    index.record_resolution(ResolveReport(market_id=1, market_title="m", consensus=_consensus(), tx_signature="sig"), ts=2.0)
+    market = index.get(1)
+    assert market.status == MarketStatus.RESOLVED
+    assert market.outcome == Outcome.YES
+    assert index.due(now=5000) == []
+
+    history = index.history(1)
+    assert [(r.error, r.tx_signature) for r in history] == [("rpc down", None), (None, "sig")]
+    assert history[1].consensus_reached is True
+
+    # The chain state wins on the next sync.
+    index.apply(101, [_market(1, 1000, MarketStatus.RESOLVED)])
+    assert index.get(1).outcome is None
+
+
+def test_index_persists_in_wal_mode(tmp_path):
+    path = tmp_path / "markets.db"
+    index = MarketIndex(path)
+    index.apply(100, [_market(1, 1000)])
+    index.close()
+
+    mode = sqlite3.connect(path).execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+    reopened = MarketIndex.open(path)
+    assert reopened.get(1).title == "Market 1"
+    assert reopened.last_slot == 100
+
+
+def test_ids_lists_every_indexed_market():
+    index = MarketIndex()
+    index.apply(100, [_market(1, 1000), _market(4, 2000, MarketStatus.RESOLVED)])
+    assert index.ids() == {1, 4}
@@ -0,0 +1,106 @@
+"""Tests for src.positions — vectorized Position decoding and risk analytics."""
+
+import struct
+
+import numpy as np
+import pytest
+
+from src.positions import analyze, decode_positions, market_codes, payouts
+from src.types import MarketInfo, MarketStatus, Outcome
+
+DISCRIMINATOR = b"POSITION"
+MARKET_A, MARKET_B, MARKET_X = b"\x01" * 32, b"\x02" * 32, b"\x09" * 32
+ALICE, BOB, CAROL = b"a" * 32, b"b" * 32, b"c" * 32
+
+
+def _position(owner: bytes, market: bytes, side: int, amount: int, claimed: bool = False) -> bytes:
+    return DISCRIMINATOR + owner + market + bytes([side]) + struct.pack("<Q", amount) + bytes([claimed, 255])
+
+
+def _market(market_id: int, yes_pool: int, no_pool: int, outcome: Outcome | None = None) -> MarketInfo:
+    return MarketInfo(
+        id=market_id,
+        title=f"Market {market_id}",
+        description="",
+        resolution_deadline=0,
+        yes_pool=yes_pool,
+        no_pool=no_pool,
+        status=MarketStatus.RESOLVED if outcome else MarketStatus.OPEN,
+        outcome=outcome,
+    )
+
+
+ACCOUNTS = [
+    _position(ALICE, MARKET_A, 0, 100),
+    _position(BOB, MARKET_A, 1, 300),
+    _position(ALICE, MARKET_A, 0, 100, claimed=True),
+    _position(CAROL, MARKET_B, 1, 50),
+    _position(CAROL, MARKET_X, 0, 999),
+]
+
+
+def test_decode_positions_filters_discriminator():
+    other = b"NOTAPOSN" + _position(ALICE, MARKET_A, 0, 7)[8:]
+
+    positions = decode_positions(ACCOUNTS + [other], DISCRIMINATOR)
+
+    assert len(positions) == len(ACCOUNTS)
+    assert positions["amount"].tolist() == [100, 300, 100, 50, 999]
+    assert positions["claimed"].tolist() == [False, False, True, False, False]
+    assert bytes(positions["owner"][1]) == BOB
+
+
+def test_decode_positions_rejects_truncated_data():
+    with pytest.raises(ValueError):
+        decode_positions(b"".join(ACCOUNTS)[:-1])
+
+
+def test_market_codes_marks_unknown_markets():
+    positions = decode_positions(ACCOUNTS)
+    assert market_codes(positions, [MARKET_B, MARKET_A]).tolist() == [1, 1, 1, 0, -1]
+
+
+def test_payouts_mirror_claim_math():
+    positions = decode_positions(ACCOUNTS[:3])
+    yes, no = np.full(3, 200), np.full(3, 300)
+
+    net, fee = payouts(positions, yes, no, Outcome.YES, fee_bps=100)
+    # gross = amount * 500 / 200 = 250, fee 1%.
+    assert net.tolist() == [248, 0, 248]
+    assert fee.tolist() == [2, 0, 2]
+
+    refund, no_fee = payouts(positions, yes, no, Outcome.INVALID, fee_bps=100)
+    assert refund.tolist() == [250, 500, 250]
+    assert no_fee.tolist() == [0, 0, 0]
+
+
+def test_analyze_exposure_liability_and_concentration():
+    markets = [_market(10, 200, 300, Outcome.YES), _market(11, 0, 50)]
+    positions = decode_positions(ACCOUNTS)
+
+    a, b = analyze(positions, markets, [MARKET_A, MARKET_B], fee_bps=100)
+
+    assert (a.positions, a.holders, a.yes_stake, a.no_stake) == (3, 2, 200, 300)
+    assert (a.payout_if_yes, a.fees_if_yes) == (496, 4)
+    assert a.payout_if_no == 495
+    assert a.payout_if_invalid == 1000
+    # Only Alice's unclaimed YES position is still owed.
+    assert (a.unclaimed_positions, a.unclaimed_liability) == (1, 248)
+    assert a.top_holder_share == pytest.approx(0.6)
+    assert a.top10_share == pytest.approx(1.0)
+    assert a.hhi == pytest.approx(0.6**2 + 0.4**2)
+
+    # The unknown market's position is ignored; an open market owes nothing yet.
+    assert (b.positions, b.holders, b.no_stake) == (1, 1, 50)
+    assert b.payout_if_yes == 0
+    assert b.unclaimed_liability == 0
+    assert b.top_holder_share == 1.0
+
+
+def test_analyze_sums_large_stakes_exactly():
+    big = 2**62 + 1
+    positions = decode_positions([_position(ALICE, MARKET_A, 0, big), _position(BOB, MARKET_A, 0, 3)])
+
+    (risk,) = analyze(positions, [_market(1, big + 3, 0)], [MARKET_A], fee_bps=0)
+
+    assert risk.yes_stake == big + 3
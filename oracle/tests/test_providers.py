@@ -1,5 +1,8 @@
 """Tests for src.providers — mocked LLM API calls."""
 
+import json
+from types import SimpleNamespace
+
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 
@@ -9,6 +12,29 @@ from src.types import Outcome, ResearchContext
 VALID_JSON_RESPONSE = '{"outcome": "Yes", "confidence": 85, "reasoning": "Evidence supports yes"}'
 
 
+def _tool_use_block(raw: str) -> SimpleNamespace:
+    return SimpleNamespace(type="tool_use", name="submit_judgment", input=json.loads(raw))
+
+
+def _raw_response(parsed, headers: dict | None = None) -> MagicMock:
+    """What an SDK's `with_raw_response.create` returns."""
+    raw = MagicMock()
+    raw.headers = headers or {}
+    raw.parse.return_value = parsed
+    return raw
+
+
+class _Stream:
+    """An async iterator with the SDK stream's `response` attribute."""
+
+    def __init__(self, items, headers: dict | None = None):
+        self._items = items
+        self.response = SimpleNamespace(headers=headers or {})
+
+    def __aiter__(self):
+        return self._items.__aiter__()
+
+
 # --- Claude ---
 
 @pytest.mark.asyncio
@@ -16,10 +42,10 @@ async def test_claude_returns_valid_judgment(monkeypatch):
     monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
 
     mock_message = MagicMock()
-    mock_message.content = [MagicMock(text=VALID_JSON_RESPONSE)]
+    mock_message.content = [_tool_use_block(VALID_JSON_RESPONSE)]
 
     mock_client = AsyncMock()
-    mock_client.messages.create = AsyncMock(return_value=mock_message)
+    mock_client.messages.with_raw_response.create = AsyncMock(return_value=_raw_response(mock_message))
 
     with patch("src.providers.claude.anthropic.AsyncAnthropic", return_value=mock_client):
         from src.providers.claude import judge
@@ -50,7 +76,7 @@ async def test_openai_returns_valid_judgment(monkeypatch):
     mock_response.choices = [mock_choice]
 
     mock_client = AsyncMock()
-    mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
+    mock_client.chat.completions.with_raw_response.create = AsyncMock(return_value=_raw_response(mock_response))
 
     with patch("src.providers.openai.openai.AsyncOpenAI", return_value=mock_client):
         from src.providers.openai import judge
@@ -109,17 +135,123 @@ async def test_claude_prompt_includes_market_info(monkeypatch):
     monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
 
     mock_message = MagicMock()
-    mock_message.content = [MagicMock(text=VALID_JSON_RESPONSE)]
+    mock_message.content = [_tool_use_block(VALID_JSON_RESPONSE)]
 
     mock_client = AsyncMock()
-    mock_client.messages.create = AsyncMock(return_value=mock_message)
+    mock_client.messages.with_raw_response.create = AsyncMock(return_value=_raw_response(mock_message))
 
     with patch("src.providers.claude.anthropic.AsyncAnthropic", return_value=mock_client):
         from src.providers.claude import judge
         await judge("My Special Market", "Detailed description here", ResearchContext())
 
     # Check the prompt passed to the API
-    call_kwargs = mock_client.messages.create.call_args.kwargs
+    call_kwargs = mock_client.messages.with_raw_response.create.call_args.kwargs
     prompt_text = call_kwargs["messages"][0]["content"]
     assert "My Special Market" in prompt_text
     assert "Detailed description here" in prompt_text
+
+
+# --- Streaming ---
+
+@pytest.mark.asyncio
+async def test_claude_stream_reports_verdict_early(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+
+    async def events():
+        yield SimpleNamespace(type="content_block_start")
+        for part in ['{"outcome": "Yes", "confidence": 85,', ' "reasoning": "Evidence', ' supports yes"}']:
+            yield SimpleNamespace(
+                type="content_block_delta",
+                delta=SimpleNamespace(type="input_json_delta", partial_json=part),
+            )
+
+    stream = _Stream(events())
+    stream_cm = MagicMock()
+    stream_cm.__aenter__ = AsyncMock(return_value=stream)
+    stream_cm.__aexit__ = AsyncMock(return_value=False)
+
+    mock_client = MagicMock()
+    mock_client.messages.stream = MagicMock(return_value=stream_cm)
+
+    verdicts = []
+    with patch("src.providers.claude.anthropic.AsyncAnthropic", return_value=mock_client):
+        from src.providers.claude import judge_stream
+        result = await judge_stream("Test Market", "Description", ResearchContext(), on_verdict=verdicts.append)
+
+    assert [(v.outcome, v.confidence) for v in verdicts] == [(Outcome.YES, 85)]
+    assert result.reasoning == "Evidence supports yes"
+
+
+@pytest.mark.asyncio
+async def test_openai_stream_collects_deltas(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+    async def chunks():
+        for part in ['{"outcome": "No", ', '"confidence": 60, "reasoning": "nope"}']:
+            chunk = MagicMock()
+            chunk.choices = [MagicMock()]
+            chunk.choices[0].delta.content = part
+            yield chunk
+
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create = AsyncMock(return_value=_Stream(chunks()))
+
+    with patch("src.providers.openai.openai.AsyncOpenAI", return_value=mock_client):
+        from src.providers.openai import judge_stream
+        result = await judge_stream("Test Market", "Description", ResearchContext())
+
+    assert result.outcome == Outcome.NO
+    assert result.confidence == 60
+    assert mock_client.chat.completions.create.call_args.kwargs["stream"] is True
+
+
+# --- Structured output ---
+
+def test_structured_output_params():
+    from src.providers import claude, gemini, openai
+
+    research = ResearchContext()
+
+    claude_params = claude.build_params("T", "D", research)
+    assert claude_params["tool_choice"] == {"type": "tool", "name": "submit_judgment"}
+    assert claude_params["tools"][0]["input_schema"]["required"] == ["outcome", "confidence", "reasoning"]
+
+    openai_params = openai.build_params("T", "D", research)
+    assert openai_params["response_format"]["type"] == "json_schema"
+    assert openai_params["response_format"]["json_schema"]["strict"] is True
+
+    config = gemini.build_params("T", "D", research)["config"]
+    assert config.response_mime_type == "application/json"
+
+
+def test_claude_response_text_falls_back_to_text_blocks():
+    from src.providers.claude import response_text
+
+    message = SimpleNamespace(content=[SimpleNamespace(type="text", text=VALID_JSON_RESPONSE)])
+    assert json.loads(response_text(message))["outcome"] == "Yes"
+
+
+@pytest.mark.asyncio
+async def test_openai_repairs_unusable_response(monkeypatch):
+    """An unparseable answer triggers one cheap repair call instead of losing the vote."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+    def response(content):
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = content
+        return mock_response
+
+    mock_client = AsyncMock()
+    mock_client.chat.completions.with_raw_response.create = AsyncMock(
+        side_effect=[_raw_response(response("The answer is yes, fairly sure.")), _raw_response(response(VALID_JSON_RESPONSE))]
+    )
+
+    with patch("src.providers.openai.openai.AsyncOpenAI", return_value=mock_client):
+        from src.providers.openai import judge
+        result = await judge("Test Market", "Description", ResearchContext())
+
+    assert result.outcome == Outcome.YES
+    repair_call = mock_client.chat.completions.with_raw_response.create.call_args_list[1].kwargs
+    assert "The answer is yes, fairly sure." in repair_call["messages"][1]["content"]
+    assert "Test Market" not in repair_call["messages"][1]["content"]
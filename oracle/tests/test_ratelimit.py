@@ -0,0 +1,166 @@
+"""Tests for src.ratelimit — per-provider concurrency and adaptive rate limiting."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.judge import _safe_judge
+from src.ratelimit import (
+    DEFAULT_RATE,
+    ProviderLimiter,
+    MIN_RATE,
+    get_limiter,
+    is_rate_limited,
+    parse_budget,
+    parse_retry_after,
+    report_headers,
+)
+from src.types import JudgmentResult, Outcome, ResearchContext
+
+
+class RateLimitError(Exception):
+    """Stand-in for an SDK 429 error carrying response headers."""
+
+    status_code = 429
+
+    def __init__(self, headers: dict[str, str]):
+        super().__init__("rate limited")
+        self.response = MagicMock(headers=headers)
+
+
+class TestParseRetryAfter:
+    def test_retry_after_seconds(self):
+        assert parse_retry_after({"Retry-After": "7"}) == 7.0
+
+    def test_retry_after_ms_takes_precedence(self):
+        assert parse_retry_after({"retry-after-ms": "250", "retry-after": "7"}) == 0.25
+
+    def test_openai_reset_duration_when_exhausted(self):
+        headers = {"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "1m30s"}
+        assert parse_retry_after(headers) == 90.0
+
+    def test_anthropic_reset_timestamp_when_exhausted(self):
+        headers = {
+            "anthropic-ratelimit-requests-remaining": "0",
+            "anthropic-ratelimit-requests-reset": "2026-01-01T00:00:10Z",
+        }
+        now = 1767225600.0  # 2026-01-01T00:00:00Z
+        assert parse_retry_after(headers, now=now) == 10.0
+
+    def test_remaining_budget_means_no_wait(self):
+        headers = {"x-ratelimit-remaining-requests": "12", "x-ratelimit-reset-requests": "1s"}
+        assert parse_retry_after(headers) is None
+
+    def test_no_headers(self):
+        assert parse_retry_after({}) is None
+
+
+def test_is_rate_limited():
+    assert is_rate_limited(RateLimitError({}))
+    assert not is_rate_limited(ValueError("nope"))
+
+
+def test_throttle_halves_rate_and_success_recovers():
+    limiter = ProviderLimiter("p", rate=2.0)
+    pause = limiter.on_throttle(RateLimitError({"retry-after": "3"}))
+    assert pause == 3.0
+    assert limiter.rate == 1.0
+    limiter.on_success()
+    assert limiter.rate == pytest.approx(1.1)
+    assert limiter.metrics().throttled == 1
+
+
+def test_parse_budget_takes_the_tightest_window():
+    headers = {
+        "x-ratelimit-remaining-requests": "3",
+        "x-ratelimit-reset-requests": "6s",
+        "x-ratelimit-remaining-tokens": "5000",
+        "x-ratelimit-reset-tokens": "1s",
+    }
+    assert parse_budget(headers) == (3, 6.0)
+    headers["x-ratelimit-remaining-tokens"] = "0"
+    assert parse_budget(headers) == (0, 1.0)
+    assert parse_budget({"anthropic-ratelimit-requests-remaining": "40",
+                         "anthropic-ratelimit-requests-reset": "2026-01-01T00:00:10Z"},
+                        now=1767225600.0) == (40, 10.0)
+    assert parse_budget({"content-type": "application/json"}) is None
+
+
+def test_success_headers_pace_the_bucket_before_a_429():
+    limiter = ProviderLimiter("p", rate=2.0)
+    limiter.on_success({"x-ratelimit-remaining-requests": "500", "x-ratelimit-reset-requests": "60s"})
+    assert limiter.rate == pytest.approx(2.1)
+
+    # Two requests left for the next 20s: spread them out.
+    limiter.on_success({"x-ratelimit-remaining-requests": "2", "x-ratelimit-reset-requests": "20s"})
+    assert limiter.rate == pytest.approx(0.1)
+    limiter.on_success({"x-ratelimit-remaining-requests": "1", "x-ratelimit-reset-requests": "1m0s"})
+    assert limiter.rate == MIN_RATE
+
+    # None left: pause until the window resets, without counting a throttle.
+    limiter.on_success({"anthropic-ratelimit-requests-remaining": "0", "anthropic-ratelimit-requests-reset": "30"})
+    assert limiter._blocked_until > limiter._last_refill + 29
+    assert limiter.metrics().throttled == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_capped():
+    limiter = ProviderLimiter("p", concurrency=2, rate=1000, burst=1000)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with limiter:
+            peak = max(peak, limiter.metrics().in_flight)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(call() for _ in range(6)))
+    metrics = limiter.metrics()
+    assert peak == 2
+    assert metrics.requests == 6
+    assert metrics.max_queued >= 4
+    assert metrics.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_safe_judge_retries_after_429():
+    """A 429 is retried after the advertised pause instead of losing the vote."""
+    judgment = JudgmentResult(provider="gemini-3-pro", outcome=Outcome.YES, confidence=80, reasoning="ok")
+    judge = AsyncMock(side_effect=[RateLimitError({"retry-after-ms": "10"}), judgment])
+    provider = SimpleNamespace(__name__="gemini", PROVIDER_NAME="gemini-3-pro", judge=judge)
+
+    result = await _safe_judge(provider, "T", "D", ResearchContext())
+
+    assert result == judgment
+    assert provider.judge.call_count == 2
+    metrics = get_limiter("gemini-3-pro").metrics()
+    assert metrics.throttled == 1
+    assert metrics.rate < DEFAULT_RATE + 0.2
+
+
+@pytest.mark.asyncio
+async def test_safe_judge_gives_up_after_repeated_429s():
+    judge = AsyncMock(side_effect=RateLimitError({"retry-after-ms": "1"}))
+    provider = SimpleNamespace(__name__="claude", PROVIDER_NAME="claude-opus-4-5", judge=judge)
+
+    with patch("src.judge.RATE_LIMIT_RETRIES", 2):
+        result = await _safe_judge(provider, "T", "D", ResearchContext())
+
+    assert result is None
+    assert provider.judge.call_count == 2
+    assert get_limiter("claude-opus-4-5").metrics().throttled == 2
+
+
+@pytest.mark.asyncio
+async def test_safe_judge_feeds_response_headers_to_the_limiter():
+    judgment = JudgmentResult(provider="gpt-5.2", outcome=Outcome.YES, confidence=80, reasoning="ok")
+
+    async def judge(*args):
+        report_headers({"x-ratelimit-remaining-requests": "1", "x-ratelimit-reset-requests": "10s"})
+        return judgment
+
+    provider = SimpleNamespace(__name__="openai", PROVIDER_NAME="gpt-5.2", judge=judge)
+    assert await _safe_judge(provider, "T", "D", ResearchContext()) == judgment
+    assert get_limiter("gpt-5.2").rate == pytest.approx(0.1)
@@ -0,0 +1,98 @@
+"""Tests for src.registry — config-driven provider panel."""
+
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from src.providers import claude
+from src.registry import DEFAULT_PANEL, PanelConfig, ProviderSpec, get_provider_module, load_panel
+
+
+def _write(tmp_path, config: dict):
+    path = tmp_path / "panel.json"
+    path.write_text(json.dumps(config))
+    return path
+
+
+def test_load_panel_from_file(tmp_path):
+    path = _write(tmp_path, {
+        "quorum": 3,
+        "providers": [
+            {"name": "a", "module": "gemini"},
+            {"name": "b", "module": "gemini", "model": "gemini-3-flash", "weight": 0.5},
+            {"name": "c", "module": "claude"},
+            {"name": "d", "module": "openai", "weight": 2},
+        ],
+    })
+    panel = load_panel(path)
+    assert panel.size == 4
+    assert panel.quorum == 3
+    assert panel.weights() == {"a": 1.0, "b": 0.5, "c": 1.0, "d": 2.0}
+    assert panel.providers[1].model == "gemini-3-flash"
+
+
+def test_load_panel_env_override(tmp_path, monkeypatch):
+    path = _write(tmp_path, {"quorum": 1, "providers": [{"name": "solo", "module": "claude"}]})
+    monkeypatch.setenv("ORACLE_PANEL_CONFIG", str(path))
+    assert load_panel().providers[0].name == "solo"
+
+
+def test_shipped_panel_matches_default(monkeypatch):
+    monkeypatch.delenv("ORACLE_PANEL_CONFIG", raising=False)
+    assert load_panel() == DEFAULT_PANEL
+
+
+def test_unknown_module_fails_fast(tmp_path):
+    path = _write(tmp_path, {"providers": [{"name": "x", "module": "nope"}, {"name": "y", "module": "claude"}]})
+    with pytest.raises(ValueError, match="Unknown provider module 'nope'"):
+        load_panel(path)
+
+
+def test_quorum_larger_than_panel_rejected():
+    with pytest.raises(ValidationError, match="exceeds panel size"):
+        PanelConfig(providers=[ProviderSpec(name="a", module="claude")], quorum=2)
+
+
+def test_duplicate_names_rejected():
+    with pytest.raises(ValidationError, match="Duplicate provider names"):
+        PanelConfig(providers=[ProviderSpec(name="a", module="claude"), ProviderSpec(name="a", module="gemini")])
+
+
+def test_non_positive_weight_rejected():
+    with pytest.raises(ValidationError):
+        ProviderSpec(name="a", module="claude", weight=0)
+
+
+def test_get_provider_module():
+    assert get_provider_module(ProviderSpec(name="c", module="claude")) is claude
+
+
+def test_load_panel_with_cascade(tmp_path):
+    path = _write(tmp_path, {
+        "providers": [{"name": "a", "module": "claude"}, {"name": "b", "module": "openai"}],
+        "cascade": {
+            "min_confidence": 80,
+            "providers": [
+                {"name": "flash", "module": "gemini", "model": "gemini-3-flash"},
+                {"name": "haiku", "module": "claude", "model": "claude-haiku-4-5"},
+            ],
+        },
+    })
+    panel = load_panel(path)
+    assert panel.cascade.enabled and panel.cascade.min_confidence == 80
+    assert [p.name for p in panel.cascade.providers] == ["flash", "haiku"]
+    assert DEFAULT_PANEL.cascade is None
+
+
+def test_invalid_cascades_rejected(tmp_path):
+    seats = [{"name": "a", "module": "claude"}, {"name": "b", "module": "openai"}]
+    with pytest.raises(ValidationError, match="reuse panel names"):
+        PanelConfig.model_validate({"providers": seats, "cascade": {"providers": [seats[0], {"name": "c", "module": "gemini"}]}})
+    with pytest.raises(ValidationError, match="at least 2"):
+        PanelConfig.model_validate({"providers": seats, "cascade": {"providers": [{"name": "c", "module": "gemini"}]}})
+    path = _write(tmp_path, {"providers": seats, "cascade": {"providers": [
+        {"name": "c", "module": "gemini"}, {"name": "d", "module": "nope"},
+    ]}})
+    with pytest.raises(ValueError, match="Unknown provider module 'nope'"):
+        load_panel(path)
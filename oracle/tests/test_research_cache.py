@@ -0,0 +1,144 @@
+"""Tests for src.research_cache — speculative research warming."""
+
+import httpx
+import pytest
+import respx
+
+from src.research_cache import ResearchCache, ResearchWarmer
+
+BRAVE_URL = "https://api.search.brave.com/res/v1/web/search"
+
+
+def _page(text: str) -> str:
+    return f"<html><body><p>{text}</p></body></html>"
+
+
+def _search(*titles: str) -> dict:
+    return {"web": {"results": [{"title": t, "url": f"https://{t}.com", "description": t} for t in titles]}}
+
+
+@pytest.mark.asyncio
+async def test_unchanged_source_is_revalidated_with_conditional_get(tmp_path):
+    cache = ResearchCache.load(1, tmp_path)
+    with respx.mock:
+        route = respx.get("https://example.com/status").mock(side_effect=[
+            httpx.Response(200, text=_page("Pending"), headers={"ETag": '"v1"'}),
+            httpx.Response(304),
+        ])
+        first = await cache.refresh(["https://example.com/status"], [], now=1000)
+        second = await cache.refresh(["https://example.com/status"], [], now=2000)
+
+    assert route.calls[1].request.headers["If-None-Match"] == '"v1"'
+    assert len(first.sources) == 1
+    assert not second.changed
+    assert "Pending" in cache.context(["https://example.com/status"], []).source_summaries[0].content
+
+
+@pytest.mark.asyncio
+async def test_snapshots_hold_only_changes_and_replay_on_load(tmp_path):
+    urls = ["https://a.example/x", "https://b.example/y"]
+    cache = ResearchCache.load(2, tmp_path)
+    with respx.mock:
+        respx.get(urls[0]).mock(side_effect=[
+            httpx.Response(200, text=_page("A one")),
+            httpx.Response(200, text=_page("A two")),
+        ])
+        respx.get(urls[1]).mock(return_value=httpx.Response(200, text=_page("B same")))
+        await cache.refresh(urls, [], now=1000)
+        delta = await cache.refresh(urls, [], now=2000)
+
+    assert [s.url for s in delta.sources] == [urls[0]]
+    lines = (tmp_path / "market-2.jsonl").read_text().splitlines()
+    assert len(lines) == 2
+
+    reloaded = ResearchCache.load(2, tmp_path)
+    contents = [s.content for s in reloaded.context(urls, []).source_summaries]
+    assert contents == ["A two", "B same"]
+
+
+@pytest.mark.asyncio
+async def test_fetch_error_keeps_last_good_copy(tmp_path):
+    cache = ResearchCache.load(3, tmp_path)
+    url = "https://example.com/flaky"
+    with respx.mock:
+        respx.get(url).mock(side_effect=[
+            httpx.Response(200, text=_page("Good copy")),
+            httpx.Response(503),
+        ])
+        await cache.refresh([url], [], now=1000)
+        await cache.refresh([url], [], now=2000)
+
+    summary = cache.context([url], []).source_summaries[0]
+    assert summary.error is None
+    assert summary.content == "Good copy"
+
+
+@pytest.mark.asyncio
+async def test_searches_rerun_only_when_stale(tmp_path, monkeypatch):
+    monkeypatch.setenv("BRAVE_API_KEY", "test-key")
+    cache = ResearchCache.load(4, tmp_path)
+    with respx.mock:
+        route = respx.get(BRAVE_URL).mock(side_effect=[
+            httpx.Response(200, json=_search("first")),
+            httpx.Response(200, json=_search("second")),
+        ])
+        await cache.refresh([], ["q"], search_max_age=600, now=1000)
+        await cache.refresh([], ["q"], search_max_age=600, now=1300)
+        assert route.call_count == 1
+        await cache.refresh([], ["q"], search_max_age=600, now=1700)
+        assert route.call_count == 2
+
+    assert cache.context([], ["q"]).search_results[0].title == "second"
+
+
+@pytest.mark.asyncio
+async def test_warmer_final_refresh_returns_context(tmp_path, monkeypatch):
+    monkeypatch.setenv("BRAVE_API_KEY", "test-key")
+    warmer = ResearchWarmer(tmp_path)
+    with respx.mock:
+        respx.get("https://example.com/s").mock(return_value=httpx.Response(200, text=_page("Evidence")))
+        respx.get(BRAVE_URL).mock(return_value=httpx.Response(200, json=_search("hit")))
+        await warmer.warm(5, ["https://example.com/s"], ["q"])
+        context = await warmer.warm(5, ["https://example.com/s"], ["q"], final=True)
+
+    assert context.source_summaries[0].content == "Evidence"
+    assert context.search_results[0].title == "hit"
+    warmer.forget(5)
+    assert 5 not in warmer._caches
+
+
+@pytest.mark.asyncio
+async def test_new_passages_are_highlighted_and_stored_once(tmp_path):
+    url = "https://example.com/bill"
+    before = "<html><body><p>Title: CLARITY Act</p><p>Latest action: referred to committee</p></body></html>"
+    after = "<html><body><p>Title: CLARITY Act</p><p>Latest action: signed into law</p></body></html>"
+    cache = ResearchCache.load(6, tmp_path)
+    with respx.mock:
+        respx.get(url).mock(side_effect=[httpx.Response(200, text=before), httpx.Response(200, text=after)])
+        await cache.refresh([url], [], now=1000)
+        delta = await cache.refresh([url], [], now=2000)
+
+    # Only the changed passage's text is stored in the second snapshot.
+    assert list(delta.sources[0].added.values()) == ["Latest action: signed into law"]
+
+    context = cache.context([url], [])
+    assert context.source_summaries[0].new_passages == ["Latest action: signed into law"]
+    prompt = context.to_prompt_section()
+    assert "New since previous snapshot:\n+ Latest action: signed into law" in prompt
+    assert "Unchanged:\nTitle: CLARITY Act" in prompt
+    assert "referred to committee" not in prompt
+
+    reloaded = ResearchCache.load(6, tmp_path)
+    assert reloaded.context([url], []).source_summaries[0].new_passages == ["Latest action: signed into law"]
+
+
+@pytest.mark.asyncio
+async def test_first_fetch_has_no_highlight(tmp_path):
+    url = "https://example.com/first"
+    cache = ResearchCache.load(7, tmp_path)
+    with respx.mock:
+        respx.get(url).mock(return_value=httpx.Response(200, text=_page("Hello")))
+        await cache.refresh([url], [], now=1000)
+    summary = cache.context([url], []).source_summaries[0]
+    assert summary.new_passages == []
+    assert "New since" not in cache.context([url], []).to_prompt_section()
@@ -0,0 +1,110 @@
+"""Tests for src.resolve_queue — value-weighted resolution priority queue."""
+
+from src.resolve_queue import (
+    MAX_VALUE_CREDIT_SECONDS,
+    RETRY_PENALTY_SECONDS,
+    VALUE_CREDIT_SECONDS,
+    ResolutionQueue,
+    priority_key,
+)
+from src.types import MarketInfo, MarketStatus
+
+
+class Clock:
+    def __init__(self, now: float = 10_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _market(market_id: int, value: int) -> MarketInfo:
+    return MarketInfo(
+        id=market_id, title="t", description="d", resolution_deadline=0,
+        yes_pool=value // 2, no_pool=value - value // 2, status=MarketStatus.LOCKED,
+    )
+
+
+def _drain(queue: ResolutionQueue) -> list[int]:
+    order = []
+    while (market_id := queue.pop()) is not None:
+        order.append(market_id)
+    return order
+
+
+def test_priority_key_credits_value_and_penalises_retries():
+    assert priority_key(_market(1, 0), 100.0) == 100.0
+    assert priority_key(_market(1, 999), 100.0) == 100.0 - 3 * VALUE_CREDIT_SECONDS
+    assert priority_key(_market(1, 10**30), 100.0) == 100.0 - MAX_VALUE_CREDIT_SECONDS
+    assert priority_key(_market(1, 0), 100.0, attempts=2) == 100.0 + 2 * RETRY_PENALTY_SECONDS
+
+
+def test_markets_that_expire_together_resolve_by_value():
+    queue = ResolutionQueue(Clock())
+    for market_id, value in [(1, 10), (2, 10**9), (3, 10**5), (4, 0)]:
+        queue.push(_market(market_id, value), ready_at=9_000)
+
+    assert not queue.push(_market(1, 10), ready_at=9_000)
+    assert len(queue) == 4
+    assert _drain(queue) == [2, 3, 1, 4]
+
+
+def test_overdue_and_retried_markets():
+    queue = ResolutionQueue(Clock())
+    # A small market an hour overdue beats a big one that just expired.
+    queue.push(_market(1, 10), ready_at=10_000 - 3600)
+    queue.push(_market(2, 10**12), ready_at=10_000)
+    # A retried market drops behind an equal fresh one.
+    queue.push(_market(3, 1000), ready_at=10_000, attempts=1)
+    queue.push(_market(4, 1000), ready_at=10_000)
+
+    assert _drain(queue) == [1, 2, 4, 3]
+
+
+def test_aging_bounds_how_long_a_small_market_waits():
+    clock = Clock()
+    queue = ResolutionQueue(clock)
+    queue.push(_market(0, 0), ready_at=clock.now)
+
+    # Whales keep arriving every minute and one slot frees up every minute.
+    served = []
+    for minute in range(1, 60):
+        clock.now += 60
+        queue.push(_market(minute, 10**18), ready_at=clock.now)
+        served.append(queue.pop())
+
+    waited = served.index(0) + 1
+    assert 0 < waited * 60 <= MAX_VALUE_CREDIT_SECONDS + 60
+
+
+def test_discard_and_metrics():
+    clock = Clock()
+    queue = ResolutionQueue(clock)
+    queue.push(_market(1, 100), ready_at=clock.now - 10)
+    queue.push(_market(2, 300), ready_at=clock.now - 30)
+    queue.push(_market(3, 7), ready_at=clock.now)
+    queue.discard(3)
+
+    assert 3 not in queue
+    assert queue.metrics().queued_value == 400
+    assert _drain(queue) == [2, 1]
+
+    m = queue.metrics()
+    assert (m.depth, m.dequeued) == (0, 2)
+    assert m.mean_wait_seconds == 20
+    assert m.max_wait_seconds == m.p95_wait_seconds == 30
+    assert m.value_weighted_wait_seconds == (10 * 100 + 30 * 300) / 400
+
+
+def test_requeued_market_keeps_only_its_new_key():
+    clock = Clock()
+    queue = ResolutionQueue(clock)
+    queue.push(_market(1, 100), ready_at=0)
+    queue.push(_market(2, 100), ready_at=500)
+    queue.discard(1)
+    queue.push(_market(1, 100), ready_at=1000)
+
+    # The discarded entry's earlier key must not put market 1 first.
+    assert _drain(queue) == [2, 1]
+    assert queue.metrics().max_wait_seconds == clock.now - 500
+    assert queue.pop() is None
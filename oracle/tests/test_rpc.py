@@ -0,0 +1,189 @@
+"""Tests for src.rpc — pooled RPC access with failover and coalescing."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+import respx
+from solana.rpc.core import RPCException
+
+from src.rpc import AllEndpointsFailed, RpcPool, get_rpc_urls
+
+
+class _FakeClient:
+    """Stands in for AsyncClient, with AsyncMock RPC methods."""
+
+    def __init__(self, url: str, slot: int = 1000, latency: float = 0.0):
+        self.url = url
+        self.get_slot = AsyncMock(side_effect=self._slot)
+        self.get_account_info = AsyncMock(return_value=SimpleNamespace(value=url))
+        self.send_transaction = AsyncMock(return_value=SimpleNamespace(value=f"sig@{url}"))
+        self.close = AsyncMock()
+        self._slot_value = slot
+        self._latency = latency
+
+    async def _slot(self):
+        await asyncio.sleep(self._latency)
+        return SimpleNamespace(value=self._slot_value)
+
+
+def _pool(*clients: _FakeClient) -> RpcPool:
+    by_url = {c.url: c for c in clients}
+    return RpcPool(list(by_url), client_factory=by_url.__getitem__)
+
+
+def _throttled(retry_after: str = "7") -> Exception:
+    request = httpx.Request("POST", "https://rpc.test")
+    response = httpx.Response(429, headers={"retry-after": retry_after}, request=request)
+    try:
+        raise httpx.HTTPStatusError("429", request=request, response=response)
+    except httpx.HTTPStatusError as e:
+        wrapped = RuntimeError("rpc request failed")
+        wrapped.__cause__ = e
+        return wrapped
+
+
+@pytest.mark.asyncio
+async def test_fastest_endpoint_is_preferred():
+    slow, fast = _FakeClient("https://slow", latency=0.05), _FakeClient("https://fast")
+    pool = _pool(slow, fast)
+
+    resp = await pool.get_account_info("acct")
+
+    assert resp.value == "https://fast"
+    slow.get_account_info.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_failover_on_transport_error_and_cooldown():
+    primary, backup = _FakeClient("https://a"), _FakeClient("https://b", latency=0.01)
+    primary.get_account_info.side_effect = httpx.ConnectError("down")
+    pool = _pool(primary, backup)
+
+    assert (await pool.get_account_info("x")).value == "https://b"
+    # The failed endpoint cools down, so the next call goes straight to the backup.
+    assert (await pool.get_account_info("y")).value == "https://b"
+    assert primary.get_account_info.call_count == 1
+    assert pool.stats()[0].available is False
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_honours_retry_after():
+    now = [100.0]
+    primary, backup = _FakeClient("https://a"), _FakeClient("https://b")
+    primary.send_transaction.side_effect = _throttled("7")
+    pool = RpcPool(["https://a", "https://b"], client_factory={"https://a": primary, "https://b": backup}.__getitem__,
+                   clock=lambda: now[0])
+    pool._checked = True
+
+    assert (await pool.send_transaction("tx")).value == "sig@https://b"
+    endpoint = pool.endpoints[0]
+    assert endpoint.throttled == 1
+    assert endpoint.cooldown_until == pytest.approx(107.0)
+
+
+@pytest.mark.asyncio
+async def test_rpc_errors_are_not_failed_over():
+    primary, backup = _FakeClient("https://a"), _FakeClient("https://b", latency=0.01)
+    primary.send_transaction.side_effect = RPCException({"code": -32002, "message": "preflight failed"})
+    pool = _pool(primary, backup)
+
+    with pytest.raises(RPCException):
+        await pool.send_transaction("tx")
+    backup.send_transaction.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_all_endpoints_failing_raises():
+    a, b = _FakeClient("https://a"), _FakeClient("https://b")
+    a.get_account_info.side_effect = httpx.ReadTimeout("slow")
+    b.get_account_info.side_effect = httpx.ConnectError("down")
+    pool = _pool(a, b)
+
+    with pytest.raises(AllEndpointsFailed, match="https://a.*https://b|https://b.*https://a"):
+        await pool.get_account_info("x")
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_reads_are_coalesced():
+    client = _FakeClient("https://a")
+    gate = asyncio.Event()
+
+    async def slow_read(*args, **kwargs):
+        await gate.wait()
+        return SimpleNamespace(value=args)
+
+    client.get_account_info.side_effect = slow_read
+    pool = _pool(client)
+
+    reads = [asyncio.create_task(pool.get_account_info("m1")) for _ in range(5)]
+    other = asyncio.create_task(pool.get_account_info("m2"))
+    await asyncio.sleep(0)
+    gate.set()
+    results = await asyncio.gather(*reads, other)
+
+    assert client.get_account_info.call_count == 2
+    assert pool.coalesced == 4
+    assert {r.value for r in results} == {("m1",), ("m2",)}
+    # Once finished, the next read goes out again.
+    await pool.get_account_info("m1")
+    assert client.get_account_info.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_lagging_endpoint_is_deprioritised():
+    behind, ahead = _FakeClient("https://behind", slot=1000), _FakeClient("https://ahead", slot=5000, latency=0.02)
+    pool = _pool(behind, ahead)
+
+    stats = {s.url: s for s in await pool.check_health()}
+
+    assert stats["https://behind"].lagging
+    assert not stats["https://ahead"].lagging
+    assert pool.ranked()[0].url == "https://ahead"
+
+
+def test_unknown_attributes_are_not_proxied():
+    pool = RpcPool(["https://a"])
+    with pytest.raises(AttributeError):
+        pool.not_an_rpc_method
+
+
+def test_rpc_urls_from_env(monkeypatch):
+    monkeypatch.setenv("SOLANA_RPC_URLS", "https://a, https://b,")
+    assert get_rpc_urls() == ["https://a", "https://b"]
+    monkeypatch.delenv("SOLANA_RPC_URLS")
+    monkeypatch.setenv("SOLANA_RPC_URL", "https://single")
+    assert get_rpc_urls() == ["https://single"]
+
+
+@pytest.mark.asyncio
+async def test_batch_sends_one_request_and_fails_over():
+    pool = RpcPool(["https://a.rpc", "https://b.rpc"], client_factory=_FakeClient)
+    pool._checked = True
+    with respx.mock:
+        respx.post("https://a.rpc").mock(return_value=httpx.Response(503))
+        route = respx.post("https://b.rpc").mock(return_value=httpx.Response(200, json=[
+            {"jsonrpc": "2.0", "id": 1, "result": {"value": "acct"}},
+            {"jsonrpc": "2.0", "id": 0, "result": {"value": ["status"]}},
+        ]))
+        results = await pool.batch([("getSignatureStatuses", [["sig"]]), ("getAccountInfo", ["pda"])])
+
+    assert results == [{"value": ["status"]}, {"value": "acct"}]
+    body = json.loads(route.calls[0].request.content)
+    assert [c["method"] for c in body] == ["getSignatureStatuses", "getAccountInfo"]
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_batch_raises_rpc_errors():
+    pool = RpcPool(["https://a.rpc"], client_factory=_FakeClient)
+    with respx.mock:
+        respx.post("https://a.rpc").mock(return_value=httpx.Response(200, json=[
+            {"jsonrpc": "2.0", "id": 0, "error": {"code": -32602, "message": "bad params"}},
+        ]))
+        with pytest.raises(RPCException):
+            await pool.batch([("getAccountInfo", ["pda"])])
+    await pool.close()
@@ -0,0 +1,203 @@
+"""Tests for src.scheduler — deadline-driven market resolution."""
+
+import asyncio
+import time
+
+import pytest
+
+from src import scheduler as scheduler_module
+from src.scheduler import DeadlineScheduler
+from src.types import MarketInfo, MarketStatus, ResearchContext, ResolveReport, SearchResult
+
+
+def _market(market_id: int, deadline: float, status: MarketStatus = MarketStatus.OPEN) -> MarketInfo:
+    return MarketInfo(
+        id=market_id,
+        title=f"Market {market_id}",
+        description="desc",
+        resolution_deadline=int(deadline),
+        yes_pool=0,
+        no_pool=0,
+        status=status,
+    )
+
+
+class Harness:
+    """Records prewarm/resolve calls and stops the scheduler once `expected` markets resolve."""
+
+    def __init__(self, markets: list[MarketInfo], expected: int, fail_first: set[int] = frozenset()):
+        self.markets = markets
+        self.expected = expected
+        self.fail_first = set(fail_first)
+        self.prewarmed: list[tuple[int, float, bool]] = []
+        self.resolved: list[tuple[int, ResearchContext | None, float]] = []
+        self.stop = asyncio.Event()
+
+    async def discover(self) -> list[MarketInfo]:
+        return self.markets
+
+    async def prewarm(self, market: MarketInfo, final: bool = False) -> ResearchContext:
+        self.prewarmed.append((market.id, time.time(), final))
+        return ResearchContext(search_results=[SearchResult(title=market.title, url="u", snippet="s")])
+
+    async def resolve(self, market_id: int, research: ResearchContext | None) -> ResolveReport:
+        if market_id in self.fail_first:
+            self.fail_first.discard(market_id)
+            return ResolveReport(market_id=market_id, market_title="", consensus=None, error="cluster clock behind")
+        self.resolved.append((market_id, research, time.time()))
+        if len(self.resolved) >= self.expected:
+            self.stop.set()
+        return ResolveReport(market_id=market_id, market_title="", consensus=None, tx_signature="sig")
+
+    def scheduler(self, **kwargs) -> DeadlineScheduler:
+        kwargs = {"prewarm_lead": 0.5, "grace": 0.0, "refresh_interval": 60.0, **kwargs}
+        return DeadlineScheduler(self.discover, self.prewarm, self.resolve, **kwargs)
+
+
+class TestSchedule:
+    def test_only_unresolved_markets_are_scheduled(self):
+        s = DeadlineScheduler(None, None, None, prewarm_lead=10, grace=0)
+        assert s.schedule(_market(1, 1000))
+        assert not s.schedule(_market(2, 500, MarketStatus.RESOLVED))
+        assert s.next_event() == 990  # prewarm of market 1
+
+    def test_changed_deadline_invalidates_old_events(self):
+        s = DeadlineScheduler(None, None, None, prewarm_lead=10, grace=0)
+        s.schedule(_market(1, 1000))
+        s.schedule(_market(1, 2000))
+        assert s.next_event() == 1990
+
+    def test_unscheduled_market_leaves_no_events(self):
+        s = DeadlineScheduler(None, None, None, prewarm_lead=10, grace=0)
+        s.schedule(_market(1, 1000))
+        s.unschedule(1)
+        assert s.next_event() is None
+
+
+@pytest.mark.asyncio
+async def test_resolves_in_deadline_order_with_prewarmed_research():
+    now = time.time()
+    harness = Harness([_market(2, now + 2), _market(1, now + 1)], expected=2)
+    s = harness.scheduler()
+
+    await asyncio.wait_for(s.run(harness.stop), timeout=5)
+
+    assert [m for m, _, _ in harness.resolved] == [1, 2]
+    for market_id, research, fired_at in harness.resolved:
+        deadline = next(m.resolution_deadline for m in harness.markets if m.id == market_id)
+        assert deadline <= fired_at < deadline + 0.5
+        assert research.search_results[0].title == f"Market {market_id}"
+    warm_passes = [(m, final) for m, _, final in harness.prewarmed]
+    # One speculative pass ahead of each deadline, then a final delta refresh.
+    assert warm_passes.index((1, False)) < warm_passes.index((1, True))
+    assert warm_passes.count((2, True)) == 1
+
+
+@pytest.mark.asyncio
+async def test_research_is_rewarmed_until_the_deadline(monkeypatch):
+    monkeypatch.setattr(scheduler_module, "LAST_PREWARM_LEAD_SECONDS", 0.1)
+    harness = Harness([_market(1, time.time() + 2)], expected=1)
+    s = harness.scheduler(prewarm_lead=5.0, prewarm_interval=0.3)
+
+    await asyncio.wait_for(s.run(harness.stop), timeout=5)
+
+    speculative = [t for _, t, final in harness.prewarmed if not final]
+    assert len(speculative) >= 3
+    # Passes are spaced by the interval, except the last one which is pinned
+    # just before the deadline.
+    assert all(b - a >= 0.25 for a, b in zip(speculative[:-1], speculative[1:-1]))
+    assert speculative[-1] < harness.markets[0].resolution_deadline
+
+
+@pytest.mark.asyncio
+async def test_overdue_markets_resolve_immediately():
+    harness = Harness([_market(7, time.time() - 3600)], expected=1)
+    started = time.monotonic()
+    await asyncio.wait_for(harness.scheduler().run(harness.stop), timeout=5)
+    assert harness.resolved[0][0] == 7
+    assert time.monotonic() - started < 1
+
+
+@pytest.mark.asyncio
+async def test_earlier_market_wakes_sleeping_scheduler():
+    harness = Harness([_market(1, time.time() + 3600)], expected=1)
+    s = harness.scheduler()
+    runner = asyncio.create_task(s.run(harness.stop))
+    await asyncio.sleep(0.05)
+
+    s.schedule(_market(2, time.time() - 1))
+    await asyncio.wait_for(runner, timeout=2)
+
+    assert harness.resolved[0][0] == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_resolution_is_retried(monkeypatch):
+    monkeypatch.setattr(scheduler_module, "RETRY_DELAY_SECONDS", 0.05)
+    harness = Harness([_market(3, time.time() - 1)], expected=1, fail_first={3})
+
+    await asyncio.wait_for(harness.scheduler().run(harness.stop), timeout=5)
+
+    assert [m for m, _, _ in harness.resolved] == [3]
+    # Each attempt runs its own final refresh.
+    assert [final for _, _, final in harness.prewarmed].count(True) == 2
+
+
+@pytest.mark.asyncio
+async def test_given_up_market_is_not_rescheduled_by_refresh(monkeypatch):
+    monkeypatch.setattr(scheduler_module, "RETRY_DELAY_SECONDS", 0.01)
+    deadline = time.time() - 1
+    harness = Harness([_market(3, deadline)], expected=1)
+    attempts = []
+
+    async def resolve(market_id, research):
+        attempts.append(market_id)
+        return ResolveReport(market_id=market_id, market_title="", error="always fails")
+
+    s = DeadlineScheduler(harness.discover, harness.prewarm, resolve, prewarm_lead=0.5, grace=0.0)
+    await s.refresh()
+    while len(attempts) < scheduler_module.MAX_RESOLVE_ATTEMPTS or s._running:
+        s._fire_due(time.time())
+        await asyncio.sleep(0.01)
+
+    # The market is still Open on chain, but the scheduler has given up on it.
+    for _ in range(3):
+        assert await s.refresh() == 0
+        s._fire_due(time.time() + 3600)
+        await asyncio.sleep(0)
+    assert s.next_event() is None
+    assert attempts == [3] * scheduler_module.MAX_RESOLVE_ATTEMPTS
+
+    # A new deadline (or the market leaving discovery) clears the give-up.
+    harness.markets = [_market(3, deadline + 3600)]
+    assert await s.refresh() == 1
+
+
+@pytest.mark.asyncio
+async def test_refresh_drops_markets_resolved_elsewhere():
+    harness = Harness([_market(1, time.time() + 3600)], expected=1)
+    s = harness.scheduler()
+    await s.refresh()
+    assert s.next_event() is not None
+
+    harness.markets = [_market(1, time.time() + 3600, MarketStatus.RESOLVED)]
+    await s.refresh()
+    assert s.next_event() is None
+
+
+@pytest.mark.asyncio
+async def test_due_markets_queue_by_value_behind_the_concurrency_limit():
+    now = time.time()
+    markets = [_market(m, now - 5) for m in range(1, 5)]
+    for market, value in zip(markets, [10, 10**9, 0, 10**5]):
+        market.yes_pool = value
+    harness = Harness(markets, expected=4)
+    s = harness.scheduler(concurrency=1)
+
+    await asyncio.wait_for(s.run(harness.stop), timeout=5)
+
+    assert [m for m, _, _ in harness.resolved] == [2, 4, 1, 3]
+    metrics = s.metrics()
+    assert (metrics.tracked, metrics.resolving, metrics.given_up) == (0, 0, 0)
+    assert (metrics.queue.depth, metrics.queue.dequeued) == (0, 4)
+    assert metrics.queue.max_wait_seconds >= 5
@@ -0,0 +1,40 @@
+"""Tests for src.textdiff — passage hashing and shingle diffing."""
+
+from src.textdiff import jaccard, new_passages, passage_key, shingles, split_passages
+
+
+def test_split_passages_drops_blank_lines():
+    assert split_passages("First line\n\n  Second line  \n") == ["First line", "Second line"]
+
+
+def test_passage_key_ignores_case_and_spacing():
+    assert passage_key("Bill  Passed the House") == passage_key("bill passed the house")
+    assert passage_key("Bill passed") != passage_key("Bill failed")
+
+
+def test_moved_passages_are_not_new():
+    previous = ["Status: introduced", "Sponsor: Rep. Smith", "Committee: Financial Services"]
+    current = ["Committee: Financial Services", "Status: introduced", "Sponsor: Rep. Smith"]
+    assert new_passages(previous, current) == []
+
+
+def test_trivial_edits_are_near_duplicates():
+    previous = ["The committee reported the bill favourably after a long markup session on Tuesday, page views 1021"]
+    current = ["The committee reported the bill favourably after a long markup session on Tuesday, page views 1187"]
+    assert new_passages(previous, current) == []
+
+
+def test_substantive_changes_are_new():
+    previous = ["Latest action: referred to committee", "Sponsor: Rep. Smith"]
+    current = ["Latest action: passed the Senate by voice vote", "Sponsor: Rep. Smith"]
+    assert new_passages(previous, current) == ["Latest action: passed the Senate by voice vote"]
+
+
+def test_short_passages_compare_exactly():
+    assert new_passages(["Status: Pending"], ["Status: Passed"]) == ["Status: Passed"]
+
+
+def test_jaccard_bounds():
+    a = shingles("one two three four five")
+    assert jaccard(a, a) == 1.0
+    assert jaccard(a, shingles("six seven eight nine ten")) == 0.0
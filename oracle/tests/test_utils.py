@@ -1,7 +1,16 @@
 """Tests for src.utils — JSON parsing from LLM responses."""
 
 import pytest
-from src.utils import parse_llm_json
+from src.types import JudgmentResult, Outcome
+from src.utils import (
+    IncrementalJSONParser,
+    JSONNotFound,
+    judgment_schema,
+    parse_judgment_json,
+    parse_llm_json,
+    parse_or_repair,
+    stream_judgment,
+)
 
 
 class TestParseLlmJson:
@@ -28,7 +37,7 @@ class TestParseLlmJson:
         assert result["confidence"] == 80
 
     def test_no_json_raises_value_error(self):
-        with pytest.raises(ValueError, match="No JSON object found"):
+        with pytest.raises(JSONNotFound, match="No JSON object found"):
             parse_llm_json("This response has no JSON at all")
 
     def test_malformed_json_raises_value_error(self):
@@ -43,3 +52,154 @@ class TestParseLlmJson:
         raw = '{"outcome": "Yes", "confidence": 90, "reasoning": "test", "meta": {"src": "web"}}'
         result = parse_llm_json(raw)
         assert result["meta"]["src"] == "web"
+
+    def test_fence_ignores_braces_in_surrounding_prose(self):
+        raw = 'Per the rules {see section 2}:\n```json\n{"outcome": "No", "confidence": 60, "reasoning": "r"}\n```\nDone {ok}.'
+        assert parse_llm_json(raw)["outcome"] == "No"
+
+    def test_top_level_array_is_not_an_object(self):
+        with pytest.raises(ValueError):
+            parse_llm_json("[1, 2]")
+
+
+class TestParseJudgmentJson:
+    def test_validates_clean_json(self):
+        result = parse_judgment_json('{"outcome": "Yes", "confidence": 85, "reasoning": "clear"}', "p")
+        assert result == JudgmentResult(provider="p", outcome=Outcome.YES, confidence=85, reasoning="clear")
+
+    def test_falls_back_to_extraction(self):
+        raw = 'Answer:\n```json\n{"outcome": "Invalid", "confidence": 40, "reasoning": "unclear"}\n```'
+        result = parse_judgment_json(raw, "p")
+        assert (result.outcome, result.confidence) == (Outcome.INVALID, 40)
+
+    def test_provider_comes_from_the_caller(self):
+        raw = '{"provider": "spoofed", "outcome": "Yes", "confidence": 85, "reasoning": "r"}'
+        assert parse_judgment_json(raw, "p").provider == "p"
+
+    def test_coerces_numeric_strings(self):
+        result = parse_judgment_json('{"outcome": "No", "confidence": "70", "reasoning": "r"}', "p")
+        assert result.confidence == 70
+
+    @pytest.mark.parametrize("raw", [
+        '{"outcome": "Maybe", "confidence": 70, "reasoning": "r"}',
+        '{"outcome": "Yes", "confidence": 170, "reasoning": "r"}',
+        '{"outcome": "Yes", "confidence": 70}',
+        "no json at all",
+    ])
+    def test_invalid_judgments_raise_value_error(self, raw):
+        with pytest.raises(ValueError):
+            parse_judgment_json(raw, "p")
+
+
+class TestIncrementalJSONParser:
+    RAW = '```json\n{"outcome": "Yes", "confidence": 85, "reasoning": "a, \\"quoted\\" {brace}", "meta": {"k": [1, 2]}}\n```'
+
+    def test_fields_match_full_parse_when_fed_char_by_char(self):
+        parser = IncrementalJSONParser()
+        for ch in self.RAW:
+            parser.feed(ch)
+        assert parser.done
+        assert parser.fields == parse_llm_json(self.RAW)
+
+    def test_verdict_fields_available_before_reasoning(self):
+        parser = IncrementalJSONParser()
+        parser.feed('{"outcome": "No", "confidence": 62, "reasoning": "The bill was')
+        assert parser.fields == {"outcome": "No", "confidence": 62}
+        assert not parser.done
+
+    def test_number_needs_delimiter(self):
+        parser = IncrementalJSONParser()
+        parser.feed('{"confidence": 6')
+        assert "confidence" not in parser.fields
+        parser.feed('2,')
+        assert parser.fields["confidence"] == 62
+
+
+class TestStreamJudgment:
+    @staticmethod
+    async def _chunks(*parts):
+        for part in parts:
+            yield part
+
+    @staticmethod
+    def _parse(raw: str) -> JudgmentResult:
+        data = parse_llm_json(raw)
+        return JudgmentResult(provider="p", outcome=Outcome(data["outcome"]), confidence=data["confidence"], reasoning=data["reasoning"])
+
+    @pytest.mark.asyncio
+    async def test_verdict_fires_before_stream_ends(self):
+        seen: list[tuple[JudgmentResult, int]] = []
+        consumed = 0
+
+        async def chunks():
+            nonlocal consumed
+            for part in ['{"outcome": "Yes", ', '"confidence": 90, ', '"reasoning": "long ', 'story"}']:
+                consumed += 1
+                yield part
+
+        result = await stream_judgment(chunks(), "p", self._parse, lambda v: seen.append((v, consumed)))
+
+        assert len(seen) == 1
+        verdict, at_chunk = seen[0]
+        assert (verdict.outcome, verdict.confidence, verdict.reasoning) == (Outcome.YES, 90, "")
+        assert at_chunk == 2  # before any reasoning has arrived
+        assert result.reasoning == "long story"
+
+    @pytest.mark.asyncio
+    async def test_truncated_stream_falls_back_to_verdict(self):
+        result = await stream_judgment(
+            self._chunks('{"outcome": "No", "confidence": 70, "reasoning": "cut o'), "p", self._parse
+        )
+        assert result.outcome == Outcome.NO
+        assert result.confidence == 70
+
+    @pytest.mark.asyncio
+    async def test_no_verdict_raises(self):
+        with pytest.raises(ValueError):
+            await stream_judgment(self._chunks("no json here"), "p", self._parse)
+
+
+class TestStructuredOutput:
+    def test_schema_is_generated_from_judgment_result(self):
+        schema = judgment_schema()
+        assert set(schema["properties"]) == {"outcome", "confidence", "reasoning"}
+        assert schema["required"] == ["outcome", "confidence", "reasoning"]
+        assert schema["properties"]["outcome"]["enum"] == ["Yes", "No", "Invalid"]
+        assert schema["additionalProperties"] is False
+        assert "$defs" not in schema
+
+    def test_schema_copies_are_independent(self):
+        judgment_schema().pop("additionalProperties")
+        assert "additionalProperties" in judgment_schema()
+
+    @pytest.mark.asyncio
+    async def test_repair_is_skipped_for_valid_output(self):
+        async def complete(prompt):
+            raise AssertionError("repair should not be called")
+
+        raw = '{"outcome": "Yes", "confidence": 80, "reasoning": "ok"}'
+        result = await parse_or_repair(raw, TestStreamJudgment._parse, complete, "p")
+        assert result.outcome == Outcome.YES
+
+    @pytest.mark.asyncio
+    async def test_repair_gives_up_after_max_attempts(self):
+        prompts = []
+
+        async def complete(prompt):
+            prompts.append(prompt)
+            return "still not json"
+
+        with pytest.raises(ValueError):
+            await parse_or_repair("garbage", TestStreamJudgment._parse, complete, "p")
+        assert len(prompts) == 1
+        assert "garbage" in prompts[0]
+
+    @pytest.mark.asyncio
+    async def test_stream_without_verdict_is_repaired(self):
+        async def complete(prompt):
+            return '{"outcome": "No", "confidence": 55, "reasoning": "fixed"}'
+
+        result = await stream_judgment(
+            TestStreamJudgment._chunks("no json here"), "p", TestStreamJudgment._parse, complete=complete
+        )
+        assert (result.outcome, result.reasoning) == (Outcome.NO, "fixed")